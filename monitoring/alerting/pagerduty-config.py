@@ -5,15 +5,19 @@ Handles escalation policies, incident management, and on-call scheduling
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+import argparse
 import json
 import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 import os
 from dataclasses import dataclass
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -30,150 +34,243 @@ class Service:
     escalation_policy_id: str
     alert_creation: str = "create_alerts_and_incidents"
 
+class RateLimiter:
+    """Thread-safe token bucket shared by concurrent callers"""
+
+    def __init__(self, requests_per_minute: float, burst: Optional[int] = None):
+        self.rate = requests_per_minute / 60
+        self.capacity = burst or max(1, int(self.rate))
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+def retry_delay(response: Optional[requests.Response], attempt: int) -> float:
+    """Seconds to wait before retrying: PagerDuty's rate-limit hint, else jittered exponential backoff"""
+    if response is not None:
+        for header in ("Retry-After", "ratelimit-reset"):
+            value = response.headers.get(header)
+            if value:
+                try:
+                    return float(value) + random.uniform(0, 0.25)
+                except ValueError:
+                    pass
+    return min(30.0, 0.5 * 2 ** attempt) * random.uniform(0.5, 1.0)
+
 class PagerDutyIntegration:
-    def __init__(self, api_token: str):
+    """Idempotent PagerDuty provisioning over a pooled, rate-limited session
+
+    Every call goes through one requests.Session sized for ``max_workers``
+    concurrent callers and a token bucket kept under PagerDuty's REST rate
+    limit; 429s and 5xx responses are retried with backoff. Before creating
+    anything, each collection is listed once and indexed by name (users by
+    email), so re-running the setup reuses what already exists.
+    """
+
+    # collection -> (response key, field that identifies an existing object)
+    COLLECTIONS = {
+        "users": ("user", "email"),
+        "schedules": ("schedule", "name"),
+        "escalation_policies": ("escalation_policy", "name"),
+        "services": ("service", "name")
+    }
+
+    def __init__(self, api_token: str, base_url: str = "https://api.pagerduty.com", max_workers: int = 8,
+                 requests_per_minute: float = 900, max_retries: int = 5, timeout: float = 30):
         self.api_token = api_token
-        self.base_url = "https://api.pagerduty.com"
+        self.base_url = base_url.rstrip("/")
         self.headers = {
             "Authorization": f"Token token={api_token}",
             "Content-Type": "application/json",
             "Accept": "application/vnd.pagerduty+json;version=2"
         }
-    
-    def create_user(self, name: str, email: str, role: str = "user") -> Optional[str]:
-        """Create a PagerDuty user"""
-        user_data = {
-            "user": {
-                "name": name,
-                "email": email,
-                "role": role,
-                "time_zone": "UTC"
-            }
-        }
-        
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.rate_limiter = RateLimiter(requests_per_minute)
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.stats = {"requests": 0, "rate_limited": 0, "created": 0, "reused": 0}
+        self._stats_lock = threading.Lock()
+        self._index: Dict[str, Dict[str, Dict]] = {}
+        self._index_locks = {collection: threading.Lock() for collection in self.COLLECTIONS}
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def request(self, method: str, path: str, **kwargs) -> requests.Response:
+        """Rate-limited request with backoff on 429, 5xx and connection errors"""
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire()
+            self._count("requests")
+            try:
+                response = self.session.request(method, f"{self.base_url}{path}", timeout=self.timeout, **kwargs)
+            except requests.ConnectionError:
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(retry_delay(None, attempt))
+                continue
+            if response.status_code == 429:
+                self._count("rate_limited")
+            elif response.status_code < 500:
+                return response
+            if attempt == self.max_retries:
+                return response
+            delay = retry_delay(response, attempt)
+            logger.warning(f"{method} {path} returned {response.status_code}, retrying in {delay:.1f}s")
+            time.sleep(delay)
+        return response
+
+    def lookup(self, collection: str, key: str) -> Optional[Dict]:
+        """Find an existing object, listing the whole collection on first use"""
+        with self._index_locks[collection]:
+            index = self._index.get(collection)
+            if index is None:
+                index = self._index[collection] = self._list(collection)
+            return index.get(key.lower())
+
+    def _list(self, collection: str) -> Dict[str, Dict]:
+        field = self.COLLECTIONS[collection][1]
+        index = {}
+        offset = 0
+        while True:
+            response = self.request("GET", f"/{collection}", params={"limit": 100, "offset": offset})
+            response.raise_for_status()
+            page = response.json()
+            for item in page.get(collection, []):
+                if item.get(field):
+                    index[item[field].lower()] = item
+            if not page.get("more"):
+                return index
+            offset += len(page.get(collection, []))
+
+    def _remember(self, collection: str, item: Dict):
+        field = self.COLLECTIONS[collection][1]
+        with self._index_locks[collection]:
+            self._index.setdefault(collection, {})[item[field].lower()] = item
+
+    def ensure(self, collection: str, key: str, body: Dict) -> Optional[Dict]:
+        """Return the existing object identified by ``key``, creating it if needed"""
+        singular = self.COLLECTIONS[collection][0]
         try:
-            response = requests.post(
-                f"{self.base_url}/users",
-                headers=self.headers,
-                json=user_data
-            )
-            
+            existing = self.lookup(collection, key)
+            if existing is not None:
+                self._count("reused")
+                logger.info(f"Reusing {singular.replace('_', ' ')} {key} ({existing['id']})")
+                return existing
+
+            response = self.request("POST", f"/{collection}", json={singular: body})
             if response.status_code == 201:
-                user_id = response.json()["user"]["id"]
-                logger.info(f"Created user {name} with ID: {user_id}")
-                return user_id
-            else:
-                logger.error(f"Failed to create user {name}: {response.text}")
-                return None
-                
-        except Exception as e:
-            logger.error(f"Error creating user {name}: {e}")
-            return None
-    
+                item = response.json()[singular]
+                self._remember(collection, item)
+                self._count("created")
+                logger.info(f"Created {singular.replace('_', ' ')} {key} with ID: {item['id']}")
+                return item
+            logger.error(f"Failed to create {singular.replace('_', ' ')} {key}: {response.text}")
+        except requests.RequestException as e:
+            logger.error(f"Error creating {singular.replace('_', ' ')} {key}: {e}")
+        return None
+
+    def create_user(self, name: str, email: str, role: str = "user") -> Optional[str]:
+        """Create a PagerDuty user"""
+        user = self.ensure("users", email, {
+            "name": name,
+            "email": email,
+            "role": role,
+            "time_zone": "UTC"
+        })
+        return user["id"] if user else None
+
     def create_schedule(self, name: str, time_zone: str = "UTC") -> Optional[str]:
         """Create an on-call schedule"""
-        schedule_data = {
-            "schedule": {
-                "name": name,
-                "time_zone": time_zone,
-                "description": f"On-call schedule for {name}"
-            }
-        }
-        
-        try:
-            response = requests.post(
-                f"{self.base_url}/schedules",
-                headers=self.headers,
-                json=schedule_data
-            )
-            
-            if response.status_code == 201:
-                schedule_id = response.json()["schedule"]["id"]
-                logger.info(f"Created schedule {name} with ID: {schedule_id}")
-                return schedule_id
-            else:
-                logger.error(f"Failed to create schedule {name}: {response.text}")
-                return None
-                
-        except Exception as e:
-            logger.error(f"Error creating schedule {name}: {e}")
-            return None
-    
+        schedule = self.ensure("schedules", name, {
+            "name": name,
+            "time_zone": time_zone,
+            "description": f"On-call schedule for {name}"
+        })
+        return schedule["id"] if schedule else None
+
     def create_escalation_policy(self, policy: EscalationPolicy) -> Optional[str]:
         """Create an escalation policy"""
-        policy_data = {
+        created = self.ensure("escalation_policies", policy.name, {
+            "name": policy.name,
+            "description": policy.description,
+            "num_loops": policy.num_loops,
+            "escalation_rules": policy.escalation_rules
+        })
+        return created["id"] if created else None
+
+    def create_service(self, service: Service) -> Optional[Tuple[str, str]]:
+        """Create a PagerDuty service and return its ID and Events API integration key"""
+        created = self.ensure("services", service.name, {
+            "name": service.name,
+            "description": service.description,
             "escalation_policy": {
-                "name": policy.name,
-                "description": policy.description,
-                "num_loops": policy.num_loops,
-                "escalation_rules": policy.escalation_rules
-            }
-        }
-        
-        try:
-            response = requests.post(
-                f"{self.base_url}/escalation_policies",
-                headers=self.headers,
-                json=policy_data
-            )
-            
-            if response.status_code == 201:
-                policy_id = response.json()["escalation_policy"]["id"]
-                logger.info(f"Created escalation policy {policy.name} with ID: {policy_id}")
-                return policy_id
-            else:
-                logger.error(f"Failed to create escalation policy {policy.name}: {response.text}")
-                return None
-                
-        except Exception as e:
-            logger.error(f"Error creating escalation policy {policy.name}: {e}")
+                "id": service.escalation_policy_id,
+                "type": "escalation_policy_reference"
+            },
+            "alert_creation": service.alert_creation
+        })
+        if not created:
             return None
-    
-    def create_service(self, service: Service) -> Optional[str]:
-        """Create a PagerDuty service"""
-        service_data = {
-            "service": {
-                "name": service.name,
-                "description": service.description,
-                "escalation_policy": {
-                    "id": service.escalation_policy_id,
-                    "type": "escalation_policy_reference"
-                },
-                "alert_creation": service.alert_creation
-            }
-        }
-        
         try:
-            response = requests.post(
-                f"{self.base_url}/services",
-                headers=self.headers,
-                json=service_data
-            )
-            
-            if response.status_code == 201:
-                service_id = response.json()["service"]["id"]
-                integration_key = response.json()["service"]["integrations"][0]["integration_key"]
-                logger.info(f"Created service {service.name} with ID: {service_id}")
-                logger.info(f"Integration key: {integration_key}")
-                return service_id, integration_key
-            else:
-                logger.error(f"Failed to create service {service.name}: {response.text}")
-                return None
-                
-        except Exception as e:
-            logger.error(f"Error creating service {service.name}: {e}")
+            integration_key = self.integration_key(created)
+        except requests.RequestException as e:
+            logger.error(f"Error fetching integration key for {service.name}: {e}")
             return None
+        logger.info(f"Integration key for {service.name}: {integration_key}")
+        return created["id"], integration_key
 
-def setup_sleek_pagerduty_integration():
-    """Setup complete PagerDuty integration for Sleek monitoring"""
-    
-    # Get API token from environment variable
-    api_token = os.getenv("PAGERDUTY_API_TOKEN")
-    if not api_token:
-        logger.error("PAGERDUTY_API_TOKEN environment variable not set")
-        return False
+    def integration_key(self, service: Dict) -> str:
+        """Key of the service's Events API integration, adding one if it has none"""
+        integrations = service.get("integrations") or []
+        for integration in integrations:
+            if integration.get("integration_key"):
+                return integration["integration_key"]
+        if integrations:
+            response = self.request("GET", f"/services/{service['id']}/integrations/{integrations[0]['id']}")
+        else:
+            response = self.request("POST", f"/services/{service['id']}/integrations", json={
+                "integration": {"type": "events_api_v2_inbound_integration", "name": "Prometheus AlertManager"}
+            })
+        response.raise_for_status()
+        return response.json()["integration"]["integration_key"]
+
+    def run_parallel(self, calls: Dict[str, Callable[[], object]]) -> Dict[str, object]:
+        """Run independent provisioning calls concurrently, keyed like ``calls``"""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {key: pool.submit(call) for key, call in calls.items()}
+            return {key: future.result() for key, future in futures.items()}
+
+def setup_sleek_pagerduty_integration(pd: Optional[PagerDutyIntegration] = None):
+    """Setup complete PagerDuty integration for Sleek monitoring
+
+    Users and schedules are created concurrently, then the escalation
+    policies that reference them, then the services.
+    """
     
-    pd = PagerDutyIntegration(api_token)
+    if pd is None:
+        # Get API token from environment variable
+        api_token = os.getenv("PAGERDUTY_API_TOKEN")
+        if not api_token:
+            logger.error("PAGERDUTY_API_TOKEN environment variable not set")
+            return False
+        pd = PagerDutyIntegration(api_token, base_url=os.getenv("PAGERDUTY_API_URL", "https://api.pagerduty.com"))
     
     # Create team members (mock data for demo)
     team_members = [
@@ -183,22 +280,23 @@ def setup_sleek_pagerduty_integration():
         {"name": "James Mitchell", "email": "james.mitchell@sleek.com", "role": "user"}
     ]
     
-    user_ids = {}
-    for member in team_members:
-        user_id = pd.create_user(member["name"], member["email"], member["role"])
-        if user_id:
-            user_ids[member["name"]] = user_id
-    
-    # Create schedules for different regions
-    schedules = {
-        "APAC Primary": pd.create_schedule("APAC Primary On-Call", "Asia/Singapore"),
-        "EMEA Primary": pd.create_schedule("EMEA Primary On-Call", "Europe/London"),
-        "Global Escalation": pd.create_schedule("Global Escalation", "UTC")
+    # Users and schedules for different regions are independent of each other
+    created = pd.run_parallel({
+        **{
+            f"user:{member['name']}": (lambda m=member: pd.create_user(m["name"], m["email"], m["role"]))
+            for member in team_members
+        },
+        "APAC Primary": lambda: pd.create_schedule("APAC Primary On-Call", "Asia/Singapore"),
+        "EMEA Primary": lambda: pd.create_schedule("EMEA Primary On-Call", "Europe/London"),
+        "Global Escalation": lambda: pd.create_schedule("Global Escalation", "UTC")
+    })
+    user_ids = {
+        member["name"]: created[f"user:{member['name']}"]
+        for member in team_members if created[f"user:{member['name']}"]
     }
+    schedules = {name: created[name] for name in ("APAC Primary", "EMEA Primary", "Global Escalation")}
     
-    # Create escalation policies
-    escalation_policies = {}
-    
+    # Escalation policies reference the schedules and users above
     # Critical Infrastructure Policy
     critical_policy = EscalationPolicy(
         name="Sleek Critical Infrastructure",
@@ -227,10 +325,6 @@ def setup_sleek_pagerduty_integration():
         ]
     )
     
-    critical_policy_id = pd.create_escalation_policy(critical_policy)
-    if critical_policy_id:
-        escalation_policies["critical"] = critical_policy_id
-    
     # SLA Violation Policy
     sla_policy = EscalationPolicy(
         name="Sleek SLA Violation Response",
@@ -252,10 +346,6 @@ def setup_sleek_pagerduty_integration():
         ]
     )
     
-    sla_policy_id = pd.create_escalation_policy(sla_policy)
-    if sla_policy_id:
-        escalation_policies["sla"] = sla_policy_id
-    
     # Disaster Recovery Policy
     disaster_policy = EscalationPolicy(
         name="Sleek Disaster Recovery",
@@ -272,9 +362,12 @@ def setup_sleek_pagerduty_integration():
         ]
     )
     
-    disaster_policy_id = pd.create_escalation_policy(disaster_policy)
-    if disaster_policy_id:
-        escalation_policies["disaster"] = disaster_policy_id
+    created = pd.run_parallel({
+        "critical": lambda: pd.create_escalation_policy(critical_policy),
+        "sla": lambda: pd.create_escalation_policy(sla_policy),
+        "disaster": lambda: pd.create_escalation_policy(disaster_policy)
+    })
+    escalation_policies = {key: policy_id for key, policy_id in created.items() if policy_id}
     
     # Create services with integration keys
     services = [
@@ -295,13 +388,11 @@ def setup_sleek_pagerduty_integration():
         )
     ]
     
-    integration_keys = {}
-    for service in services:
-        if service.escalation_policy_id:
-            result = pd.create_service(service)
-            if result:
-                service_id, integration_key = result
-                integration_keys[service.name] = integration_key
+    created = pd.run_parallel({
+        service.name: (lambda s=service: pd.create_service(s))
+        for service in services if service.escalation_policy_id
+    })
+    integration_keys = {name: result[1] for name, result in created.items() if result}
     
     # Generate configuration files
     generate_alertmanager_config(integration_keys)
@@ -390,10 +481,27 @@ def get_service_purpose(service_name: str) -> str:
     return purposes.get(service_name, "General monitoring service")
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Provision PagerDuty for Sleek multi-region monitoring")
+    parser.add_argument("--api-url", default=os.getenv("PAGERDUTY_API_URL", "https://api.pagerduty.com"),
+                        help="PagerDuty REST API base URL (or a local stub)")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent API calls")
+    parser.add_argument("--requests-per-minute", type=float, default=900,
+                        help="Client-side rate limit, kept under PagerDuty's REST API limit")
+    args = parser.parse_args()
+    
     logger.info("Setting up PagerDuty integration for Sleek multi-region monitoring...")
     
-    if setup_sleek_pagerduty_integration():
-        logger.info("PagerDuty integration setup completed successfully!")
+    api_token = os.getenv("PAGERDUTY_API_TOKEN")
+    pd = None
+    if api_token:
+        pd = PagerDutyIntegration(api_token, base_url=args.api_url, max_workers=args.workers,
+                                  requests_per_minute=args.requests_per_minute)
+    started = time.perf_counter()
+    if setup_sleek_pagerduty_integration(pd):
+        logger.info(f"PagerDuty integration setup completed successfully in {time.perf_counter() - started:.2f}s "
+                    f"({pd.stats['created']} created, {pd.stats['reused']} reused, "
+                    f"{pd.stats['requests']} requests, {pd.stats['rate_limited']} rate limited)")
         print("\nNext steps:")
         print("1. Update monitoring/alerting/alertmanager.yml with the generated integration keys")
         print("2. Configure on-call schedules in the PagerDuty web interface")
@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+"""
+PagerDuty Events API v2 forwarder for Sleek Multi-Region Monitoring
+Coalesces alert events by dedup_key, delivers them over a pooled, rate-limited
+session and keeps undelivered events in a SQLite retry queue across restarts
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+import argparse
+import hashlib
+import importlib.util
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram
+
+def load_sibling(module_name: str, filename: str):
+    """Import another hyphenated module from this directory"""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), filename)
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+pagerduty_config = load_sibling("pagerduty_config", "pagerduty-config.py")
+
+logger = logging.getLogger(__name__)
+
+EVENTS_URL = "https://events.pagerduty.com/v2/enqueue"
+
+# PagerDuty accepts these payload severities; AlertManager labels are mapped onto them
+SEVERITIES = {"critical": "critical", "error": "error", "warning": "warning", "info": "info"}
+
+DELIVERY_BUCKETS_SECONDS = (0.25, 0.5, 1, 2, 3, 5, 10, 30, 60, 300)
+
+def alert_dedup_key(alert: Dict) -> str:
+    """Stable per-alert dedup key: AlertManager's fingerprint or a hash of the labels"""
+    fingerprint = alert.get("fingerprint")
+    if not fingerprint:
+        labels = json.dumps(alert.get("labels", {}), sort_keys=True, separators=(",", ":"))
+        fingerprint = hashlib.sha1(labels.encode()).hexdigest()[:16]
+    return f"sleek-{fingerprint}"
+
+def events_from_alertmanager(payload: Dict, routing_key: str) -> List[Dict]:
+    """One Events API v2 event per alert in an AlertManager webhook payload"""
+    events = []
+    for alert in payload.get("alerts", []):
+        labels = alert.get("labels", {})
+        annotations = alert.get("annotations", {})
+        dedup_key = alert_dedup_key(alert)
+        if alert.get("status") == "resolved":
+            events.append({"routing_key": routing_key, "event_action": "resolve", "dedup_key": dedup_key})
+            continue
+        events.append({
+            "routing_key": routing_key,
+            "event_action": "trigger",
+            "dedup_key": dedup_key,
+            "payload": {
+                "summary": (annotations.get("summary") or labels.get("alertname", "Alert"))[:1024],
+                "source": labels.get("instance") or labels.get("region") or "sleek-monitor",
+                "severity": SEVERITIES.get(labels.get("severity"), "error"),
+                "timestamp": alert.get("startsAt"),
+                "component": labels.get("service"),
+                "group": labels.get("region"),
+                "class": labels.get("alertname"),
+                "custom_details": {"labels": labels, "annotations": annotations}
+            }
+        })
+    return events
+
+class EventQueue:
+    """Pending events in SQLite, one row per dedup_key
+
+    Submitting an event whose dedup_key is already queued replaces the
+    queued event and bumps its version instead of adding a row, so a burst
+    of updates to one alert costs a single delivery. Acks are conditional
+    on the version that was sent: an update that arrives while a delivery
+    is in flight stays queued and goes out next.
+    """
+
+    def __init__(self, path: str = "pagerduty-events.db"):
+        self.path = path
+        self._local = threading.local()
+        self._connection().executescript("""
+            CREATE TABLE IF NOT EXISTS pending (
+                dedup_key TEXT PRIMARY KEY,
+                routing_key TEXT NOT NULL,
+                event TEXT NOT NULL,
+                version INTEGER NOT NULL DEFAULT 0,
+                first_seen REAL NOT NULL,
+                due REAL NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                coalesced INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS pending_due ON pending (due);
+        """)
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread; SQLite connections are not shared across threads"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5.0)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def put_many(self, events: Iterable[Dict], window_seconds: float) -> int:
+        """Queue events in one transaction; returns how many replaced a queued event"""
+        now = time.time()
+        connection = self._connection()
+        coalesced = 0
+        with connection:
+            for event in events:
+                cursor = connection.execute(
+                    "UPDATE pending SET event = ?, routing_key = ?, version = version + 1, coalesced = coalesced + 1 "
+                    "WHERE dedup_key = ?",
+                    (json.dumps(event), event["routing_key"], event["dedup_key"])
+                )
+                if cursor.rowcount:
+                    coalesced += 1
+                    continue
+                connection.execute(
+                    "INSERT INTO pending (dedup_key, routing_key, event, first_seen, due) VALUES (?, ?, ?, ?, ?)",
+                    (event["dedup_key"], event["routing_key"], json.dumps(event), now, now + window_seconds)
+                )
+        return coalesced
+
+    def due(self, limit: int, exclude: Iterable[str] = ()) -> List[Tuple]:
+        """(dedup_key, routing_key, event, version, first_seen, attempts, coalesced) rows ready to send"""
+        excluded = set(exclude)
+        rows = self._connection().execute(
+            "SELECT dedup_key, routing_key, event, version, first_seen, attempts, coalesced FROM pending "
+            "WHERE due <= ? ORDER BY due LIMIT ?",
+            (time.time(), limit + len(excluded))
+        ).fetchall()
+        return [row for row in rows if row[0] not in excluded][:limit]
+
+    def next_due(self) -> Optional[float]:
+        row = self._connection().execute("SELECT MIN(due) FROM pending").fetchone()
+        return row[0]
+
+    def ack(self, dedup_key: str, version: int) -> bool:
+        """Remove a delivered event unless it was replaced while in flight"""
+        connection = self._connection()
+        with connection:
+            cursor = connection.execute("DELETE FROM pending WHERE dedup_key = ? AND version = ?", (dedup_key, version))
+        return cursor.rowcount > 0
+
+    def retry(self, dedup_key: str, delay: float):
+        connection = self._connection()
+        with connection:
+            connection.execute("UPDATE pending SET attempts = attempts + 1, due = ? WHERE dedup_key = ?",
+                               (time.time() + delay, dedup_key))
+
+    def depth(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM pending").fetchone()[0]
+
+class ForwarderMetrics:
+    """Prometheus metrics plus a recent-latency window for quick summaries"""
+
+    def __init__(self, registry: Optional[CollectorRegistry] = None, window: int = 10000):
+        self.registry = registry or CollectorRegistry()
+        self.events = Counter(
+            "sleek_pagerduty_events_total",
+            "Events API v2 events by outcome",
+            ["outcome"],
+            registry=self.registry
+        )
+        self.delivery_latency = Histogram(
+            "sleek_pagerduty_event_delivery_seconds",
+            "Time from first submission of a dedup_key to PagerDuty accepting it",
+            buckets=DELIVERY_BUCKETS_SECONDS,
+            registry=self.registry
+        )
+        self.queue_depth = Gauge(
+            "sleek_pagerduty_event_queue_depth",
+            "Events waiting in the retry queue",
+            registry=self.registry
+        )
+        self.counts: Dict[str, int] = {}
+        self._recent = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def count(self, outcome: str, amount: int = 1):
+        if amount:
+            self.events.labels(outcome=outcome).inc(amount)
+            with self._lock:
+                self.counts[outcome] = self.counts.get(outcome, 0) + amount
+
+    def delivered(self, latency_seconds: float):
+        self.count("delivered")
+        self.delivery_latency.observe(latency_seconds)
+        with self._lock:
+            self._recent.append(latency_seconds)
+
+    def summary(self) -> Dict:
+        with self._lock:
+            ordered = sorted(self._recent)
+            counts = dict(self.counts)
+        if not ordered:
+            return {**counts, "p50_delivery_seconds": 0.0, "p99_delivery_seconds": 0.0}
+        return {
+            **counts,
+            "p50_delivery_seconds": ordered[len(ordered) // 2],
+            "p99_delivery_seconds": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+        }
+
+class PagerDutyEventForwarder:
+    """Deliver Events API v2 events with coalescing, rate limiting and retries
+
+    ``submit`` only writes to the SQLite queue, so callers such as webhook
+    request threads never wait on PagerDuty. Each new dedup_key waits
+    ``coalesce_seconds`` before it is sent; updates to it within that window
+    replace the queued event (a trigger followed by a resolve sends only
+    the resolve). A dispatcher thread hands due events to ``max_workers``
+    senders sharing one pooled session and a token bucket per routing key,
+    as PagerDuty rate-limits each integration separately. 429s, 5xx
+    responses and connection errors are rescheduled with backoff in the
+    queue, so they survive restarts; 400s are dropped and logged.
+    """
+
+    def __init__(self, queue_path: str = "pagerduty-events.db", events_url: str = EVENTS_URL,
+                 coalesce_seconds: float = 2.0, max_workers: int = 8, events_per_minute: float = 120,
+                 burst: Optional[int] = None, timeout: float = 10, max_age_seconds: float = 24 * 3600,
+                 registry: Optional[CollectorRegistry] = None):
+        self.queue = EventQueue(queue_path)
+        self.events_url = events_url
+        self.coalesce_seconds = coalesce_seconds
+        self.max_workers = max_workers
+        self.events_per_minute = events_per_minute
+        self.burst = burst
+        self.timeout = timeout
+        self.max_age_seconds = max_age_seconds
+        self.metrics = ForwarderMetrics(registry)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._limiters: Dict[str, "pagerduty_config.RateLimiter"] = {}
+        self._limiters_lock = threading.Lock()
+        self._senders = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pagerduty-sender")
+        self._in_flight: set = set()
+        self._in_flight_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._dispatcher: Optional[threading.Thread] = None
+
+    def start(self) -> "PagerDutyEventForwarder":
+        pending = self.queue.depth()
+        if pending:
+            logger.info(f"Resuming {pending} queued PagerDuty event(s)")
+        self._dispatcher = threading.Thread(target=self._dispatch, name="pagerduty-dispatcher", daemon=True)
+        self._dispatcher.start()
+        return self
+
+    def submit_many(self, events: List[Dict]):
+        coalesced = self.queue.put_many(events, self.coalesce_seconds)
+        self.metrics.count("submitted", len(events))
+        self.metrics.count("coalesced", coalesced)
+        self._wakeup.set()
+
+    def submit(self, event: Dict):
+        self.submit_many([event])
+
+    def forward_alertmanager(self, payload: Dict, routing_key: str) -> int:
+        """Queue every alert in an AlertManager webhook payload; returns the number queued"""
+        events = events_from_alertmanager(payload, routing_key)
+        if events:
+            self.submit_many(events)
+        return len(events)
+
+    def _limiter(self, routing_key: str) -> "pagerduty_config.RateLimiter":
+        with self._limiters_lock:
+            limiter = self._limiters.get(routing_key)
+            if limiter is None:
+                limiter = self._limiters[routing_key] = pagerduty_config.RateLimiter(self.events_per_minute, self.burst)
+            return limiter
+
+    def _dispatch(self):
+        while not self._stopping.is_set():
+            with self._in_flight_lock:
+                busy = set(self._in_flight)
+            # Keep the sender pool fed without pulling the whole queue into memory
+            capacity = self.max_workers * 2 - len(busy)
+            rows = self.queue.due(capacity, exclude=busy) if capacity > 0 else []
+            for row in rows:
+                with self._in_flight_lock:
+                    self._in_flight.add(row[0])
+                self._senders.submit(self._deliver, row)
+            self.metrics.queue_depth.set(self.queue.depth())
+            if rows:
+                continue
+            next_due = self.queue.next_due()
+            wait = 1.0 if next_due is None else min(1.0, max(0.01, next_due - time.time()))
+            self._wakeup.wait(wait)
+            self._wakeup.clear()
+
+    def _deliver(self, row: Tuple):
+        dedup_key, routing_key, event, version, first_seen, attempts, coalesced = row
+        try:
+            if time.time() - first_seen > self.max_age_seconds:
+                logger.error(f"Dropping PagerDuty event {dedup_key} after {attempts} attempt(s): older than max age")
+                self.queue.ack(dedup_key, version)
+                self.metrics.count("expired")
+                return
+            self._limiter(routing_key).acquire()
+            self.metrics.count("requests")
+            try:
+                response = self.session.post(self.events_url, data=event, timeout=self.timeout,
+                                             headers={"Content-Type": "application/json"})
+            except requests.RequestException as e:
+                self._retry(dedup_key, None, attempts, type(e).__name__)
+                return
+            if response.status_code == 202:
+                if self.queue.ack(dedup_key, version):
+                    self.metrics.delivered(time.time() - first_seen)
+                else:
+                    self.metrics.count("superseded")
+            elif response.status_code == 429:
+                self.metrics.count("rate_limited")
+                self._retry(dedup_key, response, attempts, "429")
+            elif response.status_code >= 500:
+                self._retry(dedup_key, response, attempts, str(response.status_code))
+            else:
+                logger.error(f"PagerDuty rejected event {dedup_key}: {response.status_code} {response.text[:200]}")
+                self.queue.ack(dedup_key, version)
+                self.metrics.count("rejected")
+        finally:
+            with self._in_flight_lock:
+                self._in_flight.discard(dedup_key)
+            self._wakeup.set()
+
+    def _retry(self, dedup_key: str, response: Optional[requests.Response], attempts: int, reason: str):
+        delay = pagerduty_config.retry_delay(response, attempts)
+        logger.warning(f"PagerDuty event {dedup_key} failed ({reason}), retrying in {delay:.1f}s")
+        self.queue.retry(dedup_key, delay)
+        self.metrics.count("retried")
+
+    def flush(self, timeout: float = 30) -> bool:
+        """Wait until the queue is empty; returns False if events are still pending"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._in_flight_lock:
+                busy = bool(self._in_flight)
+            if not busy and self.queue.depth() == 0:
+                return True
+            time.sleep(0.05)
+        return False
+
+    def close(self):
+        """Stop sending; anything still queued is delivered after the next start"""
+        self._stopping.set()
+        self._wakeup.set()
+        if self._dispatcher is not None:
+            self._dispatcher.join()
+        self._senders.shutdown(wait=True)
+        self.session.close()
+
+    def stats(self) -> Dict:
+        return {**self.metrics.summary(), "queued": self.queue.depth()}
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Forward AlertManager payloads to the PagerDuty Events API v2")
+    parser.add_argument("--queue", default="pagerduty-events.db", help="SQLite retry queue")
+    parser.add_argument("--events-url", default=os.getenv("PAGERDUTY_EVENTS_URL", EVENTS_URL),
+                        help="Events API endpoint")
+    parser.add_argument("--events-per-minute", type=float, default=120, help="Rate limit per routing key")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent senders")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    send = subparsers.add_parser("send", help="Queue an AlertManager webhook payload and deliver it")
+    send.add_argument("payload", nargs="?", help="Payload file (default: stdin)")
+    send.add_argument("--routing-key", default=os.getenv("PAGERDUTY_ROUTING_KEY"),
+                      help="Integration key (default: $PAGERDUTY_ROUTING_KEY)")
+    send.add_argument("--coalesce-seconds", type=float, default=0.5, help="Coalescing window")
+    send.add_argument("--timeout", type=float, default=60, help="Seconds to wait for delivery")
+
+    drain = subparsers.add_parser("drain", help="Deliver whatever is left in the retry queue")
+    drain.add_argument("--timeout", type=float, default=60, help="Seconds to wait for delivery")
+
+    subparsers.add_parser("status", help="Show the retry queue depth")
+
+    args = parser.parse_args()
+
+    if args.command == "status":
+        print(json.dumps({"queued": EventQueue(args.queue).depth()}, indent=2))
+        return
+
+    if args.command == "send" and not args.routing_key:
+        parser.error("--routing-key or PAGERDUTY_ROUTING_KEY is required")
+
+    forwarder = PagerDutyEventForwarder(
+        queue_path=args.queue,
+        events_url=args.events_url,
+        coalesce_seconds=getattr(args, "coalesce_seconds", 0),
+        max_workers=args.workers,
+        events_per_minute=args.events_per_minute
+    ).start()
+    try:
+        if args.command == "send":
+            if args.payload:
+                with open(args.payload) as f:
+                    payload = json.load(f)
+            else:
+                payload = json.load(sys.stdin)
+            queued = forwarder.forward_alertmanager(payload, args.routing_key)
+            logger.info(f"Queued {queued} event(s)")
+        delivered = forwarder.flush(args.timeout)
+    finally:
+        forwarder.close()
+    print(json.dumps(forwarder.stats(), indent=2))
+    if not delivered:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
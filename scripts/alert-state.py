@@ -0,0 +1,223 @@
+"""
+Active alert state shared by the AlertManager webhook receivers
+Tracks what is firing right now, keyed by AlertManager fingerprint, with
+secondary indexes by region, severity and service
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Set
+
+INDEXED_LABELS = ("region", "severity", "service")
+
+@dataclass
+class ActiveAlert:
+    fingerprint: str
+    labels: Dict[str, str]
+    annotations: Dict[str, str]
+    starts_at: Optional[str]
+    first_seen: str
+    last_seen: str
+    receiver: Optional[str] = None
+    # Times this fingerprint resolved and then fired again
+    flaps: int = 0
+    _seen_at: float = field(default=0.0, repr=False)
+
+    def to_dict(self) -> Dict:
+        return {
+            "fingerprint": self.fingerprint,
+            "alertname": self.labels.get("alertname"),
+            "labels": self.labels,
+            "annotations": self.annotations,
+            "starts_at": self.starts_at,
+            "first_seen": self.first_seen,
+            "last_seen": self.last_seen,
+            "receiver": self.receiver,
+            "flaps": self.flaps
+        }
+
+def alert_fingerprint(alert: Dict) -> str:
+    """AlertManager's fingerprint, or a stable hash of the labels for older payloads"""
+    fingerprint = alert.get("fingerprint")
+    if fingerprint:
+        return fingerprint
+    labels = json.dumps(alert.get("labels", {}), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(labels.encode()).hexdigest()[:16]
+
+def validate_payload(payload) -> Dict:
+    """Raise ValueError unless ``payload`` is shaped like an AlertManager webhook body"""
+    if not isinstance(payload, dict):
+        raise ValueError("Payload must be a JSON object")
+    alerts = payload.get("alerts")
+    if not isinstance(alerts, list):
+        raise ValueError("Payload must have an 'alerts' list")
+    for position, alert in enumerate(alerts):
+        if not isinstance(alert, dict):
+            raise ValueError(f"alerts[{position}] must be an object")
+        labels = alert.get("labels")
+        if not isinstance(labels, dict) or not all(isinstance(value, str) for value in labels.values()):
+            raise ValueError(f"alerts[{position}] must have a 'labels' object of strings")
+        if not isinstance(alert.get("annotations", {}), dict):
+            raise ValueError(f"alerts[{position}] 'annotations' must be an object")
+    return payload
+
+class ActiveAlertIndex:
+    """Firing alerts keyed by fingerprint, with TTL and size-bounded eviction
+
+    Entries are kept in last-seen order, so expiry only touches the alerts
+    it removes. A resolved alert leaves the index immediately; a firing
+    alert that AlertManager stops repeating expires after ``ttl_seconds``.
+    Recently resolved fingerprints are remembered (bounded as well) only
+    to count flaps. Queries intersect the label indexes starting from the
+    smallest set, so they cost O(result) rather than O(active alerts).
+    Safe to share between threads.
+    """
+
+    def __init__(self, ttl_seconds: float = 13 * 3600, max_alerts: int = 50_000,
+                 indexed_labels: Iterable[str] = INDEXED_LABELS):
+        # Longer than the 12h root repeat_interval, so still-firing alerts are refreshed before they expire
+        self.ttl_seconds = ttl_seconds
+        self.max_alerts = max_alerts
+        self.indexed_labels = tuple(indexed_labels)
+        self._alerts: "OrderedDict[str, ActiveAlert]" = OrderedDict()
+        self._indexes: Dict[str, Dict[str, Set[str]]] = {label: {} for label in self.indexed_labels}
+        self._resolved: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.resolved_total = 0
+        self.evicted_total = 0
+
+    def __len__(self) -> int:
+        return len(self._alerts)
+
+    def _index(self, alert: ActiveAlert):
+        for label in self.indexed_labels:
+            self._indexes[label].setdefault(alert.labels.get(label, "unknown"), set()).add(alert.fingerprint)
+
+    def _unindex(self, alert: ActiveAlert):
+        for label in self.indexed_labels:
+            value = alert.labels.get(label, "unknown")
+            members = self._indexes[label].get(value)
+            if members is not None:
+                members.discard(alert.fingerprint)
+                if not members:
+                    del self._indexes[label][value]
+
+    def _remove(self, fingerprint: str) -> Optional[ActiveAlert]:
+        alert = self._alerts.pop(fingerprint, None)
+        if alert is not None:
+            self._unindex(alert)
+        return alert
+
+    def _expire(self, now: float):
+        cutoff = now - self.ttl_seconds
+        while self._alerts:
+            fingerprint, alert = next(iter(self._alerts.items()))
+            if alert._seen_at >= cutoff and len(self._alerts) <= self.max_alerts:
+                break
+            self._remove(fingerprint)
+            self.evicted_total += 1
+        while len(self._resolved) > self.max_alerts:
+            self._resolved.popitem(last=False)
+
+    def update(self, payload: Dict, receiver: Optional[str] = None) -> int:
+        """Apply every alert in an AlertManager webhook payload, returning how many changed state
+
+        A malformed payload raises ValueError before any alert is applied.
+        """
+        validate_payload(payload)
+        now = time.monotonic()
+        seen = datetime.now(timezone.utc).isoformat()
+        changed = 0
+        with self._lock:
+            for item in payload["alerts"]:
+                fingerprint = alert_fingerprint(item)
+                if item.get("status") == "resolved":
+                    resolved = self._remove(fingerprint)
+                    if resolved is not None:
+                        self.resolved_total += 1
+                        self._resolved[fingerprint] = resolved.flaps + 1
+                        changed += 1
+                    continue
+
+                alert = self._alerts.get(fingerprint)
+                if alert is None:
+                    alert = ActiveAlert(
+                        fingerprint=fingerprint,
+                        labels=dict(item["labels"]),
+                        annotations=dict(item.get("annotations", {})),
+                        starts_at=item.get("startsAt"),
+                        first_seen=seen,
+                        last_seen=seen,
+                        receiver=receiver,
+                        flaps=self._resolved.pop(fingerprint, 0)
+                    )
+                    self._alerts[fingerprint] = alert
+                    self._index(alert)
+                    changed += 1
+                else:
+                    alert.annotations = dict(item.get("annotations", alert.annotations))
+                    alert.last_seen = seen
+                    self._alerts.move_to_end(fingerprint)
+                alert._seen_at = now
+            self._expire(now)
+        return changed
+
+    def get(self, fingerprint: str) -> Optional[ActiveAlert]:
+        with self._lock:
+            self._expire(time.monotonic())
+            return self._alerts.get(fingerprint)
+
+    def query(self, limit: Optional[int] = None, **filters: str) -> List[ActiveAlert]:
+        """Active alerts matching every given indexed label, e.g. ``query(region="uk")``"""
+        unknown = set(filters) - set(self.indexed_labels)
+        if unknown:
+            raise ValueError(f"Cannot filter on {', '.join(sorted(unknown))}")
+        with self._lock:
+            self._expire(time.monotonic())
+            if not filters:
+                fingerprints: Iterable[str] = self._alerts.keys()
+            else:
+                sets = sorted((self._indexes[label].get(value, set()) for label, value in filters.items()), key=len)
+                fingerprints = sets[0].intersection(*sets[1:]) if len(sets) > 1 else sets[0]
+            alerts = []
+            for fingerprint in fingerprints:
+                alerts.append(self._alerts[fingerprint])
+                if limit is not None and len(alerts) >= limit:
+                    break
+            return alerts
+
+    def counts(self) -> Dict[str, Dict[str, int]]:
+        """Active alert counts per value of each indexed label"""
+        with self._lock:
+            self._expire(time.monotonic())
+            return {
+                label: {value: len(members) for value, members in values.items()}
+                for label, values in self._indexes.items()
+            }
+
+    def stats(self) -> Dict:
+        return {
+            "active": len(self._alerts),
+            "resolved_total": self.resolved_total,
+            "evicted_total": self.evicted_total,
+            "ttl_seconds": self.ttl_seconds,
+            "max_alerts": self.max_alerts
+        }
+
+def alerts_response(index: ActiveAlertIndex, params: Dict[str, str]) -> Dict:
+    """Body of GET /alerts: ?region=&severity=&service=&limit= filters over the active alerts"""
+    filters = {label: params[label] for label in index.indexed_labels if params.get(label)}
+    limit = int(params["limit"]) if params.get("limit") else None
+    alerts = index.query(limit=limit, **filters)
+    return {
+        "filters": filters,
+        "count": len(alerts),
+        "alerts": [alert.to_dict() for alert in alerts],
+        "active_by": index.counts(),
+        **index.stats()
+    }
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Write-ahead log of raw AlertManager webhook deliveries
+Receivers append each payload before acknowledging it; a writer thread
+group-commits whatever has queued up with a single write and fsync. Logged
+deliveries can be replayed into any handler or re-posted to a receiver.
+"""
+
+import argparse
+import asyncio
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+from concurrent.futures import Future
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Iterator, List, Optional, Tuple
+
+import aiohttp
+
+# payload length, crc32 of endpoint + payload, receive time, endpoint length
+RECORD_HEADER = struct.Struct("<IIQH")
+SEGMENT_SUFFIX = ".wal"
+
+@dataclass
+class WalRecord:
+    timestamp_ns: int
+    endpoint: str
+    payload: bytes
+
+    @property
+    def received_at(self) -> datetime:
+        return datetime.fromtimestamp(self.timestamp_ns / 1e9, timezone.utc)
+
+def encode_record(record: WalRecord) -> bytes:
+    endpoint = record.endpoint.encode()
+    crc = zlib.crc32(record.payload, zlib.crc32(endpoint))
+    return RECORD_HEADER.pack(len(record.payload), crc, record.timestamp_ns, len(endpoint)) + endpoint + record.payload
+
+def read_segment(path: str) -> Iterator[Tuple[int, WalRecord]]:
+    """Yield (end offset, record) for every intact record, stopping at a torn or corrupt tail"""
+    with open(path, "rb") as f:
+        data = f.read()
+    offset = 0
+    while offset + RECORD_HEADER.size <= len(data):
+        length, crc, timestamp_ns, endpoint_length = RECORD_HEADER.unpack_from(data, offset)
+        start = offset + RECORD_HEADER.size
+        end = start + endpoint_length + length
+        if end > len(data):
+            return
+        endpoint = data[start:start + endpoint_length]
+        payload = data[start + endpoint_length:end]
+        if zlib.crc32(payload, zlib.crc32(endpoint)) != crc:
+            return
+        offset = end
+        yield offset, WalRecord(timestamp_ns, endpoint.decode(), payload)
+
+def list_segments(directory: str) -> List[str]:
+    names = sorted(name for name in os.listdir(directory) if name.endswith(SEGMENT_SUFFIX))
+    return [os.path.join(directory, name) for name in names]
+
+def replay_directory(directory: str, since_ns: Optional[int] = None) -> Iterator[WalRecord]:
+    """Every intact logged delivery in order, optionally only those received since ``since_ns``"""
+    for path in list_segments(directory):
+        # A segment is last written after its newest record was received, so one
+        # not modified since ``since_ns`` holds nothing to replay and is not read
+        if since_ns is not None and os.stat(path).st_mtime_ns < since_ns:
+            continue
+        for _, record in read_segment(path):
+            if since_ns is None or record.timestamp_ns >= since_ns:
+                yield record
+
+class AlertWAL:
+    """Append-only, segmented, group-committed log of webhook payloads
+
+    ``append`` queues a record and returns a Future that resolves once the
+    record is on disk. The writer thread takes everything queued while the
+    previous fsync ran (up to ``max_batch``), writes it in one call and
+    fsyncs once, so concurrent requests share the cost of each fsync.
+    Segments rotate at ``segment_max_bytes``; with ``max_segments`` the
+    oldest sealed segments are deleted. A commit that fails part way is cut
+    off the segment before anything else is written, so later records are
+    never logged behind a torn one that replay would stop at.
+    """
+
+    def __init__(self, directory: str = "alert-wal", segment_max_bytes: int = 64 * 1024 * 1024,
+                 max_segments: Optional[int] = None, max_batch: int = 1024, fsync: bool = True):
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        self.max_segments = max_segments
+        self.max_batch = max_batch
+        self.fsync = fsync
+        self.records_written = 0
+        self.commits = 0
+        os.makedirs(directory, exist_ok=True)
+
+        self._pending: "queue.SimpleQueue[Optional[Tuple[bytes, Future]]]" = queue.SimpleQueue()
+        self._file = None
+        self._segment_size = 0
+        self._torn = False
+        self._open_segment()
+        self._writer = threading.Thread(target=self._run, name="alert-wal-writer", daemon=True)
+        self._writer.start()
+
+    def segments(self) -> List[str]:
+        return list_segments(self.directory)
+
+    def _sync_directory(self):
+        if self.fsync:
+            fd = os.open(self.directory, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def _open_segment(self):
+        """Continue the newest segment after trimming any torn tail, or start the first one"""
+        segments = self.segments()
+        if segments:
+            path = segments[-1]
+            valid = 0
+            for valid, _ in read_segment(path):
+                pass
+            if valid != os.path.getsize(path):
+                with open(path, "r+b") as f:
+                    f.truncate(valid)
+            self._file = open(path, "ab", buffering=0)
+            self._segment_size = valid
+        else:
+            self._start_segment(0)
+
+    def _start_segment(self, number: int):
+        if self._file is not None:
+            self._file.close()
+        path = os.path.join(self.directory, f"segment-{number:08d}{SEGMENT_SUFFIX}")
+        # Unbuffered, so a failed write leaves nothing behind to be flushed later
+        self._file = open(path, "ab", buffering=0)
+        self._segment_size = 0
+        self._torn = False
+        self._sync_directory()
+        if self.max_segments:
+            for old in self.segments()[:-self.max_segments]:
+                os.remove(old)
+
+    def _rotate(self):
+        current = os.path.basename(self._file.name)
+        self._start_segment(int(current[len("segment-"):-len(SEGMENT_SUFFIX)]) + 1)
+
+    def append(self, endpoint: str, payload: bytes, timestamp_ns: Optional[int] = None) -> Future:
+        """Queue a delivery for the next group commit"""
+        record = WalRecord(timestamp_ns or time.time_ns(), endpoint, payload)
+        future: Future = Future()
+        self._pending.put((encode_record(record), future))
+        return future
+
+    def _run(self):
+        while True:
+            item = self._pending.get()
+            if item is None:
+                return
+            batch = [item]
+            stopping = False
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._pending.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._commit(batch)
+            if stopping:
+                return
+
+    def _write(self, data: bytes):
+        view = memoryview(data)
+        while view:
+            view = view[self._file.write(view):]
+
+    def _discard_torn_tail(self):
+        """Truncate the segment back to its last committed record, or move on to a new segment"""
+        try:
+            os.ftruncate(self._file.fileno(), self._segment_size)
+            self._file.seek(self._segment_size)
+        except OSError:
+            self._rotate()
+        self._torn = False
+
+    def _commit(self, batch: List[Tuple[bytes, Future]]):
+        try:
+            if self._torn:
+                self._discard_torn_tail()
+            if self._segment_size >= self.segment_max_bytes:
+                self._rotate()
+            data = b"".join(encoded for encoded, _ in batch)
+            self._torn = True
+            self._write(data)
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self._torn = False
+            self._segment_size += len(data)
+        except OSError as e:
+            for _, future in batch:
+                future.set_exception(e)
+            if self._torn:
+                try:
+                    self._discard_torn_tail()
+                except OSError:
+                    pass  # retried before the next commit
+            return
+        self.records_written += len(batch)
+        self.commits += 1
+        for _, future in batch:
+            future.set_result(None)
+
+    def close(self):
+        """Commit everything already queued and stop the writer"""
+        self._pending.put(None)
+        self._writer.join()
+        self._file.close()
+
+    def replay(self, since_ns: Optional[int] = None) -> Iterator[WalRecord]:
+        return replay_directory(self.directory, since_ns)
+
+def replay_into(records: Iterator[WalRecord], handler: Callable[[WalRecord], None]) -> int:
+    """Feed logged deliveries to an in-process handler as fast as it accepts them"""
+    count = 0
+    for record in records:
+        handler(record)
+        count += 1
+    return count
+
+async def replay_to_url(records: Iterator[WalRecord], base_url: str, concurrency: int = 32) -> Tuple[int, int]:
+    """Re-post logged deliveries to ``base_url`` + their original endpoint; returns (sent, failed)"""
+    sent = failed = 0
+
+    async def sender(session: aiohttp.ClientSession):
+        nonlocal sent, failed
+        for record in records:
+            try:
+                async with session.post(f"{base_url.rstrip('/')}{record.endpoint}", data=record.payload,
+                                        headers={"Content-Type": "application/json"}) as response:
+                    await response.read()
+                    if response.status < 300:
+                        sent += 1
+                    else:
+                        failed += 1
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                failed += 1
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=30)) as session:
+        # The senders share one iterator, so each record is posted exactly once
+        await asyncio.gather(*(sender(session) for _ in range(concurrency)))
+    return sent, failed
+
+def parse_time(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or replay the alert webhook write-ahead log")
+    parser.add_argument("--dir", default="alert-wal", help="WAL directory")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    subcommands.add_parser("stats", help="Summarize the logged segments")
+
+    replay = subcommands.add_parser("replay", help="Re-post logged deliveries to a receiver at full speed")
+    replay.add_argument("--url", default="http://localhost:8888", help="Receiver base URL")
+    replay.add_argument("--since", type=parse_time, help="Only deliveries received since (ISO 8601)")
+    replay.add_argument("--concurrency", type=int, default=32, help="Concurrent requests")
+
+    args = parser.parse_args()
+    if not os.path.isdir(args.dir):
+        parser.error(f"WAL directory not found: {args.dir}")
+
+    if args.command == "stats":
+        print(f"\n{'='*60}")
+        print("ALERT WEBHOOK WAL")
+        print(f"{'='*60}")
+        for path in list_segments(args.dir):
+            records = [record for _, record in read_segment(path)]
+            span = f"{records[0].received_at.isoformat()} - {records[-1].received_at.isoformat()}" if records else "empty"
+            print(f"  {os.path.basename(path)}: {len(records)} deliveries, "
+                  f"{os.path.getsize(path) / 1024:.0f}KB ({span})")
+        return
+
+    since_ns = int(args.since.timestamp() * 1e9) if args.since else None
+    records = replay_directory(args.dir, since_ns)
+    started = time.perf_counter()
+    sent, failed = asyncio.run(replay_to_url(records, args.url, args.concurrency))
+    elapsed = time.perf_counter() - started
+    print(f"Replayed {sent} deliveries to {args.url} in {elapsed:.2f}s "
+          f"({sent / elapsed if elapsed else 0:.0f}/s, {failed} failed)")
+
+if __name__ == "__main__":
+    main()
@@ -2,101 +2,232 @@
 """
 Simple webhook server to receive and display AlertManager alerts
 Run this to see alerts in the console during disaster recovery tests
+
+Requests are acknowledged as soon as the payload is queued; a consumer task
+renders queued payloads in batches, so a slow console never holds up
+AlertManager during an alert storm. GET /alerts lists what is firing now.
 """
 
-from http.server import HTTPServer, BaseHTTPRequestHandler
+import argparse
+import asyncio
+import importlib.util
 import json
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def load_script(module_name: str, filename: str):
+    """Import one of the hyphenated scripts in this directory as a module"""
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(SCRIPTS_DIR, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+alert_state = load_script("alert_state", "alert-state.py")
+
+def render_alert(alert: Dict) -> List[str]:
+    status = alert.get('status', 'unknown')
+    labels = alert.get('labels', {})
+    annotations = alert.get('annotations', {})
+
+    # Format alert display
+    alert_name = labels.get('alertname', 'Unknown Alert')
+    severity = labels.get('severity', 'info')
+    region = labels.get('region', 'unknown')
+    service = labels.get('service', 'unknown')
+
+    summary = annotations.get('summary', 'No summary')
+    description = annotations.get('description', 'No description')
+
+    # Color coding for severity
+    if severity == 'critical':
+        severity_icon = "🔴 CRITICAL"
+    elif severity == 'warning':
+        severity_icon = "🟡 WARNING"
+    else:
+        severity_icon = f"ℹ️  {severity.upper()}"
+
+    status_icon = "🔥 FIRING" if status == 'firing' else "✅ RESOLVED"
+
+    return [
+        f"{status_icon} {severity_icon}",
+        f"📋 Alert: {alert_name}",
+        f"🌍 Region: {region}",
+        f"⚙️  Service: {service}",
+        f"📝 Summary: {summary}",
+        f"📄 Description: {description}",
+        "-" * 60
+    ]
+
+def render_payload(endpoint: str, data: Dict, received_at: datetime, debug: bool = False) -> str:
+    """Format one webhook delivery the way the console has always shown it"""
+    lines = [
+        f"\n{'='*60}",
+        f"🚨 ALERT RECEIVED at {received_at.strftime('%Y-%m-%d %H:%M:%S')}",
+        f"📍 Endpoint: {endpoint}",
+        f"{'='*60}"
+    ]
+    for alert in data['alerts']:
+        lines.extend(render_alert(alert))
+
+    # Also print raw data for debugging
+    if debug:
+        lines.append(f"🔍 Raw Alert Data:")
+        lines.append(json.dumps(data, indent=2))
+
+    lines.append(f"{'='*60}\n")
+    return "\n".join(lines) + "\n"
+
+class AlertWebhookServer:
+    """aiohttp receiver that queues payloads and renders them from a single consumer task"""
+
+    def __init__(self, queue_size: int = 10000, batch_size: int = 100, debug: bool = False,
+                 output=sys.stdout, index: Optional["alert_state.ActiveAlertIndex"] = None):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.index = index or alert_state.ActiveAlertIndex()
+        self.batch_size = batch_size
+        self.debug = debug
+        self.output = output
+        self.accepted = 0
+        self.rejected = 0
+        self.invalid = 0
+        self.rendered = 0
+        self.render_errors = 0
+        # One writer thread keeps console output ordered and off the event loop
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="alert-render")
+        self._consumer = None
 
-class AlertWebhookHandler(BaseHTTPRequestHandler):
-    def do_POST(self):
-        content_length = int(self.headers.get('Content-Length', 0))
-        post_data = self.rfile.read(content_length)
-        
+    def build_app(self) -> web.Application:
+        app = web.Application(client_max_size=16 * 1024 * 1024)
+        app.router.add_get("/health", self.health)
+        app.router.add_get("/alerts", self.alerts)
+        app.router.add_post("/{endpoint:.*}", self.receive)
+        app.on_startup.append(self._start_consumer)
+        app.on_cleanup.append(self._stop_consumer)
+        return app
+
+    async def receive(self, request: web.Request) -> web.Response:
+        body = await request.read()
+        try:
+            data = json.loads(body.decode('utf-8'))
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            self.invalid += 1
+            return web.json_response({"error": "Body is not valid JSON"}, status=400)
+        try:
+            alert_state.validate_payload(data)
+        except ValueError as e:
+            self.invalid += 1
+            return web.json_response({"error": str(e)}, status=400)
+        try:
+            self.queue.put_nowait((request.path, data, datetime.now()))
+        except asyncio.QueueFull:
+            # AlertManager retries failed deliveries, so shed load instead of buffering without bound
+            self.rejected += 1
+            return web.json_response({"status": "busy"}, status=503, headers={"Retry-After": "1"})
+        self.accepted += 1
+        return web.json_response({"status": "ok"})
+
+    async def health(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            "status": "healthy",
+            "queued": self.queue.qsize(),
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "invalid": self.invalid,
+            "rendered": self.rendered,
+            "render_errors": self.render_errors,
+            "active_alerts": len(self.index)
+        })
+
+    async def alerts(self, request: web.Request) -> web.Response:
         try:
-            alert_data = json.loads(post_data.decode('utf-8'))
-            self.process_alert(alert_data)
-        except json.JSONDecodeError:
-            print(f"❌ Failed to parse JSON alert data")
-        
-        # Send response
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.end_headers()
-        self.wfile.write(b'{"status": "ok"}')
-    
-    def process_alert(self, data):
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        endpoint = self.path
-        
-        print(f"\n{'='*60}")
-        print(f"🚨 ALERT RECEIVED at {timestamp}")
-        print(f"📍 Endpoint: {endpoint}")
-        print(f"{'='*60}")
-        
-        if 'alerts' in data:
-            for alert in data['alerts']:
-                status = alert.get('status', 'unknown')
-                labels = alert.get('labels', {})
-                annotations = alert.get('annotations', {})
-                
-                # Format alert display
-                alert_name = labels.get('alertname', 'Unknown Alert')
-                severity = labels.get('severity', 'info')
-                region = labels.get('region', 'unknown')
-                service = labels.get('service', 'unknown')
-                
-                summary = annotations.get('summary', 'No summary')
-                description = annotations.get('description', 'No description')
-                
-                # Color coding for severity
-                if severity == 'critical':
-                    severity_icon = "🔴 CRITICAL"
-                elif severity == 'warning':
-                    severity_icon = "🟡 WARNING"
-                else:
-                    severity_icon = f"ℹ️  {severity.upper()}"
-                
-                status_icon = "🔥 FIRING" if status == 'firing' else "✅ RESOLVED"
-                
-                print(f"{status_icon} {severity_icon}")
-                print(f"📋 Alert: {alert_name}")
-                print(f"🌍 Region: {region}")
-                print(f"⚙️  Service: {service}")
-                print(f"📝 Summary: {summary}")
-                print(f"📄 Description: {description}")
-                print(f"-" * 60)
-        
-        # Also print raw data for debugging
-        if len(sys.argv) > 1 and sys.argv[1] == '--debug':
-            print(f"🔍 Raw Alert Data:")
-            print(json.dumps(data, indent=2))
-        
-        print(f"{'='*60}\n")
-    
-    def log_message(self, format, *args):
-        # Suppress default HTTP server logs
-        pass
+            return web.json_response(alert_state.alerts_response(self.index, request.query))
+        except ValueError as e:
+            return web.json_response({"error": str(e)}, status=400)
+
+    def render(self, endpoint: str, data: Dict, received_at: datetime) -> str:
+        """Fold a delivery into the active alert index and format it"""
+        self.index.update(data, receiver=endpoint.strip("/") or None)
+        return render_payload(endpoint, data, received_at, self.debug)
+
+    def render_batch(self, batch: List[Tuple[str, Dict, datetime]]) -> str:
+        """Format a batch of deliveries, skipping any that fail so the rest still show"""
+        parts = []
+        for endpoint, data, received_at in batch:
+            try:
+                parts.append(self.render(endpoint, data, received_at))
+            except Exception as e:
+                self.render_errors += 1
+                parts.append(f"❌ Failed to render alert delivery from {endpoint}: {e}\n")
+        return "".join(parts)
+
+    def _write(self, text: str):
+        self.output.write(text)
+        self.output.flush()
+
+    async def consume(self):
+        """Drain the queue in batches and hand each rendered batch to the writer thread"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch: List[Tuple[str, Dict, datetime]] = [await self.queue.get()]
+            while len(batch) < self.batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            text = self.render_batch(batch)
+            if len(batch) > 1:
+                text += f"📦 Rendered {len(batch)} queued deliveries ({self.queue.qsize()} still queued)\n"
+            try:
+                await loop.run_in_executor(self._writer, self._write, text)
+            except OSError as e:
+                print(f"❌ Failed to write {len(batch)} alert deliveries: {e}", file=sys.stderr)
+            finally:
+                self.rendered += len(batch)
+                for _ in batch:
+                    self.queue.task_done()
+
+    async def _start_consumer(self, app: web.Application):
+        self._consumer = asyncio.create_task(self.consume())
+
+    async def _stop_consumer(self, app: web.Application):
+        # Give whatever is already acknowledged a chance to reach the console
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout=5)
+        except asyncio.TimeoutError:
+            pass
+        self._consumer.cancel()
+        await asyncio.gather(self._consumer, return_exceptions=True)
+        self._writer.shutdown(wait=True)
 
 def main():
-    port = 8888
-    server_address = ('', port)
-    
+    parser = argparse.ArgumentParser(description="Display AlertManager webhook deliveries")
+    parser.add_argument("--port", type=int, default=8888, help="Port to listen on")
+    parser.add_argument("--debug", action="store_true", help="Also print the raw JSON of each delivery")
+    parser.add_argument("--queue-size", type=int, default=10000,
+                        help="Deliveries buffered before new ones are rejected with 503")
+    parser.add_argument("--batch-size", type=int, default=100, help="Deliveries rendered per console write")
+    parser.add_argument("--alert-ttl-hours", type=float, default=13,
+                        help="Forget firing alerts AlertManager has not repeated for this long")
+    parser.add_argument("--max-alerts", type=int, default=50_000, help="Upper bound on tracked active alerts")
+    args = parser.parse_args()
+
     print(f"🎯 Starting Alert Webhook Server")
-    print(f"📡 Listening on http://localhost:{port}")
+    print(f"📡 Listening on http://localhost:{args.port}")
     print(f"🔗 AlertManager should send alerts here")
     print(f"💡 Use --debug flag to see raw JSON data")
+    print(f"🔎 Active alerts: http://localhost:{args.port}/alerts?region=singapore&severity=critical")
     print(f"⏹️  Press Ctrl+C to stop")
     print(f"{'='*60}")
-    
-    httpd = HTTPServer(server_address, AlertWebhookHandler)
-    
-    try:
-        httpd.serve_forever()
-    except KeyboardInterrupt:
-        print(f"\n🛑 Alert webhook server stopped")
-        httpd.server_close()
+
+    index = alert_state.ActiveAlertIndex(ttl_seconds=args.alert_ttl_hours * 3600, max_alerts=args.max_alerts)
+    server = AlertWebhookServer(queue_size=args.queue_size, batch_size=args.batch_size, debug=args.debug,
+                                index=index)
+    web.run_app(server.build_app(), port=args.port, access_log=None, print=None)
+    print(f"\n🛑 Alert webhook server stopped")
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
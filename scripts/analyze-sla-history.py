@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Sleek SLA History Analysis
+Builds availability, latency percentile and compliance reports from exported
+transaction details. Each CSV (or compressed segment) is converted once into
+memory-mapped NumPy column files and reused on later runs.
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    import zstandard  # noqa: F401  pandas reads .csv.zst segments through it
+except ImportError:
+    zstandard = None
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+COLUMNS = ["timestamp", "region", "transaction_type", "status_code", "response_time_ms", "success"]
+COMPLIANCE_LIMIT_MS = 500
+SLA_TARGET = 99.99
+SOURCE_PATTERNS = ("transaction_details_*.csv", "transaction_details_*.csv.gz", "transaction_details_*.csv.zst")
+
+def find_sources(paths: List[str]) -> List[str]:
+    """Expand directories and globs into transaction detail files"""
+    sources = []
+    for path in paths:
+        if os.path.isdir(path):
+            for pattern in SOURCE_PATTERNS:
+                sources.extend(glob.glob(os.path.join(path, pattern)))
+        else:
+            sources.extend(glob.glob(path))
+    return sorted(set(sources))
+
+def cache_path_for(source: str, cache_dir: str) -> str:
+    """Cache directory for a source, keyed on its absolute path so equal file names never collide"""
+    name = os.path.basename(source).split(".csv")[0]
+    digest = hashlib.sha1(os.path.abspath(source).encode()).hexdigest()[:12]
+    return os.path.join(cache_dir, f"{name}-{digest}")
+
+def is_cache_fresh(source: str, cache_path: str) -> bool:
+    meta_path = os.path.join(cache_path, "meta.json")
+    if not os.path.exists(meta_path):
+        return False
+    with open(meta_path) as f:
+        meta = json.load(f)
+    stat = os.stat(source)
+    return (meta.get("version") == CACHE_VERSION
+            and meta.get("source_size") == stat.st_size
+            and meta.get("source_mtime") == stat.st_mtime)
+
+def convert_to_columns(source: str, cache_path: str):
+    """Parse a CSV once and store each column as a .npy file"""
+    if source.endswith(".zst") and zstandard is None:
+        raise RuntimeError(f"zstandard is required to read {source}")
+    # Compression is inferred from the .gz or .zst suffix
+    frame = pd.read_csv(source, usecols=COLUMNS, dtype={"region": "category", "transaction_type": "category"})
+    timestamps = pd.to_datetime(frame["timestamp"], utc=True, format="ISO8601")
+    success = frame["success"]
+    if success.dtype != bool:
+        success = success.astype(str).str.lower() == "true"
+
+    os.makedirs(cache_path, exist_ok=True)
+    epoch_ns = timestamps.dt.tz_convert(None).to_numpy(dtype="datetime64[ns]").view(np.int64)
+    np.save(os.path.join(cache_path, "timestamp.npy"), epoch_ns)
+    np.save(os.path.join(cache_path, "response_time_ms.npy"), frame["response_time_ms"].to_numpy(dtype=np.float64))
+    np.save(os.path.join(cache_path, "status_code.npy"), frame["status_code"].to_numpy(dtype=np.int16))
+    np.save(os.path.join(cache_path, "success.npy"), success.to_numpy(dtype=bool))
+    np.save(os.path.join(cache_path, "region.npy"), frame["region"].cat.codes.to_numpy(dtype=np.int16))
+    np.save(os.path.join(cache_path, "transaction_type.npy"),
+            frame["transaction_type"].cat.codes.to_numpy(dtype=np.int16))
+
+    stat = os.stat(source)
+    with open(os.path.join(cache_path, "meta.json"), "w") as f:
+        json.dump({
+            "version": CACHE_VERSION,
+            "source": os.path.abspath(source),
+            "source_size": stat.st_size,
+            "source_mtime": stat.st_mtime,
+            "rows": len(frame),
+            "regions": list(frame["region"].cat.categories),
+            "transaction_types": list(frame["transaction_type"].cat.categories)
+        }, f)
+
+def load_columns(cache_path: str) -> pd.DataFrame:
+    """Memory-map a cached column set into a DataFrame with categorical labels"""
+    with open(os.path.join(cache_path, "meta.json")) as f:
+        meta = json.load(f)
+
+    def column(name: str) -> np.ndarray:
+        return np.load(os.path.join(cache_path, f"{name}.npy"), mmap_mode="r")
+
+    return pd.DataFrame({
+        "timestamp": column("timestamp"),
+        "response_time_ms": column("response_time_ms"),
+        "status_code": column("status_code"),
+        "success": column("success"),
+        "region": pd.Categorical.from_codes(column("region"), meta["regions"]),
+        "transaction_type": pd.Categorical.from_codes(column("transaction_type"), meta["transaction_types"])
+    })
+
+def load_history(sources: List[str], cache_dir: str, since: Optional[datetime] = None,
+                 until: Optional[datetime] = None) -> pd.DataFrame:
+    """Load every source through the column cache, converting only new or changed files"""
+    frames = []
+    converted = 0
+    for source in sources:
+        cache_path = cache_path_for(source, cache_dir)
+        if not is_cache_fresh(source, cache_path):
+            convert_to_columns(source, cache_path)
+            converted += 1
+        frames.append(load_columns(cache_path))
+    logger.info(f"Loaded {len(sources)} files ({converted} converted, {len(sources) - converted} cached)")
+
+    if not frames:
+        return pd.DataFrame(columns=COLUMNS)
+    history = pd.concat(frames, ignore_index=True)
+    for column in ("region", "transaction_type"):
+        history[column] = history[column].astype("category")
+
+    if since is not None:
+        history = history[history["timestamp"] >= pd.Timestamp(since).value]
+    if until is not None:
+        history = history[history["timestamp"] < pd.Timestamp(until).value]
+
+    # Older exports rewrote the full history every cycle, so rows repeat across files
+    history = history.drop_duplicates(subset=["timestamp", "region", "transaction_type"])
+    history["timestamp"] = pd.to_datetime(history["timestamp"], utc=True)
+    return history
+
+def build_report(history: pd.DataFrame, bucket: str) -> pd.DataFrame:
+    """Availability, latency quantiles and compliance per region, type and time bucket"""
+    history = history.assign(
+        bucket=history["timestamp"].dt.floor(bucket),
+        violation=(history["transaction_type"] == "financial_query")
+        & (history["response_time_ms"] > COMPLIANCE_LIMIT_MS)
+    )
+    grouped = history.groupby(["region", "transaction_type", "bucket"], observed=True)
+    report = grouped.agg(
+        transactions=("success", "size"),
+        successful=("success", "sum"),
+        avg_ms=("response_time_ms", "mean"),
+        compliance_violations=("violation", "sum")
+    )
+    quantiles = grouped["response_time_ms"].quantile([0.5, 0.95, 0.99]).unstack()
+    quantiles.columns = ["p50_ms", "p95_ms", "p99_ms"]
+    report = report.join(quantiles)
+    report["availability"] = report["successful"] / report["transactions"] * 100
+    report["sla_compliant"] = report["availability"] >= SLA_TARGET
+    return report.reset_index()
+
+def summarize(history: pd.DataFrame) -> Dict:
+    """Whole-period availability and tail latency per region"""
+    summary = {}
+    for region, frame in history.groupby("region", observed=True):
+        latencies = frame["response_time_ms"].to_numpy()
+        availability = float(frame["success"].mean() * 100)
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        summary[region] = {
+            "transactions": int(len(frame)),
+            "availability": availability,
+            "sla_compliant": availability >= SLA_TARGET,
+            "p50_ms": float(p50),
+            "p95_ms": float(p95),
+            "p99_ms": float(p99),
+            "compliance_violations": int(((frame["transaction_type"] == "financial_query")
+                                          & (frame["response_time_ms"] > COMPLIANCE_LIMIT_MS)).sum())
+        }
+    return summary
+
+def parse_time(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+def main():
+    parser = argparse.ArgumentParser(description="Sleek SLA report from exported transaction details")
+    parser.add_argument("paths", nargs="*", default=["."],
+                        help="Directories, files or globs of transaction_details CSVs (default: current directory)")
+    parser.add_argument("--cache-dir", default=".sla-cache", help="Directory for the columnar cache")
+    parser.add_argument("--bucket", default="1D", help="Time bucket for the report, e.g. 1h, 1D (default: 1D)")
+    parser.add_argument("--days", type=float, help="Only include the last N days")
+    parser.add_argument("--since", type=parse_time, help="Start of the report period (ISO 8601)")
+    parser.add_argument("--until", type=parse_time, help="End of the report period (ISO 8601)")
+    parser.add_argument("--output", help="Write the bucketed report to this .csv or .json file")
+
+    args = parser.parse_args()
+
+    since = args.since
+    if args.days is not None:
+        since = datetime.now(timezone.utc) - timedelta(days=args.days)
+
+    sources = find_sources(args.paths)
+    if not sources:
+        logger.error("No transaction detail files found")
+        return
+
+    history = load_history(sources, args.cache_dir, since=since, until=args.until)
+    if history.empty:
+        logger.error("No transactions in the selected period")
+        return
+
+    report = build_report(history, args.bucket)
+    summary = summarize(history)
+
+    print(f"\n{'='*50}")
+    print("SLEEK SLA HISTORY REPORT")
+    print(f"{'='*50}")
+    print(f"Period: {history['timestamp'].min()} - {history['timestamp'].max()}")
+    print(f"Transactions: {len(history)}")
+    print(f"\nRegion Summary:")
+    for region, data in summary.items():
+        status = "COMPLIANT" if data["sla_compliant"] else "NON_COMPLIANT"
+        print(f"  {region.capitalize()}: {data['availability']:.3f}% {status} "
+              f"(p50 {data['p50_ms']:.2f}ms, p99 {data['p99_ms']:.2f}ms, "
+              f"{data['compliance_violations']} compliance violations)")
+    print(f"\nBy region, transaction type and {args.bucket} bucket:")
+    print(report.to_string(index=False, float_format=lambda value: f"{value:.2f}"))
+
+    if args.output:
+        if args.output.endswith(".json"):
+            report.assign(bucket=report["bucket"].astype(str)).to_json(args.output, orient="records", indent=2)
+        else:
+            report.to_csv(args.output, index=False)
+        logger.info(f"Report written to {args.output}")
+
+if __name__ == "__main__":
+    main()
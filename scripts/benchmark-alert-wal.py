@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Sustained ingest benchmark for the alert webhook write-ahead log
+Many threads append AlertManager payloads and wait for durability, as the
+receiver's request threads do, with group commit, with one fsync per
+record and with fsync disabled
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, List
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def load_script(module_name: str, filename: str):
+    """Import one of the hyphenated scripts in this directory as a module"""
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(SCRIPTS_DIR, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+alert_wal = load_script("alert_wal", "alert-wal.py")
+load_test = load_script("load_test_alert_webhook", "load-test-alert-webhook.py")
+
+MODES = {
+    "group-commit": {"fsync": True},
+    "fsync-per-record": {"fsync": True, "max_batch": 1},
+    "no-fsync": {"fsync": False}
+}
+
+def run_mode(mode: str, directory: str, payload: bytes, threads: int, duration: float,
+             segment_max_bytes: int) -> Dict:
+    wal = alert_wal.AlertWAL(os.path.join(directory, mode), segment_max_bytes=segment_max_bytes, **MODES[mode])
+    latencies: List[List[float]] = [[] for _ in range(threads)]
+    stop = time.perf_counter() + duration
+
+    def appender(samples: List[float]):
+        while time.perf_counter() < stop:
+            started = time.perf_counter()
+            wal.append("/critical", payload).result()
+            samples.append((time.perf_counter() - started) * 1000)
+
+    workers = [threading.Thread(target=appender, args=(samples,)) for samples in latencies]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+    wal.close()
+
+    replayed = sum(1 for _ in wal.replay())
+    ordered = sorted(sample for samples in latencies for sample in samples)
+    return {
+        "mode": mode,
+        "records": wal.records_written,
+        "replayed": replayed,
+        "segments": len(wal.segments()),
+        "records_per_sec": wal.records_written / elapsed,
+        "mb_per_sec": wal.records_written * len(payload) / elapsed / 1024 / 1024,
+        "records_per_commit": wal.records_written / wal.commits if wal.commits else 0.0,
+        "p50_commit_ms": ordered[len(ordered) // 2] if ordered else 0.0,
+        "p99_commit_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] if ordered else 0.0
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark durable ingest into the alert webhook WAL")
+    parser.add_argument("--threads", type=int, default=16, help="Concurrent appenders, like the receiver's threads")
+    parser.add_argument("--duration", type=float, default=5, help="Seconds to run each mode")
+    parser.add_argument("--alerts", type=int, default=20, help="Alerts grouped in each payload")
+    parser.add_argument("--segment-mb", type=float, default=16, help="WAL segment size")
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES), help="Modes to run")
+    parser.add_argument("--dir", help="Directory on the disk to test (default: a temporary directory)")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+
+    args = parser.parse_args()
+    payload = load_test.build_payload(args.alerts, 0)
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+        rows = [
+            run_mode(mode, directory, payload, args.threads, args.duration, int(args.segment_mb * 1024 * 1024))
+            for mode in args.modes
+        ]
+
+    print(f"\n{'='*60}")
+    print("ALERT WAL INGEST")
+    print(f"{'='*60}")
+    print(f"{args.threads} threads, {len(payload) / 1024:.1f}KB payloads, {args.duration:.0f}s per mode")
+    print(f"{'mode':>17} {'records/s':>10} {'MB/s':>7} {'per fsync':>10} {'p50':>9} {'p99':>9} {'replayed':>9}")
+    for row in rows:
+        print(f"{row['mode']:>17} {row['records_per_sec']:>10.0f} {row['mb_per_sec']:>7.1f} "
+              f"{row['records_per_commit']:>10.1f} {row['p50_commit_ms']:>7.2f}ms {row['p99_commit_ms']:>7.2f}ms "
+              f"{row['replayed']:>9}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"settings": vars(args), "modes": rows}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
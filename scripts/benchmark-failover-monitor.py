@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+RTO measurement accuracy benchmark for the failover monitor
+Starts the mock region server with scheduled outages, runs
+scripts/failover-monitor.py against it alongside a serial poller shaped like
+the old monitor_failover loop (one region at a time, then sleep), and
+compares both measured outages with the outage windows the server applied
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import aiohttp
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+REGIONS = ["singapore", "hongkong", "australia", "uk"]
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_mock_server(ports: Dict[str, int], outages: List[str], workdir: str) -> subprocess.Popen:
+    config_path = os.path.join(workdir, "mock-profiles.json")
+    with open(config_path, "w") as f:
+        json.dump([{"name": region, "port": port, "latency_median_ms": 30, "latency_sigma": 0.2, "hang_seconds": 30}
+                   for region, port in ports.items()], f)
+    command = [sys.executable, os.path.join(SCRIPTS_DIR, "mock-region-server.py"), "--config", config_path]
+    for outage in outages:
+        command += ["--outage", outage]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        try:
+            for port in ports.values():
+                socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("Mock region server did not start")
+
+def write_outputs(ports: Dict[str, int], workdir: str):
+    """Terraform-style outputs files pointing the regions at the mock server"""
+    for region, port in ports.items():
+        with open(os.path.join(workdir, f"outputs_{region}.json"), "w") as f:
+            json.dump({"environment": {"value": region},
+                       "load_balancer_dns_name": {"value": f"localhost:{port}"}}, f)
+
+def applied_outages(port: int) -> Dict[str, List[Tuple[float, float]]]:
+    """Outage windows (wall-clock start, end) per region as logged by the mock server"""
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/_faults") as response:
+        log = json.load(response)
+    windows: Dict[str, List[Tuple[float, float]]] = {}
+    started: Dict[str, float] = {}
+    for entry in log:
+        if entry["mode"] == "none":
+            if entry["region"] in started:
+                windows.setdefault(entry["region"], []).append((started.pop(entry["region"]), entry["at"]))
+        else:
+            started.setdefault(entry["region"], entry["at"])
+    return windows
+
+async def serial_poll(ports: Dict[str, int], duration: float, poll_interval: float,
+                      timeout: float) -> Dict[str, List[Tuple[float, Optional[float]]]]:
+    """Health check each region in turn, then sleep; edges are the polls that saw the change"""
+    outages: Dict[str, List[Tuple[float, Optional[float]]]] = {region: [] for region in ports}
+    down_since: Dict[str, float] = {}
+    deadline = time.monotonic() + duration
+    async with aiohttp.ClientSession() as session:
+        while time.monotonic() < deadline:
+            for region, port in ports.items():
+                try:
+                    async with session.get(f"http://localhost:{port}/health",
+                                           timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                        healthy = response.status == 200
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    healthy = False
+                observed = time.time()
+                if not healthy and region not in down_since:
+                    down_since[region] = observed
+                elif healthy and region in down_since:
+                    outages[region].append((down_since.pop(region), observed))
+            await asyncio.sleep(poll_interval)
+    for region, start in down_since.items():
+        outages[region].append((start, None))
+    return outages
+
+def parse_iso(value: Optional[str]) -> Optional[float]:
+    if value is None:
+        return None
+    return datetime.fromisoformat(value).timestamp()
+
+def compare(truth: List[Tuple[float, float]], measured: List[Tuple[float, Optional[float]]]) -> Dict:
+    """Match each applied outage with the measured outage overlapping it"""
+    rows = []
+    for start, end in truth:
+        match = next(((m_start, m_end) for m_start, m_end in measured
+                      if m_start <= end + 1 and (m_end is None or m_end >= start - 1)), None)
+        if match is None or match[1] is None:
+            rows.append({"rto_seconds": end - start, "measured_seconds": None, "error_seconds": None})
+            continue
+        measured_rto = match[1] - match[0]
+        rows.append({"rto_seconds": end - start, "measured_seconds": measured_rto,
+                     "error_seconds": measured_rto - (end - start),
+                     "start_error_seconds": match[0] - start, "end_error_seconds": match[1] - end})
+    return {"outages": rows, "false_outages": max(0, len(measured) - len([row for row in rows
+                                                                         if row["measured_seconds"] is not None]))}
+
+async def run(args, workdir: str) -> Dict:
+    ports = {region: free_port() for region in REGIONS}
+    write_outputs(ports, workdir)
+    report_path = os.path.join(workdir, "failover_report.json")
+    server = start_mock_server(ports, args.outage, workdir)
+    try:
+        monitor = await asyncio.create_subprocess_exec(
+            sys.executable, os.path.join(SCRIPTS_DIR, "failover-monitor.py"),
+            "--region-outputs", os.path.join(workdir, "outputs_*.json"), "--duration", str(args.duration),
+            "--interval", str(args.interval), "--timeout", str(args.timeout), "--report", report_path,
+            "--status-interval", str(args.duration), stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL, cwd=workdir
+        )
+        baseline = await serial_poll(ports, args.duration, args.poll_interval, args.poll_timeout)
+        await monitor.wait()
+        truth = applied_outages(next(iter(ports.values())))
+    finally:
+        server.terminate()
+        server.wait()
+
+    with open(report_path) as f:
+        report = json.load(f)
+    measured: Dict[str, List[Tuple[float, Optional[float]]]] = {region: [] for region in REGIONS}
+    for region, summary in report["regions"].items():
+        for incident in summary["incidents"]:
+            measured[region].append((parse_iso(incident["started_at"]), parse_iso(incident["recovered_at"])))
+
+    return {
+        region: {
+            "applied": [end - start for start, end in truth.get(region, [])],
+            "monitor": compare(truth.get(region, []), measured[region]),
+            "serial_poll": compare(truth.get(region, []), baseline[region])
+        }
+        for region in REGIONS
+    }
+
+def fmt(value: Optional[float]) -> str:
+    return "missed" if value is None else f"{value:.3f}s"
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare measured RTO against outages applied by the mock server")
+    parser.add_argument("--outage", action="append",
+                        help="Mock server outage REGION:START:DURATION[:MODE]; repeatable "
+                             "(default: a 12s error, a 6s hang and a 1.5s blip)")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds to monitor")
+    parser.add_argument("--interval", type=float, default=0.1, help="Failover monitor probe interval")
+    parser.add_argument("--timeout", type=float, default=2.0, help="Failover monitor probe timeout")
+    parser.add_argument("--poll-interval", type=float, default=5, help="Serial poller sleep between rounds")
+    parser.add_argument("--poll-timeout", type=float, default=10, help="Serial poller request timeout")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+
+    args = parser.parse_args()
+    args.outage = args.outage or ["singapore:5:12", "hongkong:8:6:hang", "australia:11:1.5"]
+    with tempfile.TemporaryDirectory() as workdir:
+        results = asyncio.run(run(args, workdir))
+
+    print(f"\n{'='*60}")
+    print("FAILOVER RTO MEASUREMENT")
+    print(f"{'='*60}")
+    print(f"Monitor: every {args.interval * 1000:.0f}ms per target, concurrent; "
+          f"serial poll: every {args.poll_interval:.0f}s, one region at a time")
+    print(f"{'region':<10} {'applied':>9} {'monitor':>9} {'error':>8} {'serial':>9} {'error':>8}")
+    for region, result in results.items():
+        for index, applied in enumerate(result["applied"]):
+            monitor = result["monitor"]["outages"][index]
+            serial = result["serial_poll"]["outages"][index]
+            print(f"{region:<10} {applied:>8.3f}s {fmt(monitor['measured_seconds']):>9} "
+                  f"{fmt(monitor['error_seconds']):>8} {fmt(serial['measured_seconds']):>9} "
+                  f"{fmt(serial['error_seconds']):>8}")
+        false_outages = result["monitor"]["false_outages"] + result["serial_poll"]["false_outages"]
+        if not result["applied"]:
+            print(f"{region:<10} {'none':>9}" + (f"  {false_outages} false outage(s)" if false_outages else ""))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"settings": vars(args), "regions": results}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Event loop lag benchmark for the synthetic monitor's logging setup
+Runs a ticker that measures how late each asyncio wakeup fires while other
+tasks log at a fixed rate, once with the old synchronous file and console
+handlers and once with the queue-based pipeline from health-check-synthetic.py
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import logging
+import logging.handlers
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def load_script(module_name: str, filename: str):
+    """Import one of the hyphenated scripts in this directory as a module"""
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(SCRIPTS_DIR, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+synthetic = load_script("health_check_synthetic", "health-check-synthetic.py")
+
+class SlowFileHandler(logging.FileHandler):
+    """File handler that flushes and fsyncs every record, optionally with an extra delay per write"""
+
+    def __init__(self, filename: str, write_delay_ms: float):
+        super().__init__(filename)
+        self.write_delay = write_delay_ms / 1000
+
+    def emit(self, record: logging.LogRecord):
+        super().emit(record)
+        os.fsync(self.stream.fileno())
+        if self.write_delay:
+            time.sleep(self.write_delay)
+
+def configure_sync(log_file: str, write_delay_ms: float):
+    """The pre-queue setup: handlers run inline in whichever thread logs"""
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    file_handler = SlowFileHandler(log_file, write_delay_ms)
+    file_handler.setFormatter(logging.Formatter(synthetic.LOG_FORMAT))
+    console = logging.StreamHandler(open(os.devnull, "w"))
+    console.setFormatter(logging.Formatter(synthetic.LOG_FORMAT))
+    root.addHandler(file_handler)
+    root.addHandler(console)
+    root.setLevel(logging.INFO)
+
+def configure_queued(log_file: str, write_delay_ms: float) -> logging.handlers.QueueListener:
+    """The same slow file and silent console, behind the engine's logging queue"""
+    file_handler = SlowFileHandler(log_file, write_delay_ms)
+    file_handler.setFormatter(synthetic.JsonFormatter())
+    console = logging.StreamHandler(open(os.devnull, "w"))
+    return synthetic.configure_logging(handlers=[file_handler, console])
+
+async def measure_lag(duration: float, log_rate: float, tick_ms: float) -> List[float]:
+    """Return how late, in milliseconds, each ticker wakeup fired while logging runs"""
+    logger = logging.getLogger("benchmark")
+    stop = time.perf_counter() + duration
+
+    async def log_traffic():
+        period = 1 / log_rate
+        sequence = 0
+        while time.perf_counter() < stop:
+            sequence += 1
+            logger.info(f"Synthetic probe {sequence} completed", extra={"region": "singapore"})
+            await asyncio.sleep(period)
+
+    lags = []
+    traffic = asyncio.create_task(log_traffic())
+    interval = tick_ms / 1000
+    while time.perf_counter() < stop:
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append((time.perf_counter() - started - interval) * 1000)
+    await traffic
+    return lags
+
+def summarize(mode: str, lags: List[float]) -> Dict:
+    ordered = sorted(lags)
+    return {
+        "mode": mode,
+        "ticks": len(lags),
+        "mean_ms": statistics.fmean(lags),
+        "p50_ms": ordered[len(ordered) // 2],
+        "p99_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))],
+        "max_ms": ordered[-1]
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare event loop lag under synchronous and queued logging")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds to run each mode")
+    parser.add_argument("--log-rate", type=float, default=200, help="Log records per second")
+    parser.add_argument("--tick-ms", type=float, default=5, help="Ticker interval used to sample loop lag")
+    parser.add_argument("--write-delay-ms", type=float, default=0,
+                        help="Extra delay per file write, to emulate a slow or contended disk")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+
+    args = parser.parse_args()
+
+    rows = []
+    with tempfile.TemporaryDirectory() as workdir:
+        configure_sync(os.path.join(workdir, "sync.log"), args.write_delay_ms)
+        rows.append(summarize("sync", asyncio.run(measure_lag(args.duration, args.log_rate, args.tick_ms))))
+
+        listener = configure_queued(os.path.join(workdir, "queued.log"), args.write_delay_ms)
+        rows.append(summarize("queued", asyncio.run(measure_lag(args.duration, args.log_rate, args.tick_ms))))
+        listener.stop()
+
+    print(f"\n{'='*50}")
+    print("LOGGING EVENT LOOP LAG")
+    print(f"{'='*50}")
+    print(f"{args.log_rate:.0f} records/s, {args.tick_ms:.1f}ms ticks, "
+          f"{args.write_delay_ms:.1f}ms extra per write, {args.duration:.0f}s per mode")
+    print(f"{'mode':>8} {'ticks':>7} {'mean':>9} {'p50':>9} {'p99':>9} {'max':>9}")
+    for row in rows:
+        print(f"{row['mode']:>8} {row['ticks']:>7} {row['mean_ms']:>8.3f}ms {row['p50_ms']:>8.3f}ms "
+              f"{row['p99_ms']:>8.3f}ms {row['max_ms']:>8.3f}ms")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"settings": vars(args), "modes": rows}, f, indent=2)
+
+if __name__ == "__main__":
+    sys.exit(main())
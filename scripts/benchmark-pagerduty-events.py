@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Alert storm benchmark for the PagerDuty Events API v2 forwarder
+Replays repeated AlertManager deliveries for many alerts against the local
+stub, once posting every alert directly and once through
+monitoring/alerting/pagerduty-events.py, and checks that the incident
+state PagerDuty ends up with matches the last state of every alert. A
+restart run queues events while the stub is down and delivers them from
+the persisted queue with a new forwarder
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+import requests
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(SCRIPTS_DIR)
+ROUTING_KEY = "benchmark-routing-key"
+
+def load_module(module_name: str, path: str):
+    """Import a hyphenated script by path"""
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+pagerduty_events = load_module("pagerduty_events", os.path.join(REPO_DIR, "monitoring", "alerting", "pagerduty-events.py"))
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_stub(port: int, latency_ms: float, events_per_minute: float, failure_rate: float) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(SCRIPTS_DIR, "mock-pagerduty-api.py"), "--port", str(port),
+         "--latency-ms", str(latency_ms), "--events-per-minute", str(events_per_minute),
+         "--event-failure-rate", str(failure_rate)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("Mock PagerDuty API did not start")
+
+def stub_stats(base_url: str) -> Dict:
+    with urllib.request.urlopen(f"{base_url}/_stats") as response:
+        return json.load(response)
+
+def build_storm(alerts: int, updates: int, resolved_fraction: float, seed: int = 7) -> Tuple[List[Dict], Dict[str, str]]:
+    """AlertManager payloads in delivery order, and the final action expected per dedup_key"""
+    rng = random.Random(seed)
+    regions = ["singapore", "hongkong", "australia", "uk"]
+    deliveries = []
+    for update in range(updates + 1):
+        batch = []
+        for index in range(alerts):
+            resolved = update == updates and index < alerts * resolved_fraction
+            if update == updates and not resolved:
+                continue
+            region = regions[index % len(regions)]
+            batch.append({
+                "status": "resolved" if resolved else "firing",
+                "fingerprint": f"{index:08x}",
+                "labels": {"alertname": "HighLatency", "severity": "critical", "region": region,
+                           "instance": f"{region}-web-{index}", "service": "web"},
+                "annotations": {"summary": f"p99 latency above SLO on {region}-web-{index}",
+                                "description": f"update {update}"},
+                "startsAt": "2026-10-16T00:00:00Z"
+            })
+        rng.shuffle(batch)
+        for start in range(0, len(batch), 20):
+            deliveries.append({"status": "firing", "alerts": batch[start:start + 20]})
+    expected = {}
+    for payload in deliveries:
+        for event in pagerduty_events.events_from_alertmanager(payload, ROUTING_KEY):
+            expected[event["dedup_key"]] = event["event_action"]
+    return deliveries, expected
+
+def replay(deliveries: List[Dict], duration: float, deliver):
+    """Hand deliveries to ``deliver`` spread evenly over ``duration`` seconds"""
+    started = time.perf_counter()
+    for index, payload in enumerate(deliveries):
+        pause = started + duration * index / len(deliveries) - time.perf_counter()
+        if pause > 0:
+            time.sleep(pause)
+        deliver(payload)
+
+def mismatches(expected: Dict[str, str], state: Dict[str, str]) -> int:
+    return sum(1 for key, action in expected.items() if state.get(key) != action)
+
+def run_direct(base_url: str, deliveries: List[Dict], expected: Dict[str, str], duration: float, workers: int) -> Dict:
+    """Today's shape: one Events API call per alert per delivery, no limiter and no retry queue"""
+    session = requests.Session()
+    statuses: Dict[int, int] = {}
+    latencies: List[float] = []
+
+    def post(event: Dict):
+        started = time.perf_counter()
+        try:
+            status = session.post(f"{base_url}/v2/enqueue", json=event, timeout=10).status_code
+        except requests.RequestException:
+            status = 0
+        statuses[status] = statuses.get(status, 0) + 1
+        if status == 202:
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        replay(deliveries, duration,
+               lambda payload: [pool.submit(post, event)
+                                for event in pagerduty_events.events_from_alertmanager(payload, ROUTING_KEY)])
+    elapsed = time.perf_counter() - started
+    stats = stub_stats(base_url)
+    latencies.sort()
+    return {
+        "mode": "direct",
+        "wall_seconds": elapsed,
+        "api_calls": stats["events"],
+        "rate_limited": stats["events_rate_limited"],
+        "delivered": statuses.get(202, 0),
+        "lost": sum(count for status, count in statuses.items() if status != 202),
+        "p99_delivery_seconds": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] if latencies else 0.0,
+        "wrong_state": mismatches(expected, stats["event_state"])
+    }
+
+def run_forwarder(base_url: str, queue_path: str, deliveries: List[Dict], expected: Dict[str, str],
+                  duration: float, workers: int, events_per_minute: float, coalesce_seconds: float) -> Dict:
+    forwarder = pagerduty_events.PagerDutyEventForwarder(
+        queue_path=queue_path, events_url=f"{base_url}/v2/enqueue", coalesce_seconds=coalesce_seconds,
+        max_workers=workers, events_per_minute=events_per_minute
+    ).start()
+    started = time.perf_counter()
+    try:
+        replay(deliveries, duration, lambda payload: forwarder.forward_alertmanager(payload, ROUTING_KEY))
+        drained = forwarder.flush(timeout=300)
+    finally:
+        forwarder.close()
+    elapsed = time.perf_counter() - started
+    stats = stub_stats(base_url)
+    summary = forwarder.stats()
+    return {
+        "mode": "forwarder",
+        "wall_seconds": elapsed,
+        "api_calls": stats["events"],
+        "rate_limited": stats["events_rate_limited"],
+        "delivered": summary.get("delivered", 0),
+        "lost": summary["queued"] if not drained else summary.get("rejected", 0),
+        "coalesced": summary.get("coalesced", 0),
+        "p50_delivery_seconds": summary["p50_delivery_seconds"],
+        "p99_delivery_seconds": summary["p99_delivery_seconds"],
+        "wrong_state": mismatches(expected, stats["event_state"])
+    }
+
+def run_restart(args, workdir: str, deliveries: List[Dict], expected: Dict[str, str]) -> Dict:
+    """Queue events while PagerDuty is unreachable, stop, then drain with a fresh forwarder"""
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    queue_path = os.path.join(workdir, "restart.db")
+    forwarder = pagerduty_events.PagerDutyEventForwarder(
+        queue_path=queue_path, events_url=f"{base_url}/v2/enqueue", coalesce_seconds=0,
+        max_workers=args.workers, events_per_minute=args.events_per_minute
+    ).start()
+    for payload in deliveries:
+        forwarder.forward_alertmanager(payload, ROUTING_KEY)
+    time.sleep(0.5)
+    forwarder.close()
+    queued = forwarder.queue.depth()
+
+    stub = start_stub(port, args.latency_ms, args.events_per_minute, 0.0)
+    try:
+        forwarder = pagerduty_events.PagerDutyEventForwarder(
+            queue_path=queue_path, events_url=f"{base_url}/v2/enqueue",
+            max_workers=args.workers, events_per_minute=args.events_per_minute
+        ).start()
+        started = time.perf_counter()
+        try:
+            forwarder.flush(timeout=300)
+        finally:
+            forwarder.close()
+        elapsed = time.perf_counter() - started
+        stats = stub_stats(base_url)
+    finally:
+        stub.terminate()
+        stub.wait()
+    return {
+        "mode": "restart",
+        "queued_while_down": queued,
+        "drain_seconds": elapsed,
+        "delivered": forwarder.stats().get("delivered", 0),
+        "left_in_queue": forwarder.queue.depth(),
+        "wrong_state": mismatches(expected, stats["event_state"])
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PagerDuty event delivery during an alert storm")
+    parser.add_argument("--alerts", type=int, default=100, help="Distinct alerts in the storm")
+    parser.add_argument("--updates", type=int, default=5, help="Repeated firing deliveries per alert")
+    parser.add_argument("--resolved-fraction", type=float, default=0.5, help="Alerts resolved at the end")
+    parser.add_argument("--duration", type=float, default=5, help="Seconds over which the storm is replayed")
+    parser.add_argument("--events-per-minute", type=float, default=1200, help="Stub and forwarder limit per routing key")
+    parser.add_argument("--latency-ms", type=float, default=50, help="Stub latency per event")
+    parser.add_argument("--failure-rate", type=float, default=0.02, help="Fraction of events the stub fails with 500")
+    parser.add_argument("--coalesce-seconds", type=float, default=2.0, help="Forwarder coalescing window")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent senders")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+
+    args = parser.parse_args()
+    deliveries, expected = build_storm(args.alerts, args.updates, args.resolved_fraction)
+    alert_events = sum(len(payload["alerts"]) for payload in deliveries)
+
+    rows = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for mode in ("direct", "forwarder"):
+            port = free_port()
+            base_url = f"http://127.0.0.1:{port}"
+            stub = start_stub(port, args.latency_ms, args.events_per_minute, args.failure_rate)
+            try:
+                if mode == "direct":
+                    rows.append(run_direct(base_url, deliveries, expected, args.duration, args.workers))
+                else:
+                    rows.append(run_forwarder(base_url, os.path.join(workdir, "events.db"), deliveries, expected,
+                                              args.duration, args.workers, args.events_per_minute,
+                                              args.coalesce_seconds))
+            finally:
+                stub.terminate()
+                stub.wait()
+        restart = run_restart(args, workdir, deliveries, expected)
+
+    print(f"\n{'='*60}")
+    print("PAGERDUTY EVENT STORM")
+    print(f"{'='*60}")
+    print(f"{args.alerts} alerts, {alert_events} alert updates in {len(deliveries)} deliveries over {args.duration:.0f}s")
+    print(f"Stub: {args.events_per_minute:.0f} events/minute, {args.latency_ms:.0f}ms, {args.failure_rate:.0%} 500s")
+    print(f"{'mode':>10} {'wall':>8} {'calls':>6} {'429s':>5} {'delivered':>10} {'lost':>5} {'p99':>8} {'wrong state':>12}")
+    for row in rows:
+        print(f"{row['mode']:>10} {row['wall_seconds']:>7.1f}s {row['api_calls']:>6} {row['rate_limited']:>5} "
+              f"{row['delivered']:>10} {row['lost']:>5} {row['p99_delivery_seconds']:>7.2f}s {row['wrong_state']:>12}")
+    print(f"Restart: {restart['queued_while_down']} events queued while unreachable, "
+          f"{restart['delivered']} delivered in {restart['drain_seconds']:.1f}s after restart, "
+          f"{restart['left_in_queue']} left, {restart['wrong_state']} wrong state")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"settings": vars(args), "modes": rows, "restart": restart}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Wall-time benchmark for PagerDuty provisioning against the local stub API
+Runs setup_sleek_pagerduty_integration from monitoring/alerting/pagerduty-config.py
+twice per worker count (a fresh account, then a re-run that must create
+nothing) and reports wall time, requests, 429s and objects in the account
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from typing import Dict, List
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(SCRIPTS_DIR)
+
+def load_module(module_name: str, path: str):
+    """Import a hyphenated script by path"""
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+pagerduty = load_module("pagerduty_config", os.path.join(REPO_DIR, "monitoring", "alerting", "pagerduty-config.py"))
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_stub(port: int, latency_ms: float, requests_per_minute: float) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(SCRIPTS_DIR, "mock-pagerduty-api.py"), "--port", str(port),
+         "--latency-ms", str(latency_ms), "--requests-per-minute", str(requests_per_minute)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("Mock PagerDuty API did not start")
+
+def stub_stats(base_url: str) -> Dict:
+    with urllib.request.urlopen(f"{base_url}/_stats") as response:
+        return json.load(response)
+
+def run_setup(base_url: str, workers: int, client_rate: float) -> Dict:
+    pd = pagerduty.PagerDutyIntegration("benchmark-token", base_url=base_url, max_workers=workers,
+                                        requests_per_minute=client_rate)
+    started = time.perf_counter()
+    ok = pagerduty.setup_sleek_pagerduty_integration(pd)
+    return {"ok": ok, "wall_seconds": time.perf_counter() - started, **pd.stats}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PagerDuty provisioning against the local stub API")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 8], help="Worker counts to compare")
+    parser.add_argument("--latency-ms", type=float, default=80, help="Stub latency per request")
+    parser.add_argument("--stub-rate", type=float, default=960, help="Stub rate limit in requests/minute")
+    parser.add_argument("--client-rate", type=float, default=900, help="Client rate limit in requests/minute")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+
+    args = parser.parse_args()
+
+    rows: List[Dict] = []
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        # setup writes its generated config files to the working directory
+        os.chdir(workdir)
+        try:
+            for workers in args.workers:
+                port = free_port()
+                base_url = f"http://127.0.0.1:{port}"
+                stub = start_stub(port, args.latency_ms, args.stub_rate)
+                try:
+                    for run in ("fresh", "re-run"):
+                        result = run_setup(base_url, workers, args.client_rate)
+                        rows.append({"workers": workers, "run": run, **result,
+                                     "account_objects": stub_stats(base_url)["objects"]})
+                finally:
+                    stub.terminate()
+                    stub.wait()
+        finally:
+            os.chdir(cwd)
+
+    print(f"\n{'='*60}")
+    print("PAGERDUTY PROVISIONING")
+    print(f"{'='*60}")
+    print(f"Stub: {args.latency_ms:.0f}ms per request, {args.stub_rate:.0f} requests/minute")
+    print(f"{'workers':>7} {'run':>7} {'wall':>8} {'requests':>9} {'429s':>5} {'created':>8} {'reused':>7}  objects")
+    for row in rows:
+        objects = ", ".join(f"{name}={count}" for name, count in row["account_objects"].items())
+        print(f"{row['workers']:>7} {row['run']:>7} {row['wall_seconds']:>7.2f}s {row['requests']:>9} "
+              f"{row['rate_limited']:>5} {row['created']:>8} {row['reused']:>7}  {objects}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"settings": vars(args), "runs": rows}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
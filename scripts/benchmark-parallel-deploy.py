@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Rollout time benchmark for the parallel region deployment runner
+Deploys a copy of the Terraform environments with scripts/mock-terraform.py
+standing in for terraform, once one region at a time like the old
+deploy_all_regions loop and once in parallel, then measures a plan followed
+by a deploy that reuses the saved plans, and a fail-fast rollout with one
+broken region
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import shutil
+import tempfile
+from typing import Dict
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(SCRIPTS_DIR)
+
+def load_script(module_name: str, filename: str):
+    """Import one of the hyphenated scripts in this directory as a module"""
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(SCRIPTS_DIR, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+deploy_regions = load_script("deploy_regions", "deploy-regions.py")
+
+def fresh_tree(workdir: str, name: str) -> str:
+    """A clean copy of terraform/ with no init, plans or state"""
+    terraform_dir = os.path.join(workdir, name)
+    shutil.copytree(os.path.join(REPO_DIR, "terraform"), terraform_dir,
+                    ignore=shutil.ignore_patterns(".terraform", "*.tfplan", "*.tfplan.key", "*.tfstate*"))
+    return terraform_dir
+
+def deploy(terraform_dir: str, action: str, concurrency: int, fail_fast: bool = False) -> Dict:
+    with open(os.devnull, "w") as devnull:
+        runner = deploy_regions.DeploymentRunner(
+            deploy_regions.REGIONS, action=action, terraform_dir=terraform_dir, outputs_dir=terraform_dir,
+            terraform=os.path.join(SCRIPTS_DIR, "mock-terraform.py"), concurrency=concurrency,
+            fail_fast=fail_fast, output=devnull
+        )
+        return asyncio.run(runner.run())
+
+def row(name: str, report: Dict) -> Dict:
+    regions = report["regions"].values()
+    return {
+        "run": name,
+        "wall_seconds": report["wall_seconds"],
+        "region_seconds": report["serial_seconds"],
+        "phase_seconds": report["phase_seconds"],
+        "succeeded": sum(1 for run in regions if run["status"] == "succeeded"),
+        "cached_phases": sum(1 for run in regions for phase in run["phases"].values() if phase["status"] == "cached"),
+        "not_run": sum(1 for run in regions if run["status"] in ("skipped", "stopped"))
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark serial and parallel multi-region rollouts")
+    parser.add_argument("--init-seconds", type=float, default=1.0, help="Mock terraform init duration")
+    parser.add_argument("--plan-seconds", type=float, default=3.0, help="Mock terraform plan duration")
+    parser.add_argument("--apply-seconds", type=float, default=6.0, help="Mock terraform apply duration")
+    parser.add_argument("--concurrency", type=int, default=4, help="Regions deployed at once in the parallel runs")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+
+    args = parser.parse_args()
+    os.environ["MOCK_TERRAFORM_SECONDS"] = (f"init={args.init_seconds},plan={args.plan_seconds},"
+                                            f"apply={args.apply_seconds}")
+    rows = []
+    with tempfile.TemporaryDirectory() as workdir:
+        rows.append(row("serial", deploy(fresh_tree(workdir, "serial"), "deploy", 1)))
+        rows.append(row("parallel", deploy(fresh_tree(workdir, "parallel"), "deploy", args.concurrency)))
+
+        cached_tree = fresh_tree(workdir, "cached")
+        rows.append(row("plan", deploy(cached_tree, "plan", args.concurrency)))
+        rows.append(row("deploy after plan", deploy(cached_tree, "deploy", args.concurrency)))
+
+        os.environ["MOCK_TERRAFORM_FAIL"] = f"{deploy_regions.REGIONS[0]}:plan"
+        try:
+            rows.append(row("fail-fast", deploy(fresh_tree(workdir, "fail-fast"), "deploy", 2, fail_fast=True)))
+        finally:
+            del os.environ["MOCK_TERRAFORM_FAIL"]
+
+    print(f"\n{'='*60}")
+    print("MULTI-REGION ROLLOUT")
+    print(f"{'='*60}")
+    print(f"{len(deploy_regions.REGIONS)} regions; mock terraform init {args.init_seconds:.1f}s, "
+          f"plan {args.plan_seconds:.1f}s, apply {args.apply_seconds:.1f}s")
+    print(f"{'run':<18} {'wall':>8} {'region time':>12} {'succeeded':>10} {'cached':>7} {'not run':>8}")
+    for result in rows:
+        print(f"{result['run']:<18} {result['wall_seconds']:>7.1f}s {result['region_seconds']:>11.1f}s "
+              f"{result['succeeded']:>10} {result['cached_phases']:>7} {result['not_run']:>8}")
+    print(f"Parallel speedup: {rows[0]['wall_seconds'] / rows[1]['wall_seconds']:.1f}x")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"settings": vars(args), "runs": rows}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
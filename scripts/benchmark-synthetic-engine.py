@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark for the synthetic transaction engine
+Runs SyntheticTransactionEngine against the local mock region server at
+increasing target counts and probe rates, and reports probes/sec, engine
+CPU per probe, memory growth and latency measurement error
+"""
+
+import argparse
+import asyncio
+import atexit
+import importlib.util
+import json
+import os
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def load_script(module_name: str, filename: str):
+    """Import one of the hyphenated scripts in this directory as a module"""
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(SCRIPTS_DIR, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+synthetic = load_script("health_check_synthetic", "health-check-synthetic.py")
+logger = synthetic.logger
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def rss_bytes() -> int:
+    """Current resident set size, falling back to the peak where /proc is unavailable"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        scale = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+def start_mock_server(port: int, latency_ms: float, workdir: str) -> subprocess.Popen:
+    """Run the mock server in its own process so its CPU is not billed to the engine"""
+    config_path = os.path.join(workdir, "mock-profiles.json")
+    with open(config_path, "w") as f:
+        json.dump([{"name": "bench", "port": port, "latency_median_ms": latency_ms}], f)
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(SCRIPTS_DIR, "mock-region-server.py"), "--config", config_path],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("Mock region server did not start")
+
+async def run_step(endpoint: str, targets: int, interval: float, duration: float,
+                   latency_ms: float, workdir: str) -> Dict:
+    """Run the scheduler for one (target count, interval) combination"""
+    region_count = -(-targets // 3)
+    exporter = synthetic.SegmentedResultExporter(directory=os.path.join(workdir, f"step_{targets}_{interval}"))
+    engine = synthetic.SyntheticTransactionEngine(exporter=exporter, connection_limit=0, connection_limit_per_host=0)
+    engine.regions = [
+        synthetic.RegionConfig(f"bench-{index:03d}", endpoint, int(latency_ms), "Benchmark")
+        for index in range(region_count)
+    ]
+    probe_targets = engine.build_probe_targets(interval)[:targets]
+    step = synthetic.ResultAggregator()
+
+    def on_window(window):
+        step.merge(window)
+        engine.export_details()
+
+    rss_before = rss_bytes()
+    cpu_before = time.process_time()
+    started = time.perf_counter()
+    task = asyncio.create_task(engine.run_scheduled(
+        interval_seconds=interval,
+        report_interval_seconds=1.0,
+        jitter=0.1,
+        max_concurrency=max(20, targets),
+        on_window=on_window,
+        targets=probe_targets
+    ))
+    await asyncio.sleep(duration)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    elapsed = time.perf_counter() - started
+    cpu = time.process_time() - cpu_before
+    rss_growth = rss_bytes() - rss_before
+    await engine.close()
+    exporter.close()
+
+    overall = step.overall
+    completed = overall.total
+    return {
+        "targets": len(probe_targets),
+        "interval_seconds": interval,
+        "offered_rate": len(probe_targets) / interval,
+        "probes": completed,
+        "probes_per_sec": completed / elapsed,
+        "success_rate": overall.success_rate,
+        "cpu_ms_per_probe": cpu * 1000 / completed if completed else None,
+        "rss_growth_kb": rss_growth / 1024,
+        "p50_error_ms": overall.sketch.quantile(0.5) - latency_ms if completed else None,
+        "p99_error_ms": overall.sketch.quantile(0.99) - latency_ms if completed else None
+    }
+
+def print_table(rows: List[Dict]):
+    header = f"{'targets':>8} {'interval':>9} {'offered/s':>10} {'probes/s':>9} {'ok %':>7} " \
+             f"{'cpu ms/probe':>13} {'rss +KB':>9} {'p50 err':>9} {'p99 err':>9}"
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        print(f"{row['targets']:>8} {row['interval_seconds']:>9.2f} {row['offered_rate']:>10.1f} "
+              f"{row['probes_per_sec']:>9.1f} {row['success_rate']:>7.2f} "
+              f"{(row['cpu_ms_per_probe'] or 0):>13.3f} {row['rss_growth_kb']:>9.0f} "
+              f"{(row['p50_error_ms'] or 0):>9.2f} {(row['p99_error_ms'] or 0):>9.2f}")
+
+def compare_to_baseline(rows: List[Dict], baseline_path: str, tolerance: float) -> List[str]:
+    """Return a description of every step that regressed beyond the tolerance"""
+    with open(baseline_path) as f:
+        baseline = {(row["targets"], row["interval_seconds"]): row for row in json.load(f)["steps"]}
+    regressions = []
+    for row in rows:
+        previous = baseline.get((row["targets"], row["interval_seconds"]))
+        if previous is None:
+            continue
+        if row["probes_per_sec"] < previous["probes_per_sec"] * (1 - tolerance):
+            regressions.append(f"{row['targets']} targets @ {row['interval_seconds']}s: probes/sec "
+                               f"{previous['probes_per_sec']:.1f} -> {row['probes_per_sec']:.1f}")
+        if previous["cpu_ms_per_probe"] and row["cpu_ms_per_probe"] and \
+                row["cpu_ms_per_probe"] > previous["cpu_ms_per_probe"] * (1 + tolerance):
+            regressions.append(f"{row['targets']} targets @ {row['interval_seconds']}s: CPU/probe "
+                               f"{previous['cpu_ms_per_probe']:.3f} -> {row['cpu_ms_per_probe']:.3f}ms")
+    return regressions
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Sleek synthetic transaction engine")
+    parser.add_argument("--targets", type=int, nargs="+", default=[12, 48, 192],
+                        help="Probe target counts to benchmark")
+    parser.add_argument("--intervals", type=float, nargs="+", default=[1.0, 0.25],
+                        help="Per-target probe intervals in seconds")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds to run each step")
+    parser.add_argument("--latency-ms", type=float, default=20, help="Constant latency injected by the mock server")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--baseline", help="Previous --output file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed regression versus the baseline")
+
+    args = parser.parse_args()
+    log_listener = synthetic.configure_logging(log_file=None)
+    atexit.register(log_listener.stop)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        port = free_port()
+        server = start_mock_server(port, args.latency_ms, workdir)
+        try:
+            rows = []
+            for targets in args.targets:
+                for interval in args.intervals:
+                    logger.info(f"Benchmarking {targets} targets every {interval}s for {args.duration:.0f}s")
+                    rows.append(await run_step(f"http://127.0.0.1:{port}", targets, interval,
+                                               args.duration, args.latency_ms, workdir))
+        finally:
+            server.terminate()
+            server.wait()
+
+    print()
+    print_table(rows)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"latency_ms": args.latency_ms, "duration_seconds": args.duration, "steps": rows}, f, indent=2)
+        logger.info(f"Benchmark results written to {args.output}")
+
+    if args.baseline:
+        regressions = compare_to_baseline(rows, args.baseline, args.tolerance)
+        for regression in regressions:
+            logger.error(f"Regression: {regression}")
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    asyncio.run(main())
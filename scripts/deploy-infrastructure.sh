@@ -16,6 +16,9 @@ NC='\033[0m' # No Color
 REGIONS=("singapore" "hongkong" "australia" "uk")
 PROJECT_ROOT="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)"
 TERRAFORM_DIR="${PROJECT_ROOT}/terraform"
+TERRAFORM_BIN="${TERRAFORM_BIN:-terraform}"
+DEPLOY_CONCURRENCY="${DEPLOY_CONCURRENCY:-4}"
+DEPLOY_FAIL_FAST="${DEPLOY_FAIL_FAST:-false}"
 
 # Logging function
 log() {
@@ -39,11 +42,17 @@ check_prerequisites() {
     log "Checking prerequisites..."
     
     # Check if terraform is installed
-    if ! command -v terraform &> /dev/null; then
+    if ! command -v "${TERRAFORM_BIN}" &> /dev/null; then
         error "Terraform is not installed. Please install Terraform first."
         exit 1
     fi
     
+    # Check if Python 3 is installed (runs the regions in parallel)
+    if ! command -v python3 &> /dev/null; then
+        error "Python 3 is not installed. Please install Python 3 first."
+        exit 1
+    fi
+    
     # Check if AWS CLI is installed
     if ! command -v aws &> /dev/null; then
         error "AWS CLI is not installed. Please install AWS CLI first."
@@ -59,133 +68,36 @@ check_prerequisites() {
     success "Prerequisites check passed"
 }
 
-# Initialize Terraform
-init_terraform() {
-    local region=$1
-    local env_dir="${TERRAFORM_DIR}/environments/${region}"
-    
-    log "Initializing Terraform for ${region}..."
-    cd "${env_dir}"
-    
-    if terraform init; then
-        success "Terraform initialized for ${region}"
-    else
-        error "Failed to initialize Terraform for ${region}"
-        return 1
+# Run the Terraform workflow for every region, DEPLOY_CONCURRENCY regions at a time
+run_regions() {
+    local action=$1
+    local args=(
+        "${action}"
+        --regions "${REGIONS[@]}"
+        --concurrency "${DEPLOY_CONCURRENCY}"
+        --terraform "${TERRAFORM_BIN}"
+        --terraform-dir "${TERRAFORM_DIR}"
+        --outputs-dir "${PROJECT_ROOT}"
+        --log-dir "${PROJECT_ROOT}/deploy-logs"
+        --report "${PROJECT_ROOT}/deploy_report_${action}.json"
+    )
+    if [ "${DEPLOY_FAIL_FAST}" = "true" ]; then
+        args+=(--fail-fast)
     fi
-}
-
-# Plan Terraform deployment
-plan_terraform() {
-    local region=$1
-    local env_dir="${TERRAFORM_DIR}/environments/${region}"
-    
-    log "Planning Terraform deployment for ${region}..."
-    cd "${env_dir}"
     
-    if terraform plan -out="terraform.tfplan"; then
-        success "Terraform plan created for ${region}"
-    else
-        error "Failed to create Terraform plan for ${region}"
-        return 1
-    fi
-}
-
-# Apply Terraform deployment
-apply_terraform() {
-    local region=$1
-    local env_dir="${TERRAFORM_DIR}/environments/${region}"
-    
-    log "Applying Terraform deployment for ${region}..."
-    cd "${env_dir}"
-    
-    if terraform apply "terraform.tfplan"; then
-        success "Terraform applied successfully for ${region}"
-    else
-        error "Failed to apply Terraform for ${region}"
-        return 1
-    fi
-}
-
-# Get deployment outputs
-get_outputs() {
-    local region=$1
-    local env_dir="${TERRAFORM_DIR}/environments/${region}"
-    
-    log "Getting outputs for ${region}..."
-    cd "${env_dir}"
-    
-    terraform output -json > "${PROJECT_ROOT}/outputs_${region}.json"
-    
-    # Extract key outputs
-    local lb_dns=$(terraform output -raw load_balancer_dns_name 2>/dev/null || echo "N/A")
-    local vpc_id=$(terraform output -raw vpc_id 2>/dev/null || echo "N/A")
-    
-    echo "Region: ${region}"
-    echo "  Load Balancer DNS: ${lb_dns}"
-    echo "  VPC ID: ${vpc_id}"
-    echo ""
-}
-
-# Deploy to single region
-deploy_region() {
-    local region=$1
-    
-    log "Starting deployment for ${region} region..."
-    
-    if init_terraform "${region}" && plan_terraform "${region}" && apply_terraform "${region}"; then
-        success "Successfully deployed infrastructure in ${region}"
-        get_outputs "${region}"
-        return 0
-    else
-        error "Failed to deploy infrastructure in ${region}"
-        return 1
-    fi
+    python3 "${PROJECT_ROOT}/scripts/deploy-regions.py" "${args[@]}"
 }
 
 # Deploy to all regions
 deploy_all_regions() {
-    local failed_regions=()
+    log "Starting multi-region deployment (${DEPLOY_CONCURRENCY} regions at a time)..."
     
-    log "Starting multi-region deployment..."
-    
-    for region in "${REGIONS[@]}"; do
-        if deploy_region "${region}"; then
-            success "Deployment completed for ${region}"
-        else
-            error "Deployment failed for ${region}"
-            failed_regions+=("${region}")
-        fi
-        echo ""
-    done
-    
-    # Summary
-    echo "========================================="
-    echo "DEPLOYMENT SUMMARY"
-    echo "========================================="
-    
-    local successful_regions=()
-    for region in "${REGIONS[@]}"; do
-        if [[ ! " ${failed_regions[@]} " =~ " ${region} " ]]; then
-            successful_regions+=("${region}")
-        fi
-    done
-    
-    echo "Successful deployments: ${#successful_regions[@]}"
-    for region in "${successful_regions[@]}"; do
-        echo "  ✓ ${region}"
-    done
-    
-    if [ ${#failed_regions[@]} -gt 0 ]; then
-        echo ""
-        echo "Failed deployments: ${#failed_regions[@]}"
-        for region in "${failed_regions[@]}"; do
-            echo "  ✗ ${region}"
-        done
+    if run_regions deploy; then
+        success "Deployment completed for all regions"
+    else
+        error "Deployment failed, see ${PROJECT_ROOT}/deploy-logs for each region's output"
         return 1
     fi
-    
-    return 0
 }
 
 # Destroy infrastructure
@@ -263,8 +175,7 @@ main() {
     case $action in
         "deploy")
             check_prerequisites
-            deploy_all_regions
-            if [ $? -eq 0 ]; then
+            if deploy_all_regions; then
                 setup_monitoring
                 validate_deployment
                 success "Multi-region deployment completed successfully!"
@@ -290,10 +201,7 @@ main() {
             ;;
         "plan")
             check_prerequisites
-            for region in "${REGIONS[@]}"; do
-                init_terraform "${region}"
-                plan_terraform "${region}"
-            done
+            run_regions plan
             ;;
         *)
             echo "Usage: $0 {deploy|destroy|validate|setup-monitoring|plan}"
@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""
+Sleek Parallel Region Deployment
+Runs the per-region Terraform workflow (init, plan, apply, outputs) for
+several regions at once with a bounded concurrency, streams each region's
+output with a prefix, reuses saved plans whose inputs have not changed, and
+reports how long every phase took in every region
+"""
+
+import argparse
+import asyncio
+import glob
+import hashlib
+import json
+import logging
+import os
+import signal
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Set, TextIO, Tuple
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REGIONS = ["singapore", "hongkong", "australia", "uk"]
+
+PHASES = {
+    "plan": ("init", "plan"),
+    "deploy": ("init", "plan", "apply", "outputs")
+}
+# Phases that change nothing remotely, so fail-fast may interrupt them
+INTERRUPTIBLE_PHASES = ("init", "plan")
+
+PLAN_FILE = "terraform.tfplan"
+PLAN_KEY_FILE = "terraform.tfplan.key"
+INIT_KEY_FILE = os.path.join(".terraform", "sleek-init.key")
+
+PREFIX_COLORS = ["\033[0;36m", "\033[0;35m", "\033[0;33m", "\033[0;32m", "\033[0;34m", "\033[0;31m"]
+NC = "\033[0m"
+
+@dataclass
+class PhaseResult:
+    status: str  # ok, cached, failed, stopped
+    seconds: float = 0.0
+    returncode: Optional[int] = None
+
+@dataclass
+class RegionRun:
+    region: str
+    status: str = "queued"  # queued, running, succeeded, failed, stopped, skipped
+    failed_phase: Optional[str] = None
+    queued_seconds: float = 0.0
+    seconds: float = 0.0
+    phases: Dict[str, PhaseResult] = field(default_factory=dict)
+    outputs: Dict[str, str] = field(default_factory=dict)
+
+class DeploymentRunner:
+    """Run one Terraform workflow per region, at most ``concurrency`` regions at a time
+
+    With ``fail_fast`` the first failure stops the rest of the rollout:
+    queued regions are skipped, regions still in init or plan are
+    interrupted, and regions already applying are left to finish, since
+    interrupting an apply leaves that region half changed.
+    """
+
+    def __init__(self, regions: List[str], action: str = "deploy", terraform_dir: str = None,
+                 outputs_dir: str = None, terraform: str = "terraform", concurrency: int = 4,
+                 fail_fast: bool = False, plan_cache: bool = True, max_plan_age_seconds: float = 3600,
+                 log_dir: Optional[str] = None, color: Optional[bool] = None, output: TextIO = None):
+        self.action = action
+        self.phases = PHASES[action]
+        self.terraform_dir = terraform_dir or os.path.join(PROJECT_ROOT, "terraform")
+        self.outputs_dir = outputs_dir or PROJECT_ROOT
+        self.terraform = terraform
+        self.concurrency = max(1, concurrency)
+        self.fail_fast = fail_fast
+        self.plan_cache = plan_cache
+        self.max_plan_age_seconds = max_plan_age_seconds
+        self.log_dir = log_dir
+        self.output = output or sys.stdout
+        self.color = self.output.isatty() if color is None else color
+        self.runs = {region: RegionRun(region) for region in regions}
+        self.wall_seconds = 0.0
+        self.started_at: Optional[datetime] = None
+        self._stopping = False
+        self._interrupted: Set[str] = set()
+        self._processes: Dict[str, Tuple[str, asyncio.subprocess.Process]] = {}
+        self._logs: Dict[str, TextIO] = {}
+        width = max(len(region) for region in regions)
+        self._prefixes = {
+            region: (f"{PREFIX_COLORS[index % len(PREFIX_COLORS)]}[{region:<{width}}]{NC}" if self.color
+                     else f"[{region:<{width}}]")
+            for index, region in enumerate(regions)
+        }
+
+    def env_dir(self, region: str) -> str:
+        return os.path.join(self.terraform_dir, "environments", region)
+
+    def config_key(self, region: str) -> str:
+        """Hash of everything a plan is computed from, apart from state and the live infrastructure"""
+        env_dir = self.env_dir(region)
+        paths = []
+        for pattern in ("*.tf", "*.tfvars", "*.tfvars.json", ".terraform.lock.hcl"):
+            paths += glob.glob(os.path.join(env_dir, pattern))
+        modules = glob.glob(os.path.join(self.terraform_dir, "modules", "**", "*"), recursive=True)
+        digest = hashlib.sha256()
+        for path in sorted(paths) + sorted(path for path in modules if os.path.isfile(path)):
+            digest.update(os.path.relpath(path, self.terraform_dir).encode())
+            with open(path, "rb") as f:
+                digest.update(hashlib.sha256(f.read()).digest())
+        for name in sorted(os.environ):
+            if name.startswith("TF_VAR_"):
+                digest.update(f"{name}={os.environ[name]}".encode())
+        return digest.hexdigest()
+
+    async def state_key(self, region: str) -> Optional[str]:
+        """Lineage and serial of the region's state, or None when they cannot be read
+
+        The local state file is read directly. Without one the state may
+        live in a remote backend, so it is fetched with ``terraform state pull``.
+        """
+        try:
+            with open(os.path.join(self.env_dir(region), "terraform.tfstate")) as f:
+                stdout = f.read()
+        except FileNotFoundError:
+            returncode, stdout = await self.terraform_command(region, "plan", "state", "pull", capture=True)
+            if returncode != 0:
+                return None
+        except OSError:
+            return None
+        if not stdout.strip():
+            return "empty"
+        try:
+            state = json.loads(stdout)
+        except ValueError:
+            return None
+        return f"{state.get('lineage')}:{state.get('serial')}"
+
+    async def plan_key(self, region: str) -> Optional[str]:
+        state_key = await self.state_key(region)
+        return None if state_key is None else f"{self.config_key(region)}:{state_key}"
+
+    async def cached_plan_age(self, region: str) -> Optional[float]:
+        """Age of the saved plan if it was made from the current inputs and state, else None"""
+        env_dir = self.env_dir(region)
+        if not self.plan_cache or not os.path.exists(os.path.join(env_dir, PLAN_FILE)):
+            return None
+        try:
+            with open(os.path.join(env_dir, PLAN_KEY_FILE)) as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return None
+        age = time.time() - saved.get("created", 0)
+        if age > self.max_plan_age_seconds:
+            return None
+        key = await self.plan_key(region)
+        if key is None or saved.get("key") != key:
+            return None
+        return age
+
+    def initialized(self, region: str) -> bool:
+        """Whether init already ran against the current configuration and lock file"""
+        if not self.plan_cache:
+            return False
+        try:
+            with open(os.path.join(self.env_dir(region), INIT_KEY_FILE)) as f:
+                return f.read().strip() == self.config_key(region)
+        except OSError:
+            return False
+
+    def emit(self, region: str, line: str):
+        line = line.rstrip("\n")
+        print(f"{self._prefixes[region]} {line}", file=self.output, flush=True)
+        if region in self._logs:
+            self._logs[region].write(line + "\n")
+            self._logs[region].flush()
+
+    async def terraform_command(self, region: str, phase: str, *args: str, capture: bool = False):
+        """Run terraform in the region's directory, streaming its output; returns (returncode, captured stdout)"""
+        if not self.color and args[0] in ("init", "plan", "apply"):
+            # Flags have to come before the plan file argument
+            args = (args[0], "-no-color") + args[1:]
+        env = dict(os.environ, TF_IN_AUTOMATION="1", TF_INPUT="0")
+        # A session of its own so a Ctrl-C reaches terraform once, from us, rather than twice
+        process = await asyncio.create_subprocess_exec(
+            self.terraform, *args, cwd=self.env_dir(region), env=env, start_new_session=True,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE if capture else asyncio.subprocess.STDOUT,
+            limit=1024 * 1024
+        )
+        self._processes[region] = (phase, process)
+        try:
+            if capture:
+                stdout, stderr = await process.communicate()
+                for line in stderr.decode(errors="replace").splitlines():
+                    self.emit(region, line)
+                return process.returncode, stdout.decode()
+            async for line in process.stdout:
+                self.emit(region, line.decode(errors="replace"))
+            return await process.wait(), ""
+        finally:
+            del self._processes[region]
+
+    async def run_phase(self, run: RegionRun, phase: str) -> bool:
+        region = run.region
+        env_dir = self.env_dir(region)
+        started = time.monotonic()
+        status = "ok"
+        returncode = 0
+
+        if phase == "init":
+            if self.initialized(region):
+                status = "cached"
+                self.emit(region, "init: already initialized for this configuration, skipping")
+            else:
+                returncode, _ = await self.terraform_command(region, phase, "init", "-input=false")
+                if returncode == 0:
+                    with open(os.path.join(env_dir, INIT_KEY_FILE), "w") as f:
+                        f.write(self.config_key(region))
+        elif phase == "plan":
+            age = await self.cached_plan_age(region)
+            if age is not None:
+                status = "cached"
+                self.emit(region, f"plan: reusing {PLAN_FILE} from {age / 60:.0f}m ago "
+                                  "(configuration and state unchanged)")
+            else:
+                key_path = os.path.join(env_dir, PLAN_KEY_FILE)
+                if os.path.exists(key_path):
+                    os.remove(key_path)
+                # Keyed on the state the plan starts from; a plan whose state cannot be read is never reused
+                key = await self.plan_key(region) if self.plan_cache else None
+                returncode, _ = await self.terraform_command(region, phase, "plan", "-input=false",
+                                                             f"-out={PLAN_FILE}")
+                if returncode == 0 and key is not None:
+                    with open(key_path, "w") as f:
+                        json.dump({"key": key, "created": time.time()}, f)
+        elif phase == "apply":
+            try:
+                returncode, _ = await self.terraform_command(region, phase, "apply", "-input=false", PLAN_FILE)
+            finally:
+                # Applied or not, the saved plan no longer matches the state
+                key_path = os.path.join(env_dir, PLAN_KEY_FILE)
+                if os.path.exists(key_path):
+                    os.remove(key_path)
+        elif phase == "outputs":
+            returncode, stdout = await self.terraform_command(region, phase, "output", "-json", capture=True)
+            if returncode == 0:
+                self.write_outputs(run, stdout)
+
+        if returncode != 0:
+            status = "stopped" if region in self._interrupted else "failed"
+        run.phases[phase] = PhaseResult(status, time.monotonic() - started, None if status == "cached" else returncode)
+        return status in ("ok", "cached")
+
+    def write_outputs(self, run: RegionRun, stdout: str):
+        """Write outputs_<region>.json atomically, since the synthetic monitor hot-reloads these files"""
+        path = os.path.join(self.outputs_dir, f"outputs_{run.region}.json")
+        with open(f"{path}.tmp", "w") as f:
+            f.write(stdout)
+        os.replace(f"{path}.tmp", path)
+        try:
+            outputs = json.loads(stdout)
+        except ValueError:
+            outputs = {}
+        for name in ("load_balancer_dns_name", "vpc_id"):
+            value = outputs.get(name, {}).get("value")
+            run.outputs[name] = value if isinstance(value, str) else "N/A"
+        self.emit(run.region, f"Load Balancer DNS: {run.outputs['load_balancer_dns_name']}")
+        self.emit(run.region, f"VPC ID: {run.outputs['vpc_id']}")
+
+    async def run_region(self, region: str, semaphore: asyncio.Semaphore, started: float):
+        run = self.runs[region]
+        async with semaphore:
+            run.queued_seconds = time.monotonic() - started
+            if self._stopping:
+                run.status = "skipped"
+                return
+            run.status = "running"
+            region_started = time.monotonic()
+            if self.log_dir:
+                self._logs[region] = open(os.path.join(self.log_dir, f"{region}.log"), "a")
+                self._logs[region].write(f"==== {self.action} {datetime.now().isoformat(timespec='seconds')}\n")
+            try:
+                for phase in self.phases:
+                    if self._stopping and phase != "outputs":
+                        run.status = "stopped"
+                        run.failed_phase = phase
+                        self.emit(region, f"{phase}: not started, rollout stopped")
+                        return
+                    if not await self.run_phase(run, phase):
+                        run.status = run.phases[phase].status
+                        run.failed_phase = phase
+                        if run.status == "failed":
+                            self.emit(region, f"{phase} failed (exit {run.phases[phase].returncode})")
+                            if self.fail_fast:
+                                self.stop(f"{region} failed in {phase}")
+                        return
+                run.status = "succeeded"
+            finally:
+                run.seconds = time.monotonic() - region_started
+                if region in self._logs:
+                    self._logs.pop(region).close()
+
+    def stop(self, reason: str, interrupt_apply: bool = False):
+        """Start no new phases anywhere and interrupt running terraform that is safe to interrupt"""
+        if self._stopping and not interrupt_apply:
+            return
+        self._stopping = True
+        logger.warning(f"Stopping the rollout: {reason}")
+        for region, (phase, process) in list(self._processes.items()):
+            if process.returncode is not None or region in self._interrupted:
+                continue
+            if phase in INTERRUPTIBLE_PHASES or interrupt_apply:
+                self._interrupted.add(region)
+                process.send_signal(signal.SIGINT)
+            else:
+                logger.warning(f"Letting the {phase} in {region} finish")
+
+    async def run(self) -> Dict:
+        if self.log_dir:
+            os.makedirs(self.log_dir, exist_ok=True)
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, self.stop, "interrupted", True)
+
+        self.started_at = datetime.now()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        started = time.monotonic()
+        try:
+            await asyncio.gather(*(self.run_region(region, semaphore, started) for region in self.runs))
+        finally:
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                loop.remove_signal_handler(signum)
+        self.wall_seconds = time.monotonic() - started
+        return self.report()
+
+    def report(self) -> Dict:
+        phase_totals = {phase: sum(run.phases[phase].seconds for run in self.runs.values() if phase in run.phases)
+                        for phase in self.phases}
+        return {
+            "action": self.action,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "concurrency": self.concurrency,
+            "fail_fast": self.fail_fast,
+            "wall_seconds": self.wall_seconds,
+            "serial_seconds": sum(run.seconds for run in self.runs.values()),
+            "phase_seconds": phase_totals,
+            "succeeded": all(run.status == "succeeded" for run in self.runs.values()),
+            "regions": {region: asdict(run) for region, run in self.runs.items()}
+        }
+
+def format_phase(result: Optional[Dict]) -> str:
+    if result is None:
+        return "-"
+    if result["status"] == "cached":
+        return "cached"
+    return f"{result['seconds']:.1f}s"
+
+def print_summary(report: Dict):
+    phases = list(report["phase_seconds"])
+    print(f"\n{'='*60}")
+    print(f"{report['action'].upper()} SUMMARY")
+    print(f"{'='*60}")
+    print(f"{'region':<12} {'status':<18} {'queued':>7} " + " ".join(f"{phase:>8}" for phase in phases) +
+          f" {'total':>8}")
+    for region, run in report["regions"].items():
+        status = run["status"] if not run["failed_phase"] else f"{run['status']} ({run['failed_phase']})"
+        print(f"{region:<12} {status:<18} {run['queued_seconds']:>6.1f}s " +
+              " ".join(f"{format_phase(run['phases'].get(phase)):>8}" for phase in phases) +
+              f" {run['seconds']:>7.1f}s")
+    print(f"{'all regions':<12} {'':<18} {'':>7} " +
+          " ".join(f"{report['phase_seconds'][phase]:>7.1f}s" for phase in phases) +
+          f" {report['serial_seconds']:>7.1f}s")
+    print(f"\nWall time {report['wall_seconds']:.1f}s at concurrency {report['concurrency']} "
+          f"({report['serial_seconds']:.1f}s of region time)")
+
+    succeeded = [region for region, run in report["regions"].items() if run["status"] == "succeeded"]
+    failed = [region for region in report["regions"] if region not in succeeded]
+    print(f"Successful {report['action']}s: {len(succeeded)}")
+    for region in succeeded:
+        print(f"  ✓ {region}")
+    if failed:
+        print(f"Failed or stopped {report['action']}s: {len(failed)}")
+        for region in failed:
+            print(f"  ✗ {region}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Terraform workflow for several regions in parallel")
+    parser.add_argument("action", choices=sorted(PHASES), help="plan: init and plan; deploy: also apply and "
+                                                                 "write outputs_<region>.json")
+    parser.add_argument("--regions", nargs="+", default=REGIONS, help="Regions to run, in start order")
+    parser.add_argument("--concurrency", type=int, default=len(REGIONS), help="Regions running at the same time")
+    parser.add_argument("--fail-fast", action="store_true",
+                        help="On the first failure skip queued regions and interrupt those still planning")
+    parser.add_argument("--terraform", default=os.environ.get("TERRAFORM_BIN", "terraform"),
+                        help="Terraform binary (default: $TERRAFORM_BIN or terraform)")
+    parser.add_argument("--terraform-dir", default=os.path.join(PROJECT_ROOT, "terraform"),
+                        help="Directory holding environments/<region> and modules/")
+    parser.add_argument("--outputs-dir", default=PROJECT_ROOT, help="Where outputs_<region>.json are written")
+    parser.add_argument("--no-plan-cache", action="store_true",
+                        help="Always run init and plan, even when a saved plan matches the current inputs")
+    parser.add_argument("--max-plan-age", type=float, default=60,
+                        help="Minutes a saved plan may be reused for; older plans are made again")
+    parser.add_argument("--log-dir", help="Also write each region's terraform output to <dir>/<region>.log")
+    parser.add_argument("--report", help="Write the timing report as JSON to this file")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    missing = [region for region in args.regions
+               if not os.path.isdir(os.path.join(args.terraform_dir, "environments", region))]
+    if missing:
+        parser.error(f"No Terraform environment for: {', '.join(missing)}")
+
+    runner = DeploymentRunner(args.regions, action=args.action, terraform_dir=args.terraform_dir,
+                              outputs_dir=args.outputs_dir, terraform=args.terraform,
+                              concurrency=args.concurrency, fail_fast=args.fail_fast,
+                              plan_cache=not args.no_plan_cache, max_plan_age_seconds=args.max_plan_age * 60,
+                              log_dir=args.log_dir)
+    logger.info(f"Running {args.action} for {len(args.regions)} region(s), {runner.concurrency} at a time: "
+                f"{', '.join(args.regions)}")
+    report = asyncio.run(runner.run())
+    print_summary(report)
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"Timing report written to {args.report}")
+    return 0 if report["succeeded"] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
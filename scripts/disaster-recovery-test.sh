@@ -19,6 +19,11 @@ TEST_TYPE="all"
 DRY_RUN=false
 PROJECT_ROOT="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)"
 TERRAFORM_DIR="${PROJECT_ROOT}/terraform"
+# Seconds the failover monitor keeps watching after the restore for every region to recover
+RECOVERY_TIMEOUT=900
+FAILOVER_MONITOR_PID=""
+FAILOVER_MARKS=""
+FAILOVER_REPORT=""
 
 # Logging function
 log() {
@@ -368,49 +373,102 @@ simulate_network_failure() {
     warning "Consider implementing load balancer listener rule changes"
 }
 
+# Start the failover monitor before the fault so the outage start edge is observed
+start_failover_monitor() {
+    local failed_region=$1
+    local duration_seconds=$2
+    local stamp=$(date +%Y%m%d_%H%M%S)
+    
+    FAILOVER_MARKS="${PROJECT_ROOT}/failover_marks_${failed_region}_${stamp}.txt"
+    FAILOVER_REPORT="${PROJECT_ROOT}/failover_report_${failed_region}_${stamp}.json"
+    : > "$FAILOVER_MARKS"
+    
+    log "Starting failover monitor (report: $FAILOVER_REPORT)..."
+    python3 "${PROJECT_ROOT}/scripts/failover-monitor.py" \
+        --region-outputs "${PROJECT_ROOT}/outputs_*.json" \
+        --fault-region "$failed_region" \
+        --duration $((duration_seconds + RECOVERY_TIMEOUT)) \
+        --marks-file "$FAILOVER_MARKS" \
+        --until-recovered \
+        --report "$FAILOVER_REPORT" &
+    FAILOVER_MONITOR_PID=$!
+    
+    # Give the monitor time to resolve the load balancers and establish a healthy baseline
+    sleep 5
+    if ! kill -0 "$FAILOVER_MONITOR_PID" 2>/dev/null; then
+        warning "Failover monitor exited early. Cannot measure RTO automatically."
+        FAILOVER_MONITOR_PID=""
+    fi
+}
+
+# Record a point on the failover timeline (fault_injected, restore_started)
+mark_failover() {
+    local name=$1
+    
+    if [[ -n "$FAILOVER_MARKS" ]]; then
+        echo "$name $(python3 -c 'import time; print(f"{time.time():.3f}")')" >> "$FAILOVER_MARKS"
+    fi
+}
+
 # Monitor other regions during test
 monitor_failover() {
     local failed_region=$1
     local duration_seconds=$2
     
-    log "Monitoring other regions during $failed_region failure..."
+    log "Monitoring all regions during $failed_region failure..."
     log "Test duration: ${DURATION} (${duration_seconds} seconds)"
     
-    # Check Prometheus is accessible
-    if ! curl -s http://localhost:9090/api/v1/query?query=up >/dev/null; then
-        warning "Prometheus not accessible. Cannot monitor failover automatically."
-        return 1
+    if [[ -z "$FAILOVER_MONITOR_PID" ]]; then
+        warning "Failover monitor not running. Holding the failure for the test duration."
+        sleep "$duration_seconds"
+        return 0
     fi
 
-    local start_time=$(date +%s)
-    local end_time=$((start_time + duration_seconds))
-    
+    # The monitor probes every region concurrently and logs outage and recovery edges as they happen
+    local end_time=$(($(date +%s) + duration_seconds))
     while [[ $(date +%s) -lt $end_time ]]; do
-        local current_time=$(date +%s)
-        local elapsed=$((current_time - start_time))
-        local remaining=$((end_time - current_time))
-        
-        log "Test progress: ${elapsed}s elapsed, ${remaining}s remaining"
-        
-        # Check health of all regions
-        local prometheus_response=$(curl -s 'http://localhost:9090/api/v1/query?query=probe_success{job=~"blackbox-http-.*"}')
-        local healthy_regions=0
-        
-        if [[ -n "$prometheus_response" ]] && echo "$prometheus_response" | jq -e '.data.result' >/dev/null 2>&1; then
-            healthy_regions=$(echo "$prometheus_response" | \
-                jq -r '.data.result[]? | select(.value[1] == "1") | .metric.region' 2>/dev/null | \
-                sort -u | wc -l || echo "0")
+        if ! kill -0 "$FAILOVER_MONITOR_PID" 2>/dev/null; then
+            warning "Failover monitor exited during the test"
+            break
         fi
-            
-        log "Healthy regions: ${healthy_regions:-0}/4"
-        
-        # Sleep for 30 seconds before next check
-        sleep 30
+        sleep 1
     done
     
     success "Monitoring completed"
 }
 
+# Wait for every region to recover after the restore, then show the RTO report
+finish_failover_monitor() {
+    if [[ -z "$FAILOVER_MONITOR_PID" ]]; then
+        return 0
+    fi
+
+    log "Waiting for all regions to recover (up to ${RECOVERY_TIMEOUT}s)..."
+    if wait "$FAILOVER_MONITOR_PID"; then
+        success "All regions recovered"
+    else
+        warning "Not every region recovered before the monitor stopped"
+    fi
+    FAILOVER_MONITOR_PID=""
+    
+    if [[ -f "$FAILOVER_REPORT" ]]; then
+        log "Measured RTO per region with outages:"
+        jq -r '.regions | to_entries[] | select(.value.outages > 0)
+            | "  \(.key): \(.value.rto_seconds)s (±\(.value.precision_seconds)s)"
+              + (if .value.recovered_after_restore_seconds then ", recovered \(.value.recovered_after_restore_seconds)s after restore" else "" end)' \
+            "$FAILOVER_REPORT"
+        log "Full report: $FAILOVER_REPORT"
+    fi
+}
+
+# Stop the monitor if the test is interrupted; it still writes its report
+stop_failover_monitor() {
+    if [[ -n "$FAILOVER_MONITOR_PID" ]]; then
+        kill -TERM "$FAILOVER_MONITOR_PID" 2>/dev/null || true
+        wait "$FAILOVER_MONITOR_PID" 2>/dev/null || true
+    fi
+}
+
 # Run disaster recovery test
 run_test() {
     local region=$1
@@ -435,6 +493,12 @@ run_test() {
     log "Duration: $DURATION ($duration_seconds seconds)"
     log "Dry Run: $DRY_RUN"
     
+    if [[ "$DRY_RUN" != "true" ]]; then
+        trap stop_failover_monitor EXIT
+        start_failover_monitor "$region" "$duration_seconds"
+        mark_failover fault_injected
+    fi
+    
     # Execute failure simulation based on test type
     case $TEST_TYPE in
         instance|all)
@@ -464,6 +528,7 @@ run_test() {
     
     # Restore services
     log "=== RESTORING SERVICES ==="
+    mark_failover restore_started
     
     case $TEST_TYPE in
         instance|all)
@@ -471,6 +536,8 @@ run_test() {
             ;;
     esac
     
+    finish_failover_monitor
+    
     success "=== DISASTER RECOVERY TEST COMPLETED ==="
     log "Check Grafana dashboard to verify all regions are healthy again"
     log "Dashboard: http://localhost:3000/d/sleek-clean-overview/sleek-multi-region-clean-overview"
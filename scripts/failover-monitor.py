@@ -0,0 +1,500 @@
+#!/usr/bin/env python3
+"""
+Sleek Failover Monitor
+Probes every region's endpoints concurrently at a high fixed rate during a
+disaster recovery test, detects when each (region, transaction type) goes
+down and comes back with sub-second precision, and writes an RTO report
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import logging
+import math
+import os
+import random
+import signal
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def load_script(module_name: str, filename: str):
+    """Import one of the hyphenated scripts in this directory as a module"""
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(SCRIPTS_DIR, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+synthetic = load_script("health_check_synthetic", "health-check-synthetic.py")
+
+logger = logging.getLogger(__name__)
+
+TRANSACTION_TYPES = ("health_check", "user_login", "financial_query")
+
+def iso(wall: Optional[float]) -> Optional[str]:
+    if wall is None:
+        return None
+    return datetime.fromtimestamp(wall, timezone.utc).isoformat(timespec="milliseconds")
+
+@dataclass
+class Outage:
+    """One down period of a target, bracketed by the probes either side of each edge
+
+    Times are monotonic send times of probes. The outage started after
+    ``last_ok_at`` and no later than ``first_failed_at``, and recovered
+    after ``last_failed_at`` and no later than ``first_ok_at``.
+    """
+    region: str
+    transaction_type: str
+    last_ok_at: Optional[float]
+    first_failed_at: float
+    last_failed_at: float
+    first_ok_at: Optional[float] = None
+    failed_probes: int = 0
+    errors: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def started_at(self) -> float:
+        """Midpoint of the start bracket; the first failure when the target was down from the start"""
+        if self.last_ok_at is None:
+            return self.first_failed_at
+        return (self.last_ok_at + self.first_failed_at) / 2
+
+    @property
+    def recovered_at(self) -> Optional[float]:
+        if self.first_ok_at is None:
+            return None
+        return (self.last_failed_at + self.first_ok_at) / 2
+
+    def precision(self) -> float:
+        """Half the combined width of both edge brackets: the worst-case error of the RTO"""
+        start = 0.0 if self.last_ok_at is None else self.first_failed_at - self.last_ok_at
+        end = 0.0 if self.first_ok_at is None else self.first_ok_at - self.last_failed_at
+        return (start + end) / 2
+
+class TargetTracker:
+    """Edge detection for one (region, transaction type) target
+
+    Probes overlap, so results can finish out of order; they are applied
+    in send order through a small reorder buffer. ``down_after``
+    consecutive failures open an outage whose start edge is the first of
+    them, and ``up_after`` consecutive successes close it at the first
+    success, so one dropped probe does not count as an outage.
+    """
+
+    def __init__(self, region: synthetic.RegionConfig, transaction_type: str, down_after: int = 2, up_after: int = 2):
+        self.region = region
+        self.transaction_type = transaction_type
+        self.down_after = down_after
+        self.up_after = up_after
+        self.state = "unknown"
+        self.outages: List[Outage] = []
+        self.sent = 0
+        self.failed = 0
+        self.slow = 0
+        self.skipped = 0
+        self.in_flight = 0
+        self.latencies_ms: List[float] = []
+        self._next_seq = 0
+        self._pending: Dict[int, Tuple[float, bool, Optional[str]]] = {}
+        self._last_ok_at: Optional[float] = None
+        self._streak: List[Tuple[float, Optional[str]]] = []
+
+    def next_seq(self) -> int:
+        seq = self.sent
+        self.sent += 1
+        return seq
+
+    def record(self, seq: int, sent_at: float, success: bool, error: Optional[str]):
+        self._pending[seq] = (sent_at, success, error)
+        while self._next_seq in self._pending:
+            self._apply(*self._pending.pop(self._next_seq))
+            self._next_seq += 1
+
+    def _apply(self, sent_at: float, success: bool, error: Optional[str]):
+        if not success:
+            self.failed += 1
+        if self.state in ("up", "unknown"):
+            if success:
+                self._streak.clear()
+                self._last_ok_at = sent_at
+                self.state = "up"
+                return
+            self._streak.append((sent_at, error))
+            if len(self._streak) >= self.down_after:
+                outage = Outage(self.region.name, self.transaction_type, self._last_ok_at,
+                                self._streak[0][0], self._streak[-1][0])
+                for _, streak_error in self._streak:
+                    self._count_failure(outage, streak_error)
+                self._streak.clear()
+                self.outages.append(outage)
+                self.state = "down"
+                logger.warning(f"{self.region.name}/{self.transaction_type} DOWN: {error}")
+            return
+
+        outage = self.outages[-1]
+        if not success:
+            self._streak.clear()
+            outage.last_failed_at = sent_at
+            self._count_failure(outage, error)
+            return
+        self._streak.append((sent_at, None))
+        if len(self._streak) >= self.up_after:
+            outage.first_ok_at = self._streak[0][0]
+            self._last_ok_at = sent_at
+            self._streak.clear()
+            self.state = "up"
+            logger.info(f"{self.region.name}/{self.transaction_type} RECOVERED after "
+                        f"{outage.recovered_at - outage.started_at:.3f}s (±{outage.precision():.3f}s)")
+
+    @staticmethod
+    def _count_failure(outage: Outage, error: Optional[str]):
+        outage.failed_probes += 1
+        key = (error or "failed")[:120]
+        outage.errors[key] = outage.errors.get(key, 0) + 1
+
+class FailoverMonitor:
+    """Probe every region and transaction type on a fixed high-frequency grid
+
+    Each target fires a probe every ``interval_seconds`` whether or not the
+    previous one has answered, with up to enough probes in flight to cover
+    ``timeout_seconds``, so a hanging region is still sampled at the full
+    rate. Probes reuse the synthetic engine's transactions, pooled session
+    and pre-resolved load balancer addresses. Timeline marks written to
+    ``marks_file`` by the caller (``<name> <unix time>`` per line) are
+    used to relate outages to the fault injection and the restore.
+    """
+
+    def __init__(self, regions: List[synthetic.RegionConfig], transaction_types: List[str],
+                 interval_seconds: float = 0.1, timeout_seconds: float = 2.0, down_after: int = 2, up_after: int = 2,
+                 marks_file: Optional[str] = None, dns_refresh_seconds: float = 30):
+        self.engine = synthetic.SyntheticTransactionEngine(
+            connection_limit=0, connection_limit_per_host=0,
+            dns_cache=synthetic.DnsCache(dns_refresh_seconds) if dns_refresh_seconds > 0 else None
+        )
+        self.engine.regions = regions
+        self.interval_seconds = interval_seconds
+        self.timeout_seconds = timeout_seconds
+        self.max_in_flight = math.ceil(timeout_seconds / interval_seconds) + 1
+        self.trackers = [
+            TargetTracker(region, transaction_type, down_after, up_after)
+            for region in regions
+            for transaction_type in transaction_types
+        ]
+        self.marks_file = marks_file
+        self.marks: Dict[str, float] = {}
+        self._marks_signature = None
+        # Monotonic probe times are reported as wall-clock time through a fixed offset
+        self.wall_offset = time.time() - time.monotonic()
+        self.started_at = 0.0
+        self.ended_at = 0.0
+        self._tasks: set = set()
+
+    def wall(self, monotonic: Optional[float]) -> Optional[float]:
+        return None if monotonic is None else monotonic + self.wall_offset
+
+    def read_marks(self):
+        """Pick up marks appended to the marks file since the last read"""
+        if not self.marks_file:
+            return
+        try:
+            stat = os.stat(self.marks_file)
+        except OSError:
+            return
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self._marks_signature:
+            return
+        self._marks_signature = signature
+        with open(self.marks_file) as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 2 and parts[0] not in self.marks:
+                    try:
+                        self.marks[parts[0]] = float(parts[1]) - self.wall_offset
+                    except ValueError:
+                        continue
+                    logger.info(f"Mark {parts[0]} at {iso(float(parts[1]))}")
+
+    async def _probe(self, session, tracker: TargetTracker, seq: int, sent_at: float):
+        perform = self.engine.transactions[tracker.transaction_type]
+        try:
+            result = await asyncio.wait_for(perform(session, tracker.region), self.timeout_seconds)
+            # An answer over its latency budget is an SLA miss, not an outage
+            success = not synthetic.RegionCircuitBreaker.is_failure(result)
+            error = None if success else (result.error or f"HTTP {result.status_code}")
+            if success:
+                tracker.latencies_ms.append(result.response_time_ms)
+                if result.latency_budget_exceeded:
+                    tracker.slow += 1
+        except asyncio.TimeoutError:
+            success, error = False, f"No response within {self.timeout_seconds}s"
+        except Exception as e:
+            success, error = False, str(e) or type(e).__name__
+        finally:
+            tracker.in_flight -= 1
+        tracker.record(seq, sent_at, success, error)
+
+    async def _drive(self, session, tracker: TargetTracker):
+        next_send = time.monotonic() + random.uniform(0, self.interval_seconds)
+        while True:
+            await asyncio.sleep(max(0.0, next_send - time.monotonic()))
+            next_send += self.interval_seconds
+            if tracker.in_flight >= self.max_in_flight:
+                tracker.skipped += 1
+                continue
+            tracker.in_flight += 1
+            task = asyncio.create_task(self._probe(session, tracker, tracker.next_seq(), time.monotonic()))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def all_up_since(self) -> Optional[float]:
+        """Monotonic time since which every target has been up, or None while any is not"""
+        if any(tracker.state != "up" for tracker in self.trackers):
+            return None
+        recoveries = [outage.first_ok_at for tracker in self.trackers for outage in tracker.outages]
+        return max(recoveries, default=self.started_at)
+
+    def log_status(self):
+        down = sorted({tracker.region.name for tracker in self.trackers if tracker.state == "down"})
+        regions = {tracker.region.name for tracker in self.trackers}
+        elapsed = time.monotonic() - self.started_at
+        logger.info(f"{elapsed:.0f}s elapsed, healthy regions {len(regions) - len(down)}/{len(regions)}"
+                    + (f", down: {', '.join(down)}" if down else ""))
+
+    async def run(self, duration_seconds: float, until_recovered: bool = False, settle_seconds: float = 10,
+                  status_interval_seconds: float = 30, stop: Optional[asyncio.Event] = None):
+        """Probe until ``duration_seconds`` pass, ``stop`` is set, or, with ``until_recovered``,
+        every target has been up for ``settle_seconds`` after the restore_started mark"""
+        session = await self.engine.get_session()
+        stop = stop or asyncio.Event()
+        self.started_at = time.monotonic()
+        drivers = [asyncio.create_task(self._drive(session, tracker)) for tracker in self.trackers]
+        deadline = self.started_at + duration_seconds
+        next_status = self.started_at + status_interval_seconds
+        try:
+            while not stop.is_set() and time.monotonic() < deadline:
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=0.25)
+                except asyncio.TimeoutError:
+                    pass
+                now = time.monotonic()
+                self.read_marks()
+                if now >= next_status:
+                    next_status += status_interval_seconds
+                    self.log_status()
+                if until_recovered and "restore_started" in self.marks:
+                    up_since = self.all_up_since()
+                    if up_since is not None and now - max(up_since, self.marks["restore_started"]) >= settle_seconds:
+                        logger.info(f"All regions healthy for {settle_seconds:.0f}s after the restore")
+                        break
+        finally:
+            self.ended_at = time.monotonic()
+            for task in drivers:
+                task.cancel()
+            await asyncio.gather(*drivers, return_exceptions=True)
+            # Let probes already sent finish so the last edges are bracketed
+            if self._tasks:
+                await asyncio.wait(list(self._tasks), timeout=self.timeout_seconds + 1)
+            self.read_marks()
+            await self.engine.close()
+
+    def outage_dict(self, outage: Outage) -> Dict:
+        end = outage.recovered_at if outage.recovered_at is not None else self.ended_at
+        return {
+            "region": outage.region,
+            "transaction_type": outage.transaction_type,
+            "started_at": iso(self.wall(outage.started_at)),
+            "recovered_at": iso(self.wall(outage.recovered_at)),
+            "rto_seconds": round(end - outage.started_at, 3),
+            "precision_seconds": round(outage.precision(), 3),
+            "recovered": outage.recovered_at is not None,
+            "down_at_start": outage.last_ok_at is None,
+            "last_ok_at": iso(self.wall(outage.last_ok_at)),
+            "first_failed_at": iso(self.wall(outage.first_failed_at)),
+            "last_failed_at": iso(self.wall(outage.last_failed_at)),
+            "first_ok_at": iso(self.wall(outage.first_ok_at)),
+            "failed_probes": outage.failed_probes,
+            "errors": outage.errors
+        }
+
+    def region_summary(self, region: str, outages: List[Outage]) -> Dict:
+        """Merge overlapping outages of a region's transaction types into incidents"""
+        intervals = sorted(
+            (outage.started_at, outage.recovered_at if outage.recovered_at is not None else self.ended_at,
+             outage.precision(), outage.recovered_at is not None)
+            for outage in outages
+        )
+        incidents: List[List] = []
+        for start, end, precision, recovered in intervals:
+            if incidents and start <= incidents[-1][1]:
+                incident = incidents[-1]
+                if end >= incident[1]:
+                    incident[1], incident[3] = end, recovered
+                incident[2] = max(incident[2], precision)
+            else:
+                incidents.append([start, end, precision, recovered])
+
+        summary = {
+            "outages": len(incidents),
+            "rto_seconds": round(max((end - start for start, end, _, _ in incidents), default=0.0), 3),
+            "precision_seconds": round(max((precision for _, _, precision, _ in incidents), default=0.0), 3),
+            "recovered": all(recovered for _, _, _, recovered in incidents),
+            "incidents": [
+                {"started_at": iso(self.wall(start)), "recovered_at": iso(self.wall(end)) if recovered else None,
+                 "rto_seconds": round(end - start, 3)}
+                for start, end, _, recovered in incidents
+            ],
+            "transaction_types": {}
+        }
+        for outage in outages:
+            end = outage.recovered_at if outage.recovered_at is not None else self.ended_at
+            worst = summary["transaction_types"].get(outage.transaction_type, 0.0)
+            summary["transaction_types"][outage.transaction_type] = round(max(worst, end - outage.started_at), 3)
+        if incidents:
+            first_start = incidents[0][0]
+            last_end = incidents[-1][1]
+            if "fault_injected" in self.marks:
+                summary["detected_after_fault_seconds"] = round(first_start - self.marks["fault_injected"], 3)
+            if "restore_started" in self.marks and incidents[-1][3]:
+                summary["recovered_after_restore_seconds"] = round(last_end - self.marks["restore_started"], 3)
+        return summary
+
+    def report(self, fault_region: Optional[str] = None) -> Dict:
+        outages = [outage for tracker in self.trackers for outage in tracker.outages]
+        regions = sorted({tracker.region.name for tracker in self.trackers})
+        region_summaries = {
+            region: self.region_summary(region, [outage for outage in outages if outage.region == region])
+            for region in regions
+        }
+        transaction_types: Dict[str, Dict] = {}
+        for region, summary in region_summaries.items():
+            for transaction_type, rto in summary["transaction_types"].items():
+                entry = transaction_types.setdefault(transaction_type, {"rto_seconds": 0.0, "regions": {}})
+                entry["regions"][region] = rto
+                entry["rto_seconds"] = max(entry["rto_seconds"], rto)
+
+        targets = []
+        for tracker in self.trackers:
+            latencies = sorted(tracker.latencies_ms)
+            targets.append({
+                "region": tracker.region.name,
+                "transaction_type": tracker.transaction_type,
+                "endpoint": tracker.region.endpoint,
+                "state": tracker.state,
+                "probes": tracker.sent,
+                "failed": tracker.failed,
+                "over_latency_budget": tracker.slow,
+                "skipped": tracker.skipped,
+                "p50_ms": round(latencies[len(latencies) // 2], 2) if latencies else None,
+                "p99_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))], 2) if latencies else None
+            })
+
+        report = {
+            "generated_at": iso(time.time()),
+            "started_at": iso(self.wall(self.started_at)),
+            "ended_at": iso(self.wall(self.ended_at)),
+            "duration_seconds": round(self.ended_at - self.started_at, 3),
+            "settings": {
+                "interval_seconds": self.interval_seconds,
+                "timeout_seconds": self.timeout_seconds,
+                "down_after": self.trackers[0].down_after if self.trackers else None,
+                "up_after": self.trackers[0].up_after if self.trackers else None
+            },
+            "marks": {name: iso(self.wall(at)) for name, at in self.marks.items()},
+            "fault_region": fault_region,
+            "all_recovered": all(tracker.state == "up" for tracker in self.trackers),
+            "regions": region_summaries,
+            "transaction_types": transaction_types,
+            "outages": [self.outage_dict(outage) for outage in sorted(outages, key=lambda outage: outage.started_at)],
+            "targets": targets
+        }
+        if fault_region:
+            report["collateral_outages"] = [outage for outage in report["outages"] if outage["region"] != fault_region]
+        return report
+
+def print_summary(report: Dict):
+    print(f"\n{'='*60}")
+    print("SLEEK FAILOVER MONITOR REPORT")
+    print(f"{'='*60}")
+    settings = report["settings"]
+    print(f"Monitored {report['duration_seconds']:.1f}s, probing each target every "
+          f"{settings['interval_seconds'] * 1000:.0f}ms (timeout {settings['timeout_seconds']:.1f}s)")
+    for name, at in report["marks"].items():
+        print(f"Mark {name}: {at}")
+    print(f"\n{'region':<12} {'outages':>7} {'RTO':>10} {'±':>7} {'after restore':>14}  recovered")
+    for region, summary in report["regions"].items():
+        after_restore = summary.get("recovered_after_restore_seconds")
+        print(f"{region:<12} {summary['outages']:>7} {summary['rto_seconds']:>9.3f}s "
+              f"{summary['precision_seconds']:>6.3f}s "
+              f"{(f'{after_restore:.3f}s' if after_restore is not None else '-'):>14}  "
+              f"{'yes' if summary['recovered'] else 'NO'}")
+    if report["transaction_types"]:
+        print("\nWorst RTO per transaction type:")
+        for transaction_type, entry in report["transaction_types"].items():
+            per_region = ", ".join(f"{region} {rto:.3f}s" for region, rto in entry["regions"].items())
+            print(f"  {transaction_type}: {entry['rto_seconds']:.3f}s ({per_region})")
+    if report.get("collateral_outages"):
+        print(f"\nOutages outside {report['fault_region']}: {len(report['collateral_outages'])}")
+
+async def main():
+    parser = argparse.ArgumentParser(description="Measure per-region RTO during a disaster recovery test")
+    parser.add_argument("--region-outputs", default="outputs_*.json",
+                        help="Terraform outputs files defining the regions and their load balancers")
+    parser.add_argument("--regions", nargs="+", help="Only monitor these regions")
+    parser.add_argument("--transactions", nargs="+", choices=TRANSACTION_TYPES, default=list(TRANSACTION_TYPES),
+                        help="Transaction types to probe")
+    parser.add_argument("--interval", type=float, default=0.1, help="Seconds between probes of each target")
+    parser.add_argument("--timeout", type=float, default=2.0, help="Seconds before a probe counts as failed")
+    parser.add_argument("--down-after", type=int, default=2, help="Consecutive failures that open an outage")
+    parser.add_argument("--up-after", type=int, default=2, help="Consecutive successes that end an outage")
+    parser.add_argument("--duration", type=float, default=3600, help="Maximum seconds to monitor")
+    parser.add_argument("--marks-file", help="File of '<name> <unix time>' lines (fault_injected, restore_started)")
+    parser.add_argument("--until-recovered", action="store_true",
+                        help="Stop once every target is healthy for --settle seconds after the restore_started mark")
+    parser.add_argument("--settle", type=float, default=10, help="Seconds of health required by --until-recovered")
+    parser.add_argument("--fault-region", help="Region the fault is injected into; outages elsewhere are flagged")
+    parser.add_argument("--status-interval", type=float, default=30, help="Seconds between progress lines")
+    parser.add_argument("--dns-refresh", type=float, default=5,
+                        help="Seconds between background re-resolutions of the load balancer addresses")
+    parser.add_argument("--report", default=f"failover_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+                        help="Where to write the JSON report")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format=synthetic.LOG_FORMAT)
+
+    registry = synthetic.RegionRegistry(args.region_outputs)
+    registry.refresh()
+    regions = list(registry.regions.values()) or synthetic.default_regions()
+    if args.regions:
+        unknown = set(args.regions) - {region.name for region in regions}
+        if unknown:
+            parser.error(f"Unknown region(s): {', '.join(sorted(unknown))}")
+        regions = [region for region in regions if region.name in args.regions]
+
+    monitor = FailoverMonitor(regions, args.transactions, interval_seconds=args.interval,
+                              timeout_seconds=args.timeout, down_after=args.down_after, up_after=args.up_after,
+                              marks_file=args.marks_file, dns_refresh_seconds=args.dns_refresh)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+
+    logger.info(f"Monitoring {len(monitor.trackers)} targets in {len(regions)} region(s) every "
+                f"{args.interval * 1000:.0f}ms: {', '.join(region.name for region in regions)}")
+    await monitor.run(args.duration, until_recovered=args.until_recovered, settle_seconds=args.settle,
+                      status_interval_seconds=args.status_interval, stop=stop)
+
+    report = monitor.report(args.fault_region)
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2)
+    print_summary(report)
+    logger.info(f"Failover report written to {args.report}")
+    return 0 if report["all_recovered"] else 1
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
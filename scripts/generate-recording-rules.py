@@ -0,0 +1,909 @@
+#!/usr/bin/env python3
+"""
+Recording rule generator for Sleek Multi-Region Monitoring
+Parses the Prometheus alert rules and Grafana dashboard queries, finds the
+sub-expressions that are repeated or re-read often enough to be worth
+precomputing, writes them as recording rules and rewrites the alerts and
+panels to read the recorded series, reporting the estimated query cost
+before and after
+"""
+
+import argparse
+import json
+import os
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import yaml
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+AGGREGATIONS = {"sum", "min", "max", "avg", "group", "stddev", "stdvar", "count", "count_values",
+                "bottomk", "topk", "quantile"}
+RANGE_FUNCTIONS = {"rate", "irate", "increase", "delta", "idelta", "deriv", "predict_linear", "changes",
+                   "resets", "holt_winters", "avg_over_time", "min_over_time", "max_over_time",
+                   "sum_over_time", "count_over_time", "quantile_over_time", "stddev_over_time",
+                   "stdvar_over_time", "last_over_time", "present_over_time"}
+SCALAR_FUNCTIONS = {"time", "scalar", "pi"}
+
+# Binary operator precedence, lowest first; ^ is right-associative
+PRECEDENCE = {"or": 1, "and": 2, "unless": 2, "==": 3, "!=": 3, "<=": 3, "<": 3, ">=": 3, ">": 3,
+              "+": 4, "-": 4, "*": 5, "/": 5, "%": 5, "atan2": 5, "^": 6}
+COMPARISONS = {"==", "!=", "<=", "<", ">=", ">"}
+OP_WORDS = {"==": "eq", "!=": "ne", ">": "gt", "<": "lt", ">=": "ge", "<=": "le", "+": "add", "-": "sub",
+            "*": "mul", "/": "ratio", "%": "mod", "^": "pow", "and": "and", "or": "or", "unless": "unless",
+            "atan2": "atan2"}
+
+# Rough series counts per region used by the cost model (override with --series);
+# job matchers are ignored as each metric already comes from a single job family
+SERIES_PER_REGION = {
+    "up": 6,
+    "probe_success": 1,
+    "probe_duration_seconds": 1,
+    "node_cpu_seconds_total": 32,
+    "node_memory_MemTotal_bytes": 2,
+    "node_memory_MemAvailable_bytes": 2,
+    "node_filesystem_avail_bytes": 8,
+    "node_filesystem_size_bytes": 8,
+    "sleek_app_requests_total": 40,
+    "sleek_last_data_sync_timestamp": 1
+}
+DEFAULT_SERIES_PER_REGION = 5
+# Distinct values per label, for matcher selectivity
+LABEL_VALUES = {"mode": 8, "status": 5, "fstype": 4, "mountpoint": 4, "cpu": 2, "job": 3}
+JOB_SCOPED_METRICS = {"up"}
+
+DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800, "y": 31536000}
+
+class PromQLError(ValueError):
+    pass
+
+def parse_duration(text: str) -> float:
+    parts = re.findall(r"(\d+(?:\.\d+)?)(ms|[smhdwy])", text)
+    if not parts or "".join(number + unit for number, unit in parts) != text:
+        raise PromQLError(f"Invalid duration: {text}")
+    return sum(float(number) * DURATION_UNITS[unit] for number, unit in parts)
+
+# AST nodes carry the [start, end) span of their source text, so rewrites
+# replace exactly the sub-expression and leave everything else as written
+
+@dataclass
+class Node:
+    start: int
+    end: int
+
+    def children(self) -> List["Node"]:
+        return []
+
+@dataclass
+class Number(Node):
+    value: float
+
+@dataclass
+class String(Node):
+    value: str
+
+@dataclass
+class Selector(Node):
+    name: Optional[str]
+    matchers: List[Tuple[str, str, str]]
+    range: Optional[str] = None
+    offset: Optional[str] = None
+
+@dataclass
+class Call(Node):
+    func: str
+    args: List[Node]
+
+    def children(self) -> List[Node]:
+        return self.args
+
+@dataclass
+class Aggregate(Node):
+    op: str
+    args: List[Node]
+    grouping: List[str] = field(default_factory=list)
+    without: bool = False
+
+    def children(self) -> List[Node]:
+        return self.args
+
+@dataclass
+class Binary(Node):
+    op: str
+    lhs: Node
+    rhs: Node
+    bool_modifier: bool = False
+    matching: Optional[Tuple[str, Tuple[str, ...]]] = None
+    group: Optional[Tuple[str, Tuple[str, ...]]] = None
+
+    def children(self) -> List[Node]:
+        return [self.lhs, self.rhs]
+
+@dataclass
+class Unary(Node):
+    op: str
+    expr: Node
+
+    def children(self) -> List[Node]:
+        return [self.expr]
+
+@dataclass
+class Paren(Node):
+    expr: Node
+
+    def children(self) -> List[Node]:
+        return [self.expr]
+
+@dataclass
+class Subquery(Node):
+    expr: Node
+    range: str
+
+    def children(self) -> List[Node]:
+        return [self.expr]
+
+TOKEN_PATTERN = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<duration>\d+(?:ms|[smhdwy])(?:\d+(?:ms|[smhdwy]))*(?![\w.]))
+  | (?P<number>0x[0-9a-fA-F]+|(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*'|`[^`]*`)
+  | (?P<ident>[a-zA-Z_:][a-zA-Z0-9_:]*)
+  | (?P<range>\[[^\]]*\])
+  | (?P<op>=~|!~|==|!=|<=|>=|[-+*/%^<>=(){},@])
+""", re.VERBOSE)
+
+def tokenize(text: str) -> List[Tuple[str, str, int, int]]:
+    tokens = []
+    position = 0
+    while position < len(text):
+        match = TOKEN_PATTERN.match(text, position)
+        if not match:
+            raise PromQLError(f"Unexpected character {text[position]!r} at {position} in {text}")
+        kind = match.lastgroup
+        if kind != "space":
+            tokens.append((kind, match.group(), match.start(), match.end()))
+        position = match.end()
+    tokens.append(("eof", "", len(text), len(text)))
+    return tokens
+
+class Parser:
+    """Recursive-descent parser for the PromQL used in rules and dashboards"""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens = tokenize(text)
+        self.position = 0
+
+    def peek(self, offset: int = 0) -> Tuple[str, str, int, int]:
+        return self.tokens[min(self.position + offset, len(self.tokens) - 1)]
+
+    def take(self, value: Optional[str] = None) -> Tuple[str, str, int, int]:
+        token = self.tokens[self.position]
+        if value is not None and token[1] != value:
+            raise PromQLError(f"Expected {value!r} at {token[2]} in {self.text}, found {token[1]!r}")
+        self.position += 1
+        return token
+
+    def parse(self) -> Node:
+        node = self.expression(0)
+        if self.peek()[0] != "eof":
+            raise PromQLError(f"Unexpected {self.peek()[1]!r} at {self.peek()[2]} in {self.text}")
+        return node
+
+    def binary_operator(self) -> Optional[str]:
+        kind, value, _, _ = self.peek()
+        if (kind == "op" or kind == "ident") and value in PRECEDENCE:
+            return value
+        return None
+
+    def expression(self, min_precedence: int) -> Node:
+        lhs = self.unary()
+        while True:
+            op = self.binary_operator()
+            if op is None or PRECEDENCE[op] < min_precedence:
+                return lhs
+            self.take()
+            bool_modifier = False
+            matching = group = None
+            if self.peek()[1] == "bool":
+                self.take()
+                bool_modifier = True
+            if self.peek()[1] in ("on", "ignoring"):
+                matching = (self.take()[1], tuple(self.label_list()))
+                if self.peek()[1] in ("group_left", "group_right"):
+                    keyword = self.take()[1]
+                    group = (keyword, tuple(self.label_list()) if self.peek()[1] == "(" else ())
+            rhs = self.expression(PRECEDENCE[op] + (0 if op == "^" else 1))
+            lhs = Binary(lhs.start, rhs.end, op, lhs, rhs, bool_modifier, matching, group)
+
+    def unary(self) -> Node:
+        kind, value, start, _ = self.peek()
+        if kind == "op" and value in ("+", "-"):
+            self.take()
+            operand = self.expression(PRECEDENCE["^"])
+            return Unary(start, operand.end, value, operand)
+        return self.postfix(self.primary())
+
+    def postfix(self, node: Node) -> Node:
+        while True:
+            kind, value, _, end = self.peek()
+            if kind == "range":
+                self.take()
+                inner = value[1:-1].strip()
+                if ":" in inner:
+                    node = Subquery(node.start, end, node, inner)
+                elif isinstance(node, Selector) and node.range is None:
+                    parse_duration(inner)
+                    node.range = inner
+                    node.end = end
+                else:
+                    raise PromQLError(f"Range applied to a non-selector in {self.text}")
+            elif value == "offset" and isinstance(node, Selector):
+                self.take()
+                duration = self.take()
+                node.offset = duration[1]
+                node.end = duration[3]
+            else:
+                return node
+
+    def label_list(self) -> List[str]:
+        self.take("(")
+        labels = []
+        while self.peek()[1] != ")":
+            labels.append(self.take()[1])
+            if self.peek()[1] == ",":
+                self.take()
+        self.take(")")
+        return labels
+
+    def arguments(self) -> Tuple[List[Node], int]:
+        self.take("(")
+        args = []
+        while self.peek()[1] != ")":
+            args.append(self.expression(0))
+            if self.peek()[1] == ",":
+                self.take()
+        return args, self.take(")")[3]
+
+    def matchers(self) -> Tuple[List[Tuple[str, str, str]], int]:
+        self.take("{")
+        matchers = []
+        while self.peek()[1] != "}":
+            label = self.take()[1]
+            op = self.take()[1]
+            value = self.take()
+            if value[0] != "string" or op not in ("=", "!=", "=~", "!~"):
+                raise PromQLError(f"Invalid label matcher at {value[2]} in {self.text}")
+            matchers.append((label, op, parse_string(value[1])))
+            if self.peek()[1] == ",":
+                self.take()
+        return matchers, self.take("}")[3]
+
+    def primary(self) -> Node:
+        kind, value, start, end = self.peek()
+        if kind == "number":
+            self.take()
+            return Number(start, end, float(int(value, 16)) if value.startswith("0x") else float(value))
+        if kind == "string":
+            self.take()
+            return String(start, end, parse_string(value))
+        if value == "(":
+            self.take()
+            inner = self.expression(0)
+            return Paren(start, self.take(")")[3], inner)
+        if value == "{":
+            matchers, end = self.matchers()
+            return Selector(start, end, None, matchers)
+        if kind == "eof":
+            raise PromQLError(f"Unexpected end of expression in {self.text}")
+        if kind != "ident":
+            raise PromQLError(f"Unexpected {value!r} at {start} in {self.text}")
+        self.take()
+        following = self.peek()[1]
+        if value in AGGREGATIONS and following in ("(", "by", "without"):
+            return self.aggregate(value, start)
+        if following == "(":
+            args, end = self.arguments()
+            return Call(start, end, value, args)
+        if value in ("Inf", "NaN"):
+            return Number(start, end, float(value.lower()))
+        if following == "{":
+            matchers, end = self.matchers()
+            return Selector(start, end, value, matchers)
+        return Selector(start, end, value, [])
+
+    def aggregate(self, op: str, start: int) -> Aggregate:
+        grouping: Optional[List[str]] = None
+        without = False
+        if self.peek()[1] in ("by", "without"):
+            without = self.take()[1] == "without"
+            grouping = self.label_list()
+        args, end = self.arguments()
+        if grouping is None and self.peek()[1] in ("by", "without"):
+            without = self.take()[1] == "without"
+            grouping = self.label_list()
+            end = self.tokens[self.position - 1][3]
+        return Aggregate(start, end, op, args, grouping or [], without)
+
+def parse_string(literal: str) -> str:
+    if literal[0] == "`":
+        return literal[1:-1]
+    body = literal[1:-1]
+    if literal[0] == "'":
+        body = body.replace("\\'", "'").replace('"', '\\"')
+    return json.loads(f'"{body}"')
+
+def parse_promql(text: str) -> Node:
+    return Parser(text).parse()
+
+def format_number(value: float) -> str:
+    if value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+def walk(node: Node):
+    yield node
+    for child in node.children():
+        yield from walk(child)
+
+def canonical(node: Node, names: Dict[str, str], top: bool = True) -> str:
+    """Normalised text of an expression with recorded sub-expressions replaced by their names"""
+    if isinstance(node, Paren):
+        return canonical(node.expr, names, top)
+    if isinstance(node, Number):
+        text = format_number(node.value)
+    elif isinstance(node, String):
+        text = json.dumps(node.value)
+    elif isinstance(node, Selector):
+        text = node.name or ""
+        if node.matchers:
+            text += "{" + ",".join(f"{label}{op}{json.dumps(value)}" for label, op, value in sorted(node.matchers)) + "}"
+        if node.range:
+            text += f"[{node.range}]"
+        if node.offset:
+            text += f" offset {node.offset}"
+    elif isinstance(node, Call):
+        text = f"{node.func}({', '.join(canonical(arg, names, False) for arg in node.args)})"
+    elif isinstance(node, Aggregate):
+        clause = ""
+        if node.grouping or node.without:
+            clause = f" {'without' if node.without else 'by'} ({', '.join(sorted(node.grouping))})"
+        text = f"{node.op}{clause} ({', '.join(canonical(arg, names, False) for arg in node.args)})"
+    elif isinstance(node, Binary):
+        modifiers = " bool" if node.bool_modifier else ""
+        for clause in (node.matching, node.group):
+            if clause:
+                modifiers += f" {clause[0]} ({', '.join(sorted(clause[1]))})"
+        text = f"({canonical(node.lhs, names, False)}) {node.op}{modifiers} ({canonical(node.rhs, names, False)})"
+    elif isinstance(node, Unary):
+        text = f"{node.op}({canonical(node.expr, names, False)})"
+    elif isinstance(node, Subquery):
+        text = f"({canonical(node.expr, names, False)})[{node.range}]"
+    else:
+        raise PromQLError(f"Unknown node {node!r}")
+    if not top and text in names:
+        return names[text]
+    return text
+
+def rewrite(text: str, root: Node, names: Dict[str, str], top: bool = True) -> str:
+    """Source text of ``root`` with its recorded sub-expressions replaced by the recorded series"""
+    replacements = []
+
+    def collect(node: Node, is_top: bool):
+        if not is_top and not isinstance(node, Paren):
+            key = canonical(node, names)
+            if key in names:
+                replacements.append((node.start, node.end, names[key]))
+                return
+        for child in node.children():
+            collect(child, False)
+
+    collect(root, top)
+    result = text[root.start:root.end]
+    for start, end, name in sorted(replacements, reverse=True):
+        result = result[:start - root.start] + name + result[end - root.start:]
+    return result
+
+def contains_range(node: Node) -> bool:
+    return any(isinstance(child, (Selector, Subquery)) and getattr(child, "range", None) for child in walk(node))
+
+def is_candidate(node: Node) -> bool:
+    """Sub-expressions that are worth precomputing: aggregations and range-vector functions"""
+    if isinstance(node, Aggregate):
+        return True
+    if isinstance(node, Call) and node.func not in SCALAR_FUNCTIONS:
+        return node.func in RANGE_FUNCTIONS or any(isinstance(child, Aggregate) for child in walk(node))
+    return False
+
+class CostModel:
+    """Estimates series and samples read per evaluation from per-region series counts"""
+
+    def __init__(self, regions: int, scrape_interval: float, instances_per_region: int,
+                 series_per_region: Dict[str, float], recorded: Dict[str, float]):
+        self.regions = regions
+        self.scrape_interval = scrape_interval
+        self.instances_per_region = instances_per_region
+        self.series_per_region = series_per_region
+        # recording rule name -> estimated output series
+        self.recorded = recorded
+
+    def with_regions(self, regions: int) -> "CostModel":
+        return CostModel(regions, self.scrape_interval, self.instances_per_region, self.series_per_region, {})
+
+    def selector_series(self, node: Selector) -> float:
+        if node.name in self.recorded:
+            return self.recorded[node.name]
+        series = self.regions * self.series_per_region.get(node.name, DEFAULT_SERIES_PER_REGION)
+        for label, op, _ in node.matchers:
+            if label == "__name__" or (label == "job" and node.name not in JOB_SCOPED_METRICS):
+                continue
+            values = LABEL_VALUES.get(label, 2)
+            series *= 1 / values if op in ("=", "=~") else 1 - 1 / values
+        return max(1.0, series)
+
+    def group_count(self, labels: List[str]) -> Optional[float]:
+        cardinality = {"region": self.regions, "instance": self.regions * self.instances_per_region}
+        total = 1.0
+        for label in labels:
+            if label in cardinality:
+                total *= cardinality[label]
+            elif label in LABEL_VALUES:
+                total *= LABEL_VALUES[label]
+            else:
+                return None
+        return total
+
+    def output(self, node: Node, names: Dict[str, str], top: bool = True) -> float:
+        """Estimated series returned by an expression"""
+        if not top and not isinstance(node, Paren):
+            key = canonical(node, names)
+            if key in names:
+                return self.recorded.get(names[key], 1.0)
+        if isinstance(node, Selector):
+            return self.selector_series(node)
+        if isinstance(node, (Number, String)):
+            return 0.0
+        if isinstance(node, Aggregate):
+            series = self.output(node.args[-1], names, False)
+            if node.without:
+                return series
+            groups = self.group_count(node.grouping)
+            groups = series if groups is None else groups
+            if node.op in ("topk", "bottomk"):
+                return series
+            return max(1.0, min(series, groups))
+        if isinstance(node, Binary):
+            lhs = self.output(node.lhs, names, False)
+            rhs = self.output(node.rhs, names, False)
+            return lhs + rhs if node.op == "or" else max(lhs, rhs)
+        if isinstance(node, Call) and node.func in SCALAR_FUNCTIONS:
+            return 0.0
+        if isinstance(node, Call) and node.func == "vector":
+            return 1.0
+        return max([self.output(child, names, False) for child in node.children()] or [0.0])
+
+    def cost(self, node: Node, names: Dict[str, str], top: bool = True) -> float:
+        """Estimated samples read by one evaluation"""
+        if not top and not isinstance(node, Paren):
+            key = canonical(node, names)
+            if key in names:
+                return self.recorded.get(names[key], 1.0)
+        if isinstance(node, Selector):
+            samples = parse_duration(node.range) / self.scrape_interval if node.range else 1.0
+            return self.selector_series(node) * max(1.0, samples)
+        if isinstance(node, Subquery):
+            window, _, step = node.range.partition(":")
+            steps = parse_duration(window) / (parse_duration(step) if step else self.scrape_interval)
+            return self.cost(node.expr, names, False) * max(1.0, steps)
+        return sum(self.cost(child, names, False) for child in node.children())
+
+@dataclass
+class Source:
+    kind: str
+    name: str
+    path: str
+    expr: str
+    per_minute: float
+    ast: Node = None
+
+@dataclass
+class Decision:
+    key: str
+    expr: str
+    uses: int
+    consumers: List[str]
+    cost: float
+    saving: float
+    name: Optional[str] = None
+
+def sanitize(value: str) -> str:
+    value = value.lower().replace(".", "x")
+    return re.sub(r"[^a-z0-9]+", "_", value).strip("_")
+
+def primary_path(node: Node, names: Dict[str, str]) -> List[Node]:
+    """Nodes from ``node`` down to the leftmost selector or recorded sub-expression"""
+    path = [node]
+    while True:
+        current = path[-1]
+        if len(path) > 1 and not isinstance(current, Paren) and canonical(current, names) in names:
+            return path
+        if isinstance(current, Selector):
+            return path
+        children = [child for child in current.children() if not isinstance(child, (Number, String))]
+        if not children:
+            return path
+        path.append(children[-1] if isinstance(current, Aggregate) else children[0])
+
+def recording_name(node: Node, names: Dict[str, str], taken: set) -> str:
+    """level:metric:operations, following the Prometheus recording rule naming convention"""
+    path = primary_path(node, names)
+    aggregate = next((current for current in path if isinstance(current, Aggregate)), None)
+    if aggregate is None:
+        level = "instance"
+    else:
+        labels = list(aggregate.grouping)
+        # histogram_quantile consumes the bucket label
+        if any(isinstance(current, Call) and current.func == "histogram_quantile" for current in path) and "le" in labels:
+            labels.remove("le")
+        level = ("without_" if aggregate.without else "") + ("_".join(labels) or "global")
+    leaf = path[-1]
+    if len(path) > 1 and canonical(leaf, names) in names:
+        recorded = names[canonical(leaf, names)]
+    elif isinstance(leaf, Selector) and leaf.name and ":" in leaf.name:
+        recorded = leaf.name
+    else:
+        recorded = None
+    base_ops = ""
+    if recorded:
+        _, metric, base_ops = (recorded.split(":", 2) + ["", ""])[:3]
+    elif isinstance(leaf, Selector):
+        metric = re.sub(r"_total$", "", leaf.name or "series")
+        for label, op, value in leaf.matchers:
+            if label in ("job", "__name__"):
+                continue
+            metric += f"_{'not_' if op.startswith('!') else ''}{sanitize(value)}"
+    else:
+        metric = "value"
+
+    ops = []
+    for current, child in zip(path, path[1:]):
+        if isinstance(current, Aggregate) and current.op != "sum":
+            ops.append(current.op)
+        elif isinstance(current, Call):
+            selector = next((arg for arg in current.args if isinstance(arg, Selector) and arg.range), None)
+            ops.append(f"{current.func}{selector.range}" if selector is not None and current.func in RANGE_FUNCTIONS
+                       else current.func)
+        elif isinstance(current, Binary):
+            other = current.rhs if child is current.lhs else current.lhs
+            if isinstance(other, Number):
+                if current.op in COMPARISONS:
+                    ops.append(OP_WORDS[current.op] + format_number(other.value).replace(".", "_").replace("-", "neg"))
+            else:
+                ops.append(OP_WORDS[current.op])
+    if base_ops:
+        ops.append(base_ops)
+
+    name = f"{level}:{metric}:{'_'.join(ops) or 'value'}"
+    candidate, suffix = name, 2
+    while candidate in taken:
+        candidate = f"{name}_{suffix}"
+        suffix += 1
+    return candidate
+
+def candidate_height(node: Node) -> int:
+    below = max([candidate_height(child) for child in node.children()] or [0])
+    return below + 1 if is_candidate(node) else below
+
+def load_alert_sources(rules_dir: str, output: str, evaluation_interval: float) -> List[Source]:
+    sources = []
+    for filename in sorted(os.listdir(rules_dir)):
+        path = os.path.join(rules_dir, filename)
+        if not filename.endswith((".yml", ".yaml")) or os.path.abspath(path) == os.path.abspath(output):
+            continue
+        with open(path) as f:
+            document = yaml.safe_load(f) or {}
+        for group in document.get("groups", []):
+            interval = parse_duration(group["interval"]) if group.get("interval") else evaluation_interval
+            for rule in group.get("rules", []):
+                name = rule.get("alert") or rule.get("record")
+                sources.append(Source("alert" if "alert" in rule else "rule", name, path, str(rule["expr"]),
+                                      60 / interval))
+    return sources
+
+def dashboard_panels(panels: List[Dict]):
+    for panel in panels:
+        yield panel
+        yield from dashboard_panels(panel.get("panels", []))
+
+def load_dashboard_sources(dashboards_dir: str, scrape_interval: float, loads_per_minute: float,
+                           viewers: int, max_data_points: int) -> List[Source]:
+    sources = []
+    for filename in sorted(os.listdir(dashboards_dir)):
+        if not filename.endswith(".json"):
+            continue
+        path = os.path.join(dashboards_dir, filename)
+        with open(path) as f:
+            dashboard = json.load(f)
+        dashboard = dashboard.get("dashboard", dashboard)
+        refresh = dashboard.get("refresh")
+        loads = 60 / parse_duration(refresh) if refresh else loads_per_minute
+        time_from = (dashboard.get("time") or {}).get("from", "now-1h")
+        window = parse_duration(time_from[4:]) if time_from.startswith("now-") else 3600
+        for panel in dashboard_panels(dashboard.get("panels", [])):
+            for target in panel.get("targets", []):
+                if not target.get("expr") or target.get("hide"):
+                    continue
+                if target.get("instant"):
+                    steps = 1
+                else:
+                    step = max(scrape_interval, window / (panel.get("maxDataPoints") or max_data_points))
+                    if target.get("interval"):
+                        step = max(step, parse_duration(target["interval"]))
+                    steps = window / step + 1
+                sources.append(Source("panel", f"{dashboard.get('title', filename)} / {panel.get('title')}",
+                                      path, target["expr"], loads * viewers * steps))
+    return sources
+
+def load_recording_rules(path: str) -> List[Tuple[str, str]]:
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        document = yaml.safe_load(f) or {}
+    return [(rule["record"], str(rule["expr"])) for group in document.get("groups", [])
+            for rule in group.get("rules", []) if "record" in rule]
+
+class RecordingRulePlanner:
+    """Chooses sub-expressions to record by their estimated net saving
+
+    Candidates are aggregations and range-vector functions. They are
+    decided innermost first, so an outer expression is costed as if its
+    recorded parts were already in place. A candidate is recorded when the
+    samples its consumers would stop reading (every occurrence, weighted
+    by how often its alert is evaluated or its panel is loaded, over every
+    step of a range query) exceed what evaluating the recording rule itself
+    reads each rule interval. A sub-expression used once by an alert
+    evaluated at the rule interval therefore stays inline: recording it
+    would only add a write.
+    """
+
+    def __init__(self, sources: List[Source], model: CostModel, rule_interval: float,
+                 existing: List[Tuple[str, str]], min_saving: float = 0.0):
+        self.sources = sources
+        self.model = model
+        self.rule_rate = 60 / rule_interval
+        self.min_saving = min_saving
+        self.names: Dict[str, str] = {}
+        self.rules: List[Tuple[str, str]] = []
+        self.existing = existing
+        self.decisions: List[Decision] = []
+        for name, expr in existing:
+            ast = parse_promql(expr)
+            self.names[canonical(ast, self.names)] = name
+            self.model.recorded[name] = self.model.output(ast, self.names)
+        for source in sources:
+            source.ast = parse_promql(source.expr)
+
+    def plan(self) -> List[Tuple[str, str]]:
+        occurrences: Dict[int, List[Tuple[Source, Node]]] = defaultdict(list)
+        for source in self.sources:
+            for node in walk(source.ast):
+                if is_candidate(node):
+                    occurrences[candidate_height(node)].append((source, node))
+
+        for height in sorted(occurrences):
+            groups: Dict[str, List[Tuple[Source, Node]]] = defaultdict(list)
+            for source, node in occurrences[height]:
+                key = canonical(node, self.names)
+                if key not in self.names:
+                    groups[key].append((source, node))
+            for key, uses in groups.items():
+                source, node = uses[0]
+                cost = self.model.cost(node, self.names)
+                output = self.model.output(node, self.names)
+                saving = sum(user.per_minute for user, _ in uses) * (cost - output) - self.rule_rate * cost
+                decision = Decision(key, rewrite(source.expr, node, self.names), len(uses),
+                                    sorted({user.name for user, _ in uses}), cost, saving)
+                self.decisions.append(decision)
+                if saving > self.min_saving:
+                    decision.name = recording_name(node, self.names, set(self.names.values()))
+                    self.names[key] = decision.name
+                    self.model.recorded[decision.name] = output
+                    self.rules.append((decision.name, decision.expr))
+        return self.referenced_rules()
+
+    def rewritten(self, source: Source) -> str:
+        return rewrite(source.expr, source.ast, self.names, top=False)
+
+    def referenced_rules(self) -> List[Tuple[str, str]]:
+        """Existing then new rules, dropping any that nothing reads any more"""
+        candidates = self.existing + self.rules
+        expressions = [self.rewritten(source) for source in self.sources]
+        referenced = set()
+        pending = [parse_promql(expr) for expr in expressions]
+        rule_exprs = dict(candidates)
+        while pending:
+            for node in walk(pending.pop()):
+                if isinstance(node, Selector) and node.name in rule_exprs and node.name not in referenced:
+                    referenced.add(node.name)
+                    pending.append(parse_promql(rule_exprs[node.name]))
+        return [(name, expr) for name, expr in candidates if name in referenced]
+
+def query_costs(sources: List[Tuple[Source, str]], rules: List[Tuple[str, str]], model: CostModel,
+                rule_interval: float) -> Dict[str, float]:
+    """Samples read per minute by alerts, dashboards and recording rules"""
+    totals = {"alert": 0.0, "panel": 0.0, "rule": 0.0}
+    for name, expr in rules:
+        ast = parse_promql(expr)
+        totals["rule"] += 60 / rule_interval * model.cost(ast, {})
+        model.recorded[name] = model.output(ast, {})
+    for source, expr in sources:
+        totals["rule" if source.kind == "rule" else source.kind] += source.per_minute * model.cost(parse_promql(expr), {})
+    totals["total"] = sum(totals.values())
+    return totals
+
+def yaml_scalar(text: str) -> str:
+    try:
+        if yaml.safe_load(f"value: {text}") == {"value": text}:
+            return text
+    except yaml.YAMLError:
+        pass
+    return "'" + text.replace("'", "''") + "'"
+
+def render_rules(rules: List[Tuple[str, str]], group_name: str) -> str:
+    lines = [
+        "# Generated by scripts/generate-recording-rules.py from the alert rules and",
+        "# Grafana dashboards; re-run the script instead of editing this file.",
+        "groups:",
+        f"  - name: {group_name}",
+        "    rules:"
+    ]
+    for index, (name, expr) in enumerate(rules):
+        if index:
+            lines.append("")
+        lines.append(f"      - record: {name}")
+        lines.append(f"        expr: {yaml_scalar(expr)}")
+    return "\n".join(lines) + "\n"
+
+def apply_rewrites(changes: List[Tuple[Source, str]]) -> List[str]:
+    """Rewrite expressions in place, keeping each file's formatting; returns the files changed"""
+    by_path: Dict[str, List[Tuple[Source, str]]] = defaultdict(list)
+    for source, expr in changes:
+        by_path[source.path].append((source, expr))
+    for path, edits in by_path.items():
+        with open(path) as f:
+            text = f.read()
+        for source, expr in edits:
+            if source.kind == "panel":
+                old, new = f'"expr": {json.dumps(source.expr)}', f'"expr": {json.dumps(expr)}'
+                if old not in text:
+                    raise ValueError(f"Could not find the query for {source.name} in {path}")
+                text = text.replace(old, new)
+                continue
+            # The value runs on over any more deeply indented lines: folded plain scalars and "|" blocks
+            pattern = re.compile(r"^([ \t]*)expr:[ \t]*(.+(?:\n(?:[ \t]*\n)*\1[ \t]+\S.*)*)", re.MULTILINE)
+            for match in pattern.finditer(text):
+                try:
+                    value = yaml.safe_load(f"value: {match.group(2)}")["value"]
+                except yaml.YAMLError:
+                    continue
+                if str(value).strip() == source.expr.strip():
+                    text = text[:match.start(2)] + yaml_scalar(expr) + text[match.end(2):]
+                    break
+            else:
+                raise ValueError(f"Could not find the expression for {source.name} in {path}")
+        with open(path, "w") as f:
+            f.write(text)
+    return sorted(by_path)
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate Prometheus recording rules from alert and dashboard queries")
+    parser.add_argument("--prometheus-config", default=os.path.join(REPO_DIR, "monitoring", "prometheus", "prometheus.yml"),
+                        help="Prometheus config (scrape/evaluation intervals and regions)")
+    parser.add_argument("--rules-dir", default=os.path.join(REPO_DIR, "monitoring", "prometheus", "rules"),
+                        help="Directory of alert rule files")
+    parser.add_argument("--dashboards-dir", default=os.path.join(REPO_DIR, "monitoring", "grafana", "dashboards"),
+                        help="Directory of Grafana dashboard JSON")
+    parser.add_argument("--output", default=os.path.join(REPO_DIR, "monitoring", "prometheus", "rules", "sleek-recording.yml"),
+                        help="Recording rules file to generate")
+    parser.add_argument("--regions", type=int, help="Plan for this many regions (default: regions in the Prometheus config)")
+    parser.add_argument("--project-regions", type=int, help="Also report costs at this many regions (default: double)")
+    parser.add_argument("--instances-per-region", type=int, default=2, help="Instances behind each regional ALB")
+    parser.add_argument("--series", help="JSON file of series per region by metric, overriding the built-in estimates")
+    parser.add_argument("--viewers", type=int, default=1, help="Concurrent viewers of each dashboard")
+    parser.add_argument("--dashboard-loads-per-minute", type=float, default=1,
+                        help="Loads per minute per viewer for dashboards without auto-refresh")
+    parser.add_argument("--max-data-points", type=int, default=500, help="Points per range query panel")
+    parser.add_argument("--min-saving", type=float, default=0, help="Samples per minute a rule must save to be recorded")
+    parser.add_argument("--write", action="store_true", help="Write the rules file and rewrite alerts and dashboards")
+    parser.add_argument("--json", help="Write the plan and cost report as JSON to this file")
+
+    args = parser.parse_args()
+
+    with open(args.prometheus_config) as f:
+        config = yaml.safe_load(f)
+    scrape_interval = parse_duration(config.get("global", {}).get("scrape_interval", "1m"))
+    evaluation_interval = parse_duration(config.get("global", {}).get("evaluation_interval", "1m"))
+    configured_regions = len([job for job in config.get("scrape_configs", [])
+                              if job["job_name"].startswith("blackbox-http-")]) or 1
+    regions = args.regions or configured_regions
+    project_regions = args.project_regions or regions * 2
+
+    series = dict(SERIES_PER_REGION)
+    if args.series:
+        with open(args.series) as f:
+            series.update(json.load(f))
+
+    model = CostModel(regions, scrape_interval, args.instances_per_region, series, {})
+    sources = load_alert_sources(args.rules_dir, args.output, evaluation_interval) + \
+        load_dashboard_sources(args.dashboards_dir, scrape_interval, args.dashboard_loads_per_minute,
+                               args.viewers, args.max_data_points)
+    existing = load_recording_rules(args.output)
+    planner = RecordingRulePlanner(sources, model, evaluation_interval, existing, args.min_saving)
+    rules = planner.plan()
+    rewritten = [(source, planner.rewritten(source)) for source in sources]
+    changes = [(source, expr) for source, expr in rewritten if expr != source.expr]
+
+    reports = {}
+    for count in (regions, project_regions):
+        scaled = model.with_regions(count)
+        before = query_costs([(source, source.expr) for source in sources], existing, scaled, evaluation_interval)
+        after = query_costs(rewritten, rules, model.with_regions(count), evaluation_interval)
+        reports[count] = (before, after)
+
+    alerts = sum(1 for source in sources if source.kind != "panel")
+    dashboards = len({source.path for source in sources if source.kind == "panel"})
+    print(f"\n{'='*60}")
+    print("RECORDING RULE PLAN")
+    print(f"{'='*60}")
+    print(f"{alerts} rule expressions, {len(sources) - alerts} panel queries in {dashboards} dashboards, "
+          f"{regions} regions")
+    print(f"\nRecording rules ({len(rules)}):")
+    for name, expr in rules:
+        decision = next((d for d in planner.decisions if d.name == name), None)
+        print(f"  {name}")
+        print(f"      {expr}")
+        if decision:
+            print(f"      {decision.uses} use(s) in {', '.join(decision.consumers)}; "
+                  f"saves {decision.saving:,.0f} samples/min")
+    rejected = sorted((d for d in planner.decisions if d.name is None), key=lambda d: d.saving, reverse=True)
+    if rejected:
+        print("\nKept inline (recording would not pay for its own evaluation):")
+        for decision in rejected[:8]:
+            print(f"  {decision.expr}")
+            print(f"      {decision.uses} use(s) in {', '.join(decision.consumers)}; "
+                  f"net {decision.saving:,.0f} samples/min")
+    print(f"\nRewritten expressions ({len(changes)}):")
+    for source, expr in changes:
+        print(f"  {source.name}: {expr}")
+
+    print("\nEstimated samples read per minute")
+    print(f"{'':>16}" + "".join(f"{f'{count} regions':>24}" for count in reports))
+    print(f"{'':>16}" + "".join(f"{'before':>12}{'after':>12}" for _ in reports))
+    for key, label in (("alert", "Alert rules"), ("panel", "Dashboards"), ("rule", "Recording rules"),
+                       ("total", "Total")):
+        print(f"{label:>16}" + "".join(f"{before[key]:>12,.0f}{after[key]:>12,.0f}" for before, after in reports.values()))
+    print(f"{'Reduction':>16}" + "".join(
+        f"{(1 - after['total'] / before['total']) if before['total'] else 0:>24.1%}" for before, after in reports.values()))
+
+    if args.write:
+        with open(args.output, "w") as f:
+            f.write(render_rules(rules, "sleek.recording"))
+        changed = apply_rewrites(changes)
+        print(f"\nWrote {len(rules)} recording rule(s) to {args.output}")
+        for path in changed:
+            print(f"Rewrote {path}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "rules": [{"record": name, "expr": expr} for name, expr in rules],
+                "rewrites": [{"source": source.name, "before": source.expr, "after": expr} for source, expr in changes],
+                "decisions": [decision.__dict__ for decision in planner.decisions],
+                "costs": {str(count): {"before": before, "after": after} for count, (before, after) in reports.items()}
+            }, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -9,23 +9,104 @@ import aiohttp
 import time
 import json
 import logging
+import logging.handlers
+import sys
+from array import array
+from collections import deque
 from datetime import datetime, timezone
-from typing import Dict, List, Optional
+from typing import Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 import argparse
-from dataclasses import dataclass, asdict
-import statistics
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('synthetic_transactions.log'),
-        logging.StreamHandler()
-    ]
-)
+import atexit
+from dataclasses import dataclass, asdict, replace
+import math
+import heapq
+import functools
+import random
+import multiprocessing
+import queue
+import signal
+import csv
+import glob
+import gzip
+import ipaddress
+import os
+import shutil
+import socket
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from aiohttp.abc import AbstractResolver, ResolveResult
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, start_http_server
+
+try:
+    import zstandard
+except ImportError:  # zstd compression is optional
+    zstandard = None
+
 logger = logging.getLogger(__name__)
 
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+# Attributes every LogRecord has; anything else was passed through ``extra``
+_LOG_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with any ``extra`` fields kept as keys"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "process": record.process,
+            "message": record.getMessage()
+        }
+        for key, value in record.__dict__.items():
+            if key not in _LOG_RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+class DebugSampler(logging.Filter):
+    """Keep a random fraction of DEBUG records; INFO and above always pass"""
+
+    def __init__(self, sample_rate: float = 1.0):
+        super().__init__()
+        self.sample_rate = sample_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno > logging.DEBUG or random.random() < self.sample_rate
+
+def configure_logging(log_file: Optional[str] = "synthetic_transactions.log", level: int = logging.INFO,
+                      max_bytes: int = 50 * 1024 * 1024, backup_count: int = 5,
+                      sample_rate: float = 1.0,
+                      handlers: Optional[List[logging.Handler]] = None) -> logging.handlers.QueueListener:
+    """Route all logging through an in-memory queue drained by a background thread"""
+    if handlers is None:
+        console = logging.StreamHandler()
+        console.setFormatter(logging.Formatter(LOG_FORMAT))
+        handlers = [console]
+        if log_file:
+            file_handler = logging.handlers.RotatingFileHandler(log_file, maxBytes=max_bytes,
+                                                                backupCount=backup_count)
+            file_handler.setFormatter(JsonFormatter())
+            handlers.append(file_handler)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(DebugSampler(sample_rate))
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
+
 @dataclass
 class RegionConfig:
     name: str
@@ -33,6 +114,123 @@ class RegionConfig:
     expected_response_time_ms: int
     country: str
 
+# Expected response time and display name per region; endpoints come from the Terraform outputs
+REGION_DEFAULTS = {
+    "singapore": (200, "Singapore"),
+    "hongkong": (250, "Hong Kong"),
+    "australia": (300, "Australia"),
+    "uk": (400, "United Kingdom")
+}
+DEFAULT_EXPECTED_RESPONSE_TIME_MS = 500
+
+def default_regions() -> List[RegionConfig]:
+    """Built-in regions, probed when no Terraform outputs are available"""
+    return [
+        RegionConfig(name, f"https://{name}-lb.sleek-monitor.local", expected_ms, country)
+        for name, (expected_ms, country) in REGION_DEFAULTS.items()
+    ]
+
+@dataclass
+class RegionChange:
+    added: List[RegionConfig]
+    removed: List[RegionConfig]
+    # (region, previous endpoint); the region already carries the new endpoint
+    changed: List[Tuple[RegionConfig, str]]
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+class RegionRegistry:
+    """Regions loaded from the outputs_<region>.json files written by deploy-infrastructure.sh"""
+
+    def __init__(self, pattern: str = "outputs_*.json", scheme: str = "http",
+                 regions: Optional[Iterable[RegionConfig]] = None):
+        self.pattern = pattern
+        self.scheme = scheme
+        self.regions: Dict[str, RegionConfig] = {region.name: region for region in regions or []}
+        self._only = set(self.regions) if regions is not None else None
+        # path -> (mtime_ns, size) of the last successful parse, and the region it defined
+        self._signatures: Dict[str, Tuple[int, int]] = {}
+        self._file_regions: Dict[str, str] = {}
+        # path -> (mtime_ns, size) of a version that failed to parse, so it is reported once
+        self._rejected: Dict[str, Tuple[int, int]] = {}
+
+    def parse(self, path: str) -> RegionConfig:
+        with open(path) as f:
+            outputs = json.load(f)
+        name = outputs.get("environment", {}).get("value")
+        if not name:
+            name = os.path.basename(path)[len("outputs_"):-len(".json")]
+        dns_name = outputs.get("load_balancer_dns_name", {}).get("value")
+        if not dns_name or dns_name == "N/A":
+            raise ValueError("no load_balancer_dns_name output")
+        expected_ms, country = REGION_DEFAULTS.get(name, (DEFAULT_EXPECTED_RESPONSE_TIME_MS, name.title()))
+        return RegionConfig(name, f"{self.scheme}://{dns_name}", expected_ms, country)
+
+    def refresh(self) -> RegionChange:
+        """Re-read changed outputs files and apply them to the registry"""
+        change = RegionChange([], [], [])
+        paths = set(glob.glob(self.pattern))
+
+        for path in sorted(paths):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            signature = (stat.st_mtime_ns, stat.st_size)
+            if signature in (self._signatures.get(path), self._rejected.get(path)):
+                continue
+            try:
+                loaded = self.parse(path)
+            except (OSError, ValueError, AttributeError) as e:
+                logger.warning(f"Ignoring region outputs {path}: {e}")
+                self._rejected[path] = signature
+                continue
+            self._rejected.pop(path, None)
+            self._signatures[path] = signature
+            if self._only is not None and loaded.name not in self._only:
+                continue
+
+            previous_name = self._file_regions.get(path)
+            self._file_regions[path] = loaded.name
+            if previous_name is not None and previous_name != loaded.name:
+                change.removed.append(self.regions.pop(previous_name))
+            region = self.regions.get(loaded.name)
+            if region is None:
+                self.regions[loaded.name] = loaded
+                change.added.append(loaded)
+            elif region.endpoint != loaded.endpoint:
+                previous_endpoint = region.endpoint
+                region.endpoint = loaded.endpoint
+                change.changed.append((region, previous_endpoint))
+
+        for path in list(self._file_regions):
+            if path not in paths:
+                self._signatures.pop(path, None)
+                self._rejected.pop(path, None)
+                region = self.regions.pop(self._file_regions.pop(path), None)
+                if region is not None:
+                    change.removed.append(region)
+
+        for region in change.added:
+            logger.info(f"Region {region.name} loaded from outputs: {region.endpoint}")
+        for region, previous_endpoint in change.changed:
+            logger.info(f"Region {region.name} endpoint changed: {previous_endpoint} -> {region.endpoint}")
+        for region in change.removed:
+            logger.info(f"Region {region.name} removed: its outputs file is gone")
+        return change
+
+    async def watch(self, interval_seconds: float, on_change: Callable[[RegionChange], Awaitable[None]]):
+        """Poll the outputs files every ``interval_seconds`` until cancelled"""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                change = self.refresh()
+                if change:
+                    await on_change(change)
+            except Exception as e:
+                logger.error(f"Error reloading regions: {e}")
+
 @dataclass
 class TransactionResult:
     region: str
@@ -42,56 +240,1429 @@ class TransactionResult:
     success: bool
     timestamp: str
     error: Optional[str] = None
+    dns_ms: Optional[float] = None
+    connect_ms: Optional[float] = None
+    ttfb_ms: Optional[float] = None
+    connection_reused: Optional[bool] = None
+    # Early verdict recorded at the latency budget
+    provisional: bool = False
+    # Answered correctly, but slower than the transaction's latency budget
+    latency_budget_exceeded: bool = False
+
+class PhaseTimings:
+    """Per-request timestamps collected by the aiohttp trace hooks"""
+
+    __slots__ = ("request_start", "dns_start", "dns_end", "connect_start", "connect_end",
+                 "headers_received", "connection_reused")
 
-class SyntheticTransactionEngine:
     def __init__(self):
-        self.regions = [
-            RegionConfig("singapore", "https://singapore-lb.sleek-monitor.local", 200, "Singapore"),
-            RegionConfig("hongkong", "https://hongkong-lb.sleek-monitor.local", 250, "Hong Kong"),
-            RegionConfig("australia", "https://australia-lb.sleek-monitor.local", 300, "Australia"),
-            RegionConfig("uk", "https://uk-lb.sleek-monitor.local", 400, "United Kingdom")
-        ]
-        self.results: List[TransactionResult] = []
+        self.request_start: Optional[float] = None
+        self.dns_start: Optional[float] = None
+        self.dns_end: Optional[float] = None
+        self.connect_start: Optional[float] = None
+        self.connect_end: Optional[float] = None
+        self.headers_received: Optional[float] = None
+        self.connection_reused: Optional[bool] = None
+
+    def as_fields(self) -> Dict:
+        """Phase durations in milliseconds, as TransactionResult fields"""
+        dns_ms = None
+        if self.dns_start is not None and self.dns_end is not None:
+            dns_ms = (self.dns_end - self.dns_start) * 1000
+        connect_ms = None
+        if self.connect_start is not None and self.connect_end is not None:
+            # aiohttp resolves DNS inside connection creation, so TCP connect plus TLS is what remains
+            connect_ms = (self.connect_end - self.connect_start) * 1000 - (dns_ms or 0.0)
+        ttfb_ms = None
+        if self.request_start is not None and self.headers_received is not None:
+            ttfb_ms = (self.headers_received - self.request_start) * 1000
+        return {
+            "dns_ms": dns_ms,
+            "connect_ms": connect_ms,
+            "ttfb_ms": ttfb_ms,
+            "connection_reused": self.connection_reused
+        }
+
+def build_trace_config() -> aiohttp.TraceConfig:
+    """Trace hooks that fill the PhaseTimings passed as trace_request_ctx"""
+    trace_config = aiohttp.TraceConfig()
+
+    def hook(callback):
+        async def handler(session, trace_config_ctx, params):
+            timings = trace_config_ctx.trace_request_ctx
+            if isinstance(timings, PhaseTimings):
+                callback(timings, time.perf_counter())
+        return handler
+
+    def request_start(t: PhaseTimings, now: float):
+        if t.request_start is None:
+            t.request_start = now
+
+    def dns_start(t: PhaseTimings, now: float):
+        t.dns_start = now
+
+    def dns_end(t: PhaseTimings, now: float):
+        t.dns_end = now
+
+    def connect_start(t: PhaseTimings, now: float):
+        t.connect_start = now
+
+    def connect_end(t: PhaseTimings, now: float):
+        t.connect_end = now
+        t.connection_reused = False
+
+    def connection_reused(t: PhaseTimings, now: float):
+        t.connection_reused = True
+
+    def headers_received(t: PhaseTimings, now: float):
+        t.headers_received = now
+
+    trace_config.on_request_start.append(hook(request_start))
+    trace_config.on_dns_resolvehost_start.append(hook(dns_start))
+    trace_config.on_dns_resolvehost_end.append(hook(dns_end))
+    trace_config.on_connection_create_start.append(hook(connect_start))
+    trace_config.on_connection_create_end.append(hook(connect_end))
+    trace_config.on_connection_reuseconn.append(hook(connection_reused))
+    trace_config.on_request_end.append(hook(headers_received))
+    return trace_config
+
+@dataclass
+class DnsChangeEvent:
+    host: str
+    region: str
+    previous: List[str]
+    current: List[str]
+    timestamp: str
+
+class DnsCache(AbstractResolver):
+    """aiohttp resolver answering from addresses resolved ahead of time"""
+
+    def __init__(self, refresh_seconds: float = 30, timeout_seconds: float = 5, max_events: int = 1000):
+        self.refresh_seconds = refresh_seconds
+        self.timeout_seconds = timeout_seconds
+        self.events: deque = deque(maxlen=max_events)
+        self.listeners: List[Callable[[DnsChangeEvent], None]] = []
+        self.stats = {"hits": 0, "misses": 0, "refreshes": 0, "failures": 0, "changes": 0}
+        # Tracked host -> region name, and resolved entries per (host, address family)
+        self._hosts: Dict[str, str] = {}
+        self._entries: Dict[Tuple[str, int], List[ResolveResult]] = {}
+        self._resolver: Optional[AbstractResolver] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def host_of(endpoint: str) -> Optional[str]:
+        """Hostname of an endpoint URL, or None for IP literals that need no resolution"""
+        host = urlsplit(endpoint).hostname
+        if not host:
+            return None
+        try:
+            ipaddress.ip_address(host)
+            return None
+        except ValueError:
+            return host
+
+    def track(self, host: str, region: str):
+        self._hosts[host] = region
+
+    def untrack(self, host: str):
+        self._hosts.pop(host, None)
+        for key in [key for key in self._entries if key[0] == host]:
+            del self._entries[key]
+
+    def addresses(self, host: str, family: int = socket.AF_UNSPEC) -> List[str]:
+        return sorted({entry["host"] for entry in self._entries.get((host, family), [])})
+
+    async def _lookup(self, host: str, family: int) -> List[ResolveResult]:
+        if self._resolver is None:
+            self._resolver = aiohttp.DefaultResolver()
+        return await asyncio.wait_for(self._resolver.resolve(host, 0, family=family), self.timeout_seconds)
+
+    async def refresh_host(self, host: str, family: int = socket.AF_UNSPEC) -> bool:
+        """Re-resolve one host, recording an event when its addresses changed"""
+        try:
+            entries = await self._lookup(host, family)
+        except (OSError, asyncio.TimeoutError) as e:
+            self.stats["failures"] += 1
+            stale = " (serving the previous addresses)" if (host, family) in self._entries else ""
+            logger.warning(f"DNS refresh of {host} failed{stale}: {e or type(e).__name__}")
+            return False
+        self.stats["refreshes"] += 1
+        previous = self.addresses(host, family)
+        self._entries[(host, family)] = entries
+        current = self.addresses(host, family)
+        if previous and previous != current:
+            self._record_change(host, previous, current)
+        return True
+
+    def _record_change(self, host: str, previous: List[str], current: List[str]):
+        event = DnsChangeEvent(host, self._hosts.get(host, ""), previous, current,
+                               datetime.now(timezone.utc).isoformat())
+        self.events.append(event)
+        self.stats["changes"] += 1
+        logger.info(f"DNS for {host} changed: {', '.join(previous)} -> {', '.join(current)}")
+        for listener in self.listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                logger.error(f"Error handling DNS change of {host}: {e}")
+
+    async def prime(self):
+        """Resolve every tracked host that has no addresses yet"""
+        hosts = [host for host in self._hosts if (host, socket.AF_UNSPEC) not in self._entries]
+        await asyncio.gather(*(self.refresh_host(host) for host in hosts))
+
+    async def refresh_all(self):
+        keys = set(self._entries) | {(host, socket.AF_UNSPEC) for host in self._hosts}
+        await asyncio.gather(*(self.refresh_host(host, family) for host, family in keys))
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            await self.refresh_all()
+
+    async def start(self):
+        """Prime the cache and start the background refresh unless it is already running"""
+        if self._task is None or self._task.done():
+            await self.prime()
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def resolve(self, host: str, port: int = 0,
+                      family: socket.AddressFamily = socket.AF_INET) -> List[ResolveResult]:
+        entries = self._entries.get((host, family))
+        if entries is None:
+            self.stats["misses"] += 1
+            entries = self._entries[(host, family)] = await self._lookup(host, family)
+        else:
+            self.stats["hits"] += 1
+        return [{**entry, "port": port} for entry in entries]
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._resolver is not None:
+            await self._resolver.close()
+            self._resolver = None
+
+def _optional(value: float) -> Optional[float]:
+    return None if math.isnan(value) else value
+
+class ResultStore:
+    """Fixed-capacity columnar ring buffer of transaction results"""
+
+    def __init__(self, capacity: int = 100_000, retention_seconds: Optional[float] = 24 * 3600):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.retention_ns = int(retention_seconds * 1e9) if retention_seconds else None
+        self._timestamps = array('q', [0]) * capacity
+        self._latencies = array('d', [0.0]) * capacity
+        self._status_codes = array('h', [0]) * capacity
+        self._successes = array('b', [0]) * capacity
+        self._region_codes = array('B', [0]) * capacity
+        self._type_codes = array('B', [0]) * capacity
+        self._errors: List[Optional[str]] = [None] * capacity
+        # Phase timings are NaN when not measured; reuse is -1 when unknown
+        self._dns = array('d', [0.0]) * capacity
+        self._connect = array('d', [0.0]) * capacity
+        self._ttfb = array('d', [0.0]) * capacity
+        self._reused = array('b', [0]) * capacity
+        self._region_names: List[str] = []
+        self._type_names: List[str] = []
+        self._region_index: Dict[str, int] = {}
+        self._type_index: Dict[str, int] = {}
+        self._start = 0
+        self._size = 0
+        # Sequence number of the next appended result; never reset or wrapped
+        self.next_sequence = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def first_sequence(self) -> int:
+        """Sequence number of the oldest result still stored"""
+        return self.next_sequence - self._size
+
+    @staticmethod
+    def _code(name: str, index: Dict[str, int], names: List[str]) -> int:
+        code = index.get(name)
+        if code is None:
+            if len(names) > 255:
+                raise ValueError(f"Too many distinct values to encode: {name}")
+            code = index[name] = len(names)
+            names.append(name)
+        return code
+
+    def append(self, result: TransactionResult, timestamp_ns: Optional[int] = None):
+        """Store a result, overwriting the oldest entry when full"""
+        if timestamp_ns is None:
+            timestamp_ns = int(datetime.fromisoformat(result.timestamp).timestamp() * 1e9)
+
+        if self._size == self.capacity:
+            slot = self._start
+            self._start = (self._start + 1) % self.capacity
+        else:
+            slot = (self._start + self._size) % self.capacity
+            self._size += 1
+        self.next_sequence += 1
+
+        self._timestamps[slot] = timestamp_ns
+        self._latencies[slot] = result.response_time_ms
+        self._status_codes[slot] = result.status_code
+        self._successes[slot] = result.success
+        self._region_codes[slot] = self._code(result.region, self._region_index, self._region_names)
+        self._type_codes[slot] = self._code(result.transaction_type, self._type_index, self._type_names)
+        self._errors[slot] = sys.intern(result.error) if result.error else None
+        self._dns[slot] = math.nan if result.dns_ms is None else result.dns_ms
+        self._connect[slot] = math.nan if result.connect_ms is None else result.connect_ms
+        self._ttfb[slot] = math.nan if result.ttfb_ms is None else result.ttfb_ms
+        self._reused[slot] = -1 if result.connection_reused is None else int(result.connection_reused)
+
+        self.evict_expired(timestamp_ns)
+
+    def evict_expired(self, now_ns: Optional[int] = None):
+        """Drop entries older than the retention window"""
+        if self.retention_ns is None:
+            return
+        if now_ns is None:
+            now_ns = time.time_ns()
+        cutoff = now_ns - self.retention_ns
+        while self._size and self._timestamps[self._start] < cutoff:
+            self._errors[self._start] = None
+            self._start = (self._start + 1) % self.capacity
+            self._size -= 1
+
+    def __iter__(self) -> Iterator[TransactionResult]:
+        """Yield stored results as records, oldest first"""
+        return self.since(0)
+
+    def since(self, sequence: int) -> Iterator[TransactionResult]:
+        """Yield stored results appended at or after a sequence number, oldest first"""
+        first = self.first_sequence
+        for offset in range(max(sequence, first) - first, self._size):
+            slot = (self._start + offset) % self.capacity
+            yield TransactionResult(
+                region=self._region_names[self._region_codes[slot]],
+                transaction_type=self._type_names[self._type_codes[slot]],
+                status_code=self._status_codes[slot],
+                response_time_ms=self._latencies[slot],
+                success=bool(self._successes[slot]),
+                timestamp=datetime.fromtimestamp(self._timestamps[slot] / 1e9, timezone.utc).isoformat(),
+                error=self._errors[slot],
+                dns_ms=_optional(self._dns[slot]),
+                connect_ms=_optional(self._connect[slot]),
+                ttfb_ms=_optional(self._ttfb[slot]),
+                connection_reused=None if self._reused[slot] < 0 else bool(self._reused[slot])
+            )
+
+CSV_HEADER = ["timestamp", "region", "transaction_type", "status_code", "response_time_ms", "success", "error",
+              "dns_ms", "connect_ms", "ttfb_ms", "connection_reused"]
+
+def _format_ms(value: Optional[float]) -> str:
+    return "" if value is None else f"{value:.2f}"
+
+class SegmentedResultExporter:
+    """Append-only CSV exporter with size/time based segment rotation"""
+
+    def __init__(self, directory: str = ".", prefix: str = "transaction_details",
+                 max_bytes: int = 64 * 1024 * 1024, max_age_seconds: float = 3600,
+                 compression: str = "gzip"):
+        if compression not in ("gzip", "zstd", "none"):
+            raise ValueError(f"Unsupported compression: {compression}")
+        if compression == "zstd" and zstandard is None:
+            logger.warning("zstandard is not installed, falling back to gzip segment compression")
+            compression = "gzip"
+        self.directory = directory
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.compression = compression
+        self.manifest_path = os.path.join(directory, f"{prefix}_manifest.json")
+        self._file = None
+        self._writer = None
+        self._segment: Optional[Dict] = None
+
+        os.makedirs(directory, exist_ok=True)
+        self.manifest = self._load_manifest()
+        # The newest segment left open by a previous run is resumed while it is within the size and
+        # age limits, so one-shot runs share segments; any other open segment is sealed
+        open_segments = [segment for segment in self.manifest["segments"] if segment["status"] == "open"]
+        for segment in open_segments[:-1]:
+            self._seal(segment)
+        if open_segments:
+            segment = open_segments[-1]
+            if self._within_limits(segment) and os.path.exists(os.path.join(directory, segment["file"])):
+                self._resume_segment(segment)
+            else:
+                self._seal(segment)
+        self._save_manifest()
+
+    def _load_manifest(self) -> Dict:
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        return {"segments": []}
+
+    def _save_manifest(self):
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _open_segment(self):
+        name = f"{self.prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.csv"
+        self._segment = {
+            "file": name,
+            "status": "open",
+            "start": None,
+            "end": None,
+            "records": 0,
+            "bytes": 0,
+            "created": time.time()
+        }
+        self.manifest["segments"].append(self._segment)
+        self._file = open(os.path.join(self.directory, name), 'w', newline='')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(CSV_HEADER)
+
+    def _resume_segment(self, segment: Dict):
+        self._segment = segment
+        self._file = open(os.path.join(self.directory, segment["file"]), 'a', newline='')
+        self._writer = csv.writer(self._file)
+        segment["bytes"] = self._file.tell()
+
+    def _within_limits(self, segment: Dict) -> bool:
+        # Segments from older manifests carry no creation time and are never resumed
+        return ("created" in segment
+                and segment["bytes"] < self.max_bytes
+                and time.time() - segment["created"] < self.max_age_seconds)
+
+    def _seal(self, segment: Dict):
+        """Compress a finished segment and mark it closed in the manifest"""
+        path = os.path.join(self.directory, segment["file"])
+        if os.path.exists(path) and self.compression != "none":
+            if self.compression == "zstd":
+                compressed_name = f"{segment['file']}.zst"
+                with open(path, 'rb') as src, open(os.path.join(self.directory, compressed_name), 'wb') as dst:
+                    zstandard.ZstdCompressor().copy_stream(src, dst)
+            else:
+                compressed_name = f"{segment['file']}.gz"
+                with open(path, 'rb') as src, gzip.open(os.path.join(self.directory, compressed_name), 'wb') as dst:
+                    shutil.copyfileobj(src, dst)
+            os.remove(path)
+            segment["file"] = compressed_name
+            segment["compressed_bytes"] = os.path.getsize(os.path.join(self.directory, compressed_name))
+        segment["status"] = "closed"
+
+    def rotate(self):
+        """Seal the active segment, if any"""
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        self._writer = None
+        self._seal(self._segment)
+        logger.info(f"Rotated transaction segment {self._segment['file']}")
+        self._segment = None
+        self._save_manifest()
+
+    def append(self, results: Iterable[TransactionResult]) -> int:
+        """Append records to the active segment and return how many were written"""
+        if self._file is not None and not self._within_limits(self._segment):
+            self.rotate()
+
+        written = 0
+        for result in results:
+            if self._file is None:
+                self._open_segment()
+            self._writer.writerow([
+                result.timestamp, result.region, result.transaction_type, result.status_code,
+                f"{result.response_time_ms:.2f}", result.success, result.error or '',
+                _format_ms(result.dns_ms), _format_ms(result.connect_ms), _format_ms(result.ttfb_ms),
+                "" if result.connection_reused is None else result.connection_reused
+            ])
+            segment = self._segment
+            if segment["start"] is None or result.timestamp < segment["start"]:
+                segment["start"] = result.timestamp
+            if segment["end"] is None or result.timestamp > segment["end"]:
+                segment["end"] = result.timestamp
+            written += 1
+
+        if written:
+            self._file.flush()
+            self._segment["records"] += written
+            self._segment["bytes"] = self._file.tell()
+            self._save_manifest()
+        return written
+
+    def close(self):
+        """Close the active segment file, leaving it open in the manifest for the next run"""
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        self._writer = None
+        self._segment = None
+
+QUANTILES = {"p50": 0.5, "p95": 0.95, "p99": 0.99, "p99_9": 0.999}
+
+class HistoryStore:
+    """Embedded SQLite probe history, partitioned by UTC day"""
+
+    def __init__(self, path: str = "synthetic_history.db", batch_size: int = 500,
+                 retention_days: Optional[float] = 90):
+        self.path = path
+        self.batch_size = batch_size
+        self.retention_days = retention_days
+        self._last_prune = 0.0
+        self._pending: List[TransactionResult] = []
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="history-writer")
+        self._local = threading.local()
+        self._known_partitions: set = set()
+        # Create the schema up front so readers never see a missing registry
+        self._connection().executescript("""
+            CREATE TABLE IF NOT EXISTS partitions (
+                name TEXT PRIMARY KEY,
+                start_ns INTEGER NOT NULL,
+                end_ns INTEGER NOT NULL
+            );
+        """)
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread; SQLite connections are not shared across threads"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5.0)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    @staticmethod
+    def partition_for(timestamp_ns: int) -> Tuple[str, int, int]:
+        day = datetime.fromtimestamp(timestamp_ns / 1e9, timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        start_ns = int(day.timestamp()) * 1_000_000_000
+        return f"results_{day.strftime('%Y%m%d')}", start_ns, start_ns + 86_400 * 1_000_000_000
+
+    def _ensure_partition(self, connection: sqlite3.Connection, timestamp_ns: int) -> str:
+        name, start_ns, end_ns = self.partition_for(timestamp_ns)
+        if name not in self._known_partitions:
+            connection.execute(f"""
+                CREATE TABLE IF NOT EXISTS {name} (
+                    ts INTEGER NOT NULL,
+                    region TEXT NOT NULL,
+                    transaction_type TEXT NOT NULL,
+                    status_code INTEGER NOT NULL,
+                    response_time_ms REAL NOT NULL,
+                    success INTEGER NOT NULL,
+                    error TEXT
+                )
+            """)
+            connection.execute(f"CREATE INDEX IF NOT EXISTS {name}_lookup ON {name} (region, transaction_type, ts)")
+            connection.execute("INSERT OR IGNORE INTO partitions (name, start_ns, end_ns) VALUES (?, ?, ?)",
+                               (name, start_ns, end_ns))
+            self._known_partitions.add(name)
+        return name
+
+    def _write_batch(self, batch: List[TransactionResult]):
+        connection = self._connection()
+        rows_by_partition: Dict[str, List[Tuple]] = {}
+        with connection:
+            for result in batch:
+                timestamp_ns = int(datetime.fromisoformat(result.timestamp).timestamp() * 1e9)
+                partition = self._ensure_partition(connection, timestamp_ns)
+                rows_by_partition.setdefault(partition, []).append((
+                    timestamp_ns, result.region, result.transaction_type, result.status_code,
+                    result.response_time_ms, int(result.success), result.error
+                ))
+            for partition, rows in rows_by_partition.items():
+                connection.executemany(f"INSERT INTO {partition} VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def add(self, result: TransactionResult):
+        """Buffer a result, handing a full batch to the writer thread"""
+        self._pending.append(result)
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Commit buffered results on the writer thread without waiting"""
+        if not self._pending:
+            return None
+        batch, self._pending = self._pending, []
+        future = self._writer.submit(self._write_batch, batch)
+        future.add_done_callback(self._log_write_error)
+        if self.retention_days and time.monotonic() - self._last_prune > 3600:
+            self._last_prune = time.monotonic()
+            cutoff_ns = time.time_ns() - int(self.retention_days * 86_400 * 1e9)
+            self._writer.submit(self.prune, cutoff_ns).add_done_callback(self._log_write_error)
+        return future
+
+    @staticmethod
+    def _log_write_error(future):
+        if future.exception() is not None:
+            logger.error(f"Failed to write probe history: {future.exception()}")
+
+    def close(self):
+        self.flush()
+        self._writer.shutdown(wait=True)
+
+    def prune(self, older_than_ns: int) -> List[str]:
+        """Drop whole partitions that end before the cutoff"""
+        connection = self._connection()
+        names = [row[0] for row in connection.execute(
+            "SELECT name FROM partitions WHERE end_ns <= ?", (older_than_ns,))]
+        with connection:
+            for name in names:
+                connection.execute(f"DROP TABLE IF EXISTS {name}")
+                connection.execute("DELETE FROM partitions WHERE name = ?", (name,))
+                self._known_partitions.discard(name)
+        return names
+
+    def rollup(self, since_ns: int, until_ns: int, region: Optional[str] = None,
+               transaction_type: Optional[str] = None, bucket_seconds: Optional[float] = None) -> List[Dict]:
+        """Availability and latency rollups for a time range, optionally bucketed"""
+        connection = self._connection()
+        partitions = [row[0] for row in connection.execute(
+            "SELECT name FROM partitions WHERE end_ns > ? AND start_ns < ? ORDER BY start_ns",
+            (since_ns, until_ns))]
+
+        conditions = ["ts >= ?", "ts < ?"]
+        params: List = [since_ns, until_ns]
+        if region:
+            conditions.insert(0, "region = ?")
+            params.insert(0, region)
+        if transaction_type:
+            conditions.insert(1 if region else 0, "transaction_type = ?")
+            params.insert(1 if region else 0, transaction_type)
+        bucket_ns = int(bucket_seconds * 1e9) if bucket_seconds else None
+        bucket_expr = f"(ts - ?) / {bucket_ns}" if bucket_ns else "0"
+
+        groups: Dict[Tuple, Dict] = {}
+        for partition in partitions:
+            query = f"""
+                SELECT region, transaction_type, {bucket_expr} AS bucket,
+                       COUNT(*), SUM(success), SUM(response_time_ms), MIN(response_time_ms), MAX(response_time_ms),
+                       SUM(transaction_type = 'financial_query' AND response_time_ms > 500)
+                FROM {partition}
+                WHERE {' AND '.join(conditions)}
+                GROUP BY region, transaction_type, bucket
+            """
+            query_params = ([since_ns] if bucket_ns else []) + params
+            for row in connection.execute(query, query_params):
+                key = row[:3]
+                count, successful, total_ms, min_ms, max_ms, violations = row[3:]
+                group = groups.get(key)
+                if group is None:
+                    groups[key] = {"count": count, "successful": successful, "total_ms": total_ms,
+                                   "min_ms": min_ms, "max_ms": max_ms, "violations": violations}
+                else:
+                    group["count"] += count
+                    group["successful"] += successful
+                    group["total_ms"] += total_ms
+                    group["min_ms"] = min(group["min_ms"], min_ms)
+                    group["max_ms"] = max(group["max_ms"], max_ms)
+                    group["violations"] += violations
+
+        rollups = []
+        for (group_region, group_type, bucket), group in sorted(groups.items()):
+            start_ns = since_ns + bucket * bucket_ns if bucket_ns else since_ns
+            end_ns = min(start_ns + bucket_ns, until_ns) if bucket_ns else until_ns
+            rollups.append({
+                "region": group_region,
+                "transaction_type": group_type,
+                "start": datetime.fromtimestamp(start_ns / 1e9, timezone.utc).isoformat(),
+                "end": datetime.fromtimestamp(end_ns / 1e9, timezone.utc).isoformat(),
+                "transactions": group["count"],
+                "successful": group["successful"],
+                "availability": group["successful"] / group["count"] * 100,
+                "avg_response_time": group["total_ms"] / group["count"],
+                "min_response_time": group["min_ms"],
+                "max_response_time": group["max_ms"],
+                "compliance_violations": group["violations"]
+            })
+        return rollups
+
+class LatencySketch:
+    """Mergeable fixed-memory latency histogram with relative-error quantiles"""
+
+    MIN_VALUE_MS = 1e-3
+
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.min = float("inf")
+        self.max = float("-inf")
+
+    def add(self, value: float, count: int = 1):
+        self.count += count
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if value <= self.MIN_VALUE_MS:
+            self.zero_count += count
+            return
+        key = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[key] = self.buckets.get(key, 0) + count
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+
+    def _collapse(self):
+        """Fold the lowest buckets together to keep memory bounded"""
+        keys = sorted(self.buckets)
+        excess = len(keys) - self.max_buckets
+        merged = sum(self.buckets.pop(key) for key in keys[:excess])
+        self.buckets[keys[excess]] += merged
+
+    def merge(self, other: "LatencySketch"):
+        """Add another sketch's counts into this one"""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return max(self.min, 0.0)
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                estimate = 2 * self._gamma ** key / (self._gamma + 1)
+                return min(max(estimate, self.min), self.max)
+        return self.max
+
+    def percentiles(self) -> Dict[str, float]:
+        return {name: self.quantile(q) for name, q in QUANTILES.items()}
+
+    def to_dict(self) -> Dict:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "count": self.count,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "zero_count": self.zero_count,
+            "buckets": {str(key): count for key, count in self.buckets.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "LatencySketch":
+        sketch = cls(relative_accuracy=data["relative_accuracy"])
+        sketch.count = data["count"]
+        if data["count"]:
+            sketch.min = data["min"]
+            sketch.max = data["max"]
+        sketch.zero_count = data["zero_count"]
+        sketch.buckets = {int(key): count for key, count in data["buckets"].items()}
+        return sketch
+
+class LatencyStats:
+    """Running counters and latency statistics for one group of results"""
+
+    def __init__(self):
+        self.total = 0
+        self.successful = 0
+        self.sum_ms = 0.0
+        self.sketch = LatencySketch()
+
+    def add(self, response_time_ms: float, success: bool):
+        self.add_outcome(success)
+        self.add_latency(response_time_ms)
+
+    def add_outcome(self, success: bool):
+        self.total += 1
+        if success:
+            self.successful += 1
+
+    def add_latency(self, response_time_ms: float):
+        self.sum_ms += response_time_ms
+        self.sketch.add(response_time_ms)
+
+    def merge(self, other: "LatencyStats"):
+        self.total += other.total
+        self.successful += other.successful
+        self.sum_ms += other.sum_ms
+        self.sketch.merge(other.sketch)
+
+    def to_dict(self) -> Dict:
+        return {
+            "total": self.total,
+            "successful": self.successful,
+            "sum_ms": self.sum_ms,
+            "sketch": self.sketch.to_dict()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "LatencyStats":
+        stats = cls()
+        stats.total = data["total"]
+        stats.successful = data["successful"]
+        stats.sum_ms = data["sum_ms"]
+        stats.sketch = LatencySketch.from_dict(data["sketch"])
+        return stats
+
+    @property
+    def success_rate(self) -> float:
+        return (self.successful / self.total) * 100 if self.total else 0.0
+
+    @property
+    def mean_ms(self) -> float:
+        return self.sum_ms / self.sketch.count if self.sketch.count else 0.0
+
+    @property
+    def min_ms(self) -> float:
+        return self.sketch.min if self.sketch.count else 0.0
+
+    @property
+    def max_ms(self) -> float:
+        return self.sketch.max if self.sketch.count else 0.0
+
+    @property
+    def median_ms(self) -> float:
+        return self.sketch.quantile(0.5)
+
+class ResultAggregator:
+    """Single-pass aggregation of transaction results into analysis metrics"""
+
+    def __init__(self):
+        self.overall = LatencyStats()
+        self.regions: Dict[str, LatencyStats] = {}
+        self.transaction_types: Dict[str, LatencyStats] = {}
+        self.region_transaction_types: Dict[Tuple[str, str], LatencyStats] = {}
+        self.financial_latency_violations = 0
+        # Circuit breaker state changes, as CircuitEvent dicts
+        self.circuit_events: List[Dict] = []
+        # ALB address changes seen by the DNS cache, as DnsChangeEvent dicts
+        self.dns_events: List[Dict] = []
+
+    @staticmethod
+    def _stats(groups: Dict, key) -> LatencyStats:
+        stats = groups.get(key)
+        if stats is None:
+            stats = groups[key] = LatencyStats()
+        return stats
+
+    def _groups(self, result: TransactionResult) -> Tuple[LatencyStats, ...]:
+        return (
+            self.overall,
+            self._stats(self.regions, result.region),
+            self._stats(self.transaction_types, result.transaction_type),
+            self._stats(self.region_transaction_types, (result.region, result.transaction_type))
+        )
+
+    def add(self, result: TransactionResult):
+        """Fold a single result into every counter it contributes to"""
+        for stats in self._groups(result):
+            stats.add_outcome(result.success)
+            if not result.provisional:
+                stats.add_latency(result.response_time_ms)
+
+        if result.transaction_type == "financial_query" and (result.provisional or result.response_time_ms > 500):
+            self.financial_latency_violations += 1
+
+    def add_latency(self, result: TransactionResult):
+        """Add the true latency of a probe whose provisional outcome was already counted"""
+        for stats in self._groups(result):
+            stats.add_latency(result.response_time_ms)
+
+    def merge(self, other: "ResultAggregator"):
+        """Combine another aggregator (another run or host) into this one"""
+        self.overall.merge(other.overall)
+        for groups, other_groups in (
+            (self.regions, other.regions),
+            (self.transaction_types, other.transaction_types),
+            (self.region_transaction_types, other.region_transaction_types),
+        ):
+            for key, stats in other_groups.items():
+                self._stats(groups, key).merge(stats)
+        self.financial_latency_violations += other.financial_latency_violations
+        self.circuit_events.extend(other.circuit_events)
+        self.dns_events.extend(other.dns_events)
+
+    def to_dict(self) -> Dict:
+        """Compact serializable form, used to ship partial aggregates between processes"""
+        return {
+            "overall": self.overall.to_dict(),
+            "regions": {key: stats.to_dict() for key, stats in self.regions.items()},
+            "transaction_types": {key: stats.to_dict() for key, stats in self.transaction_types.items()},
+            "region_transaction_types": [
+                [region, tx_type, stats.to_dict()]
+                for (region, tx_type), stats in self.region_transaction_types.items()
+            ],
+            "financial_latency_violations": self.financial_latency_violations,
+            "circuit_events": self.circuit_events,
+            "dns_events": self.dns_events
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ResultAggregator":
+        aggregator = cls()
+        aggregator.overall = LatencyStats.from_dict(data["overall"])
+        aggregator.regions = {key: LatencyStats.from_dict(stats) for key, stats in data["regions"].items()}
+        aggregator.transaction_types = {
+            key: LatencyStats.from_dict(stats) for key, stats in data["transaction_types"].items()
+        }
+        aggregator.region_transaction_types = {
+            (region, tx_type): LatencyStats.from_dict(stats)
+            for region, tx_type, stats in data["region_transaction_types"]
+        }
+        aggregator.financial_latency_violations = data["financial_latency_violations"]
+        aggregator.circuit_events = list(data.get("circuit_events", []))
+        aggregator.dns_events = list(data.get("dns_events", []))
+        return aggregator
+
+    def snapshot(self) -> Dict:
+        """Build the analysis structure from the current counters"""
+        overall = self.overall
+        if not overall.total:
+            return {"error": "No results to analyze"}
+
+        analysis = {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "total_transactions": overall.total,
+            "successful_transactions": overall.successful,
+            "failed_transactions": overall.total - overall.successful,
+            "overall_success_rate": overall.success_rate,
+            "regions": {},
+            "transaction_types": {},
+            "latency_percentiles": {},
+            "latency_sketches": {},
+            "circuit_events": list(self.circuit_events),
+            "dns_events": list(self.dns_events),
+            "sla_compliance": {},
+            "response_times": {
+                "min": overall.min_ms,
+                "max": overall.max_ms,
+                "avg": overall.mean_ms,
+                "median": overall.median_ms,
+                **overall.sketch.percentiles()
+            }
+        }
+
+        # Analyze by region
+        for region, stats in self.regions.items():
+            analysis["regions"][region] = {
+                "total": stats.total,
+                "successful": stats.successful,
+                "success_rate": stats.success_rate,
+                "avg_response_time": stats.mean_ms,
+                "percentiles": stats.sketch.percentiles(),
+                "sla_compliant": stats.success_rate >= 99.99
+            }
+
+        # Analyze by transaction type
+        for tx_type, stats in self.transaction_types.items():
+            analysis["transaction_types"][tx_type] = {
+                "total": stats.total,
+                "successful": stats.successful,
+                "success_rate": stats.success_rate,
+                "avg_response_time": stats.mean_ms,
+                "percentiles": stats.sketch.percentiles()
+            }
+
+        # Tail latency per region and transaction type, plus the mergeable sketches
+        for (region, tx_type), stats in self.region_transaction_types.items():
+            analysis["latency_percentiles"].setdefault(region, {})[tx_type] = stats.sketch.percentiles()
+            analysis["latency_sketches"].setdefault(region, {})[tx_type] = stats.sketch.to_dict()
+
+        # SLA compliance analysis
+        analysis["sla_compliance"] = {
+            "target_availability": 99.99,
+            "current_availability": analysis["overall_success_rate"],
+            "compliance_status": "COMPLIANT" if analysis["overall_success_rate"] >= 99.99 else "NON_COMPLIANT",
+            "financial_services_latency": {
+                "target_ms": 500,
+                "violations": self.financial_latency_violations
+            }
+        }
+
+        return analysis
+
+LATENCY_BUCKETS_SECONDS = (0.05, 0.1, 0.2, 0.25, 0.3, 0.4, 0.5, 0.75, 1.0, 2.0, 5.0, 10.0, 15.0, 20.0)
+
+class SyntheticMetrics:
+    """Prometheus metrics updated directly from the probe hot path"""
+
+    def __init__(self, registry: Optional[CollectorRegistry] = None):
+        self.registry = registry or CollectorRegistry()
+        self.transactions = Counter(
+            "sleek_synthetic_transactions_total",
+            "Synthetic transactions executed",
+            ["region", "transaction_type", "outcome"],
+            registry=self.registry
+        )
+        self.latency = Histogram(
+            "sleek_synthetic_transaction_duration_seconds",
+            "Synthetic transaction response time",
+            ["region", "transaction_type"],
+            buckets=LATENCY_BUCKETS_SECONDS,
+            registry=self.registry
+        )
+        self.compliance_violations = Counter(
+            "sleek_synthetic_compliance_violations_total",
+            "Financial queries exceeding the 500ms compliance limit",
+            ["region"],
+            registry=self.registry
+        )
+        self.last_success = Gauge(
+            "sleek_synthetic_last_success",
+            "Whether the most recent transaction succeeded (1) or failed (0)",
+            ["region", "transaction_type"],
+            registry=self.registry
+        )
+        self.overruns = Counter(
+            "sleek_synthetic_probe_overruns_total",
+            "Scheduled probe ticks skipped because the previous probe was still running",
+            ["region", "transaction_type"],
+            registry=self.registry
+        )
+        self.skipped = Counter(
+            "sleek_synthetic_probes_skipped_total",
+            "Probes skipped because the region's circuit breaker was open",
+            ["region", "transaction_type"],
+            registry=self.registry
+        )
+        self.circuit_state = Gauge(
+            "sleek_synthetic_circuit_state",
+            "Region circuit breaker state (0 closed, 1 half-open, 2 open)",
+            ["region"],
+            registry=self.registry
+        )
+        self.dns_changes = Counter(
+            "sleek_synthetic_dns_changes_total",
+            "Changes in the addresses a region's load balancer resolves to",
+            ["region"],
+            registry=self.registry
+        )
+        self.last_run = Gauge(
+            "sleek_synthetic_last_run_timestamp_seconds",
+            "Unix time of the last completed synthetic transaction suite",
+            registry=self.registry
+        )
+        # Labelled children are resolved once per (region, transaction type)
+        self._children: Dict[Tuple[str, str], Tuple] = {}
+
+    def _labelled(self, result: TransactionResult) -> Tuple:
+        key = (result.region, result.transaction_type)
+        children = self._children.get(key)
+        if children is None:
+            children = self._children[key] = (
+                self.transactions.labels(result.region, result.transaction_type, "success"),
+                self.transactions.labels(result.region, result.transaction_type, "failure"),
+                self.latency.labels(result.region, result.transaction_type),
+                self.last_success.labels(result.region, result.transaction_type),
+                self.compliance_violations.labels(result.region),
+            )
+        return children
+
+    def observe(self, result: TransactionResult, latency: bool = True):
+        succeeded, failed, histogram, last_success, violations = self._labelled(result)
+
+        (succeeded if result.success else failed).inc()
+        if latency:
+            histogram.observe(result.response_time_ms / 1000)
+        last_success.set(1 if result.success else 0)
+        if result.transaction_type == "financial_query" and result.response_time_ms > 500:
+            violations.inc()
+
+    def observe_latency(self, result: TransactionResult):
+        """Record the true latency of a probe whose outcome was already observed"""
+        self._labelled(result)[2].observe(result.response_time_ms / 1000)
+
+    def serve(self, port: int, addr: str = "0.0.0.0"):
+        """Expose /metrics on a background thread"""
+        start_http_server(port, addr=addr, registry=self.registry)
+        logger.info(f"Serving Prometheus metrics on http://{addr}:{port}/metrics")
+
+@dataclass
+class ProbeTarget:
+    region: RegionConfig
+    transaction_type: str
+    interval_seconds: float
+    next_tick: float = 0.0
+    in_flight: bool = False
+    ticks: int = 0
+    overruns: int = 0
+    generation: int = 0
+    removed: bool = False
+
+class ProbeScheduler:
+    """Drift-free fixed-cadence scheduler for individual probe targets"""
+
+    def __init__(self, targets: List[ProbeTarget], jitter: float = 0.1, max_concurrency: int = 20,
+                 on_overrun: Optional[Callable[[ProbeTarget, int], None]] = None):
+        self.targets = targets
+        self.jitter = jitter
+        self.on_overrun = on_overrun
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._tasks: set = set()
+        self._heap: List[Tuple[float, int, int, ProbeTarget]] = []
+        self._sequence = 0
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def _push(self, target: ProbeTarget):
+        self._sequence += 1
+        heapq.heappush(self._heap, (self._fire_time(target), self._sequence, target.generation, target))
+
+    def add(self, target: ProbeTarget):
+        """Start probing another target, at a random phase within its interval"""
+        self.targets.append(target)
+        if self._wakeup is None:
+            # Not running yet; run() schedules every target
+            return
+        target.next_tick = time.monotonic() + random.uniform(0, target.interval_seconds)
+        self._push(target)
+        self._wakeup.set()
+
+    def remove(self, target: ProbeTarget):
+        """Stop probing a target; a probe already in flight runs to completion"""
+        self.targets = [other for other in self.targets if other is not target]
+        target.removed = True
+        target.generation += 1
+
+    def reschedule(self, target: ProbeTarget, interval_seconds: float):
+        """Change a target's cadence, pulling its next tick in if the new interval is shorter"""
+        if target.removed or interval_seconds == target.interval_seconds:
+            return
+        target.interval_seconds = interval_seconds
+        target.generation += 1
+        target.next_tick = min(target.next_tick, time.monotonic() + interval_seconds)
+        self._push(target)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _fire_time(self, target: ProbeTarget) -> float:
+        return target.next_tick + random.uniform(0, self.jitter * target.interval_seconds)
+
+    def _overrun(self, target: ProbeTarget, missed: int):
+        target.overruns += missed
+        logger.warning(f"Probe {target.region.name}/{target.transaction_type} overran, "
+                       f"skipped {missed} tick(s)")
+        if self.on_overrun is not None:
+            self.on_overrun(target, missed)
+
+    async def _run_probe(self, target: ProbeTarget, probe: Callable[[ProbeTarget], Awaitable[None]]):
+        try:
+            async with self._semaphore:
+                await probe(target)
+        except Exception as e:
+            logger.error(f"Probe {target.region.name}/{target.transaction_type} failed: {e}")
+        finally:
+            target.in_flight = False
+
+    async def run(self, probe: Callable[[ProbeTarget], Awaitable[None]]):
+        """Fire ``probe`` for each target on its cadence until cancelled"""
+        self._wakeup = asyncio.Event()
+        now = time.monotonic()
+        for target in self.targets:
+            target.next_tick = now + random.uniform(0, target.interval_seconds)
+            self._push(target)
+
+        try:
+            while True:
+                if not self._heap:
+                    # Every target was removed; wait for add()
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+                fire_at, _, generation, target = self._heap[0]
+                if generation != target.generation:
+                    # Superseded by reschedule() or remove()
+                    heapq.heappop(self._heap)
+                    continue
+                delay = fire_at - time.monotonic()
+                if delay > 0:
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                heapq.heappop(self._heap)
+
+                target.ticks += 1
+                if target.in_flight:
+                    self._overrun(target, 1)
+                else:
+                    target.in_flight = True
+                    task = asyncio.create_task(self._run_probe(target, probe))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+
+                # Advance on the fixed grid, skipping ticks that are already in the past
+                target.next_tick += target.interval_seconds
+                now = time.monotonic()
+                if target.next_tick < now:
+                    missed = int((now - target.next_tick) // target.interval_seconds) + 1
+                    target.next_tick += missed * target.interval_seconds
+                    self._overrun(target, missed)
+                self._push(target)
+        finally:
+            for task in list(self._tasks):
+                task.cancel()
+            if self._tasks:
+                await asyncio.gather(*self._tasks, return_exceptions=True)
+
+@dataclass
+class CircuitEvent:
+    region: str
+    previous_state: str
+    state: str
+    reason: str
+    timestamp: str
+
+class RegionCircuitBreaker:
+    """Consecutive-failure circuit breaker for one region"""
+
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+    STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(self, region: str, failure_threshold: int = 3, cooldown_seconds: float = 60,
+                 recovery_successes: int = 2):
+        self.region = region
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.recovery_successes = recovery_successes
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.consecutive_successes = 0
+        self.opened_at = 0.0
+
+    def _transition(self, state: str, reason: str) -> CircuitEvent:
+        event = CircuitEvent(self.region, self.state, state, reason, datetime.now(timezone.utc).isoformat())
+        self.state = state
+        self.consecutive_successes = 0
+        if state == self.OPEN:
+            self.opened_at = time.monotonic()
+        elif state == self.CLOSED:
+            self.consecutive_failures = 0
+        return event
+
+    @staticmethod
+    def is_failure(result: TransactionResult) -> bool:
+        """Transport, HTTP and validation failures; latency budget violations are SLA data only"""
+        return not result.success and not result.latency_budget_exceeded
+
+    def record(self, result: TransactionResult, health_probe: bool) -> Optional[CircuitEvent]:
+        """Update the breaker with a probe outcome, returning the state change if any"""
+        if self.is_failure(result):
+            self.consecutive_failures += 1
+            self.consecutive_successes = 0
+            reason = f"{result.transaction_type} failed: {result.error or result.status_code}"
+            if self.state == self.HALF_OPEN:
+                return self._transition(self.OPEN, reason)
+            if self.state == self.CLOSED and self.consecutive_failures >= self.failure_threshold:
+                return self._transition(self.OPEN, f"{self.consecutive_failures} consecutive failures, last {reason}")
+            return None
+
+        self.consecutive_failures = 0
+        self.consecutive_successes += 1
+        if self.state == self.OPEN:
+            if health_probe and time.monotonic() - self.opened_at >= self.cooldown_seconds:
+                return self._transition(self.HALF_OPEN, "health check recovered after cooldown")
+        elif self.state == self.HALF_OPEN and self.consecutive_successes >= self.recovery_successes:
+            return self._transition(self.CLOSED, f"{self.consecutive_successes} consecutive successes")
+        return None
+
+class AdaptiveProbePolicy:
+    """Per-region probe rates and circuit breakers for continuous mode"""
+
+    HEALTH_PROBES = ("health_check", "cold_health_check")
+
+    def __init__(self, base_interval_seconds: float, degraded_interval_seconds: float = 10,
+                 failure_threshold: int = 3, cooldown_seconds: float = 60, recovery_successes: int = 2):
+        self.base_interval_seconds = base_interval_seconds
+        self.degraded_interval_seconds = min(degraded_interval_seconds, base_interval_seconds)
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.recovery_successes = recovery_successes
+        self.breakers: Dict[str, RegionCircuitBreaker] = {}
+        self.health_intervals: Dict[str, float] = {}
+
+    def breaker(self, region: str) -> RegionCircuitBreaker:
+        breaker = self.breakers.get(region)
+        if breaker is None:
+            breaker = self.breakers[region] = RegionCircuitBreaker(
+                region, self.failure_threshold, self.cooldown_seconds, self.recovery_successes
+            )
+        return breaker
+
+    def allows(self, target: ProbeTarget) -> bool:
+        """Health checks always run; other probes wait while the region's breaker is open"""
+        if target.transaction_type in self.HEALTH_PROBES:
+            return True
+        return self.breaker(target.region.name).state != RegionCircuitBreaker.OPEN
+
+    def record(self, result: TransactionResult) -> Optional[CircuitEvent]:
+        """Update the region's breaker and health check interval from a probe outcome"""
+        breaker = self.breaker(result.region)
+        event = breaker.record(result, result.transaction_type in self.HEALTH_PROBES)
+        interval = self.health_interval(result.region)
+        if breaker.is_failure(result):
+            interval = self.degraded_interval_seconds
+        elif breaker.state == RegionCircuitBreaker.CLOSED:
+            interval = min(self.base_interval_seconds, interval * 2)
+        self.health_intervals[result.region] = interval
+        return event
+
+    def health_interval(self, region: str) -> float:
+        return self.health_intervals.get(region, self.base_interval_seconds)
+
+# Latency budgets for the early compliance verdict
+LATENCY_BUDGETS_MS = {"financial_query": 500}
+
+class SyntheticTransactionEngine:
+    def __init__(self, max_results: int = 100_000, retention_seconds: Optional[float] = 24 * 3600,
+                 exporter: Optional[SegmentedResultExporter] = None,
+                 metrics: Optional[SyntheticMetrics] = None, cold_probes: bool = False,
+                 connection_limit: int = 100, connection_limit_per_host: int = 10,
+                 history: Optional[HistoryStore] = None, registry: Optional[RegionRegistry] = None,
+                 dns_cache: Optional[DnsCache] = None):
+        self.registry = registry
+        self.regions = default_regions()
+        if registry is not None:
+            registry.refresh()
+            if registry.regions:
+                self.regions = list(registry.regions.values())
+            else:
+                logger.warning(f"No region outputs match {registry.pattern}, probing the built-in regions")
+        self.dns_cache = dns_cache
+        self.results = ResultStore(capacity=max_results, retention_seconds=retention_seconds)
+        self.exporter = exporter
+        self.metrics = metrics
+        self.history = history
+        # Store sequence number of the first result not yet exported
+        self._export_sequence = 0
+        self.transactions: Dict[str, Callable[[aiohttp.ClientSession, RegionConfig], Awaitable[TransactionResult]]] = {
+            "health_check": self.perform_health_check,
+            "user_login": self.perform_user_login_simulation,
+            "financial_query": self.perform_data_query_simulation
+        }
+        if cold_probes:
+            self.transactions["cold_health_check"] = self.perform_cold_health_check
+        self.connection_limit = connection_limit
+        self.connection_limit_per_host = connection_limit_per_host
+        self._session: Optional[aiohttp.ClientSession] = None
+        # Probes past their latency budget, still running to record their true latency
+        self._late_probes: set = set()
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Return the long-lived pooled session, creating it on first use"""
+        if self._session is None or self._session.closed:
+            if self.dns_cache is not None:
+                # Addresses come pre-resolved from the DNS cache
+                for region in self.regions:
+                    self.track_dns(region)
+                await self.dns_cache.start()
+                connector = aiohttp.TCPConnector(
+                    limit=self.connection_limit,
+                    limit_per_host=self.connection_limit_per_host,
+                    resolver=self.dns_cache,
+                    use_dns_cache=False,
+                    keepalive_timeout=75
+                )
+            else:
+                connector = aiohttp.TCPConnector(
+                    limit=self.connection_limit,
+                    limit_per_host=self.connection_limit_per_host,
+                    ttl_dns_cache=300,
+                    keepalive_timeout=75
+                )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=30),
+                trace_configs=[build_trace_config()]
+            )
+        return self._session
+
+    async def drain_late_probes(self):
+        """Wait for probes that already have an early verdict to record their true latency"""
+        if self._late_probes:
+            await asyncio.gather(*self._late_probes, return_exceptions=True)
+
+    async def close(self):
+        for task in list(self._late_probes):
+            task.cancel()
+        await self.drain_late_probes()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        if self.dns_cache is not None:
+            await self.dns_cache.close()
+
+    def track_dns(self, region: RegionConfig) -> Optional[str]:
+        """Have the DNS cache keep the region's endpoint resolved"""
+        host = DnsCache.host_of(region.endpoint)
+        if host is not None:
+            self.dns_cache.track(host, region.name)
+        return host
         
-    async def perform_health_check(self, session: aiohttp.ClientSession, region: RegionConfig) -> TransactionResult:
+    async def perform_health_check(self, session: aiohttp.ClientSession, region: RegionConfig,
+                                   transaction_type: str = "health_check") -> TransactionResult:
         """Perform basic health check"""
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         timestamp = datetime.now(timezone.utc).isoformat()
+        timings = PhaseTimings()
         
         try:
-            async with session.get(f"{region.endpoint}/health", timeout=aiohttp.ClientTimeout(total=10)) as response:
-                end_time = time.time()
-                response_time = (end_time - start_time) * 1000  # Convert to milliseconds
+            async with session.get(
+                f"{region.endpoint}/health",
+                timeout=aiohttp.ClientTimeout(total=10),
+                trace_request_ctx=timings
+            ) as response:
+                response_time = (time.perf_counter_ns() - start_ns) / 1e6  # Convert to milliseconds
                 
                 success = response.status == 200
                 
                 return TransactionResult(
                     region=region.name,
-                    transaction_type="health_check",
+                    transaction_type=transaction_type,
                     status_code=response.status,
                     response_time_ms=response_time,
                     success=success,
-                    timestamp=timestamp
+                    timestamp=timestamp,
+                    **timings.as_fields()
                 )
                 
         except Exception as e:
-            end_time = time.time()
-            response_time = (end_time - start_time) * 1000
+            response_time = (time.perf_counter_ns() - start_ns) / 1e6
             
             return TransactionResult(
                 region=region.name,
-                transaction_type="health_check",
+                transaction_type=transaction_type,
                 status_code=0,
                 response_time_ms=response_time,
                 success=False,
                 timestamp=timestamp,
-                error=str(e)
+                error=str(e),
+                **timings.as_fields()
             )
 
     async def perform_user_login_simulation(self, session: aiohttp.ClientSession, region: RegionConfig) -> TransactionResult:
         """Simulate user login transaction"""
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         timestamp = datetime.now(timezone.utc).isoformat()
+        timings = PhaseTimings()
         
         try:
             # Simulate POST login request
@@ -105,10 +1676,10 @@ class SyntheticTransactionEngine:
             async with session.post(
                 f"{region.endpoint}/api/auth/login",
                 json=login_data,
-                timeout=aiohttp.ClientTimeout(total=15)
+                timeout=aiohttp.ClientTimeout(total=15),
+                trace_request_ctx=timings
             ) as response:
-                end_time = time.time()
-                response_time = (end_time - start_time) * 1000
+                response_time = (time.perf_counter_ns() - start_ns) / 1e6
                 
                 # For synthetic testing, accept various response codes as "successful"
                 success = response.status in [200, 201, 401, 404]  # 401/404 expected for synthetic endpoints
@@ -119,12 +1690,12 @@ class SyntheticTransactionEngine:
                     status_code=response.status,
                     response_time_ms=response_time,
                     success=success,
-                    timestamp=timestamp
+                    timestamp=timestamp,
+                    **timings.as_fields()
                 )
                 
         except Exception as e:
-            end_time = time.time()
-            response_time = (end_time - start_time) * 1000
+            response_time = (time.perf_counter_ns() - start_ns) / 1e6
             
             return TransactionResult(
                 region=region.name,
@@ -133,13 +1704,15 @@ class SyntheticTransactionEngine:
                 response_time_ms=response_time,
                 success=False,
                 timestamp=timestamp,
-                error=str(e)
+                error=str(e),
+                **timings.as_fields()
             )
 
     async def perform_data_query_simulation(self, session: aiohttp.ClientSession, region: RegionConfig) -> TransactionResult:
         """Simulate financial data query transaction"""
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         timestamp = datetime.now(timezone.utc).isoformat()
+        timings = PhaseTimings()
         
         try:
             # Simulate financial services data query
@@ -153,13 +1726,13 @@ class SyntheticTransactionEngine:
             async with session.get(
                 f"{region.endpoint}/api/financial/transactions",
                 params=query_params,
-                timeout=aiohttp.ClientTimeout(total=20)
+                timeout=aiohttp.ClientTimeout(total=20),
+                trace_request_ctx=timings
             ) as response:
-                end_time = time.time()
-                response_time = (end_time - start_time) * 1000
+                response_time = (time.perf_counter_ns() - start_ns) / 1e6
                 
                 # Check if response time meets financial services requirements (< 500ms)
-                compliance_check = response_time < 500
+                compliance_check = response_time < LATENCY_BUDGETS_MS["financial_query"]
                 success = response.status in [200, 404] and compliance_check
                 
                 return TransactionResult(
@@ -169,12 +1742,13 @@ class SyntheticTransactionEngine:
                     response_time_ms=response_time,
                     success=success,
                     timestamp=timestamp,
-                    error=None if compliance_check else f"Response time {response_time:.2f}ms exceeds 500ms compliance limit"
+                    error=None if compliance_check else f"Response time {response_time:.2f}ms exceeds 500ms compliance limit",
+                    latency_budget_exceeded=not compliance_check,
+                    **timings.as_fields()
                 )
                 
         except Exception as e:
-            end_time = time.time()
-            response_time = (end_time - start_time) * 1000
+            response_time = (time.perf_counter_ns() - start_ns) / 1e6
             
             return TransactionResult(
                 region=region.name,
@@ -183,174 +1757,848 @@ class SyntheticTransactionEngine:
                 response_time_ms=response_time,
                 success=False,
                 timestamp=timestamp,
-                error=str(e)
+                error=str(e),
+                **timings.as_fields()
             )
 
+    async def perform_cold_health_check(self, session: aiohttp.ClientSession, region: RegionConfig) -> TransactionResult:
+        """Perform a health check over a fresh connection with no DNS cache or keep-alive"""
+        connector = aiohttp.TCPConnector(force_close=True, use_dns_cache=False)
+        async with aiohttp.ClientSession(connector=connector, trace_configs=[build_trace_config()]) as cold_session:
+            return await self.perform_health_check(cold_session, region, transaction_type="cold_health_check")
+
     async def run_synthetic_transactions(self) -> Dict:
         """Run all synthetic transactions across all regions"""
-        connector = aiohttp.TCPConnector(limit=100, limit_per_host=10)
-        timeout = aiohttp.ClientTimeout(total=30)
+        session = await self.get_session()
         
-        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
-            tasks = []
-            
-            # Create tasks for all regions and transaction types
-            for region in self.regions:
-                tasks.extend([
-                    self.perform_health_check(session, region),
-                    self.perform_user_login_simulation(session, region),
-                    self.perform_data_query_simulation(session, region)
-                ])
-            
-            # Execute all tasks concurrently
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            # Process results
-            valid_results = []
-            for result in results:
-                if isinstance(result, TransactionResult):
-                    valid_results.append(result)
-                    self.results.append(result)
-                else:
-                    logger.error(f"Task failed with exception: {result}")
-            
-            return self.analyze_results(valid_results)
-
-    def analyze_results(self, results: List[TransactionResult]) -> Dict:
-        """Analyze transaction results and generate metrics"""
-        if not results:
-            return {"error": "No results to analyze"}
+        aggregator = ResultAggregator()
         
-        analysis = {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "total_transactions": len(results),
-            "successful_transactions": sum(1 for r in results if r.success),
-            "failed_transactions": sum(1 for r in results if not r.success),
-            "overall_success_rate": (sum(1 for r in results if r.success) / len(results)) * 100,
-            "regions": {},
-            "transaction_types": {},
-            "sla_compliance": {},
-            "response_times": {
-                "min": min(r.response_time_ms for r in results),
-                "max": max(r.response_time_ms for r in results),
-                "avg": statistics.mean(r.response_time_ms for r in results),
-                "median": statistics.median(r.response_time_ms for r in results)
-            }
-        }
+        # Create tasks for all regions and transaction types
+        tasks = [
+            self.run_probe(session, region, transaction_type, on_late=aggregator.add_latency)
+            for region in self.regions
+            for transaction_type in self.transactions
+        ]
         
-        # Analyze by region
-        for region in set(r.region for r in results):
-            region_results = [r for r in results if r.region == region]
-            region_success_rate = (sum(1 for r in region_results if r.success) / len(region_results)) * 100
-            
-            analysis["regions"][region] = {
-                "total": len(region_results),
-                "successful": sum(1 for r in region_results if r.success),
-                "success_rate": region_success_rate,
-                "avg_response_time": statistics.mean(r.response_time_ms for r in region_results),
-                "sla_compliant": region_success_rate >= 99.99
-            }
+        # Execute all tasks concurrently, folding each result in as it completes
+        for completed in asyncio.as_completed(tasks):
+            try:
+                result = await completed
+            except Exception as e:
+                logger.error(f"Task failed with exception: {e}")
+                continue
+            self.record_result(result, aggregator)
         
-        # Analyze by transaction type
-        for tx_type in set(r.transaction_type for r in results):
-            tx_results = [r for r in results if r.transaction_type == tx_type]
-            tx_success_rate = (sum(1 for r in tx_results if r.success) / len(tx_results)) * 100
-            
-            analysis["transaction_types"][tx_type] = {
-                "total": len(tx_results),
-                "successful": sum(1 for r in tx_results if r.success),
-                "success_rate": tx_success_rate,
-                "avg_response_time": statistics.mean(r.response_time_ms for r in tx_results)
-            }
+        # Probes past their budget add their true latency when they finish
+        await self.drain_late_probes()
         
-        # SLA compliance analysis
-        analysis["sla_compliance"] = {
-            "target_availability": 99.99,
-            "current_availability": analysis["overall_success_rate"],
-            "compliance_status": "COMPLIANT" if analysis["overall_success_rate"] >= 99.99 else "NON_COMPLIANT",
-            "financial_services_latency": {
-                "target_ms": 500,
-                "violations": len([r for r in results if r.transaction_type == "financial_query" and r.response_time_ms > 500])
-            }
+        if self.metrics is not None:
+            self.metrics.last_run.set_to_current_time()
+        
+        return self.analyze_results(aggregator)
+
+    async def run_probe(self, session: aiohttp.ClientSession, region: RegionConfig, transaction_type: str,
+                        on_late: Optional[Callable[[TransactionResult], None]] = None) -> TransactionResult:
+        """Run one transaction, returning a provisional failure once it passes its latency budget"""
+        perform = self.transactions[transaction_type]
+        budget_ms = LATENCY_BUDGETS_MS.get(transaction_type)
+        if budget_ms is None:
+            return await perform(session, region)
+
+        timestamp = datetime.now(timezone.utc).isoformat()
+        start_ns = time.perf_counter_ns()
+        budget_ns = int(budget_ms * 1e6)
+        task = asyncio.create_task(perform(session, region))
+        try:
+            while not task.done():
+                remaining_ns = budget_ns - (time.perf_counter_ns() - start_ns)
+                if remaining_ns < 0:
+                    break
+                await asyncio.wait({task}, timeout=remaining_ns / 1e9)
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+        if task.done():
+            return task.result()
+
+        self._late_probes.add(task)
+        task.add_done_callback(functools.partial(self._finish_late_probe, on_late))
+        elapsed_ms = (time.perf_counter_ns() - start_ns) / 1e6
+        return TransactionResult(
+            region=region.name,
+            transaction_type=transaction_type,
+            status_code=0,
+            response_time_ms=elapsed_ms,
+            success=False,
+            timestamp=timestamp,
+            error=f"No response within the {budget_ms}ms latency budget",
+            provisional=True
+        )
+
+    def _finish_late_probe(self, on_late: Optional[Callable[[TransactionResult], None]], task: asyncio.Task):
+        self._late_probes.discard(task)
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            logger.error(f"Late probe failed with exception: {task.exception()}")
+            return
+        result = task.result()
+        logger.debug(f"Late {result.transaction_type} probe of {result.region} finished "
+                     f"after {result.response_time_ms:.2f}ms")
+        self.record_details(result)
+        if self.metrics is not None:
+            self.metrics.observe_latency(result)
+        if on_late is not None:
+            on_late(result)
+
+    def record_result(self, result: TransactionResult, aggregator: ResultAggregator):
+        """Fold a completed transaction into the aggregate, store and metrics"""
+        aggregator.add(result)
+        if self.metrics is not None:
+            self.metrics.observe(result, latency=not result.provisional)
+        if not result.provisional:
+            self.record_details(result)
+
+    def record_details(self, result: TransactionResult):
+        self.results.append(result)
+        if self.history is not None:
+            self.history.add(result)
+
+    def apply_policy(self, policy: AdaptiveProbePolicy, result: TransactionResult, aggregator: ResultAggregator,
+                     scheduler: ProbeScheduler, health_target: Optional[ProbeTarget]):
+        """Feed a result to the adaptive policy and act on breaker and cadence changes"""
+        event = policy.record(result)
+        if event is not None:
+            logger.warning(f"Circuit for {event.region} {event.previous_state} -> {event.state}: {event.reason}")
+            aggregator.circuit_events.append(asdict(event))
+            if self.metrics is not None:
+                self.metrics.circuit_state.labels(event.region).set(RegionCircuitBreaker.STATE_VALUES[event.state])
+        if health_target is not None:
+            interval = policy.health_interval(result.region)
+            if interval != health_target.interval_seconds:
+                logger.debug(f"Health checking {result.region} every {interval:.0f}s")
+                scheduler.reschedule(health_target, interval)
+
+    def build_probe_targets(self, interval_seconds: float) -> List[ProbeTarget]:
+        return [
+            ProbeTarget(region, transaction_type, interval_seconds)
+            for region in self.regions
+            for transaction_type in self.transactions
+        ]
+
+    async def apply_region_change(self, change: RegionChange, scheduler: ProbeScheduler, interval_seconds: float,
+                                  health_targets: Dict[str, ProbeTarget]):
+        """Start and stop probing regions as the registry adds and removes them"""
+        added_names = {region.name for region in change.added}
+        replaced = [region for region in self.regions if region.name in added_names]
+        for region in change.removed + replaced:
+            self.regions = [other for other in self.regions if other is not region]
+            for target in [target for target in scheduler.targets if target.region is region]:
+                scheduler.remove(target)
+            health_targets.pop(region.name, None)
+            if self.dns_cache is not None:
+                host = DnsCache.host_of(region.endpoint)
+                if host is not None:
+                    self.dns_cache.untrack(host)
+
+        if self.dns_cache is not None:
+            for region, previous_endpoint in change.changed:
+                previous_host = DnsCache.host_of(previous_endpoint)
+                if previous_host is not None:
+                    self.dns_cache.untrack(previous_host)
+            for region in change.added + [region for region, _ in change.changed]:
+                self.track_dns(region)
+            await self.dns_cache.prime()
+
+        for region in change.added:
+            self.regions.append(region)
+            for transaction_type in self.transactions:
+                target = ProbeTarget(region, transaction_type, interval_seconds)
+                scheduler.add(target)
+                if transaction_type == "health_check":
+                    health_targets[region.name] = target
+        logger.info(f"Probing {len(self.regions)} region(s): {', '.join(region.name for region in self.regions)}")
+
+    async def run_scheduled(self, interval_seconds: float = 60, report_interval_seconds: float = 60,
+                            jitter: float = 0.1, max_concurrency: int = 20,
+                            on_report: Optional[Callable[[Dict], None]] = None,
+                            on_window: Optional[Callable[[int, ResultAggregator], None]] = None,
+                            targets: Optional[List[ProbeTarget]] = None,
+                            policy: Optional[AdaptiveProbePolicy] = None,
+                            region_reload_seconds: float = 10):
+        """Probe every target on its own cadence and report on a fixed period"""
+        session = await self.get_session()
+        window = ResultAggregator()
+        targets = targets or self.build_probe_targets(interval_seconds)
+        health_targets = {
+            target.region.name: target for target in targets if target.transaction_type == "health_check"
         }
+
+        def add_late_latency(result: TransactionResult):
+            # Counted in the window the probe finished in
+            window.add_latency(result)
+            # The breaker judges a late probe by its final outcome rather than the provisional verdict
+            if policy is not None:
+                self.apply_policy(policy, result, window, scheduler, health_targets.get(result.region))
+
+        def on_overrun(target: ProbeTarget, missed: int):
+            if self.metrics is not None:
+                self.metrics.overruns.labels(target.region.name, target.transaction_type).inc(missed)
+
+        async def probe(target: ProbeTarget):
+            if policy is not None and not policy.allows(target):
+                if self.metrics is not None:
+                    self.metrics.skipped.labels(target.region.name, target.transaction_type).inc()
+                return
+            result = await self.run_probe(session, target.region, target.transaction_type, on_late=add_late_latency)
+            self.record_result(result, window)
+            if policy is not None and not result.provisional:
+                self.apply_policy(policy, result, window, scheduler, health_targets.get(result.region))
+
+        def on_dns_change(event: DnsChangeEvent):
+            window.dns_events.append(asdict(event))
+            if self.metrics is not None:
+                self.metrics.dns_changes.labels(event.region or event.host).inc()
+
+        scheduler = ProbeScheduler(
+            targets,
+            jitter=jitter,
+            max_concurrency=max_concurrency,
+            on_overrun=on_overrun
+        )
+        def report_window(window_id: int, completed: ResultAggregator):
+            if self.metrics is not None:
+                self.metrics.last_run.set_to_current_time()
+            try:
+                if on_window is not None:
+                    on_window(window_id, completed)
+                if on_report is not None:
+                    on_report(self.analyze_results(completed))
+            except Exception as e:
+                logger.error(f"Error reporting synthetic results: {e}")
+
+        background = [asyncio.create_task(scheduler.run(probe))]
+        if self.registry is not None and region_reload_seconds > 0:
+            background.append(asyncio.create_task(self.registry.watch(
+                region_reload_seconds,
+                lambda change: self.apply_region_change(change, scheduler, interval_seconds, health_targets)
+            )))
+        if self.dns_cache is not None:
+            self.dns_cache.listeners.append(on_dns_change)
+        # Windows end on wall-clock multiples of the report interval, so the windows of
+        # sharded workers line up and are identified by the same id
+        window_id = int(time.time() // report_interval_seconds)
+        try:
+            while True:
+                await asyncio.sleep(max(0.0, (window_id + 1) * report_interval_seconds - time.time()))
+                completed, window = window, ResultAggregator()
+                report_window(window_id, completed)
+                window_id += 1
+        finally:
+            for task in background:
+                task.cancel()
+            await asyncio.gather(*background, return_exceptions=True)
+            if self.dns_cache is not None:
+                self.dns_cache.listeners.remove(on_dns_change)
+            # Report whatever completed in the final partial window
+            if window.overall.total:
+                report_window(window_id, window)
+
+    def analyze_results(self, results: Union[ResultAggregator, Iterable[TransactionResult]]) -> Dict:
+        """Analyze transaction results and generate metrics"""
+        if not isinstance(results, ResultAggregator):
+            aggregator = ResultAggregator()
+            for result in results:
+                aggregator.add(result)
+            results = aggregator
         
-        return analysis
+        return results.snapshot()
 
-    def export_results(self, analysis: Dict, format_type: str = "json"):
-        """Export results to various formats"""
+    def export_results(self, analysis: Dict, format_type: str = "json", include_details: bool = True):
+        """Export the run summary and append new transaction records"""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
         if format_type == "json":
             filename = f"synthetic_results_{timestamp}.json"
-            with open(filename, 'w') as f:
+            with open(f"{filename}.tmp", 'w') as f:
                 json.dump(analysis, f, indent=2)
+            os.replace(f"{filename}.tmp", filename)
             logger.info(f"Results exported to {filename}")
         
-        # Export individual transaction results
-        csv_filename = f"transaction_details_{timestamp}.csv"
-        with open(csv_filename, 'w') as f:
-            f.write("timestamp,region,transaction_type,status_code,response_time_ms,success,error\n")
-            for result in self.results:
-                f.write(f"{result.timestamp},{result.region},{result.transaction_type},"
-                       f"{result.status_code},{result.response_time_ms:.2f},{result.success},"
-                       f"\"{result.error or ''}\"\n")
-        logger.info(f"Transaction details exported to {csv_filename}")
+        if include_details:
+            self.export_details()
+
+    def export_details(self) -> int:
+        """Append only the transactions recorded since the previous export"""
+        if self.exporter is None:
+            self.exporter = SegmentedResultExporter()
+        missed = self.results.first_sequence - self._export_sequence
+        if missed > 0:
+            logger.warning(f"{missed} transaction details left the result store before they were exported")
+        sequence = self.results.next_sequence
+        written = self.exporter.append(self.results.since(self._export_sequence))
+        self._export_sequence = sequence
+        logger.info(f"Appended {written} transaction details to {self.exporter.directory}")
+        return written
+
+def _run_shard_worker(config: Dict, partials, stop_event):
+    """Entry point of a sharded probe worker process"""
+    # Ctrl+C reaches the whole process group; the coordinator drives shutdown
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Records go back to the coordinator, which owns the log file and its rotation
+    root = logging.getLogger()
+    root.addHandler(logging.handlers.QueueHandler(config["log_queue"]))
+    root.setLevel(config["log_level"])
+    if config["uvloop"]:
+        try:
+            import uvloop
+            uvloop.install()
+        except ImportError:
+            logger.warning("uvloop is not installed, using the default event loop")
+    asyncio.run(_shard_worker_main(config, partials, stop_event))
+
+async def _shard_worker_main(config: Dict, partials, stop_event):
+    shard = config["shard"]
+    exporter = SegmentedResultExporter(prefix=f"transaction_details_shard{shard}", **config["exporter"])
+    history = HistoryStore(**config["history"]) if config["history"] else None
+    regions = {region["name"]: RegionConfig(**region) for region, _ in config["targets"]}
+    # Each worker follows endpoint changes of its own regions
+    registry = RegionRegistry(**config["registry"], regions=regions.values()) if config["registry"] else None
+    dns_cache = DnsCache(config["dns_refresh_seconds"]) if config["dns_refresh_seconds"] else None
+    engine = SyntheticTransactionEngine(exporter=exporter, history=history, registry=registry, dns_cache=dns_cache,
+                                        **config["engine"])
+    if config["metrics_port"]:
+        engine.metrics = SyntheticMetrics()
+        engine.metrics.serve(config["metrics_port"] + shard)
+    targets = [
+        ProbeTarget(regions[region["name"]], transaction_type, config["interval_seconds"])
+        for region, transaction_type in config["targets"]
+    ]
+
+    policy = None
+    if config["adaptive"]:
+        policy = AdaptiveProbePolicy(config["interval_seconds"], **config["adaptive"])
+
+    def on_window(window_id: int, aggregator: ResultAggregator):
+        partials.put((shard, window_id, aggregator.to_dict()))
+        engine.export_details()
+        if history is not None:
+            history.flush()
+
+    task = asyncio.create_task(engine.run_scheduled(
+        interval_seconds=config["interval_seconds"],
+        report_interval_seconds=config["report_interval_seconds"],
+        jitter=config["jitter"],
+        max_concurrency=config["max_concurrency"],
+        on_window=on_window,
+        targets=targets,
+        policy=policy,
+        region_reload_seconds=config["region_reload_seconds"]
+    ))
+    try:
+        while not stop_event.is_set() and not task.done():
+            await asyncio.sleep(0.5)
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        engine.export_details()
+        exporter.close()
+        if history is not None:
+            history.close()
+        await engine.close()
+
+class ShardedProbeRunner:
+    """Split probe targets across worker processes and merge their aggregates"""
+
+    def __init__(self, engine: "SyntheticTransactionEngine", workers: int, interval_seconds: float = 60,
+                 report_interval_seconds: float = 60, jitter: float = 0.1, max_concurrency: int = 20,
+                 use_uvloop: bool = False, metrics_port: int = 0, exporter_options: Optional[Dict] = None,
+                 history_options: Optional[Dict] = None, adaptive_options: Optional[Dict] = None,
+                 region_reload_seconds: float = 10):
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.engine = engine
+        self.workers = workers
+        self.interval_seconds = interval_seconds
+        self.report_interval_seconds = report_interval_seconds
+        self.jitter = jitter
+        self.max_concurrency = max_concurrency
+        self.use_uvloop = use_uvloop
+        self.metrics_port = metrics_port
+        self.exporter_options = exporter_options or {}
+        self.history_options = history_options
+        self.adaptive_options = adaptive_options
+        self.region_reload_seconds = region_reload_seconds
+
+    def shard_targets(self) -> List[List[Tuple[Dict, str]]]:
+        """Deal whole regions round-robin so each region's circuit breaker lives in one worker"""
+        shards: List[List[Tuple[Dict, str]]] = [[] for _ in range(self.workers)]
+        regions = {region.name: index for index, region in enumerate(self.engine.regions)}
+        for target in self.engine.build_probe_targets(self.interval_seconds):
+            shard = regions[target.region.name] % self.workers
+            shards[shard].append((asdict(target.region), target.transaction_type))
+        return [shard for shard in shards if shard]
+
+    async def run(self, on_report: Callable[[Dict], None],
+                  on_window: Optional[Callable[[int, ResultAggregator], None]] = None):
+        context = multiprocessing.get_context("spawn")
+        partials = context.Queue()
+        stop_event = context.Event()
+        log_queue = context.Queue()
+        root = logging.getLogger()
+        log_forwarder = logging.handlers.QueueListener(log_queue, *root.handlers, respect_handler_level=True)
+        log_forwarder.start()
+        registry = self.engine.registry
+        registry_options = {"pattern": registry.pattern, "scheme": registry.scheme} if registry else None
+        processes = []
+        for shard, targets in enumerate(self.shard_targets()):
+            config = {
+                "shard": shard,
+                "targets": targets,
+                "interval_seconds": self.interval_seconds,
+                "report_interval_seconds": self.report_interval_seconds,
+                "jitter": self.jitter,
+                "max_concurrency": self.max_concurrency,
+                "uvloop": self.use_uvloop,
+                "metrics_port": self.metrics_port,
+                "engine": {
+                    "max_results": self.engine.results.capacity,
+                    "connection_limit": self.engine.connection_limit,
+                    "connection_limit_per_host": self.engine.connection_limit_per_host,
+                    "cold_probes": "cold_health_check" in self.engine.transactions
+                },
+                "exporter": self.exporter_options,
+                "history": self.history_options,
+                "adaptive": self.adaptive_options,
+                "registry": registry_options,
+                "region_reload_seconds": self.region_reload_seconds,
+                "dns_refresh_seconds": self.engine.dns_cache.refresh_seconds if self.engine.dns_cache else 0,
+                "log_queue": log_queue,
+                "log_level": root.getEffectiveLevel()
+            }
+            process = context.Process(target=_run_shard_worker, args=(config, partials, stop_event),
+                                      name=f"synthetic-shard-{shard}", daemon=True)
+            process.start()
+            processes.append(process)
+        logger.info(f"Started {len(processes)} probe worker processes")
+
+        # Partials are merged per worker window; a window is reported once every live worker has
+        # sent it, or one report interval after it ended
+        pending: Dict[int, Tuple[ResultAggregator, set]] = {}
+        last_reported = int(time.time() // self.report_interval_seconds) - 1
+        dead_reported: set = set()
+
+        def collect():
+            nonlocal last_reported
+            while True:
+                try:
+                    shard, window_id, partial = partials.get_nowait()
+                except queue.Empty:
+                    return
+                if window_id <= last_reported:
+                    logger.warning(f"Dropping window {window_id} from worker {shard}, which arrived after "
+                                   f"the window was reported")
+                    continue
+                merged, shards_reported = pending.setdefault(window_id, (ResultAggregator(), set()))
+                merged.merge(ResultAggregator.from_dict(partial))
+                shards_reported.add(shard)
+
+        def report_ready(flush: bool = False):
+            nonlocal last_reported
+            live = {shard for shard, process in enumerate(processes) if process.is_alive()}
+            for window_id in sorted(pending):
+                merged, shards_reported = pending[window_id]
+                overdue = time.time() >= (window_id + 2) * self.report_interval_seconds
+                if not (flush or overdue or live <= shards_reported):
+                    break
+                del pending[window_id]
+                last_reported = window_id
+                logger.debug(f"Merged window {window_id} from {len(shards_reported)} worker(s)")
+                try:
+                    if on_window is not None:
+                        on_window(window_id, merged)
+                    on_report(self.engine.analyze_results(merged))
+                except Exception as e:
+                    logger.error(f"Error reporting synthetic results: {e}")
+
+        try:
+            while True:
+                await asyncio.sleep(min(1.0, self.report_interval_seconds / 4))
+                collect()
+                dead = {process.name for process in processes if not process.is_alive()} - dead_reported
+                if dead:
+                    logger.error(f"Probe workers exited unexpectedly: {', '.join(sorted(dead))}")
+                    dead_reported |= dead
+                report_ready()
+        finally:
+            stop_event.set()
+            collect()
+            for process in processes:
+                process.join(timeout=10)
+                if process.is_alive():
+                    process.terminate()
+            # Windows the workers finished before stopping
+            collect()
+            report_ready(flush=True)
+            log_forwarder.stop()
+
+class LoadGenerator:
+    """Open-loop load generator driving a target request rate per region"""
+
+    def __init__(self, engine: "SyntheticTransactionEngine", rate_per_region: float, duration_seconds: float,
+                 arrival: str = "constant", transaction_types: Optional[List[str]] = None,
+                 max_in_flight: int = 1000, progress_interval_seconds: float = 5):
+        if rate_per_region <= 0:
+            raise ValueError("rate_per_region must be positive")
+        if arrival not in ("constant", "poisson"):
+            raise ValueError(f"Unsupported arrival process: {arrival}")
+        self.engine = engine
+        self.rate_per_region = rate_per_region
+        self.duration_seconds = duration_seconds
+        self.arrival = arrival
+        self.transaction_types = transaction_types or list(engine.transactions)
+        self.max_in_flight = max_in_flight
+        self.progress_interval_seconds = progress_interval_seconds
+        self.service_time = ResultAggregator()
+        self.response_time = ResultAggregator()
+        self.offered = 0
+        self.dropped = 0
+        self.completed = 0
+        self._in_flight: set = set()
+
+    def _interarrival(self) -> float:
+        if self.arrival == "poisson":
+            return random.expovariate(self.rate_per_region)
+        return 1.0 / self.rate_per_region
+
+    async def _issue(self, session: aiohttp.ClientSession, region: RegionConfig, transaction_type: str,
+                     intended_start: float):
+        result = await self.engine.transactions[transaction_type](session, region)
+        corrected_ms = (time.perf_counter() - intended_start) * 1000
+        self.engine.record_result(result, self.service_time)
+        self.response_time.add(replace(result, response_time_ms=corrected_ms))
+        self.completed += 1
+
+    async def _drive(self, session: aiohttp.ClientSession, region: RegionConfig, start: float, end: float):
+        intended = start + random.uniform(0, self._interarrival())
+        sequence = 0
+        while intended < end:
+            delay = intended - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            self.offered += 1
+            if len(self._in_flight) >= self.max_in_flight:
+                self.dropped += 1
+            else:
+                transaction_type = self.transaction_types[sequence % len(self.transaction_types)]
+                sequence += 1
+                task = asyncio.create_task(self._issue(session, region, transaction_type, intended))
+                self._in_flight.add(task)
+                task.add_done_callback(self._in_flight.discard)
+            intended += self._interarrival()
+
+    async def _report_progress(self, start: float):
+        while True:
+            await asyncio.sleep(self.progress_interval_seconds)
+            elapsed = time.perf_counter() - start
+            overall = self.response_time.overall
+            logger.info(
+                f"Load progress: {elapsed:.0f}s offered={self.offered} completed={self.completed} "
+                f"in_flight={len(self._in_flight)} dropped={self.dropped} "
+                f"rate={self.completed / elapsed:.1f}/s success={overall.success_rate:.2f}% "
+                f"p99={overall.sketch.quantile(0.99):.2f}ms"
+            )
+
+    async def run(self) -> Dict:
+        """Drive load for the configured duration and return the analysis"""
+        session = await self.engine.get_session()
+        start = time.perf_counter()
+        end = start + self.duration_seconds
+        progress = asyncio.create_task(self._report_progress(start))
+        try:
+            await asyncio.gather(*(self._drive(session, region, start, end) for region in self.engine.regions))
+            if self._in_flight:
+                await asyncio.gather(*list(self._in_flight), return_exceptions=True)
+        finally:
+            progress.cancel()
+            for task in list(self._in_flight):
+                task.cancel()
+        elapsed = time.perf_counter() - start
+
+        return {
+            "mode": "load",
+            "arrival": self.arrival,
+            "target_rate_per_region": self.rate_per_region,
+            "duration_seconds": elapsed,
+            "offered_requests": self.offered,
+            "completed_requests": self.completed,
+            "dropped_requests": self.dropped,
+            "achieved_rate": self.completed / elapsed if elapsed else 0.0,
+            "response_time": self.engine.analyze_results(self.response_time),
+            "service_time": self.engine.analyze_results(self.service_time)
+        }
+
+# Worker metrics ports listed in the sleek-synthetic-monitor scrape job
+MAX_SCRAPED_WORKERS = 8
+
+def exporter_options(args) -> Dict:
+    return {
+        "directory": args.export_dir,
+        "max_bytes": int(args.segment_max_mb * 1024 * 1024),
+        "max_age_seconds": args.segment_max_minutes * 60,
+        "compression": args.segment_compression
+    }
+
+def history_options(args) -> Optional[Dict]:
+    if not args.history_db:
+        return None
+    return {"path": args.history_db, "retention_days": args.history_retention_days}
+
+def adaptive_options(args) -> Optional[Dict]:
+    if not args.adaptive:
+        return None
+    return {
+        "degraded_interval_seconds": args.degraded_interval,
+        "failure_threshold": args.failure_threshold,
+        "cooldown_seconds": args.breaker_cooldown
+    }
+
+async def run_continuous(engine: SyntheticTransactionEngine, args):
+    """Probe every target on its own cadence and report each interval"""
+    # Every interval folded together, for the summary written on shutdown
+    cumulative = ResultAggregator()
+    # Sharded workers export their own transaction details and history
+    sharded = args.workers > 1
+
+    def add_window(window_id: int, completed: ResultAggregator):
+        cumulative.merge(completed)
+
+    def report(analysis: Dict):
+        if "error" in analysis:
+            logger.warning(f"No transactions completed in the last {args.interval:.0f}s")
+            return
+        
+        # Log key metrics
+        logger.info(f"Overall success rate: {analysis['overall_success_rate']:.2f}%")
+        logger.info(f"Average response time: {analysis['response_times']['avg']:.2f}ms")
+        logger.info(f"p99 response time: {analysis['response_times']['p99']:.2f}ms")
+        logger.info(f"SLA compliance: {analysis['sla_compliance']['compliance_status']}")
+        if analysis["circuit_events"]:
+            logger.info(f"Circuit breaker changes this interval: {len(analysis['circuit_events'])}")
+        if analysis["dns_events"]:
+            logger.info(f"Load balancer address changes this interval: {len(analysis['dns_events'])}")
+        
+        # Transaction details go to the rolling segments; the summary is written once on shutdown
+        if not sharded:
+            engine.export_details()
+            if engine.history is not None:
+                engine.history.flush()
+    
+    try:
+        if sharded:
+            runner = ShardedProbeRunner(
+                engine,
+                workers=args.workers,
+                interval_seconds=args.interval,
+                report_interval_seconds=args.interval,
+                jitter=args.jitter,
+                max_concurrency=args.max_concurrency,
+                use_uvloop=args.uvloop,
+                metrics_port=args.metrics_port,
+                exporter_options=exporter_options(args),
+                history_options=history_options(args),
+                adaptive_options=adaptive_options(args),
+                region_reload_seconds=args.region_reload
+            )
+            await runner.run(report, on_window=add_window)
+        else:
+            options = adaptive_options(args)
+            await engine.run_scheduled(
+                interval_seconds=args.interval,
+                report_interval_seconds=args.interval,
+                jitter=args.jitter,
+                max_concurrency=args.max_concurrency,
+                on_report=report,
+                on_window=add_window,
+                policy=AdaptiveProbePolicy(args.interval, **options) if options else None,
+                region_reload_seconds=args.region_reload
+            )
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        logger.info("Stopping continuous monitoring...")
+    finally:
+        if cumulative.overall.total:
+            engine.export_results(engine.analyze_results(cumulative), args.export_format,
+                                  include_details=not sharded)
+
+async def run_load_test(engine: SyntheticTransactionEngine, args):
+    """Run an open-loop load test and print the capacity summary"""
+    logger.info(f"Starting {args.arrival} load test at {args.load_rate:.1f} req/s per region "
+                f"for {args.load_duration:.0f}s")
+    generator = LoadGenerator(
+        engine,
+        rate_per_region=args.load_rate,
+        duration_seconds=args.load_duration,
+        arrival=args.arrival,
+        transaction_types=args.load_transactions
+    )
+    try:
+        report = await generator.run()
+    finally:
+        await engine.close()
+    
+    print(f"\n{'='*50}")
+    print("SLEEK MULTI-REGION LOAD TEST SUMMARY")
+    print(f"{'='*50}")
+    print(f"Offered: {report['offered_requests']} ({report['dropped_requests']} dropped)")
+    print(f"Completed: {report['completed_requests']} ({report['achieved_rate']:.1f} req/s)")
+    response = report["response_time"]
+    if "error" not in response:
+        print(f"Success Rate: {response['overall_success_rate']:.2f}%")
+        print(f"\nCorrected Response Time (p50 / p95 / p99 / p99.9):")
+        for tx_type, data in response["transaction_types"].items():
+            p = data["percentiles"]
+            print(f"  {tx_type}: {p['p50']:.2f} / {p['p95']:.2f} / {p['p99']:.2f} / {p['p99_9']:.2f}ms")
+        violations = response["sla_compliance"]["financial_services_latency"]["violations"]
+        print(f"\nFinancial queries over 500ms (corrected): {violations}")
+    
+    engine.export_results(report, args.export_format)
 
 async def main():
     parser = argparse.ArgumentParser(description="Sleek Multi-Region Synthetic Transaction Monitor")
-    parser.add_argument("--continuous", action="store_true", help="Run continuously with 60-second intervals")
+    parser.add_argument("--continuous", action="store_true", help="Run continuously, probing each target on a fixed interval")
+    parser.add_argument("--interval", type=float, default=60, help="Seconds between probes of each target in continuous mode")
+    parser.add_argument("--jitter", type=float, default=0.1, help="Random delay added to each probe, as a fraction of the interval")
+    parser.add_argument("--max-concurrency", type=int, default=20, help="Maximum probes in flight at once in continuous mode")
+    parser.add_argument("--adaptive", action=argparse.BooleanOptionalAction, default=True,
+                        help="Adapt health check frequency and skip expensive probes of failing regions")
+    parser.add_argument("--failure-threshold", type=int, default=3,
+                        help="Consecutive failed probes that open a region's circuit breaker; slow answers do not count")
+    parser.add_argument("--degraded-interval", type=float, default=10,
+                        help="Seconds between health checks of a failing region")
+    parser.add_argument("--breaker-cooldown", type=float, default=60,
+                        help="Seconds an open circuit breaker waits before trial probes resume")
     parser.add_argument("--export-format", choices=["json", "csv"], default="json", help="Export format")
     parser.add_argument("--verbose", action="store_true", help="Enable verbose logging")
+    parser.add_argument("--log-file", default="synthetic_transactions.log",
+                        help="JSON log file, written from a background thread (empty to disable)")
+    parser.add_argument("--log-max-mb", type=float, default=50, help="Rotate the log file after this size")
+    parser.add_argument("--log-backups", type=int, default=5, help="Rotated log files to keep")
+    parser.add_argument("--log-sample-rate", type=float, default=1.0,
+                        help="Fraction of --verbose debug records to keep")
+    parser.add_argument("--max-results", type=int, default=100_000, help="Maximum transaction results kept in memory awaiting export")
+    parser.add_argument("--retention-hours", type=float, default=24, help="Hours of transaction results kept in memory")
+    parser.add_argument("--export-dir", default=".", help="Directory for transaction detail segments")
+    parser.add_argument("--segment-max-mb", type=float, default=64, help="Rotate transaction segments after this size")
+    parser.add_argument("--segment-max-minutes", type=float, default=60, help="Rotate transaction segments after this age")
+    parser.add_argument("--segment-compression", choices=["gzip", "zstd", "none"], default="gzip",
+                        help="Compression applied to closed transaction segments")
+    parser.add_argument("--cold-probes", action="store_true",
+                        help="Also run a health check over a fresh connection to measure cold-start latency")
+    parser.add_argument("--history-db", default="synthetic_history.db",
+                        help="SQLite probe history written in continuous mode (empty to disable)")
+    parser.add_argument("--history-retention-days", type=float, default=90,
+                        help="Days of probe history kept before partitions are dropped")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Split continuous-mode probes across this many worker processes "
+                             "(worker N serves metrics on --metrics-port + N; Prometheus scrapes up to 8)")
+    parser.add_argument("--uvloop", action="store_true", help="Run worker event loops on uvloop when installed")
+    parser.add_argument("--load-rate", type=float,
+                        help="Run an open-loop load test at this many requests/sec per region")
+    parser.add_argument("--load-duration", type=float, default=60, help="Load test duration in seconds")
+    parser.add_argument("--arrival", choices=["constant", "poisson"], default="constant",
+                        help="Arrival process for the load test")
+    parser.add_argument("--load-transactions", nargs="+",
+                        choices=["health_check", "user_login", "financial_query"],
+                        help="Transaction types to cycle through during the load test (default: all)")
+    parser.add_argument("--load-connections", type=int, default=200,
+                        help="Connection pool size per region during the load test")
+    parser.add_argument("--metrics-port", type=int, default=9464,
+                        help="Port for the Prometheus /metrics endpoint in continuous mode (0 to disable)")
+    parser.add_argument("--region-outputs", default="outputs_*.json",
+                        help="Terraform outputs files defining the regions and their load balancers "
+                             "(empty to probe the built-in regions)")
+    parser.add_argument("--region-reload", type=float, default=10,
+                        help="Seconds between checks of the outputs files for changes in continuous mode (0 to disable)")
+    parser.add_argument("--dns-refresh", type=float, default=30,
+                        help="Seconds between background re-resolutions of the load balancer addresses "
+                             "(0 to resolve inline with aiohttp's DNS cache)")
     
     args = parser.parse_args()
     
-    if args.verbose:
-        logging.getLogger().setLevel(logging.DEBUG)
+    log_listener = configure_logging(
+        log_file=args.log_file,
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        max_bytes=int(args.log_max_mb * 1024 * 1024),
+        backup_count=args.log_backups,
+        sample_rate=args.log_sample_rate
+    )
+    atexit.register(log_listener.stop)
     
-    engine = SyntheticTransactionEngine()
+    # Sharded workers write their own transaction segments; the coordinator writes none
+    sharded = args.continuous and args.workers > 1
+    exporter = None if sharded else SegmentedResultExporter(**exporter_options(args))
+    engine = SyntheticTransactionEngine(
+        max_results=args.max_results,
+        retention_seconds=args.retention_hours * 3600,
+        exporter=exporter,
+        cold_probes=args.cold_probes,
+        registry=RegionRegistry(args.region_outputs) if args.region_outputs else None,
+        dns_cache=DnsCache(args.dns_refresh) if args.dns_refresh > 0 else None
+    )
+    if args.load_rate:
+        engine.connection_limit = args.load_connections * len(engine.regions)
+        engine.connection_limit_per_host = args.load_connections
     
-    if args.continuous:
-        logger.info("Starting continuous monitoring mode (60-second intervals)")
-        while True:
-            try:
-                logger.info("Executing synthetic transaction suite...")
-                analysis = await engine.run_synthetic_transactions()
-                
-                # Log key metrics
-                logger.info(f"Overall success rate: {analysis['overall_success_rate']:.2f}%")
-                logger.info(f"Average response time: {analysis['response_times']['avg']:.2f}ms")
-                logger.info(f"SLA compliance: {analysis['sla_compliance']['compliance_status']}")
-                
-                # Export results
-                engine.export_results(analysis, args.export_format)
-                
-                # Wait 60 seconds before next run
-                await asyncio.sleep(60)
-                
-            except KeyboardInterrupt:
-                logger.info("Stopping continuous monitoring...")
-                break
-            except Exception as e:
-                logger.error(f"Error in continuous monitoring: {e}")
-                await asyncio.sleep(10)  # Wait 10 seconds before retrying
+    if args.load_rate:
+        await run_load_test(engine, args)
+        exporter.close()
+    elif args.continuous:
+        logger.info(f"Starting continuous monitoring mode ({args.interval:.0f}-second intervals)")
+        if args.metrics_port and args.workers > MAX_SCRAPED_WORKERS:
+            logger.warning(f"Prometheus scrapes metrics ports {args.metrics_port}-"
+                           f"{args.metrics_port + MAX_SCRAPED_WORKERS - 1}; add the ports of workers "
+                           f"{MAX_SCRAPED_WORKERS}-{args.workers - 1} to monitoring/prometheus/prometheus.yml")
+        if args.metrics_port and args.workers == 1:
+            engine.metrics = SyntheticMetrics()
+            engine.metrics.serve(args.metrics_port)
+        if args.history_db and args.workers == 1:
+            engine.history = HistoryStore(**history_options(args))
+        try:
+            await run_continuous(engine, args)
+        finally:
+            if exporter is not None:
+                exporter.close()
+            if engine.history is not None:
+                engine.history.close()
+            await engine.close()
     else:
         logger.info("Executing single synthetic transaction suite...")
-        analysis = await engine.run_synthetic_transactions()
-        
-        # Print summary
-        print(f"\n{'='*50}")
-        print("SLEEK MULTI-REGION HEALTH CHECK SUMMARY")
-        print(f"{'='*50}")
-        print(f"Total Transactions: {analysis['total_transactions']}")
-        print(f"Success Rate: {analysis['overall_success_rate']:.2f}%")
-        print(f"Average Response Time: {analysis['response_times']['avg']:.2f}ms")
-        print(f"SLA Compliance: {analysis['sla_compliance']['compliance_status']}")
-        print(f"\nRegion Performance:")
-        for region, data in analysis['regions'].items():
-            print(f"  {region.capitalize()}: {data['success_rate']:.2f}% ({data['avg_response_time']:.2f}ms avg)")
-        
-        # Export results
-        engine.export_results(analysis, args.export_format)
+        try:
+            analysis = await engine.run_synthetic_transactions()
+            
+            # Print summary
+            print(f"\n{'='*50}")
+            print("SLEEK MULTI-REGION HEALTH CHECK SUMMARY")
+            print(f"{'='*50}")
+            print(f"Total Transactions: {analysis['total_transactions']}")
+            print(f"Success Rate: {analysis['overall_success_rate']:.2f}%")
+            print(f"Average Response Time: {analysis['response_times']['avg']:.2f}ms")
+            print(f"SLA Compliance: {analysis['sla_compliance']['compliance_status']}")
+            print(f"\nRegion Performance:")
+            for region, data in analysis['regions'].items():
+                print(f"  {region.capitalize()}: {data['success_rate']:.2f}% ({data['avg_response_time']:.2f}ms avg)")
+            print(f"\nLatency Percentiles (p50 / p95 / p99 / p99.9):")
+            for region, tx_types in analysis['latency_percentiles'].items():
+                for tx_type, p in tx_types.items():
+                    print(f"  {region.capitalize()} {tx_type}: {p['p50']:.2f} / {p['p95']:.2f} / "
+                          f"{p['p99']:.2f} / {p['p99_9']:.2f}ms")
+            
+            # Export results
+            engine.export_results(analysis, args.export_format)
+        finally:
+            exporter.close()
+            await engine.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Load test for the alert webhook receiver
+Replays bursts of large AlertManager payloads, like a MultiRegionOutage
+drill produces, and reports accepted requests/sec and acknowledgement latency
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+import aiohttp
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+REGIONS = ["singapore", "hongkong", "australia", "uk"]
+SERVICES = ["api", "database", "load-balancer", "synthetic-monitor"]
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def build_payload(alerts: int, sequence: int) -> bytes:
+    """An AlertManager webhook body grouping ``alerts`` firing alerts"""
+    now = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    items = []
+    for index in range(alerts):
+        region = REGIONS[index % len(REGIONS)]
+        service = SERVICES[(index // len(REGIONS)) % len(SERVICES)]
+        labels = {
+            "alertname": "MultiRegionOutage" if index % 10 == 0 else "RegionDown",
+            "severity": "critical",
+            "region": region,
+            "service": service,
+            "instance": f"{service}-{region}-{index}"
+        }
+        items.append({
+            "status": "firing",
+            "labels": labels,
+            "annotations": {
+                "summary": f"{service} unavailable in {region}",
+                "description": f"Synthetic outage drill alert {sequence}-{index}: {service} in {region} "
+                               f"has failed health checks for more than 1 minute."
+            },
+            "startsAt": now,
+            "endsAt": "0001-01-01T00:00:00Z",
+            "fingerprint": f"{sequence:08x}{index:08x}"
+        })
+    return json.dumps({
+        "version": "4",
+        "groupKey": f"{{}}:{{alertname=\"MultiRegionOutage\"}}/{sequence}",
+        "status": "firing",
+        "receiver": "critical-alerts",
+        "groupLabels": {"alertname": "MultiRegionOutage"},
+        "commonLabels": {"severity": "critical"},
+        "commonAnnotations": {},
+        "externalURL": "http://alertmanager:9093",
+        "alerts": items
+    }).encode()
+
+def start_server(port: int) -> subprocess.Popen:
+    """Run the receiver with its console output discarded"""
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(SCRIPTS_DIR, "alert-webhook-server.py"), "--port", str(port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("Alert webhook server did not start")
+
+def percentile(ordered: List[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+async def run_burst(url: str, payloads: List[bytes], concurrency: int) -> Dict:
+    """Send every payload as fast as ``concurrency`` connections allow"""
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    errors = 0
+    pending = iter(payloads)
+
+    async def sender(session: aiohttp.ClientSession):
+        nonlocal errors
+        for body in pending:
+            started = time.perf_counter()
+            try:
+                async with session.post(url, data=body, headers={"Content-Type": "application/json"}) as response:
+                    await response.read()
+                    statuses[response.status] = statuses.get(response.status, 0) + 1
+                    if response.status == 200:
+                        latencies.append((time.perf_counter() - started) * 1000)
+            except aiohttp.ClientError:
+                errors += 1
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    timeout = aiohttp.ClientTimeout(total=30)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        started = time.perf_counter()
+        await asyncio.gather(*(sender(session) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(payloads),
+        "accepted": statuses.get(200, 0),
+        "rejected": sum(count for status, count in statuses.items() if status != 200),
+        "errors": errors,
+        "elapsed_seconds": elapsed,
+        "accepted_per_sec": statuses.get(200, 0) / elapsed if elapsed else 0.0,
+        "p50_ack_ms": percentile(latencies, 0.5),
+        "p99_ack_ms": percentile(latencies, 0.99),
+        "max_ack_ms": latencies[-1] if latencies else 0.0
+    }
+
+async def main():
+    parser = argparse.ArgumentParser(description="Replay AlertManager payload bursts against the webhook receiver")
+    parser.add_argument("--url", help="Receiver endpoint (default: start a local alert-webhook-server.py)")
+    parser.add_argument("--bursts", type=int, default=3, help="Number of bursts to send")
+    parser.add_argument("--requests", type=int, default=2000, help="Webhook deliveries per burst")
+    parser.add_argument("--alerts", type=int, default=50, help="Alerts grouped in each delivery")
+    parser.add_argument("--concurrency", type=int, default=50, help="Concurrent connections, like AlertManager's")
+    parser.add_argument("--pause", type=float, default=1.0, help="Seconds between bursts")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+
+    args = parser.parse_args()
+
+    server: Optional[subprocess.Popen] = None
+    url = args.url
+    if url is None:
+        port = free_port()
+        server = start_server(port)
+        url = f"http://127.0.0.1:{port}/critical"
+
+    payloads = [build_payload(args.alerts, sequence) for sequence in range(args.requests)]
+    print(f"Sending {args.bursts} bursts of {args.requests} deliveries "
+          f"({len(payloads[0]) / 1024:.0f}KB, {args.alerts} alerts each) to {url}")
+
+    results = []
+    try:
+        for burst in range(args.bursts):
+            if burst:
+                await asyncio.sleep(args.pause)
+            results.append(await run_burst(url, payloads, args.concurrency))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    print(f"\n{'='*60}")
+    print("ALERT WEBHOOK LOAD TEST")
+    print(f"{'='*60}")
+    print(f"{'burst':>5} {'accepted':>9} {'rejected':>9} {'errors':>7} {'req/s':>9} "
+          f"{'p50 ack':>10} {'p99 ack':>10} {'max ack':>10}")
+    for burst, result in enumerate(results, 1):
+        print(f"{burst:>5} {result['accepted']:>9} {result['rejected']:>9} {result['errors']:>7} "
+              f"{result['accepted_per_sec']:>9.1f} {result['p50_ack_ms']:>8.2f}ms "
+              f"{result['p99_ack_ms']:>8.2f}ms {result['max_ack_ms']:>8.2f}ms")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"settings": vars(args), "bursts": results}, f, indent=2)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the PagerDuty REST API
+Implements the list/create endpoints used by monitoring/alerting/pagerduty-config.py
+with PagerDuty-style pagination, uniqueness rules, response latency and a
+per-token rate limit that answers 429 with ratelimit-* headers, plus the
+Events API v2 enqueue endpoint used by monitoring/alerting/pagerduty-events.py
+with a per-routing-key rate limit
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import secrets
+import string
+import time
+from typing import Dict, List
+
+from aiohttp import web
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# collection -> (request/response key, field PagerDuty rejects duplicates of, or None)
+COLLECTIONS = {
+    "users": ("user", "email"),
+    "schedules": ("schedule", None),
+    "escalation_policies": ("escalation_policy", "name"),
+    "services": ("service", "name")
+}
+
+def new_id() -> str:
+    return "P" + "".join(random.choices(string.ascii_uppercase + string.digits, k=6))
+
+class MockPagerDutyAPI:
+    def __init__(self, latency_ms: float = 80, requests_per_minute: float = 960, events_per_minute: float = 120,
+                 event_failure_rate: float = 0.0):
+        self.latency = latency_ms / 1000
+        self.requests_per_minute = requests_per_minute
+        self.events_per_minute = events_per_minute
+        self.event_failure_rate = event_failure_rate
+        self.objects: Dict[str, List[Dict]] = {collection: [] for collection in COLLECTIONS}
+        self.integrations: Dict[str, Dict] = {}
+        self.counters = {"requests": 0, "rate_limited": 0, "rejected_duplicates": 0,
+                         "events": 0, "events_rate_limited": 0, "events_failed": 0}
+        # Last accepted event_action per dedup_key, as the incident state PagerDuty would hold
+        self.event_state: Dict[str, str] = {}
+        # Token bucket per API token (REST) and per routing key (events), refilled continuously
+        self._buckets: Dict[str, List[float]] = {}
+
+    def build_app(self) -> web.Application:
+        app = web.Application(middlewares=[self.rate_limit])
+        for collection in COLLECTIONS:
+            app.router.add_get(f"/{collection}", self.list_handler(collection))
+            app.router.add_post(f"/{collection}", self.create_handler(collection))
+        app.router.add_post("/services/{service_id}/integrations", self.create_integration)
+        app.router.add_get("/services/{service_id}/integrations/{integration_id}", self.get_integration)
+        app.router.add_post("/v2/enqueue", self.enqueue_event)
+        app.router.add_get("/_stats", self.stats)
+        return app
+
+    def _take_token(self, bucket: str, per_minute: float) -> float:
+        """Spend one token from a bucket; returns 0, or the seconds until a token is available"""
+        capacity = per_minute / 60
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(bucket, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * per_minute / 60)
+        if tokens < 1:
+            self._buckets[bucket] = [tokens, now]
+            return (1 - tokens) / (per_minute / 60)
+        self._buckets[bucket] = [tokens - 1, now]
+        return 0.0
+
+    @web.middleware
+    async def rate_limit(self, request: web.Request, handler):
+        if request.path in ("/_stats", "/v2/enqueue"):
+            return await handler(request)
+        self.counters["requests"] += 1
+        reset = self._take_token("rest:" + request.headers.get("Authorization", ""), self.requests_per_minute)
+        if reset:
+            self.counters["rate_limited"] += 1
+            return web.json_response(
+                {"error": {"message": "Rate Limit Exceeded", "code": 2020}},
+                status=429,
+                headers={"ratelimit-limit": str(int(self.requests_per_minute)),
+                         "ratelimit-remaining": "0", "ratelimit-reset": f"{reset:.2f}"}
+            )
+        await asyncio.sleep(self.latency)
+        return await handler(request)
+
+    async def enqueue_event(self, request: web.Request) -> web.Response:
+        self.counters["events"] += 1
+        try:
+            event = await request.json()
+        except ValueError:
+            return web.json_response({"status": "invalid event", "message": "Event object is invalid"}, status=400)
+        if not event.get("routing_key") or event.get("event_action") not in ("trigger", "acknowledge", "resolve"):
+            return web.json_response({"status": "invalid event", "message": "Event object is invalid",
+                                      "errors": ["'routing_key' and 'event_action' are required"]}, status=400)
+        if self._take_token("events:" + event["routing_key"], self.events_per_minute):
+            self.counters["events_rate_limited"] += 1
+            return web.json_response({"status": "throttle event", "message": "Requests for this service are arriving too quickly"},
+                                     status=429)
+        await asyncio.sleep(self.latency)
+        if random.random() < self.event_failure_rate:
+            self.counters["events_failed"] += 1
+            return web.json_response({"status": "error", "message": "Internal Server Error"}, status=500)
+        dedup_key = event.get("dedup_key") or secrets.token_hex(16)
+        self.event_state[dedup_key] = event["event_action"]
+        return web.json_response({"status": "success", "message": "Event processed", "dedup_key": dedup_key},
+                                 status=202)
+
+    def list_handler(self, collection: str):
+        async def handler(request: web.Request) -> web.Response:
+            limit = min(100, int(request.query.get("limit", 25)))
+            offset = int(request.query.get("offset", 0))
+            items = self.objects[collection]
+            page = items[offset:offset + limit]
+            return web.json_response({
+                collection: page,
+                "limit": limit,
+                "offset": offset,
+                "more": offset + len(page) < len(items),
+                "total": None
+            })
+        return handler
+
+    def create_handler(self, collection: str):
+        singular, unique_field = COLLECTIONS[collection]
+
+        async def handler(request: web.Request) -> web.Response:
+            body = (await request.json()).get(singular, {})
+            if unique_field and any(
+                item.get(unique_field, "").lower() == body.get(unique_field, "").lower()
+                for item in self.objects[collection]
+            ):
+                self.counters["rejected_duplicates"] += 1
+                return web.json_response({"error": {
+                    "message": "Invalid Input Provided", "code": 2001,
+                    "errors": [f"{unique_field.capitalize()} has already been taken"]
+                }}, status=400)
+            item = {**body, "id": new_id(), "type": singular}
+            if collection == "services":
+                item["integrations"] = []
+            self.objects[collection].append(item)
+            return web.json_response({singular: item}, status=201)
+        return handler
+
+    def _service(self, request: web.Request) -> Dict:
+        for service in self.objects["services"]:
+            if service["id"] == request.match_info["service_id"]:
+                return service
+        raise web.HTTPNotFound()
+
+    async def create_integration(self, request: web.Request) -> web.Response:
+        service = self._service(request)
+        body = (await request.json()).get("integration", {})
+        integration = {**body, "id": new_id(), "integration_key": secrets.token_hex(16)}
+        self.integrations[integration["id"]] = integration
+        service["integrations"].append({"id": integration["id"], "type": "generic_events_api_inbound_integration_reference"})
+        return web.json_response({"integration": integration}, status=201)
+
+    async def get_integration(self, request: web.Request) -> web.Response:
+        self._service(request)
+        integration = self.integrations.get(request.match_info["integration_id"])
+        if integration is None:
+            raise web.HTTPNotFound()
+        return web.json_response({"integration": integration})
+
+    async def stats(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            **self.counters,
+            "objects": {collection: len(items) for collection, items in self.objects.items()},
+            "event_state": self.event_state
+        })
+
+def main():
+    parser = argparse.ArgumentParser(description="Local PagerDuty REST API stand-in")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=8085, help="Port to listen on")
+    parser.add_argument("--latency-ms", type=float, default=80, help="Delay added to every accepted request")
+    parser.add_argument("--requests-per-minute", type=float, default=960, help="Rate limit per API token")
+    parser.add_argument("--events-per-minute", type=float, default=120, help="Events API rate limit per routing key")
+    parser.add_argument("--event-failure-rate", type=float, default=0.0, help="Fraction of events answered with 500")
+    args = parser.parse_args()
+
+    api = MockPagerDutyAPI(latency_ms=args.latency_ms, requests_per_minute=args.requests_per_minute,
+                           events_per_minute=args.events_per_minute, event_failure_rate=args.event_failure_rate)
+    logger.info(f"Mock PagerDuty API listening on http://{args.host}:{args.port}")
+    web.run_app(api.build_app(), host=args.host, port=args.port, access_log=None, print=None)
+
+if __name__ == "__main__":
+    main()
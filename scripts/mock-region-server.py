@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Sleek regional load balancers
+Serves the endpoints probed by health-check-synthetic.py with configurable
+latency, error, timeout and slow-body behaviour per region, plus region
+outages that can be scheduled up front or switched over HTTP
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional
+
+from aiohttp import web
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+@dataclass
+class RegionProfile:
+    name: str
+    port: int
+    latency_median_ms: float = 20.0
+    latency_sigma: float = 0.0  # lognormal shape parameter, 0 gives a constant latency
+    error_rate: float = 0.0
+    timeout_rate: float = 0.0
+    slow_body_rate: float = 0.0
+    slow_body_ms: float = 1000.0
+    hang_seconds: float = 60.0
+
+    def sample_latency(self) -> float:
+        """Draw a response delay in seconds"""
+        if self.latency_sigma <= 0:
+            return self.latency_median_ms / 1000
+        return random.lognormvariate(0, self.latency_sigma) * self.latency_median_ms / 1000
+
+DEFAULT_PROFILES = [
+    RegionProfile("singapore", 8081, latency_median_ms=40, latency_sigma=0.3),
+    RegionProfile("hongkong", 8082, latency_median_ms=60, latency_sigma=0.3),
+    RegionProfile("australia", 8083, latency_median_ms=90, latency_sigma=0.4),
+    RegionProfile("uk", 8084, latency_median_ms=180, latency_sigma=0.5, error_rate=0.01),
+]
+
+# Outage modes: "error" answers 503 at once like an ALB with no healthy targets, "hang" never answers
+FAULT_MODES = ("error", "hang")
+
+class MockRegionServer:
+    """One aiohttp site per region profile, all on the current event loop"""
+
+    def __init__(self, profiles: List[RegionProfile], host: str = "127.0.0.1"):
+        self.profiles = profiles
+        self.host = host
+        self._runners: List[web.AppRunner] = []
+        # Active outage mode per region, and every switch with its wall-clock time
+        self.faults: Dict[str, str] = {}
+        self.fault_log: List[Dict] = []
+
+    def set_fault(self, region: str, mode: Optional[str]):
+        if mode is None or mode == "none":
+            self.faults.pop(region, None)
+            mode = "none"
+        else:
+            self.faults[region] = mode
+        self.fault_log.append({"region": region, "mode": mode, "at": time.time()})
+        logger.info(f"Mock region {region} fault: {mode}")
+
+    async def run_outage(self, region: str, start_seconds: float, duration_seconds: float, mode: str = "error"):
+        """Take a region down ``start_seconds`` from now for ``duration_seconds``"""
+        await asyncio.sleep(start_seconds)
+        self.set_fault(region, mode)
+        await asyncio.sleep(duration_seconds)
+        self.set_fault(region, None)
+
+    def endpoint(self, profile: RegionProfile) -> str:
+        return f"http://{self.host}:{profile.port}"
+
+    def build_app(self, profile: RegionProfile) -> web.Application:
+        async def health(request: web.Request) -> web.StreamResponse:
+            return await self.respond(request, profile, {"status": "healthy", "region": profile.name})
+
+        async def login(request: web.Request) -> web.StreamResponse:
+            await request.read()
+            return await self.respond(request, profile, {"token": "synthetic-token", "region": profile.name})
+
+        async def transactions(request: web.Request) -> web.StreamResponse:
+            payload = {
+                "account_id": request.query.get("account_id"),
+                "region": profile.name,
+                "transactions": [{"id": i, "amount": round(random.uniform(1, 1000), 2)} for i in range(20)]
+            }
+            return await self.respond(request, profile, payload)
+
+        async def fault(request: web.Request) -> web.Response:
+            mode = (await request.json()).get("mode", "none")
+            if mode not in FAULT_MODES + ("none",):
+                return web.json_response({"error": f"mode must be one of {', '.join(FAULT_MODES)} or none"}, status=400)
+            self.set_fault(profile.name, mode)
+            return web.json_response({"region": profile.name, "mode": mode})
+
+        async def fault_log(request: web.Request) -> web.Response:
+            return web.json_response(self.fault_log)
+
+        app = web.Application()
+        app.router.add_get("/health", health)
+        app.router.add_post("/api/auth/login", login)
+        app.router.add_get("/api/financial/transactions", transactions)
+        app.router.add_post("/_fault", fault)
+        app.router.add_get("/_faults", fault_log)
+        return app
+
+    async def respond(self, request: web.Request, profile: RegionProfile, payload: Dict) -> web.StreamResponse:
+        """Apply the profile's latency and failure behaviour to a response"""
+        fault = self.faults.get(profile.name)
+        if fault == "error":
+            return web.json_response({"error": "service unavailable"}, status=503)
+        if fault == "hang":
+            await asyncio.sleep(profile.hang_seconds)
+            return web.json_response({"error": "gateway timeout"}, status=504)
+
+        await asyncio.sleep(profile.sample_latency())
+
+        roll = random.random()
+        if roll < profile.timeout_rate:
+            await asyncio.sleep(profile.hang_seconds)
+            return web.json_response({"error": "gateway timeout"}, status=504)
+        roll -= profile.timeout_rate
+        if roll < profile.error_rate:
+            return web.json_response({"error": "service unavailable"}, status=503)
+        roll -= profile.error_rate
+
+        body = json.dumps(payload).encode()
+        if roll < profile.slow_body_rate:
+            # Headers arrive on time, the body trickles out over slow_body_ms
+            response = web.StreamResponse(headers={"Content-Type": "application/json"})
+            response.content_length = len(body)
+            await response.prepare(request)
+            chunks = 10
+            step = max(1, len(body) // chunks)
+            for offset in range(0, len(body), step):
+                await response.write(body[offset:offset + step])
+                await asyncio.sleep(profile.slow_body_ms / 1000 / chunks)
+            await response.write_eof()
+            return response
+
+        return web.Response(body=body, content_type="application/json")
+
+    async def start(self):
+        for profile in self.profiles:
+            runner = web.AppRunner(self.build_app(profile), access_log=None)
+            await runner.setup()
+            await web.TCPSite(runner, self.host, profile.port).start()
+            self._runners.append(runner)
+            logger.info(f"Mock region {profile.name} listening on {self.endpoint(profile)}")
+
+    async def stop(self):
+        for runner in self._runners:
+            await runner.cleanup()
+        self._runners.clear()
+
+def load_profiles(path: Optional[str]) -> List[RegionProfile]:
+    """Read region profiles from a JSON list, or use the defaults"""
+    if not path:
+        return list(DEFAULT_PROFILES)
+    with open(path) as f:
+        return [RegionProfile(**profile) for profile in json.load(f)]
+
+async def main():
+    parser = argparse.ArgumentParser(description="Sleek mock regional endpoints for local testing")
+    parser.add_argument("--config", help="JSON file with a list of region profiles")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    parser.add_argument("--dump-config", action="store_true", help="Print the active profiles as JSON and exit")
+    parser.add_argument("--outage", action="append", default=[], metavar="REGION:START:DURATION[:MODE]",
+                        help="Take a region down START seconds after startup for DURATION seconds "
+                             f"(mode {' or '.join(FAULT_MODES)}, default error); repeatable")
+
+    args = parser.parse_args()
+    profiles = load_profiles(args.config)
+
+    if args.dump_config:
+        print(json.dumps([asdict(profile) for profile in profiles], indent=2))
+        return
+
+    schedule = []
+    for spec in args.outage:
+        region, start, duration, *mode = spec.split(":")
+        if mode and mode[0] not in FAULT_MODES:
+            parser.error(f"Unknown outage mode {mode[0]!r} in --outage {spec}")
+        schedule.append((region, float(start), float(duration), *mode))
+
+    server = MockRegionServer(profiles, host=args.host)
+    await server.start()
+    outages = [asyncio.create_task(server.run_outage(*outage)) for outage in schedule]
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        logger.info("Mock region server stopped")
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Mock Terraform binary for exercising the deployment scripts locally
+Implements the subset of the terraform CLI that deploy-regions.py uses
+(init, plan -out, apply <plan>, output -json/-raw, state pull) against a
+local state file, printing progress lines over a configurable duration per
+command. The region is the name of the working directory.
+
+Environment:
+  MOCK_TERRAFORM_SECONDS    seconds per command, e.g. "init=1,plan=3,apply=8"
+  MOCK_TERRAFORM_FAIL       commands that fail, e.g. "hongkong:apply,uk:plan"
+  MOCK_TERRAFORM_STATE_DIR  keep <region>.tfstate in this directory, like a
+                            remote backend, instead of ./terraform.tfstate
+"""
+
+import json
+import os
+import sys
+import time
+import uuid
+from typing import Dict, List
+
+DEFAULT_SECONDS = {"init": 0.5, "plan": 1.5, "apply": 3.0, "output": 0.0}
+
+AWS_REGIONS = {
+    "singapore": "ap-southeast-1",
+    "hongkong": "ap-east-1",
+    "australia": "ap-southeast-2",
+    "uk": "eu-west-2"
+}
+
+RESOURCES = ["module.vpc.aws_vpc.main", "module.vpc.aws_subnet.private[0]", "module.security.aws_security_group.web",
+             "module.database.aws_db_instance.main", "module.compute.aws_lb.main",
+             "module.compute.aws_autoscaling_group.web"]
+
+STATE_FILE = "terraform.tfstate"
+
+def command_seconds() -> Dict[str, float]:
+    seconds = dict(DEFAULT_SECONDS)
+    for item in filter(None, os.environ.get("MOCK_TERRAFORM_SECONDS", "").split(",")):
+        command, value = item.split("=")
+        seconds[command.strip()] = float(value)
+    return seconds
+
+def should_fail(region: str, command: str) -> bool:
+    failures = {item.strip() for item in os.environ.get("MOCK_TERRAFORM_FAIL", "").split(",")}
+    return f"{region}:{command}" in failures or f"*:{command}" in failures
+
+def state_path(region: str) -> str:
+    remote_dir = os.environ.get("MOCK_TERRAFORM_STATE_DIR")
+    return os.path.join(remote_dir, f"{region}.tfstate") if remote_dir else STATE_FILE
+
+def load_state(region: str) -> Dict:
+    if not os.path.exists(state_path(region)):
+        return {"version": 4, "serial": 0, "lineage": None, "outputs": {}}
+    with open(state_path(region)) as f:
+        return json.load(f)
+
+def progress(lines: List[str], seconds: float):
+    """Print lines evenly over ``seconds``, like a long-running command"""
+    for line in lines:
+        print(line, flush=True)
+        time.sleep(seconds / len(lines))
+
+def fail(message: str) -> int:
+    print(f"\nError: {message}\n", file=sys.stderr, flush=True)
+    return 1
+
+def init(region: str, seconds: float) -> int:
+    progress(["Initializing the backend...", "Initializing modules...",
+              "Initializing provider plugins...", "- Installing hashicorp/aws v5.31.0..."], seconds)
+    if should_fail(region, "init"):
+        return fail("Failed to query available provider packages")
+    os.makedirs(".terraform", exist_ok=True)
+    if not os.path.exists(".terraform.lock.hcl"):
+        with open(".terraform.lock.hcl", "w") as f:
+            f.write('provider "registry.terraform.io/hashicorp/aws" {\n  version = "5.31.0"\n}\n')
+    print("\nTerraform has been successfully initialized!", flush=True)
+    return 0
+
+def plan(region: str, seconds: float, args: List[str]) -> int:
+    if not os.path.isdir(".terraform"):
+        return fail("Module not installed. Run \"terraform init\".")
+    out = next((arg.split("=", 1)[1] for arg in args if arg.startswith("-out=")), None)
+    state = load_state(region)
+    creating = [resource for resource in RESOURCES if resource not in state.get("resources", [])]
+    progress([f"{resource}: Refreshing state..." for resource in state.get("resources", [])] +
+             [f"  # {resource} will be created" for resource in creating] or ["No changes."], seconds)
+    if should_fail(region, "plan"):
+        return fail("Invalid reference in module.compute")
+    print(f"\nPlan: {len(creating)} to add, 0 to change, 0 to destroy.", flush=True)
+    if out:
+        with open(out, "w") as f:
+            json.dump({"lineage": state["lineage"], "serial": state["serial"], "create": creating}, f)
+        print(f"\nSaved the plan to: {out}", flush=True)
+    return 0
+
+def apply(region: str, seconds: float, args: List[str]) -> int:
+    plan_file = next((arg for arg in args if not arg.startswith("-")), None)
+    if plan_file is None:
+        return fail("mock-terraform only applies saved plans")
+    with open(plan_file) as f:
+        saved = json.load(f)
+    state = load_state(region)
+    if (saved["lineage"], saved["serial"]) != (state["lineage"], state["serial"]):
+        return fail("Saved plan is stale")
+    lines = []
+    for resource in saved["create"]:
+        lines += [f"{resource}: Creating...", f"{resource}: Creation complete after 1s"]
+    progress(lines or ["No changes."], seconds)
+    if should_fail(region, "apply"):
+        return fail("creating ELBv2 application Load Balancer: ValidationError")
+    state["lineage"] = state["lineage"] or str(uuid.uuid4())
+    state["serial"] += 1
+    state["resources"] = RESOURCES
+    state["outputs"] = {
+        "environment": {"value": region, "type": "string"},
+        "region": {"value": AWS_REGIONS.get(region, "us-east-1"), "type": "string"},
+        "vpc_id": {"value": f"vpc-{uuid.uuid5(uuid.NAMESPACE_DNS, region).hex[:17]}", "type": "string"},
+        "load_balancer_dns_name": {"value": f"sleek-{region}-alb.{AWS_REGIONS.get(region, 'us-east-1')}"
+                                            ".elb.amazonaws.com", "type": "string"},
+        "db_endpoint": {"value": f"sleek-{region}-db:5432", "type": "string", "sensitive": True}
+    }
+    with open(state_path(region), "w") as f:
+        json.dump(state, f, indent=2)
+    print(f"\nApply complete! Resources: {len(saved['create'])} added, 0 changed, 0 destroyed.", flush=True)
+    return 0
+
+def output(region: str, args: List[str]) -> int:
+    outputs = load_state(region)["outputs"]
+    names = [arg for arg in args if not arg.startswith("-")]
+    if "-raw" in args:
+        if not names or names[0] not in outputs:
+            return fail("Output not found")
+        print(outputs[names[0]]["value"], end="")
+    else:
+        print(json.dumps({name: {"sensitive": value.get("sensitive", False), **value}
+                          for name, value in outputs.items()}, indent=2))
+    return 0
+
+def state(region: str, args: List[str]) -> int:
+    if args[:1] != ["pull"]:
+        return fail("mock-terraform only implements 'state pull'")
+    # Like terraform, prints nothing while there is no state yet
+    if os.path.exists(state_path(region)):
+        with open(state_path(region)) as f:
+            print(f.read(), end="")
+    return 0
+
+def main() -> int:
+    if len(sys.argv) < 2:
+        print("Usage: mock-terraform.py <init|plan|apply|output|state> [args]", file=sys.stderr)
+        return 1
+    command, args = sys.argv[1], sys.argv[2:]
+    region = os.path.basename(os.getcwd())
+    seconds = command_seconds().get(command, 0.0)
+    try:
+        if command == "init":
+            return init(region, seconds)
+        if command == "plan":
+            return plan(region, seconds, args)
+        if command == "apply":
+            return apply(region, seconds, args)
+        if command == "output":
+            return output(region, args)
+        if command == "state":
+            return state(region, args)
+    except KeyboardInterrupt:
+        print("\nInterrupt received. Gracefully shutting down...", flush=True)
+        return 1
+    return fail(f"mock-terraform does not implement '{command}'")
+
+if __name__ == "__main__":
+    sys.exit(main())
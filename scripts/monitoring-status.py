@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Sleek Monitoring Stack Status
+Checks Prometheus, Alertmanager, Grafana, the alert webhook receiver, the
+Prometheus scrape targets and the active alerts concurrently, each under its
+own deadline, and prints a table or JSON. Results are cached for a few
+seconds so repeated calls during an incident do not re-probe the stack
+"""
+
+import argparse
+import asyncio
+import fcntl
+import hashlib
+import json
+import os
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import aiohttp
+
+DEFAULT_URLS = {
+    "prometheus": "http://localhost:9090",
+    "alertmanager": "http://localhost:9093",
+    "grafana": "http://localhost:3000",
+    "webhook": "http://localhost:8888"
+}
+
+@dataclass
+class CheckResult:
+    name: str
+    status: str  # up, down
+    latency_ms: float
+    detail: str
+    items: List[Dict[str, Any]] = field(default_factory=list)
+
+def prometheus_health(status: int, body: str) -> Tuple[bool, str, List[Dict]]:
+    return status == 200 and "Healthy" in body, body.strip(), []
+
+def alertmanager_health(status: int, body: str) -> Tuple[bool, str, List[Dict]]:
+    return status == 200, body.strip(), []
+
+def grafana_health(status: int, body: str) -> Tuple[bool, str, List[Dict]]:
+    database = json.loads(body).get("database")
+    return status == 200 and database == "ok", f"database {database}", []
+
+def webhook_health(status: int, body: str) -> Tuple[bool, str, List[Dict]]:
+    health = json.loads(body)
+    return health.get("status") == "healthy", f"{health.get('status')}, {health.get('queued', 0)} queued", []
+
+def scrape_targets(status: int, body: str) -> Tuple[bool, str, List[Dict]]:
+    """Up only when every active target is up"""
+    targets = [{
+        "job": target["labels"].get("job"),
+        "instance": target["labels"].get("instance", "").split("/")[-1],
+        "health": target.get("health"),
+        "last_error": target.get("lastError", ""),
+        "scrape_ms": round(target.get("lastScrapeDuration", 0) * 1000, 1)
+    } for target in json.loads(body)["data"]["activeTargets"]]
+    up = sum(1 for target in targets if target["health"] == "up")
+    return status == 200 and bool(targets) and up == len(targets), f"{up}/{len(targets)} up", targets
+
+def active_alerts(status: int, body: str) -> Tuple[bool, str, List[Dict]]:
+    """Firing alerts are reported, not treated as the check failing"""
+    alerts = [{
+        "alertname": alert["labels"].get("alertname"),
+        "severity": alert["labels"].get("severity", "none"),
+        "region": alert["labels"].get("region", ""),
+        "state": alert.get("status", {}).get("state"),
+        "starts_at": alert.get("startsAt")
+    } for alert in json.loads(body)]
+    return status == 200, f"{len(alerts)} active", alerts
+
+def build_checks(urls: Dict[str, str]) -> Dict[str, Tuple[str, Callable]]:
+    return {
+        "prometheus": (f"{urls['prometheus']}/-/healthy", prometheus_health),
+        "alertmanager": (f"{urls['alertmanager']}/-/healthy", alertmanager_health),
+        "grafana": (f"{urls['grafana']}/api/health", grafana_health),
+        "webhook": (f"{urls['webhook']}/health", webhook_health),
+        "targets": (f"{urls['prometheus']}/api/v1/targets?state=active", scrape_targets),
+        "alerts": (f"{urls['alertmanager']}/api/v2/alerts?active=true&silenced=false&inhibited=false",
+                   active_alerts)
+    }
+
+async def run_check(session: aiohttp.ClientSession, name: str, url: str, parse: Callable,
+                    timeout: float) -> CheckResult:
+    started = time.perf_counter()
+    try:
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+            body = await response.text()
+        if response.status == 200:
+            healthy, detail, items = parse(response.status, body)
+        else:
+            healthy, detail, items = False, f"HTTP {response.status}", []
+    except asyncio.TimeoutError:
+        healthy, detail, items = False, f"no response within {timeout:g}s", []
+    except aiohttp.ClientError as e:
+        healthy, detail, items = False, f"unreachable ({type(e).__name__})", []
+    except (ValueError, KeyError, TypeError) as e:
+        healthy, detail, items = False, f"unexpected response ({type(e).__name__}: {e})", []
+    latency_ms = (time.perf_counter() - started) * 1000
+    return CheckResult(name, "up" if healthy else "down", latency_ms, detail, items)
+
+async def check_stack(urls: Dict[str, str], timeout: float) -> Dict:
+    """Run every check at once; the whole call takes about as long as the slowest check"""
+    started = time.perf_counter()
+    checks = build_checks(urls)
+    connector = aiohttp.TCPConnector(limit=0)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        results = await asyncio.gather(*(run_check(session, name, url, parse, timeout)
+                                         for name, (url, parse) in checks.items()))
+    return {
+        "checked_at": time.time(),
+        "elapsed_seconds": time.perf_counter() - started,
+        "healthy": all(result.status == "up" for result in results),
+        "checks": {result.name: asdict(result) for result in results}
+    }
+
+class StatusCache:
+    """Last status on disk, reused for ``ttl_seconds``
+
+    A lock file serialises callers, so when several run at once during an
+    incident one probes the stack and the rest read its result.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+
+    def key(self, urls: Dict[str, str], timeout: float) -> str:
+        return hashlib.sha256(json.dumps([urls, timeout], sort_keys=True).encode()).hexdigest()
+
+    def load(self, key: str) -> Optional[Dict]:
+        try:
+            with open(self.path) as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if cached.get("key") != key or time.time() - cached["status"]["checked_at"] > self.ttl_seconds:
+            return None
+        return cached["status"]
+
+    def store(self, key: str, status: Dict):
+        with open(f"{self.path}.tmp", "w") as f:
+            json.dump({"key": key, "status": status}, f)
+        os.replace(f"{self.path}.tmp", self.path)
+
+    async def get(self, urls: Dict[str, str], timeout: float, refresh: bool = False) -> Dict:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        key = self.key(urls, timeout)
+        with open(f"{self.path}.lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            status = None if refresh else self.load(key)
+            if status is not None:
+                return dict(status, cached=True, age_seconds=time.time() - status["checked_at"])
+            status = await check_stack(urls, timeout)
+            self.store(key, status)
+        return dict(status, cached=False, age_seconds=0.0)
+
+def print_table(status: Dict):
+    checked_at = datetime.fromtimestamp(status["checked_at"]).strftime("%H:%M:%S")
+    source = (f"cached, {status['age_seconds']:.0f}s old" if status["cached"]
+              else f"took {status['elapsed_seconds']:.2f}s")
+    print(f"\n{'='*60}")
+    print(f"MONITORING STACK STATUS ({checked_at}, {source})")
+    print(f"{'='*60}")
+    print(f"{'check':<14} {'status':<8} {'latency':>9}  detail")
+    for name, check in status["checks"].items():
+        mark = "✅" if check["status"] == "up" else "❌"
+        print(f"{name:<14} {mark} {check['status']:<5} {check['latency_ms']:>7.0f}ms  {check['detail']}")
+
+    targets = status["checks"]["targets"]["items"]
+    if targets:
+        print("\nTargets:")
+        for target in sorted(targets, key=lambda target: (target["health"] == "up", target["job"] or "")):
+            error = f" - {target['last_error']}" if target["last_error"] else ""
+            print(f"  - {target['job']}: {target['instance']} [{target['health']}]{error}")
+
+    alerts = status["checks"]["alerts"]["items"]
+    if alerts:
+        print("\nActive alerts:")
+        for alert in alerts:
+            region = f" {alert['region']}" if alert["region"] else ""
+            print(f"  - {alert['alertname']} [{alert['severity']}]{region} - {alert['state']}")
+    print(f"\nOverall: {'healthy' if status['healthy'] else 'UNHEALTHY'}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Check every monitoring stack component concurrently")
+    for component, url in DEFAULT_URLS.items():
+        parser.add_argument(f"--{component}-url", default=os.environ.get(f"{component.upper()}_URL", url),
+                            help=f"{component.capitalize()} base URL (default: ${component.upper()}_URL or {url})")
+    parser.add_argument("--timeout", type=float, default=2.0, help="Deadline in seconds for each check")
+    parser.add_argument("--format", choices=["table", "json"], default="table", help="Output format")
+    parser.add_argument("--output", help="Also write the status as JSON to this file")
+    parser.add_argument("--cache-file", default=os.path.join(".status-cache", "monitoring-status.json"),
+                        help="Where the last status is cached")
+    parser.add_argument("--cache-ttl", type=float, default=10, help="Seconds a cached status is reused for")
+    parser.add_argument("--refresh", action="store_true", help="Ignore the cached status and check now")
+
+    args = parser.parse_args()
+    urls = {component: getattr(args, f"{component}_url").rstrip("/") for component in DEFAULT_URLS}
+    cache = StatusCache(args.cache_file, args.cache_ttl)
+    status = asyncio.run(cache.get(urls, args.timeout, refresh=args.refresh or args.cache_ttl <= 0))
+
+    if args.format == "json":
+        print(json.dumps(status, indent=2))
+    else:
+        print_table(status)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(status, f, indent=2)
+    return 0 if status["healthy"] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Query the Sleek synthetic probe history store
+Returns availability and latency rollups for a region, transaction type and
+time range from the SQLite history written by health-check-synthetic.py
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import re
+from datetime import datetime, timedelta, timezone
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def load_script(module_name: str, filename: str):
+    """Import one of the hyphenated scripts in this directory as a module"""
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(SCRIPTS_DIR, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+synthetic = load_script("health_check_synthetic", "health-check-synthetic.py")
+
+def parse_time(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+def parse_duration(value: str) -> float:
+    """Parse 30s / 15m / 1h / 1d into seconds"""
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)([smhd])", value)
+    if not match:
+        raise argparse.ArgumentTypeError(f"Invalid duration: {value}")
+    return float(match.group(1)) * {"s": 1, "m": 60, "h": 3600, "d": 86400}[match.group(2)]
+
+def main():
+    parser = argparse.ArgumentParser(description="Sleek probe history rollups")
+    parser.add_argument("--db", default="synthetic_history.db", help="History database path")
+    parser.add_argument("--region", help="Region to query (default: all)")
+    parser.add_argument("--type", dest="transaction_type", help="Transaction type to query (default: all)")
+    parser.add_argument("--since", type=parse_time, help="Start of the range (ISO 8601, default: 24h ago)")
+    parser.add_argument("--until", type=parse_time, help="End of the range (ISO 8601, default: now)")
+    parser.add_argument("--bucket", type=parse_duration, help="Split the range into buckets, e.g. 15m, 1h")
+    parser.add_argument("--json", action="store_true", help="Print rollups as JSON")
+
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        parser.error(f"History database not found: {args.db}")
+
+    until = args.until or datetime.now(timezone.utc)
+    since = args.since or until - timedelta(days=1)
+    store = synthetic.HistoryStore(args.db)
+    rollups = store.rollup(
+        int(since.timestamp() * 1e9),
+        int(until.timestamp() * 1e9),
+        region=args.region,
+        transaction_type=args.transaction_type,
+        bucket_seconds=args.bucket
+    )
+
+    if args.json:
+        print(json.dumps(rollups, indent=2))
+        return
+
+    print(f"\n{'='*50}")
+    print("SLEEK PROBE HISTORY")
+    print(f"{'='*50}")
+    print(f"Range: {since.isoformat()} - {until.isoformat()}")
+    if not rollups:
+        print("No probes recorded in this range")
+        return
+    for rollup in rollups:
+        print(f"  {rollup['start']}  {rollup['region']:<10} {rollup['transaction_type']:<16} "
+              f"{rollup['availability']:>8.3f}% of {rollup['transactions']:<6} "
+              f"avg {rollup['avg_response_time']:.2f}ms max {rollup['max_response_time']:.2f}ms "
+              f"violations {rollup['compliance_violations']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS_DIR = os.path.join(REPO_DIR, "scripts")
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def wait_for_port(port: int, process: subprocess.Popen, timeout: float = 15):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{process.args[1]} exited with {process.returncode}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"Nothing listening on port {port}")
+
+def get_json(url: str):
+    with urllib.request.urlopen(url, timeout=5) as response:
+        return json.load(response)
+
+@pytest.fixture
+def run_script():
+    """Start scripts/<name> in the background; every process is stopped after the test"""
+    processes = []
+
+    def start(name: str, *args: str, wait_port: int = None, **kwargs) -> subprocess.Popen:
+        process = subprocess.Popen([sys.executable, os.path.join(SCRIPTS_DIR, name), *args],
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, **kwargs)
+        processes.append(process)
+        if wait_port is not None:
+            wait_for_port(wait_port, process)
+        return process
+
+    yield start
+    for process in processes:
+        if process.poll() is None:
+            process.kill()
+        process.wait()
+        process.stderr.close()
+
+@pytest.fixture
+def mock_pagerduty(run_script):
+    """Start the local PagerDuty stand-in with the given options and return its base URL"""
+    def start(**options) -> str:
+        port = free_port()
+        args = ["--port", str(port)]
+        for name, value in options.items():
+            args += [f"--{name.replace('_', '-')}", str(value)]
+        run_script("mock-pagerduty-api.py", *args, wait_port=port)
+        return f"http://127.0.0.1:{port}"
+    return start
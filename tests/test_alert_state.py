@@ -0,0 +1,46 @@
+import importlib.util
+import os
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def load_script(module_name: str, path: str):
+    """Import one of the hyphenated scripts in this repository as a module"""
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(REPO_DIR, path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+alert_state = load_script("alert_state", os.path.join("scripts", "alert-state.py"))
+
+def alert(alertname: str, status: str = "firing", region: str = "uk") -> dict:
+    return {"status": status, "labels": {"alertname": alertname, "region": region, "severity": "critical"}}
+
+@pytest.mark.parametrize("payload", [
+    [alert("RegionDown")],
+    {"status": "firing"},
+    {"alerts": {"0": alert("RegionDown")}},
+    {"alerts": [alert("RegionDown"), "RegionDown"]},
+    {"alerts": [alert("RegionDown"), {"status": "firing"}]},
+    {"alerts": [alert("RegionDown"), {"labels": {"alertname": ["RegionDown"]}}]},
+    {"alerts": [{**alert("RegionDown"), "annotations": "down"}]},
+])
+def test_malformed_payload_leaves_the_index_untouched(payload):
+    index = alert_state.ActiveAlertIndex()
+    index.update({"alerts": [alert("HighLatency")]})
+
+    with pytest.raises(ValueError):
+        index.update(payload)
+
+    assert [active.labels["alertname"] for active in index.query()] == ["HighLatency"]
+
+def test_resolved_alert_leaves_the_index():
+    index = alert_state.ActiveAlertIndex()
+    index.update({"alerts": [alert("RegionDown"), alert("HighLatency", region="singapore")]})
+    assert len(index.query(region="uk")) == 1
+
+    index.update({"alerts": [alert("RegionDown", status="resolved")]})
+
+    assert index.query(region="uk") == []
+    assert index.stats()["resolved_total"] == 1
@@ -0,0 +1,87 @@
+import errno
+import importlib.util
+import os
+import time
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def load_script(module_name: str, path: str):
+    """Import one of the hyphenated scripts in this repository as a module"""
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(REPO_DIR, path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+alert_wal = load_script("alert_wal", os.path.join("scripts", "alert-wal.py"))
+
+class TornFile:
+    """Segment file whose next write lands only partly on disk and then fails"""
+
+    def __init__(self, wrapped, failures: int = 1):
+        self.wrapped = wrapped
+        self.failures = failures
+
+    def write(self, data) -> int:
+        if self.failures:
+            self.failures -= 1
+            self.wrapped.write(bytes(data)[:len(data) // 2])
+            raise OSError(errno.ENOSPC, "No space left on device")
+        return self.wrapped.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self.wrapped, name)
+
+def endpoints(directory: str, since_ns=None):
+    return [record.endpoint for record in alert_wal.replay_directory(directory, since_ns)]
+
+def test_failed_write_does_not_hide_later_records(tmp_path):
+    wal = alert_wal.AlertWAL(str(tmp_path), fsync=False)
+    wal.append("/before", b'{"n": 1}').result(timeout=5)
+    wal._file = TornFile(wal._file)
+
+    with pytest.raises(OSError):
+        wal.append("/failed", b'{"n": 2}' * 100).result(timeout=5)
+    wal.append("/after", b'{"n": 3}').result(timeout=5)
+    wal.append("/later", b'{"n": 4}').result(timeout=5)
+    wal.close()
+
+    assert endpoints(str(tmp_path)) == ["/before", "/after", "/later"]
+    # Reopening trims nothing that was acknowledged
+    alert_wal.AlertWAL(str(tmp_path), fsync=False).close()
+    assert endpoints(str(tmp_path)) == ["/before", "/after", "/later"]
+
+def test_failed_truncate_moves_to_a_new_segment(tmp_path, monkeypatch):
+    wal = alert_wal.AlertWAL(str(tmp_path), fsync=False)
+    wal.append("/before", b"{}").result(timeout=5)
+    wal._file = TornFile(wal._file)
+
+    def ftruncate(fd, length):
+        raise OSError(errno.EIO, "Input/output error")
+    monkeypatch.setattr(alert_wal.os, "ftruncate", ftruncate)
+
+    with pytest.raises(OSError):
+        wal.append("/failed", b"{}" * 100).result(timeout=5)
+    wal.append("/after", b"{}").result(timeout=5)
+    wal.close()
+
+    assert len(wal.segments()) == 2
+    assert endpoints(str(tmp_path)) == ["/before", "/after"]
+
+def test_replay_since_skips_segments_written_before(tmp_path, monkeypatch):
+    wal = alert_wal.AlertWAL(str(tmp_path), segment_max_bytes=1, fsync=False)
+    wal.append("/old", b"{}", timestamp_ns=time.time_ns() - 3600 * 10**9).result(timeout=5)
+    wal.append("/new", b"{}").result(timeout=5)
+    wal.close()
+    old_segment = wal.segments()[0]
+    stale_ns = time.time_ns() - 7200 * 10**9
+    os.utime(old_segment, ns=(stale_ns, stale_ns))
+
+    assert endpoints(str(tmp_path)) == ["/old", "/new"]
+
+    read = []
+    read_segment = alert_wal.read_segment
+    monkeypatch.setattr(alert_wal, "read_segment", lambda path: read.append(path) or read_segment(path))
+    assert endpoints(str(tmp_path), since_ns=time.time_ns() - 60 * 10**9) == ["/new"]
+    assert old_segment not in read
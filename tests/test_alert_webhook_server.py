@@ -0,0 +1,125 @@
+import asyncio
+import importlib.util
+import io
+import json
+import os
+import threading
+
+from aiohttp.test_utils import TestClient, TestServer
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def load_script(module_name: str, path: str):
+    """Import one of the hyphenated scripts in this repository as a module"""
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(REPO_DIR, path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+webhook_server = load_script("alert_webhook_server", os.path.join("scripts", "alert-webhook-server.py"))
+
+def firing(alertname: str, region: str = "singapore") -> dict:
+    return {
+        "status": "firing",
+        "labels": {"alertname": alertname, "severity": "critical", "region": region, "service": "api"},
+        "annotations": {"summary": f"{alertname} in {region}"}
+    }
+
+async def post_all(server, deliveries):
+    """POST each delivery to the server, wait for the consumer to drain them and return the statuses"""
+    async with TestClient(TestServer(server.build_app())) as client:
+        statuses = []
+        for body in deliveries:
+            response = await client.post("/critical", data=body, headers={"Content-Type": "application/json"})
+            statuses.append(response.status)
+        await asyncio.wait_for(server.queue.join(), timeout=5)
+        health = await (await client.get("/health")).json()
+    return statuses, health
+
+def test_non_object_payloads_are_rejected():
+    output = io.StringIO()
+    server = webhook_server.AlertWebhookServer(output=output)
+    deliveries = [b"[1, 2]", b'"firing"', b"not json", json.dumps({"alerts": [firing("RegionDown")]}).encode()]
+
+    statuses, health = asyncio.run(post_all(server, deliveries))
+
+    assert statuses == [400, 400, 400, 200]
+    assert health["invalid"] == 3
+    assert health["rendered"] == 1
+    assert "RegionDown" in output.getvalue()
+
+def test_failed_render_does_not_stop_the_consumer():
+    output = io.StringIO()
+    server = webhook_server.AlertWebhookServer(output=output, batch_size=10)
+    render = server.render
+
+    def flaky_render(endpoint, data, received_at):
+        if data.get("explode"):
+            raise RuntimeError("boom")
+        return render(endpoint, data, received_at)
+    server.render = flaky_render
+
+    deliveries = [json.dumps({"explode": True, "alerts": []}).encode()] + [
+        json.dumps({"alerts": [firing(f"Alert{n}")]}).encode() for n in range(3)
+    ]
+    statuses, health = asyncio.run(post_all(server, deliveries))
+
+    assert statuses == [200] * 4
+    assert health["render_errors"] == 1
+    assert health["rendered"] == 4
+    assert "Failed to render alert delivery from /critical: boom" in output.getvalue()
+    for n in range(3):
+        assert f"Alert{n}" in output.getvalue()
+
+def test_malformed_alerts_are_rejected_before_queueing():
+    output = io.StringIO()
+    server = webhook_server.AlertWebhookServer(output=output)
+    deliveries = [
+        json.dumps({"status": "firing"}).encode(),
+        json.dumps({"alerts": [1]}).encode(),
+        json.dumps({"alerts": [{"status": "firing"}]}).encode(),
+        json.dumps({"alerts": [firing("RegionDown"), {"labels": {"region": ["uk"]}}]}).encode(),
+        json.dumps({"alerts": [firing("RegionDown")]}).encode()
+    ]
+
+    statuses, health = asyncio.run(post_all(server, deliveries))
+
+    assert statuses == [400, 400, 400, 400, 200]
+    assert health["invalid"] == 4
+    assert health["render_errors"] == 0
+    assert health["active_alerts"] == 1
+
+class BlockedConsole(io.StringIO):
+    """Console whose writes wait until the test releases it"""
+
+    def __init__(self):
+        super().__init__()
+        self.released = threading.Event()
+
+    def write(self, text: str) -> int:
+        self.released.wait(timeout=10)
+        return super().write(text)
+
+def test_full_queue_sheds_load_until_the_console_catches_up():
+    output = BlockedConsole()
+    server = webhook_server.AlertWebhookServer(output=output, queue_size=2, batch_size=1)
+    body = json.dumps({"alerts": [firing("RegionDown")]}).encode()
+
+    async def run():
+        async with TestClient(TestServer(server.build_app())) as client:
+            statuses = []
+            for _ in range(6):
+                response = await client.post("/critical", data=body, headers={"Content-Type": "application/json"})
+                statuses.append((response.status, response.headers.get("Retry-After")))
+                await asyncio.sleep(0.01)
+            output.released.set()
+            await asyncio.wait_for(server.queue.join(), timeout=5)
+            health = await (await client.get("/health")).json()
+        return statuses, health
+    statuses, health = asyncio.run(run())
+
+    # One delivery is held by the blocked writer and two fill the queue; the rest are told to retry
+    assert statuses == [(200, None)] * 3 + [(503, "1")] * 3
+    assert health["accepted"] == 3
+    assert health["rejected"] == 3
+    assert health["rendered"] == 3
@@ -0,0 +1,83 @@
+import csv
+import gzip
+import importlib.util
+import os
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def load_script(module_name: str, path: str):
+    """Import one of the hyphenated scripts in this repository as a module"""
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(REPO_DIR, path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+analyzer = load_script("analyze_sla_history", os.path.join("scripts", "analyze-sla-history.py"))
+
+def rows(region: str, latencies, start_second: int = 0) -> list:
+    return [
+        [f"2026-01-01T00:00:{start_second + n:02d}+00:00", region, "financial_query", 200, latency, True]
+        for n, latency in enumerate(latencies)
+    ]
+
+def write_segment(path, records, opener=open):
+    with opener(path, "wt", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(analyzer.COLUMNS)
+        writer.writerows(records)
+    return str(path)
+
+@pytest.fixture
+def conversions(monkeypatch):
+    """Record every source converted into the column cache"""
+    converted = []
+    convert = analyzer.convert_to_columns
+
+    def counting_convert(source, cache_path):
+        converted.append(source)
+        convert(source, cache_path)
+    monkeypatch.setattr(analyzer, "convert_to_columns", counting_convert)
+    return converted
+
+def test_unchanged_sources_are_read_from_the_cache(tmp_path, conversions):
+    plain = write_segment(tmp_path / "transaction_details_a.csv", rows("uk", [100, 200]))
+    compressed = write_segment(tmp_path / "transaction_details_b.csv.gz", rows("uk", [600], 10), gzip.open)
+    sources = analyzer.find_sources([str(tmp_path)])
+    cache_dir = str(tmp_path / "cache")
+
+    history = analyzer.load_history(sources, cache_dir)
+    assert sorted(conversions) == sorted([plain, compressed])
+    assert analyzer.summarize(history)["uk"]["compliance_violations"] == 1
+
+    conversions.clear()
+    assert len(analyzer.load_history(sources, cache_dir)) == 3
+    assert conversions == []
+
+    write_segment(tmp_path / "transaction_details_a.csv", rows("uk", [100, 200, 300]))
+    assert len(analyzer.load_history(sources, cache_dir)) == 4
+    assert conversions == [plain]
+
+def test_equal_file_names_in_different_directories_are_cached_apart(tmp_path, conversions):
+    sources = []
+    for region in ("uk", "singapore"):
+        (tmp_path / region).mkdir()
+        sources.append(write_segment(tmp_path / region / "transaction_details_a.csv", rows(region, [100])))
+
+    history = analyzer.load_history(sources, str(tmp_path / "cache"))
+
+    assert set(history["region"]) == {"uk", "singapore"}
+    assert len(conversions) == 2
+
+def test_zstd_segments_are_found_and_read(tmp_path):
+    zstandard = pytest.importorskip("zstandard")
+    path = tmp_path / "transaction_details_a.csv.zst"
+    write_segment(path, rows("uk", [100, 700]),
+                  lambda name, mode, newline: zstandard.open(name, mode, newline=newline))
+
+    sources = analyzer.find_sources([str(tmp_path)])
+    history = analyzer.load_history(sources, str(tmp_path / "cache"))
+
+    assert sources == [str(path)]
+    assert analyzer.summarize(history)["uk"]["compliance_violations"] == 1
@@ -0,0 +1,125 @@
+import asyncio
+import importlib.util
+import io
+import json
+import os
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MOCK_TERRAFORM = os.path.join(REPO_DIR, "scripts", "mock-terraform.py")
+
+def load_script(module_name: str, path: str):
+    """Import one of the hyphenated scripts in this repository as a module"""
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(REPO_DIR, path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+deploy = load_script("deploy_regions", os.path.join("scripts", "deploy-regions.py"))
+
+@pytest.fixture
+def terraform_dir(tmp_path, monkeypatch):
+    """Terraform environments for four regions, driven by the mock terraform binary"""
+    monkeypatch.setenv("MOCK_TERRAFORM_SECONDS", "init=0,plan=0,apply=0")
+    monkeypatch.delenv("MOCK_TERRAFORM_FAIL", raising=False)
+    monkeypatch.delenv("MOCK_TERRAFORM_STATE_DIR", raising=False)
+    for region in ("alpha", "beta", "gamma", "delta"):
+        env_dir = tmp_path / "terraform" / "environments" / region
+        env_dir.mkdir(parents=True)
+        (env_dir / "main.tf").write_text(f'locals {{\n  region = "{region}"\n}}\n')
+    (tmp_path / "terraform" / "modules").mkdir()
+    return tmp_path / "terraform"
+
+def run(terraform_dir, action: str, regions=("alpha",), **options) -> dict:
+    runner = deploy.DeploymentRunner(list(regions), action=action, terraform_dir=str(terraform_dir),
+                                     outputs_dir=str(terraform_dir.parent), terraform=MOCK_TERRAFORM,
+                                     color=False, output=io.StringIO(), **options)
+    return asyncio.run(runner.run())
+
+def plan_status(report: dict, region: str = "alpha") -> str:
+    return report["regions"][region]["phases"]["plan"]["status"]
+
+def test_saved_plan_is_reused_until_the_configuration_changes(terraform_dir):
+    assert plan_status(run(terraform_dir, "plan")) == "ok"
+    assert plan_status(run(terraform_dir, "plan")) == "cached"
+
+    (terraform_dir / "environments" / "alpha" / "main.tf").write_text('locals {\n  region = "changed"\n}\n')
+    assert plan_status(run(terraform_dir, "plan")) == "ok"
+
+    report = run(terraform_dir, "deploy")
+    assert report["succeeded"]
+    assert plan_status(report) == "cached"
+
+@pytest.fixture
+def remote_state(tmp_path, monkeypatch):
+    """Keep state outside the environment directory, as a remote backend does"""
+    state_dir = tmp_path / "remote-state"
+    state_dir.mkdir()
+    monkeypatch.setenv("MOCK_TERRAFORM_STATE_DIR", str(state_dir))
+    return state_dir
+
+def test_saved_plan_is_reused_while_the_remote_state_is_unchanged(terraform_dir, remote_state):
+    assert run(terraform_dir, "deploy")["succeeded"]
+    assert not (terraform_dir / "environments" / "alpha" / "terraform.tfstate").exists()
+
+    assert plan_status(run(terraform_dir, "plan")) == "ok"
+    report = run(terraform_dir, "deploy")
+    assert report["succeeded"]
+    assert plan_status(report) == "cached"
+
+def test_saved_plan_is_made_again_after_the_remote_state_changes(terraform_dir, remote_state):
+    assert run(terraform_dir, "deploy")["succeeded"]
+    assert plan_status(run(terraform_dir, "plan")) == "ok"
+
+    # Someone else applies from another checkout in the meantime
+    state_path = remote_state / "alpha.tfstate"
+    state = json.loads(state_path.read_text())
+    state["serial"] += 1
+    state_path.write_text(json.dumps(state))
+
+    report = run(terraform_dir, "deploy")
+    assert plan_status(report) == "ok"
+    assert report["succeeded"]
+
+def test_regions_run_at_most_concurrency_at_a_time(terraform_dir, monkeypatch):
+    monkeypatch.setenv("MOCK_TERRAFORM_SECONDS", "init=0,plan=0.5")
+    regions = ("alpha", "beta", "gamma", "delta")
+
+    report = run(terraform_dir, "plan", regions, concurrency=2)
+
+    assert report["succeeded"]
+    queued = {region: report["regions"][region]["queued_seconds"] for region in regions}
+    assert queued["alpha"] < 0.3 and queued["beta"] < 0.3
+    assert queued["gamma"] > 0.4 and queued["delta"] > 0.4
+    assert report["wall_seconds"] < report["serial_seconds"]
+
+def test_fail_fast_skips_queued_regions_and_interrupts_only_init_and_plan(terraform_dir, monkeypatch):
+    monkeypatch.setenv("MOCK_TERRAFORM_SECONDS", "init=1,plan=0,apply=2")
+    monkeypatch.setenv("MOCK_TERRAFORM_FAIL", "alpha:init")
+    # beta was initialized earlier, so it is applying when alpha's init fails
+    runner = deploy.DeploymentRunner(["beta"], terraform_dir=str(terraform_dir))
+    (terraform_dir / "environments" / "beta" / ".terraform").mkdir()
+    (terraform_dir / "environments" / "beta" / deploy.INIT_KEY_FILE).write_text(runner.config_key("beta"))
+
+    report = run(terraform_dir, "deploy", ("alpha", "beta", "gamma", "delta"), concurrency=3, fail_fast=True)
+    regions = report["regions"]
+
+    assert (regions["alpha"]["status"], regions["alpha"]["failed_phase"]) == ("failed", "init")
+    assert regions["beta"]["status"] == "succeeded"
+    assert regions["beta"]["phases"]["apply"]["status"] == "ok"
+    assert regions["gamma"]["status"] == "stopped"
+    assert regions["delta"]["status"] == "skipped"
+    assert not report["succeeded"]
+
+def test_deploy_writes_each_regions_outputs_file(terraform_dir):
+    report = run(terraform_dir, "deploy", ("alpha", "beta"))
+
+    assert report["succeeded"]
+    for region in ("alpha", "beta"):
+        with open(terraform_dir.parent / f"outputs_{region}.json") as f:
+            outputs = json.load(f)
+        assert outputs["environment"]["value"] == region
+        assert report["regions"][region]["outputs"]["load_balancer_dns_name"] == \
+            outputs["load_balancer_dns_name"]["value"]
+    assert not list(terraform_dir.parent.glob("outputs_*.json.tmp"))
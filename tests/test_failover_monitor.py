@@ -0,0 +1,98 @@
+import asyncio
+import importlib.util
+import os
+
+from conftest import free_port
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def load_script(module_name: str, path: str):
+    """Import one of the hyphenated scripts in this repository as a module"""
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(REPO_DIR, path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+failover = load_script("failover_monitor", os.path.join("scripts", "failover-monitor.py"))
+mock_region = load_script("mock_region_server", os.path.join("scripts", "mock-region-server.py"))
+
+def monitor_regions(profiles, transaction_types, duration_seconds: float, during=None):
+    """Probe the mock regions for a while and return the monitor; ``during`` runs alongside it"""
+    server = mock_region.MockRegionServer(profiles)
+    regions = [
+        failover.synthetic.RegionConfig(profile.name, server.endpoint(profile), 200, profile.name)
+        for profile in profiles
+    ]
+    monitor = failover.FailoverMonitor(regions, transaction_types, interval_seconds=0.05, timeout_seconds=2,
+                                       dns_refresh_seconds=0)
+
+    async def run():
+        await server.start()
+        try:
+            background = asyncio.ensure_future(during(server)) if during else None
+            await monitor.run(duration_seconds)
+            if background is not None:
+                await background
+        finally:
+            await server.stop()
+    asyncio.run(run())
+    return monitor
+
+def test_answers_over_the_latency_budget_are_not_outages():
+    profile = mock_region.RegionProfile("slow", free_port(), latency_median_ms=600)
+
+    monitor = monitor_regions([profile], ["financial_query"], duration_seconds=1.5)
+
+    tracker = monitor.trackers[0]
+    assert tracker.state == "up"
+    assert tracker.outages == []
+    assert tracker.failed == 0
+    assert tracker.slow == tracker.sent > 0
+    assert monitor.report()["targets"][0]["over_latency_budget"] == tracker.slow
+
+def region(name: str = "uk"):
+    return failover.synthetic.RegionConfig(name, "http://127.0.0.1:1", 200, name)
+
+def test_outage_edges_are_bracketed_by_the_probes_either_side():
+    tracker = failover.TargetTracker(region(), "health_check", down_after=2, up_after=2)
+    # Send time and outcome of each probe; one dropped probe at 2.0 is not an outage
+    probes = [(1.0, True), (2.0, False), (3.0, True), (4.0, True), (5.0, False), (6.0, False),
+              (7.0, False), (8.0, True), (9.0, False), (10.0, True), (11.0, True)]
+    # Results finish out of order and are applied in send order
+    order = [1, 0, 2, 3, 5, 4, 6, 8, 7, 9, 10]
+    for seq in order:
+        sent_at, success = probes[seq]
+        tracker.record(seq, sent_at, success, None if success else "HTTP 503")
+
+    assert tracker.state == "up"
+    assert tracker.failed == 5
+    [outage] = tracker.outages
+    assert (outage.last_ok_at, outage.first_failed_at) == (4.0, 5.0)
+    assert (outage.last_failed_at, outage.first_ok_at) == (9.0, 10.0)
+    assert outage.started_at == 4.5
+    assert outage.recovered_at == 9.5
+    assert outage.precision() == 1.0
+    assert outage.failed_probes == 4
+    assert outage.errors == {"HTTP 503": 4}
+
+def test_region_outage_and_recovery_are_measured_against_the_mock_region():
+    profiles = [mock_region.RegionProfile(name, free_port(), latency_median_ms=5) for name in ("uk", "singapore")]
+
+    async def outage(server):
+        await asyncio.sleep(0.5)
+        server.set_fault("uk", "error")
+        await asyncio.sleep(1)
+        server.set_fault("uk", None)
+
+    monitor = monitor_regions(profiles, ["health_check", "financial_query"], duration_seconds=2.5, during=outage)
+    report = monitor.report(fault_region="uk")
+
+    assert report["all_recovered"]
+    assert report["collateral_outages"] == []
+    uk = report["regions"]["uk"]
+    assert uk["outages"] == 1
+    assert uk["recovered"]
+    # The fault lasted one second; probes every 50ms bracket each edge
+    assert abs(uk["rto_seconds"] - 1) < 0.25
+    assert set(uk["transaction_types"]) == {"health_check", "financial_query"}
+    assert report["regions"]["singapore"]["outages"] == 0
@@ -0,0 +1,114 @@
+import filecmp
+import importlib.util
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+import yaml
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def load_script(module_name: str, path: str):
+    """Import one of the hyphenated scripts in this repository as a module"""
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(REPO_DIR, path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+recording = load_script("generate_recording_rules", os.path.join("scripts", "generate-recording-rules.py"))
+
+def generate(monitoring_dir, *args: str) -> dict:
+    """Run the generator with --write over a monitoring directory and return its JSON plan"""
+    plan_path = os.path.join(monitoring_dir, "plan.json")
+    subprocess.run(
+        [sys.executable, os.path.join(REPO_DIR, "scripts", "generate-recording-rules.py"),
+         "--prometheus-config", os.path.join(monitoring_dir, "prometheus", "prometheus.yml"),
+         "--rules-dir", os.path.join(monitoring_dir, "prometheus", "rules"),
+         "--dashboards-dir", os.path.join(monitoring_dir, "grafana", "dashboards"),
+         "--output", os.path.join(monitoring_dir, "prometheus", "rules", "sleek-recording.yml"),
+         "--write", "--json", plan_path, *args],
+        check=True, capture_output=True, text=True
+    )
+    with open(plan_path) as f:
+        return json.load(f)
+
+def test_equivalent_expressions_share_a_canonical_form():
+    first = recording.parse_promql('sum by (region, job) (rate(http_requests_total{status=~"5..",job="api"}[5m]))')
+    second = recording.parse_promql('sum by(job,region)(rate(http_requests_total{job="api", status=~"5.."}[5m]))')
+
+    assert recording.canonical(first, {}) == recording.canonical(second, {})
+    with pytest.raises(recording.PromQLError):
+        recording.parse_promql("sum by (region) (rate(http_requests_total[5m])")
+
+def test_committed_rules_and_dashboards_match_the_generator(tmp_path):
+    shutil.copytree(os.path.join(REPO_DIR, "monitoring"), tmp_path / "monitoring")
+
+    plan = generate(str(tmp_path / "monitoring"))
+
+    assert plan["rewrites"] == []
+    assert filecmp.dircmp(os.path.join(REPO_DIR, "monitoring", "prometheus", "rules"),
+                          tmp_path / "monitoring" / "prometheus" / "rules").diff_files == []
+    assert filecmp.dircmp(os.path.join(REPO_DIR, "monitoring", "grafana", "dashboards"),
+                          tmp_path / "monitoring" / "grafana" / "dashboards").diff_files == []
+
+ERROR_RATIO = ('sum by (region) (rate(http_requests_total{status=~"5.."}[5m])) '
+               '/ sum by (region) (rate(http_requests_total[5m]))')
+
+@pytest.fixture
+def monitoring_dir(tmp_path):
+    """Two alerts and a 10s-refresh dashboard panel sharing one error ratio, and a one-off alert
+
+    yaml.safe_dump folds the long alert expressions over two lines.
+    """
+    (tmp_path / "prometheus" / "rules").mkdir(parents=True)
+    (tmp_path / "grafana" / "dashboards").mkdir(parents=True)
+    shutil.copy(os.path.join(REPO_DIR, "monitoring", "prometheus", "prometheus.yml"), tmp_path / "prometheus")
+    (tmp_path / "prometheus" / "rules" / "alerts.yml").write_text(yaml.safe_dump({"groups": [{
+        "name": "test",
+        "rules": [
+            {"alert": "ErrorRatioHigh", "expr": f"{ERROR_RATIO} > 0.05", "for": "5m"},
+            {"alert": "ErrorRatioCritical", "expr": f"{ERROR_RATIO} > 0.2", "for": "1m"},
+            {"alert": "InstanceDown", "expr": "up == 0", "for": "1m"}
+        ]
+    }]}, sort_keys=False))
+    (tmp_path / "grafana" / "dashboards" / "errors.json").write_text(json.dumps({
+        "title": "Errors",
+        "refresh": "10s",
+        "time": {"from": "now-6h"},
+        "panels": [{"title": "Error ratio", "targets": [{"expr": ERROR_RATIO}]}]
+    }, indent=2))
+    return str(tmp_path)
+
+def test_shared_subexpressions_are_recorded_and_read_back(monitoring_dir):
+    plan = generate(monitoring_dir)
+
+    recorded = {rule["record"]: rule["expr"] for rule in plan["rules"]}
+    assert recorded
+    # Recorded series follow the level:metric:operations naming convention
+    assert all(len(name.split(":")) == 3 for name in recorded)
+    assert {rewrite["source"] for rewrite in plan["rewrites"]} == {
+        "ErrorRatioHigh", "ErrorRatioCritical", "Errors / Error ratio"
+    }
+
+    with open(os.path.join(monitoring_dir, "prometheus", "rules", "alerts.yml")) as f:
+        alerts = {rule["alert"]: rule["expr"] for rule in yaml.safe_load(f)["groups"][0]["rules"]}
+    # A rule expression used once at the evaluation interval stays inline
+    assert alerts["InstanceDown"] == "up == 0"
+    for name in ("ErrorRatioHigh", "ErrorRatioCritical"):
+        assert "http_requests_total" not in alerts[name]
+        assert any(record in alerts[name] for record in recorded)
+    with open(os.path.join(monitoring_dir, "grafana", "dashboards", "errors.json")) as f:
+        panel_expr = json.load(f)["panels"][0]["targets"][0]["expr"]
+    assert "http_requests_total" not in panel_expr
+
+    # Running again over its own output changes nothing
+    rules_path = os.path.join(monitoring_dir, "prometheus", "rules", "sleek-recording.yml")
+    with open(rules_path) as f:
+        written = f.read()
+    again = generate(monitoring_dir)
+    assert again["rewrites"] == []
+    with open(rules_path) as f:
+        assert f.read() == written
@@ -0,0 +1,275 @@
+import asyncio
+import glob
+import importlib.util
+import json
+import os
+import signal
+import time
+import urllib.request
+from datetime import datetime, timezone
+
+import pytest
+
+from conftest import free_port, wait_for_port
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def load_script(module_name: str, path: str):
+    """Import one of the hyphenated scripts in this repository as a module"""
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(REPO_DIR, path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+synthetic = load_script("health_check_synthetic", os.path.join("scripts", "health-check-synthetic.py"))
+
+def result(response_time_ms: float, success: bool = True, provisional: bool = False):
+    return synthetic.TransactionResult(
+        region="singapore",
+        transaction_type="financial_query",
+        status_code=200 if success else 0,
+        response_time_ms=response_time_ms,
+        success=success,
+        timestamp=datetime.now(timezone.utc).isoformat(),
+        provisional=provisional
+    )
+
+def slow_query(delay_seconds: float, started: list = None, cancelled: list = None):
+    async def perform(session, region):
+        if started is not None:
+            started.append(region.name)
+        try:
+            await asyncio.sleep(delay_seconds)
+        except asyncio.CancelledError:
+            if cancelled is not None:
+                cancelled.append(region.name)
+            raise
+        return result(delay_seconds * 1000)
+    return perform
+
+@pytest.fixture
+def engine(monkeypatch):
+    monkeypatch.setitem(synthetic.LATENCY_BUDGETS_MS, "financial_query", 50)
+    engine = synthetic.SyntheticTransactionEngine()
+    engine.regions = engine.regions[:1]
+    return engine
+
+def test_provisional_results_count_outcomes_but_not_latency():
+    aggregator = synthetic.ResultAggregator()
+    aggregator.add(result(120))
+    aggregator.add(result(500.2, success=False, provisional=True))
+
+    assert aggregator.overall.total == 2
+    assert aggregator.overall.successful == 1
+    assert aggregator.overall.sketch.count == 1
+    assert aggregator.overall.mean_ms == pytest.approx(120)
+    assert aggregator.financial_latency_violations == 1
+
+    aggregator.add_latency(result(3000))
+
+    assert aggregator.overall.total == 2
+    assert aggregator.overall.mean_ms == pytest.approx(1560)
+    assert aggregator.overall.max_ms == pytest.approx(3000)
+    assert aggregator.financial_latency_violations == 1
+
+def test_one_shot_summary_carries_the_true_latency_of_late_probes(engine):
+    engine.transactions = {"financial_query": slow_query(0.3)}
+
+    async def run():
+        try:
+            return await engine.run_synthetic_transactions()
+        finally:
+            await engine.close()
+    analysis = asyncio.run(run())
+
+    assert analysis["total_transactions"] == 1
+    assert analysis["failed_transactions"] == 1
+    assert analysis["sla_compliance"]["financial_services_latency"]["violations"] == 1
+    assert analysis["response_times"]["avg"] == pytest.approx(300, rel=0.02)
+    assert analysis["latency_percentiles"]["singapore"]["financial_query"]["p99"] == pytest.approx(300, rel=0.02)
+    assert [stored.response_time_ms for stored in engine.results] == [pytest.approx(300)]
+
+def test_cancelled_probe_cancels_its_request(engine):
+    started, cancelled = [], []
+    engine.transactions = {"financial_query": slow_query(5, started, cancelled)}
+
+    async def run():
+        probe = asyncio.create_task(engine.run_probe(None, engine.regions[0], "financial_query"))
+        await asyncio.sleep(0.01)
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+        await asyncio.sleep(0)
+        # Checked before asyncio.run cancels whatever is left at shutdown
+        assert started == cancelled == ["singapore"]
+        assert not engine._late_probes
+    asyncio.run(run())
+
+def metrics_regions(port: int) -> set:
+    """Regions with probe outcomes on a /metrics endpoint"""
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+        lines = response.read().decode().splitlines()
+    return {
+        line.split('region="')[1].split('"')[0]
+        for line in lines if line.startswith("sleek_synthetic_transactions_total{")
+    }
+
+def mock_regions(run_script, tmp_path, *names: str):
+    """Serve each region from the mock region server and write its Terraform outputs file"""
+    regions = {name: free_port() for name in names}
+    profiles = [{"name": name, "port": port, "latency_median_ms": 5} for name, port in regions.items()]
+    (tmp_path / "profiles.json").write_text(json.dumps(profiles))
+    run_script("mock-region-server.py", "--config", str(tmp_path / "profiles.json"), wait_port=regions[names[-1]])
+    for name, port in regions.items():
+        (tmp_path / f"outputs_{name}.json").write_text(json.dumps({
+            "environment": {"value": name},
+            "load_balancer_dns_name": {"value": f"127.0.0.1:{port}"}
+        }))
+
+def test_shutdown_summary_covers_every_interval(run_script, tmp_path):
+    mock_regions(run_script, tmp_path, "alpha")
+    monitor = run_script(
+        "health-check-synthetic.py", "--continuous", "--interval", "0.5", "--metrics-port", "0",
+        "--region-outputs", str(tmp_path / "outputs_*.json"), "--dns-refresh", "0", "--history-db", "",
+        "--log-file", "", "--export-dir", str(tmp_path), "--segment-compression", "none",
+        cwd=str(tmp_path)
+    )
+    time.sleep(3)
+    monitor.send_signal(signal.SIGINT)
+    assert monitor.wait(timeout=30) == 0
+
+    summaries = glob.glob(str(tmp_path / "synthetic_results_*.json"))
+    assert len(summaries) == 1
+    with open(summaries[0]) as f:
+        summary = json.load(f)
+    exported = 0
+    for path in glob.glob(str(tmp_path / "transaction_details_*.csv")):
+        with open(path) as f:
+            exported += len(f.read().splitlines()) - 1
+    # Several intervals ran, and the summary counts the transactions of all of them
+    assert exported > 3 * 3
+    assert summary["total_transactions"] == exported
+
+def test_sharded_workers_serve_their_regions_and_merge_reports(run_script, tmp_path):
+    mock_regions(run_script, tmp_path, "alpha", "beta")
+
+    metrics_port = free_port()
+    monitor = run_script(
+        "health-check-synthetic.py", "--continuous", "--workers", "2", "--interval", "1",
+        "--metrics-port", str(metrics_port), "--region-outputs", str(tmp_path / "outputs_*.json"),
+        "--dns-refresh", "0", "--history-db", "", "--log-file", "", "--export-dir", str(tmp_path), "--verbose",
+        cwd=str(tmp_path)
+    )
+    for port in (metrics_port, metrics_port + 1):
+        wait_for_port(port, monitor, timeout=30)
+
+    # Regions are dealt to workers in outputs file order, and each worker serves only its own
+    deadline = time.monotonic() + 20
+    while time.monotonic() < deadline:
+        served = [metrics_regions(metrics_port), metrics_regions(metrics_port + 1)]
+        if all(served):
+            break
+        time.sleep(0.2)
+    assert served == [{"alpha"}, {"beta"}]
+
+    # Let the coordinator merge at least one report with both workers' windows
+    time.sleep(2.5)
+    monitor.send_signal(signal.SIGINT)
+    assert monitor.wait(timeout=30) == 0
+
+    summaries = glob.glob(str(tmp_path / "synthetic_results_*.json"))
+    assert len(summaries) == 1
+    with open(summaries[0]) as f:
+        assert set(json.load(f)["regions"]) == {"alpha", "beta"}
+
+    # Partials are merged per worker window, each window reported once and in order
+    log = monitor.stderr.read().decode()
+    merged = [line.split("Merged window ")[1].split(" worker")[0].split(" from ")
+              for line in log.splitlines() if "Merged window " in line]
+    windows = [int(window) for window, _ in merged]
+    assert windows == sorted(set(windows))
+    assert any(workers == "2" for _, workers in merged)
+
+    # Only the workers export transaction details
+    assert glob.glob(str(tmp_path / "transaction_details_shard*_manifest.json"))
+    assert not os.path.exists(tmp_path / "transaction_details_manifest.json")
+
+def test_export_reads_new_records_from_the_result_store(tmp_path, caplog):
+    engine = synthetic.SyntheticTransactionEngine(
+        max_results=3, exporter=synthetic.SegmentedResultExporter(str(tmp_path), compression="none")
+    )
+    for latency in (10, 20):
+        engine.record_details(result(latency))
+    assert engine.export_details() == 2
+
+    for latency in (30, 40, 50, 60):
+        engine.record_details(result(latency))
+    assert engine.export_details() == 3
+    assert "1 transaction details left the result store" in caplog.text
+    assert engine.export_details() == 0
+    engine.exporter.close()
+
+    rows = []
+    for path in sorted(glob.glob(str(tmp_path / "transaction_details_*.csv"))):
+        with open(path) as f:
+            rows += [line.split(",")[4] for line in f.read().splitlines()[1:]]
+    assert rows == ["10.00", "20.00", "40.00", "50.00", "60.00"]
+
+def test_one_shot_runs_append_to_the_open_segment_until_it_rotates(tmp_path):
+    def run_once(**options):
+        exporter = synthetic.SegmentedResultExporter(str(tmp_path), **options)
+        exporter.append([result(10), result(20)])
+        exporter.close()
+        with open(exporter.manifest_path) as f:
+            return json.load(f)["segments"]
+
+    for _ in range(3):
+        segments = run_once()
+    assert [(segment["status"], segment["records"]) for segment in segments] == [("open", 6)]
+    with open(tmp_path / segments[0]["file"]) as f:
+        assert f.read().count("timestamp") == 1
+
+    # A segment past its size limit is sealed on the next run and a new one started
+    segments = run_once(max_bytes=1)
+    assert [(segment["status"], segment["records"]) for segment in segments] == [("closed", 6), ("open", 2)]
+    assert segments[0]["file"].endswith(".csv.gz")
+    assert os.path.exists(tmp_path / segments[0]["file"])
+
+def test_latency_budget_violations_do_not_open_the_circuit():
+    policy = synthetic.AdaptiveProbePolicy(base_interval_seconds=60, failure_threshold=3)
+    slow = synthetic.TransactionResult(
+        region="singapore", transaction_type="financial_query", status_code=200, response_time_ms=800,
+        success=False, timestamp=datetime.now(timezone.utc).isoformat(), latency_budget_exceeded=True
+    )
+
+    assert [policy.record(slow) for _ in range(5)] == [None] * 5
+    assert policy.breaker("singapore").state == synthetic.RegionCircuitBreaker.CLOSED
+    assert policy.health_interval("singapore") == 60
+
+    events = [policy.record(result(20000, success=False)) for _ in range(3)]
+    assert events[:2] == [None, None]
+    assert events[2].state == synthetic.RegionCircuitBreaker.OPEN
+
+def test_late_probes_reach_the_breaker_with_their_final_outcome(engine):
+    engine.transactions = {"financial_query": slow_query(0.1)}
+    policy = synthetic.AdaptiveProbePolicy(base_interval_seconds=60, failure_threshold=1)
+    recorded = []
+    record = policy.record
+
+    def tracking_record(outcome):
+        recorded.append(outcome.provisional)
+        return record(outcome)
+    policy.record = tracking_record
+
+    async def run():
+        try:
+            await asyncio.wait_for(engine.run_scheduled(interval_seconds=0.2, jitter=0, policy=policy), timeout=1)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            await engine.close()
+    asyncio.run(run())
+
+    # Only the final outcomes, never the provisional verdicts at the 50ms budget
+    assert recorded and not any(recorded)
+    assert policy.breaker("singapore").state == synthetic.RegionCircuitBreaker.CLOSED
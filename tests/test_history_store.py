@@ -0,0 +1,97 @@
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def load_script(module_name: str, path: str):
+    """Import one of the hyphenated scripts in this repository as a module"""
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(REPO_DIR, path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+synthetic = load_script("health_check_synthetic", os.path.join("scripts", "health-check-synthetic.py"))
+
+MIDNIGHT = datetime(2026, 3, 2, tzinfo=timezone.utc)
+
+def probe(at: datetime, region: str = "uk", transaction_type: str = "financial_query",
+          response_time_ms: float = 100, success: bool = True):
+    return synthetic.TransactionResult(
+        region=region,
+        transaction_type=transaction_type,
+        status_code=200 if success else 503,
+        response_time_ms=response_time_ms,
+        success=success,
+        timestamp=at.isoformat()
+    )
+
+def ns(at: datetime) -> int:
+    return int(at.timestamp() * 1e9)
+
+@pytest.fixture
+def history(tmp_path):
+    """History spanning midnight: two probes of uk on each side, one of singapore after"""
+    store = synthetic.HistoryStore(str(tmp_path / "history.db"), retention_days=None)
+    for result in (
+        probe(MIDNIGHT - timedelta(minutes=30), response_time_ms=100),
+        probe(MIDNIGHT - timedelta(minutes=10), response_time_ms=700, success=False),
+        probe(MIDNIGHT + timedelta(minutes=10), response_time_ms=200),
+        probe(MIDNIGHT + timedelta(minutes=30), response_time_ms=300),
+        probe(MIDNIGHT + timedelta(minutes=20), region="singapore", transaction_type="health_check"),
+    ):
+        store.add(result)
+    store.close()
+    return store
+
+def test_results_are_partitioned_by_utc_day_and_rolled_up_across_partitions(history):
+    partitions = [row[0] for row in history._connection().execute("SELECT name FROM partitions ORDER BY name")]
+    assert partitions == ["results_20260301", "results_20260302"]
+
+    [uk] = history.rollup(ns(MIDNIGHT - timedelta(hours=1)), ns(MIDNIGHT + timedelta(hours=1)), region="uk")
+    assert uk["transactions"] == 4
+    assert uk["availability"] == 75
+    assert uk["avg_response_time"] == 325
+    assert (uk["min_response_time"], uk["max_response_time"]) == (100, 700)
+    assert uk["compliance_violations"] == 1
+
+    rollups = history.rollup(ns(MIDNIGHT - timedelta(hours=1)), ns(MIDNIGHT + timedelta(hours=1)))
+    assert [(rollup["region"], rollup["transaction_type"]) for rollup in rollups] == [
+        ("singapore", "health_check"), ("uk", "financial_query")
+    ]
+
+def test_bucketed_rollups_split_the_range(history):
+    rollups = history.rollup(ns(MIDNIGHT - timedelta(hours=1)), ns(MIDNIGHT + timedelta(hours=1)),
+                             region="uk", transaction_type="financial_query", bucket_seconds=3600)
+
+    assert [(rollup["start"], rollup["transactions"], rollup["successful"]) for rollup in rollups] == [
+        ((MIDNIGHT - timedelta(hours=1)).isoformat(), 2, 1),
+        (MIDNIGHT.isoformat(), 2, 2)
+    ]
+
+def test_prune_drops_whole_days_before_the_cutoff(history):
+    assert history.prune(ns(MIDNIGHT + timedelta(hours=12))) == ["results_20260301"]
+
+    rollups = history.rollup(ns(MIDNIGHT - timedelta(days=1)), ns(MIDNIGHT + timedelta(days=1)), region="uk")
+    assert rollups[0]["transactions"] == 2
+
+def test_query_script_prints_rollups_as_json(history):
+    completed = subprocess.run(
+        [sys.executable, os.path.join(REPO_DIR, "scripts", "query-sla-history.py"), "--db", history.path,
+         "--region", "uk", "--since", (MIDNIGHT - timedelta(hours=1)).isoformat(),
+         "--until", (MIDNIGHT + timedelta(hours=1)).isoformat(), "--bucket", "30m", "--json"],
+        capture_output=True, text=True, check=True
+    )
+
+    # The first 30 minutes hold no probes, so there is no rollup for them
+    rollups = json.loads(completed.stdout)
+    assert [rollup["start"] for rollup in rollups] == [
+        (MIDNIGHT + timedelta(minutes=minutes)).isoformat() for minutes in (-30, 0, 30)
+    ]
+    assert [rollup["transactions"] for rollup in rollups] == [2, 1, 1]
+    assert [rollup["compliance_violations"] for rollup in rollups] == [1, 0, 0]
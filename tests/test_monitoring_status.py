@@ -0,0 +1,105 @@
+import asyncio
+import importlib.util
+import os
+import time
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def load_script(module_name: str, path: str):
+    """Import one of the hyphenated scripts in this repository as a module"""
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(REPO_DIR, path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+monitoring_status = load_script("monitoring_status", os.path.join("scripts", "monitoring-status.py"))
+
+TARGETS = {"status": "success", "data": {"activeTargets": [
+    {"labels": {"job": "prometheus", "instance": "localhost:9090"}, "health": "up",
+     "lastError": "", "lastScrapeDuration": 0.004},
+    {"labels": {"job": "blackbox-http-uk", "instance": "https://uk.example.com/health"}, "health": "down",
+     "lastError": "context deadline exceeded", "lastScrapeDuration": 10}
+]}}
+
+ALERTS = [{
+    "labels": {"alertname": "RegionDown", "severity": "critical", "region": "uk"},
+    "status": {"state": "active"},
+    "startsAt": "2026-01-01T00:00:00Z"
+}]
+
+def stack_app(requests: list, grafana_delay: float = 0) -> web.Application:
+    """Every component of the stack on one server, each under its own path prefix"""
+    def respond(response, delay: float = 0):
+        async def handler(request):
+            requests.append(request.path)
+            await asyncio.sleep(delay)
+            return response() if callable(response) else web.Response(text=response)
+        return handler
+
+    app = web.Application()
+    app.router.add_get("/prometheus/-/healthy", respond("Prometheus Server is Healthy.\n"))
+    app.router.add_get("/prometheus/api/v1/targets", respond(lambda: web.json_response(TARGETS)))
+    app.router.add_get("/alertmanager/-/healthy", respond("OK"))
+    app.router.add_get("/alertmanager/api/v2/alerts", respond(lambda: web.json_response(ALERTS)))
+    app.router.add_get("/grafana/api/health", respond(lambda: web.json_response({"database": "ok"}), grafana_delay))
+    app.router.add_get("/webhook/health", respond(lambda: web.json_response({"status": "healthy", "queued": 2})))
+    return app
+
+def check(tmp_path, timeout: float = 2, grafana_delay: float = 0, calls=({},)):
+    """Check the stack once per entry of ``calls`` (keyword arguments for StatusCache.get)
+
+    Returns each status and the paths the stack was asked for.
+    """
+    requests = []
+    cache = monitoring_status.StatusCache(str(tmp_path / "status.json"), ttl_seconds=60)
+
+    async def run():
+        async with TestServer(stack_app(requests, grafana_delay)) as server:
+            base = str(server.make_url("")).rstrip("/")
+            urls = {component: f"{base}/{component}" for component in monitoring_status.DEFAULT_URLS}
+            return [await cache.get(urls, **dict({"timeout": timeout}, **options)) for options in calls]
+    return asyncio.run(run()), requests
+
+def test_every_component_is_checked_and_summarised(tmp_path):
+    [status], requests = check(tmp_path)
+    checks = status["checks"]
+
+    assert len(requests) == 6
+    for name in ("prometheus", "alertmanager", "grafana", "webhook"):
+        assert checks[name]["status"] == "up"
+    assert checks["webhook"]["detail"] == "healthy, 2 queued"
+    # One scrape target down fails the check; a firing alert does not
+    assert (checks["targets"]["status"], checks["targets"]["detail"]) == ("down", "1/2 up")
+    assert checks["targets"]["items"][1] == {"job": "blackbox-http-uk", "instance": "health", "health": "down",
+                                             "last_error": "context deadline exceeded", "scrape_ms": 10000}
+    assert (checks["alerts"]["status"], checks["alerts"]["detail"]) == ("up", "1 active")
+    assert checks["alerts"]["items"][0]["alertname"] == "RegionDown"
+    assert not status["healthy"]
+
+def test_a_hung_component_costs_one_deadline_not_the_sum(tmp_path):
+    started = time.perf_counter()
+    [status], _ = check(tmp_path, timeout=0.5, grafana_delay=3)
+    elapsed = time.perf_counter() - started
+
+    grafana = status["checks"]["grafana"]
+    assert (grafana["status"], grafana["detail"]) == ("down", "no response within 0.5s")
+    assert status["checks"]["prometheus"]["status"] == "up"
+    assert status["elapsed_seconds"] < 1
+    assert elapsed < 2
+
+def test_repeated_calls_within_the_ttl_reuse_the_cached_status(tmp_path):
+    (first, second, refreshed, other_timeout), requests = check(
+        tmp_path, calls=({}, {}, {"refresh": True}, {"timeout": 3})
+    )
+
+    assert not first["cached"]
+    assert second["cached"]
+    assert second["checks"] == first["checks"]
+    assert second["checked_at"] == first["checked_at"]
+    # --refresh and a different deadline both probe the stack again
+    assert not refreshed["cached"]
+    assert not other_timeout["cached"]
+    assert len(requests) == 18
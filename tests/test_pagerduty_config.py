@@ -0,0 +1,52 @@
+import importlib.util
+import os
+
+from conftest import get_json
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def load_script(module_name: str, path: str):
+    """Import one of the hyphenated scripts in this repository as a module"""
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(REPO_DIR, path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+pagerduty = load_script("pagerduty_config", os.path.join("monitoring", "alerting", "pagerduty-config.py"))
+
+def setup(base_url: str, **options):
+    pd = pagerduty.PagerDutyIntegration("test-token", base_url=base_url, **options)
+    return pagerduty.setup_sleek_pagerduty_integration(pd), pd
+
+def test_setup_is_idempotent(mock_pagerduty, tmp_path, monkeypatch):
+    # setup writes its generated config files to the working directory
+    monkeypatch.chdir(tmp_path)
+    base_url = mock_pagerduty(latency_ms=5, requests_per_minute=60000)
+
+    ok, pd = setup(base_url, max_workers=8, requests_per_minute=60000)
+    assert ok
+    assert pd.stats["created"] > 0
+    created = get_json(f"{base_url}/_stats")["objects"]
+
+    ok, pd = setup(base_url, max_workers=8, requests_per_minute=60000)
+    assert ok
+    assert pd.stats["created"] == 0
+    assert pd.stats["reused"] > 0
+    stats = get_json(f"{base_url}/_stats")
+    assert stats["objects"] == created
+    assert stats["rejected_duplicates"] == 0
+
+def test_rate_limited_requests_are_retried(mock_pagerduty, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    # The client allows bursts above what the stub accepts, as when another tool shares the API token
+    base_url = mock_pagerduty(latency_ms=1, requests_per_minute=600)
+    pd = pagerduty.PagerDutyIntegration("test-token", base_url=base_url, max_workers=8, requests_per_minute=900)
+
+    ids = pd.run_parallel({
+        n: (lambda n=n: pd.create_user(f"User {n}", f"user{n}@sleek.com")) for n in range(30)
+    })
+
+    assert all(ids.values())
+    assert len(set(ids.values())) == 30
+    assert pd.stats["rate_limited"] > 0
+    assert get_json(f"{base_url}/_stats")["objects"]["users"] == 30
@@ -0,0 +1,80 @@
+import importlib.util
+import os
+
+from conftest import free_port, get_json
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def load_script(module_name: str, path: str):
+    """Import one of the hyphenated scripts in this repository as a module"""
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(REPO_DIR, path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+pagerduty_events = load_script("pagerduty_events", os.path.join("monitoring", "alerting", "pagerduty-events.py"))
+
+ROUTING_KEY = "test-routing-key"
+
+def alertmanager_payload(status: str, *fingerprints: str) -> dict:
+    return {"alerts": [
+        {"status": status, "fingerprint": fingerprint,
+         "labels": {"alertname": "RegionDown", "region": "uk", "severity": "critical"}}
+        for fingerprint in fingerprints
+    ]}
+
+def forwarder(tmp_path, base_url: str, **options):
+    return pagerduty_events.PagerDutyEventForwarder(
+        queue_path=str(tmp_path / "events.db"),
+        events_url=f"{base_url}/v2/enqueue",
+        **options
+    )
+
+def test_updates_within_the_window_coalesce_into_one_delivery(mock_pagerduty, tmp_path):
+    base_url = mock_pagerduty(latency_ms=1)
+    events = forwarder(tmp_path, base_url, coalesce_seconds=0.5).start()
+    try:
+        events.forward_alertmanager(alertmanager_payload("firing", "a", "b"), ROUTING_KEY)
+        events.forward_alertmanager(alertmanager_payload("resolved", "a"), ROUTING_KEY)
+        assert events.flush(timeout=10)
+    finally:
+        events.close()
+
+    stats = get_json(f"{base_url}/_stats")
+    assert stats["events"] == 2
+    assert stats["event_state"] == {"sleek-a": "resolve", "sleek-b": "trigger"}
+    assert events.stats()["coalesced"] == 1
+
+def test_throttled_events_are_retried(mock_pagerduty, tmp_path):
+    base_url = mock_pagerduty(latency_ms=1, events_per_minute=120)
+    # The client allows more than the stub accepts per routing key
+    events = forwarder(tmp_path, base_url, coalesce_seconds=0, events_per_minute=6000).start()
+    try:
+        events.forward_alertmanager(alertmanager_payload("firing", *"abcdef"), ROUTING_KEY)
+        assert events.flush(timeout=20)
+    finally:
+        events.close()
+
+    stats = get_json(f"{base_url}/_stats")
+    assert set(stats["event_state"]) == {f"sleek-{fingerprint}" for fingerprint in "abcdef"}
+    assert events.stats()["rate_limited"] > 0
+    assert events.stats()["delivered"] == 6
+
+def test_undelivered_events_survive_a_restart(mock_pagerduty, tmp_path):
+    unreachable = f"http://127.0.0.1:{free_port()}"
+    events = forwarder(tmp_path, unreachable, coalesce_seconds=0, timeout=1).start()
+    try:
+        events.forward_alertmanager(alertmanager_payload("firing", "a"), ROUTING_KEY)
+        assert not events.flush(timeout=0.5)
+    finally:
+        events.close()
+    assert events.stats()["retried"] > 0
+
+    base_url = mock_pagerduty(latency_ms=1)
+    events = forwarder(tmp_path, base_url, coalesce_seconds=0).start()
+    try:
+        assert events.flush(timeout=20)
+    finally:
+        events.close()
+
+    assert get_json(f"{base_url}/_stats")["event_state"] == {"sleek-a": "trigger"}
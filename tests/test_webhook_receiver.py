@@ -0,0 +1,62 @@
+import importlib.util
+import json
+import os
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def load_script(module_name: str, path: str):
+    """Import one of the hyphenated scripts in this repository as a module"""
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(REPO_DIR, path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+receiver = load_script("webhook_receiver", "webhook-receiver.py")
+
+def payload(alertname: str) -> bytes:
+    return json.dumps({"alerts": [{
+        "status": "firing",
+        "labels": {"alertname": alertname, "region": "uk", "severity": "critical"}
+    }]}).encode()
+
+@pytest.fixture
+def wal(tmp_path, monkeypatch):
+    log = receiver.alert_wal.AlertWAL(str(tmp_path), fsync=False)
+    monkeypatch.setattr(receiver, "wal", log)
+    monkeypatch.setattr(receiver, "active_alerts", receiver.alert_state.ActiveAlertIndex())
+    yield log
+    log.close()
+
+@pytest.mark.parametrize("body", [b"[1]", b"not json", b'{"alerts": [1]}', b'{"status": "firing"}'])
+def test_malformed_payload_is_rejected_before_logging(wal, body):
+    client = receiver.app.test_client()
+
+    assert client.post("/critical", data=body, content_type="application/json").status_code == 400
+    assert client.post("/warning", data=body, content_type="application/json").status_code == 400
+    assert client.post("/critical", data=payload("RegionDown"), content_type="application/json").status_code == 200
+
+    assert [record.payload for record in wal.replay()] == [payload("RegionDown")]
+
+def test_restore_skips_unreadable_records(wal):
+    # Written by an older receiver that logged payloads before validating them
+    for body in (payload("RegionDown"), b"[1]", b'{"alerts": [{"status": "firing"}]}', b"\xff",
+                 payload("HighLatency")):
+        wal.append("/critical", body).result(timeout=5)
+
+    assert receiver.restore_active_alerts(wal) == 5
+    assert sorted(alert.labels["alertname"] for alert in receiver.active_alerts.query()) == [
+        "HighLatency", "RegionDown"
+    ]
+
+def test_requests_queue_console_output_instead_of_printing(wal, monkeypatch, capsys):
+    monkeypatch.setattr(receiver, "console", receiver.queue.Queue())
+    client = receiver.app.test_client()
+
+    assert client.post("/critical", data=payload("RegionDown"), content_type="application/json").status_code == 200
+
+    assert capsys.readouterr().out == ""
+    assert "Alert: RegionDown" in receiver.console.get_nowait()
+    # The PagerDuty forwarder and its dependencies load only when forwarding is enabled
+    assert receiver.pagerduty_events is None
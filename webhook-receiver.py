@@ -1,51 +1,200 @@
 #!/usr/bin/env python3
 from flask import Flask, request, jsonify
+from waitress import serve
+from concurrent.futures import TimeoutError as CommitTimeout
 from datetime import datetime
+from typing import Optional
+import argparse
+import importlib.util
 import json
+import os
+import queue
+import threading
+import time
+
+def load_script(module_name: str, filename: str, directory: str = "scripts"):
+    """Import one of the hyphenated scripts in this repository (under scripts/ by default) as a module"""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), directory, filename)
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+alert_state = load_script("alert_state", "alert-state.py")
+alert_wal = load_script("alert_wal", "alert-wal.py")
+# Loaded by main() only when forwarding is enabled, so the receiver starts without its dependencies
+pagerduty_events = None
+
+# Seconds a request waits for its group commit before AlertManager is told to retry
+WAL_COMMIT_TIMEOUT = 5
 
 app = Flask(__name__)
+active_alerts = alert_state.ActiveAlertIndex()
+wal: Optional["alert_wal.AlertWAL"] = None
+forwarder: Optional["pagerduty_events.PagerDutyEventForwarder"] = None
+routing_key: Optional[str] = None
+debug = False
+# Console output waiting for the printer thread; requests never block on stdout
+console: "queue.Queue[Optional[str]]" = queue.Queue(maxsize=10000)
+console_dropped = 0
+
+def show(text: str):
+    """Queue text for the printer thread, dropping it if the console has fallen far behind"""
+    global console_dropped
+    try:
+        console.put_nowait(text)
+    except queue.Full:
+        console_dropped += 1
+
+def print_console():
+    while True:
+        text = console.get()
+        if text is None:
+            return
+        print(text, flush=True)
+
+def receive_delivery(receiver: str):
+    """Validate the payload, log it durably, then update the active alerts
+
+    Raises ValueError for a body that is not an AlertManager payload, so
+    nothing malformed reaches the write-ahead log.
+    """
+    body = request.get_data()
+    data = alert_state.validate_payload(json.loads(body))
+    if wal is not None:
+        wal.append(request.path, body).result(timeout=WAL_COMMIT_TIMEOUT)
+    active_alerts.update(data, receiver=receiver)
+    if forwarder is not None and receiver == "critical":
+        forwarder.forward_alertmanager(data, routing_key)
+    if debug:
+        show(json.dumps(data, indent=2))
+    return data
 
 @app.route('/critical', methods=['POST'])
 def handle_critical():
     try:
-        data = request.json
+        data = receive_delivery("critical")
         timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        print(f"\n[{timestamp}] CRITICAL ALERT RECEIVED:")
-        print(json.dumps(data, indent=2))
-        
-        if 'alerts' in data:
-            for alert in data['alerts']:
-                status = alert.get('status', 'unknown')
-                labels = alert.get('labels', {})
-                annotations = alert.get('annotations', {})
-                
-                print(f"\n  Alert: {labels.get('alertname', 'Unknown')}")
-                print(f"  Status: {status}")
-                print(f"  Severity: {labels.get('severity', 'unknown')}")
-                print(f"  Instance: {labels.get('instance', 'unknown')}")
-                print(f"  Description: {annotations.get('description', 'No description')}")
-        
+        lines = [f"\n[{timestamp}] CRITICAL ALERT RECEIVED:"]
+
+        for alert in data['alerts']:
+            status = alert.get('status', 'unknown')
+            labels = alert['labels']
+            annotations = alert.get('annotations', {})
+
+            lines.append(f"\n  Alert: {labels.get('alertname', 'Unknown')}")
+            lines.append(f"  Status: {status}")
+            lines.append(f"  Severity: {labels.get('severity', 'unknown')}")
+            lines.append(f"  Instance: {labels.get('instance', 'unknown')}")
+            lines.append(f"  Description: {annotations.get('description', 'No description')}")
+        show("\n".join(lines))
+
         return jsonify({"status": "received"}), 200
+    except ValueError as e:
+        show(f"Rejected malformed alert payload: {e}")
+        return jsonify({"error": str(e)}), 400
+    except (CommitTimeout, OSError) as e:
+        show(f"Could not log alert durably: {e}")
+        return jsonify({"error": "write-ahead log unavailable"}), 503
     except Exception as e:
-        print(f"Error processing alert: {e}")
+        show(f"Error processing alert: {e}")
         return jsonify({"error": str(e)}), 500
 
 @app.route('/warning', methods=['POST'])
 def handle_warning():
     try:
-        data = request.json
+        data = receive_delivery("warning")
         timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        print(f"\n[{timestamp}] WARNING ALERT RECEIVED:")
-        print(json.dumps(data, indent=2))
+        show(f"\n[{timestamp}] WARNING ALERT RECEIVED: {len(data['alerts'])} alert(s)")
         return jsonify({"status": "received"}), 200
+    except ValueError as e:
+        show(f"Rejected malformed alert payload: {e}")
+        return jsonify({"error": str(e)}), 400
+    except (CommitTimeout, OSError) as e:
+        show(f"Could not log alert durably: {e}")
+        return jsonify({"error": "write-ahead log unavailable"}), 503
     except Exception as e:
-        print(f"Error processing alert: {e}")
+        show(f"Error processing alert: {e}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/alerts', methods=['GET'])
+def list_alerts():
+    try:
+        return jsonify(alert_state.alerts_response(active_alerts, request.args)), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
 @app.route('/health', methods=['GET'])
 def health():
     return jsonify({"status": "healthy"}), 200
 
+def restore_active_alerts(log: "alert_wal.AlertWAL") -> int:
+    """Rebuild the active alert index from deliveries still inside its TTL"""
+    since_ns = time.time_ns() - int(active_alerts.ttl_seconds * 1e9)
+
+    def apply(record):
+        try:
+            active_alerts.update(json.loads(record.payload), receiver=record.endpoint.strip("/"))
+        except (ValueError, TypeError, AttributeError, KeyError) as e:
+            # Logged before payloads were validated; skip it rather than refuse to start
+            print(f"Warning: skipping unreadable {record.endpoint} delivery from "
+                  f"{record.received_at.isoformat()} in the write-ahead log: {e}")
+
+    return alert_wal.replay_into(log.replay(since_ns), apply)
+
+def main():
+    global wal, forwarder, routing_key, debug, pagerduty_events
+    parser = argparse.ArgumentParser(description="AlertManager webhook receiver")
+    parser.add_argument("--host", default="0.0.0.0", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=8888, help="Port to listen on")
+    parser.add_argument("--threads", type=int, default=16, help="Request handler threads")
+    parser.add_argument("--wal-dir", default="alert-wal",
+                        help="Write-ahead log directory for received payloads (empty to disable)")
+    parser.add_argument("--wal-segment-mb", type=float, default=64, help="Rotate WAL segments after this size")
+    parser.add_argument("--wal-max-segments", type=int, default=16,
+                        help="Delete the oldest WAL segments beyond this many (0 keeps all)")
+    parser.add_argument("--pagerduty-routing-key", default=os.getenv("PAGERDUTY_ROUTING_KEY"),
+                        help="Forward critical alerts to this PagerDuty integration (default: $PAGERDUTY_ROUTING_KEY)")
+    parser.add_argument("--pagerduty-events-url", default=os.getenv("PAGERDUTY_EVENTS_URL"),
+                        help="PagerDuty Events API v2 endpoint (default: $PAGERDUTY_EVENTS_URL or the public API)")
+    parser.add_argument("--pagerduty-queue", default="pagerduty-events.db", help="Retry queue for forwarded events")
+    parser.add_argument("--debug", action="store_true", help="Pretty-print every payload")
+    args = parser.parse_args()
+
+    debug = args.debug
+    if args.wal_dir:
+        wal = alert_wal.AlertWAL(
+            args.wal_dir,
+            segment_max_bytes=int(args.wal_segment_mb * 1024 * 1024),
+            max_segments=args.wal_max_segments or None
+        )
+        restored = restore_active_alerts(wal)
+        print(f"Write-ahead log in {args.wal_dir} ({restored} recent deliveries restored)")
+
+    if args.pagerduty_routing_key:
+        pagerduty_events = load_script("pagerduty_events", "pagerduty-events.py", os.path.join("monitoring", "alerting"))
+        routing_key = args.pagerduty_routing_key
+        events_url = args.pagerduty_events_url or pagerduty_events.EVENTS_URL
+        forwarder = pagerduty_events.PagerDutyEventForwarder(
+            queue_path=args.pagerduty_queue,
+            events_url=events_url
+        ).start()
+        print(f"Forwarding critical alerts to {events_url}")
+
+    printer = threading.Thread(target=print_console, name="alert-console", daemon=True)
+    printer.start()
+    print(f"Starting webhook receiver on port {args.port}...")
+    try:
+        serve(app, host=args.host, port=args.port, threads=args.threads, ident="sleek-webhook-receiver")
+    finally:
+        console.put(None)
+        printer.join(timeout=5)
+        if console_dropped:
+            print(f"Dropped {console_dropped} console messages while the console was behind")
+        if forwarder is not None:
+            forwarder.close()
+        if wal is not None:
+            wal.close()
+
 if __name__ == '__main__':
-    print("Starting webhook receiver on port 8888...")
-    app.run(host='0.0.0.0', port=8888, debug=True)
\ No newline at end of file
+    main()